@@ -0,0 +1,173 @@
+"""Synthetic-source harness for the live recording audio feed.
+
+Drives nff.core.PcmSocketFeed the way a recording does, without Windows or
+ffmpeg. A source thread plays a counting signal in real-time blocks, as
+the WASAPI callback would. A reader stands in for ffmpeg and can stall
+like a slow disk. The harness prints the feed counters and checks the
+received stream:
+
+    python benchmarks/audio_feed.py --seconds 12 --stall-ms 3000 --stall-every 5
+
+- timeline drift: received audio against wall-clock time
+- unbridged drops: the signal skips ahead without the silence that keeps
+  the timeline in step
+- torn frames: channels of one frame disagree
+
+Exit code 1 means the stream drifted beyond the gap threshold or was torn.
+"""
+
+# IMPORTS
+
+# Standard library
+import argparse
+import os
+import socket
+import sys
+import time
+from array import array
+from threading import Event, Thread
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Local
+from nff.core import (  # noqa: E402
+    PCM_FEED_BUFFER,
+    PCM_FEED_MAX_GAP,
+    PcmSocketFeed,
+    format_audio_feed_stats,
+)
+
+BLOCK_FRAMES = 512  # Frames per capture callback, as in LoopbackCapture
+
+
+def play_source(feed, seconds, silence):
+    """Write a counting signal in real-time blocks, silent in the given span"""
+    block = array("h", [0] * BLOCK_FRAMES * feed.channels)
+    interval = BLOCK_FRAMES / feed.rate
+    started = time.perf_counter()
+    frame = 0
+    while frame < seconds * feed.rate:
+        position = frame / feed.rate
+        if not silence[0] <= position < silence[1]:
+            for i in range(BLOCK_FRAMES):
+                # Every channel carries the frame number (wraps past 32767)
+                value = (frame + i) % 32767 + 1
+                for channel in range(feed.channels):
+                    block[i * feed.channels + channel] = value
+            feed.write(block.tobytes())
+        frame += BLOCK_FRAMES
+        delay = started + frame / feed.rate - time.perf_counter()
+        if delay > 0:
+            time.sleep(min(delay, interval))
+
+
+def read_as_ffmpeg(port, received, stall_ms, stall_every, receive_buffer, done):
+    """Read the feed like ffmpeg, pausing stall_ms every stall_every seconds"""
+    connection = socket.socket()
+    connection.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, receive_buffer)
+    connection.connect(("127.0.0.1", port))
+    next_stall = time.perf_counter() + stall_every
+    with connection:
+        while True:
+            data = connection.recv(65536)
+            if not data:
+                break
+            received.extend(data)
+            if stall_ms and time.perf_counter() >= next_stall:
+                done.wait(stall_ms / 1000)  # The stall ends early at the finish
+                next_stall = time.perf_counter() + stall_every
+
+
+def check_stream(data, channels):
+    """Count torn frames and skips in the signal not bridged by silence"""
+    samples = array("h")
+    samples.frombytes(bytes(data[: len(data) - len(data) % (2 * channels)]))
+    torn = jumps = 0
+    previous = None
+    for index in range(0, len(samples), channels):
+        frame = samples[index : index + channels]
+        if any(value != frame[0] for value in frame):
+            torn += 1
+        value = frame[0]
+        if value == 0:
+            previous = None  # Padded silence
+            continue
+        if previous is not None and value != previous % 32767 + 1:
+            jumps += 1
+        previous = value
+    return torn, jumps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=12)
+    parser.add_argument("--rate", type=int, default=48000)
+    parser.add_argument("--channels", type=int, default=2)
+    parser.add_argument("--buffer", type=float, default=PCM_FEED_BUFFER)
+    parser.add_argument(
+        "--stall-ms", type=float, default=3000, help="reader pause, 0 to disable"
+    )
+    parser.add_argument("--stall-every", type=float, default=5)
+    parser.add_argument(
+        "--silence",
+        type=float,
+        nargs=2,
+        default=(2, 3),
+        metavar=("FROM", "TO"),
+        help="seconds with no source audio, like loopback while nothing plays",
+    )
+    parser.add_argument(
+        "--receive-buffer",
+        type=int,
+        default=16384,
+        help="reader socket buffer, small so stalls reach the feed",
+    )
+    args = parser.parse_args()
+
+    feed = PcmSocketFeed(args.rate, args.channels, buffer_seconds=args.buffer)
+    port = int(feed.input_args()[-1].rsplit(":", 1)[1])
+    received = bytearray()
+    done = Event()
+    feed.start()
+    reader = Thread(
+        target=read_as_ffmpeg,
+        args=(
+            port,
+            received,
+            args.stall_ms,
+            args.stall_every,
+            args.receive_buffer,
+            done,
+        ),
+        daemon=True,
+    )
+    reader.start()
+    while not feed._connected.wait(0.1):
+        pass
+
+    started = time.perf_counter()
+    play_source(feed, args.seconds, args.silence)
+    # Stop stalling and let the writer catch up before closing
+    done.set()
+    time.sleep(3 * PCM_FEED_MAX_GAP)
+    elapsed = time.perf_counter() - started
+    stats = feed.stats()
+    feed.close()
+    reader.join(5)
+
+    received_seconds = len(received) / (2 * args.channels) / args.rate
+    drift = received_seconds - elapsed
+    torn, jumps = check_stream(received, args.channels)
+    print(format_audio_feed_stats(stats))
+    print(f"Received {received_seconds:.2f} s of audio in {elapsed:.2f} s")
+    print(
+        f"Timeline drift {drift * 1000:+.0f} ms, "
+        f"{jumps} unbridged drops, {torn} torn frames"
+    )
+    if torn or jumps or abs(drift) > 2 * PCM_FEED_MAX_GAP:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
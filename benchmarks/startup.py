@@ -0,0 +1,89 @@
+"""Cold-start benchmark for the nvencFFX window (Windows, needs a desktop).
+
+Launches nvencFFX.py several times with NFF_STARTUP_TIMING=exit, collects
+the phase timings each run prints and reports the median of every phase:
+
+    python benchmarks/startup.py --runs 5 --budget-ms 1500
+
+With --budget-ms the exit code is 1 when the median total is over budget,
+so a slower start-up can fail a release check. --panels also opens every
+collapsible panel once per launch and reports what each first open cost,
+the work that "widgets" no longer does up front.
+"""
+
+# IMPORTS
+
+# Standard library
+import argparse
+import os
+import subprocess
+import sys
+import time
+from json import loads
+from statistics import median
+
+SCRIPT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "nvencFFX.py"
+)
+
+
+def run_once(timeout, mode="exit"):
+    """Phase timings (ms) of one launch plus the process wall time"""
+    env = dict(os.environ, NFF_STARTUP_TIMING=mode)
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, SCRIPT],
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        timeout=timeout,
+        env=env,
+    )
+    wall = (time.perf_counter() - started) * 1000
+    phases = {}
+    for line in result.stdout.splitlines():
+        if line.startswith("Startup "):
+            phases.update(loads(line[len("Startup ") :]))
+        elif line.startswith("Panels "):
+            panels = loads(line[len("Panels ") :])
+            phases.update((f"open {name}", ms) for name, ms in panels.items())
+    if "total" in phases:
+        phases["process wall time"] = round(wall, 1)
+        return phases
+    raise RuntimeError(
+        f"No timing line (exit code {result.returncode}): {result.stderr[-500:]}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument(
+        "--budget-ms", type=float, help="fail if the median total is above this"
+    )
+    parser.add_argument(
+        "--panels", action="store_true", help="also time each panel's first open"
+    )
+    args = parser.parse_args()
+    mode = "panels" if args.panels else "exit"
+
+    # The first launch warms the disk cache, it is not counted
+    run_once(args.timeout, mode)
+    runs = [run_once(args.timeout, mode) for _ in range(args.runs)]
+
+    print(f"Median of {args.runs} launches:")
+    for phase in runs[0]:
+        values = [run[phase] for run in runs if phase in run]
+        print(f"  {phase:<22} {median(values):8.1f} ms")
+
+    total = median(run["total"] for run in runs)
+    if args.budget_ms is not None and total > args.budget_ms:
+        print(f"Start-up took {total:.1f} ms, over the {args.budget_ms:.0f} ms budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Headless nvencFFX: the encode engine behind the GUI and `python -m nff`"""
@@ -0,0 +1,366 @@
+"""Command line batch encoder: python -m nff [options] INPUT [INPUT ...]
+
+Encodes every file matched by the input globs with the settings of a preset
+JSON (the same files the GUI saves in presets/). With --json every event is
+one JSON object per line on stdout; diagnostics always go to stderr.
+"""
+
+# IMPORTS
+
+# Standard library
+import argparse
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+from glob import glob
+from json import dumps
+from shutil import which
+from threading import Lock, Thread
+
+# Local
+from nff.core import (
+    FFmpegCapabilities,
+    KeyframeIndex,
+    MetadataService,
+    batch_output_path,
+    build_ffmpeg_command,
+    format_progress,
+    list_presets,
+    load_preset,
+    make_encode_job,
+    make_encode_settings,
+)
+
+# Presets and caches live next to the package, shared with the GUI
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PRESETS_DIR = os.path.join(BASE_DIR, "presets")
+
+
+def expand_inputs(patterns):
+    """Files matched by glob patterns in order, without duplicates"""
+    files = {}
+    unmatched = []
+    for pattern in patterns:
+        matches = sorted(glob(pattern, recursive=True)) or [pattern]
+        found = [path for path in matches if os.path.isfile(path)]
+        if not found:
+            unmatched.append(pattern)
+        for path in found:
+            files.setdefault(os.path.normcase(os.path.abspath(path)), path)
+    return [os.path.abspath(path) for path in files.values()], unmatched
+
+
+def resolve_preset(preset):
+    """Path of a preset given as a file path or a name in presets/"""
+    if os.path.isfile(preset):
+        return preset
+    path = os.path.join(PRESETS_DIR, f"{preset}.json")
+    if os.path.isfile(path):
+        return path
+    available = ", ".join(list_presets(PRESETS_DIR))
+    raise ValueError(f"Preset not found: {preset} (available: {available})")
+
+
+class Reporter:
+    """Writes events as JSON lines or as short text, one line at a time"""
+
+    def __init__(self, stream, as_json):
+        self.stream = stream
+        self.as_json = as_json
+        self._lock = Lock()
+
+    def emit(self, event, **fields):
+        if self.as_json:
+            line = dumps({"event": event, **fields}, ensure_ascii=False)
+        elif event == "progress":
+            line = f"{os.path.basename(fields['input'])}: {fields['status']}"
+        elif event == "finished":
+            line = f"{os.path.basename(fields['input'])}: {fields['status']}"
+            if fields["error"]:
+                line += f" ({fields['error']})"
+            elif fields["status"] == "done":
+                line += f" in {fields['elapsed']:.1f} s -> {fields['output']}"
+            else:
+                line += f" -> {fields['output']}"
+        elif event == "command":
+            line = " ".join(fields["command"])
+        elif event == "summary":
+            line = ", ".join(f"{key} {value}" for key, value in fields.items())
+        else:
+            line = " ".join(str(value) for value in fields.values())
+        with self._lock:
+            print(line, file=self.stream, flush=True)
+
+
+class BatchRunner:
+    """Encodes a list of files with up to `jobs` files at a time"""
+
+    def __init__(self, args, settings, reporter):
+        self.args = args
+        self.settings = settings
+        self.reporter = reporter
+        self.metadata = MetadataService(
+            os.path.join(args.cache_dir, "nff_probe_cache.json")
+        )
+        self.keyframes = KeyframeIndex(os.path.join(args.cache_dir, "nff_keyframes"))
+        self.capabilities = FFmpegCapabilities(
+            os.path.join(args.cache_dir, "nff_capabilities.json")
+        )
+        self.results = []
+        self._lock = Lock()
+        self._queue = []
+        self._running = {}  # input path -> job
+        self._stopping = False
+
+    def run(self, files):
+        """Encode every file, return the per-file results"""
+        build = None
+        try:
+            build = self.capabilities.probe(self.args.ffmpeg)
+        except Exception as e:
+            print(f"FFmpeg capability probe failed: {e}")
+
+        outputs = set()
+        for input_f in files:
+            output_f = batch_output_path(
+                input_f,
+                self.args.output_dir,
+                self.settings["codec"],
+                self.args.container,
+            )
+            output_key = os.path.normcase(output_f)
+            if output_key == os.path.normcase(input_f) or output_key in outputs:
+                self._finish(input_f, output_f, "skipped", "output path clash", 0.0)
+                continue
+            outputs.add(output_key)
+            if build is not None:
+                command = build_ffmpeg_command(
+                    self.args.ffmpeg, self.settings, input_f, output_f
+                )
+                missing = build.missing(command)
+                if missing:
+                    error = f"FFmpeg {build.version} lacks {', '.join(missing)}"
+                    self._finish(input_f, output_f, "failed", error, 0.0)
+                    continue
+            self._queue.append((input_f, output_f))
+
+        threads = [
+            Thread(target=self._worker, daemon=True)
+            for _ in range(min(self.args.jobs, len(self._queue)))
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                # Short joins keep Ctrl+C responsive on Windows
+                while thread.is_alive():
+                    thread.join(0.2)
+        except KeyboardInterrupt:
+            self.cancel()
+            for thread in threads:
+                thread.join()
+        self.metadata.save()
+        return self.results
+
+    def cancel(self):
+        """Stop running jobs and drop the queue"""
+        with self._lock:
+            self._stopping = True
+            queued, self._queue = self._queue, []
+            running = list(self._running.values())
+        for job in running:
+            job.cancel()
+        for input_f, output_f in queued:
+            self._finish(input_f, output_f, "cancelled", None, 0.0)
+
+    def _worker(self):
+        while True:
+            with self._lock:
+                if self._stopping or not self._queue:
+                    return
+                input_f, output_f = self._queue.pop(0)
+            self._encode(input_f, output_f)
+
+    def _encode(self, input_f, output_f):
+        started = time.monotonic()
+        job = None
+        try:
+            info = self.metadata.probe(input_f, self.args.ffprobe)
+            job = make_encode_job(
+                self.args.ffmpeg,
+                self.args.ffprobe,
+                self.settings,
+                info,
+                output_f,
+                self.args.chunks,
+                self.keyframes,
+            )
+            if self.args.dry_run:
+                if hasattr(job, "command"):
+                    self.reporter.emit("command", input=input_f, command=job.command)
+                self._finish(input_f, output_f, "planned", None, 0.0, job.name)
+                return
+            with self._lock:
+                stopping = self._stopping
+                if not stopping:
+                    self._running[input_f] = job
+            finished = False
+            if not stopping:
+                self.reporter.emit(
+                    "start", input=input_f, output=output_f, job=job.name
+                )
+                finished = job.run(
+                    on_progress=lambda snapshot: self._progress(input_f, snapshot)
+                )
+            status, error = ("done", None) if finished else ("cancelled", None)
+        except Exception as e:
+            status, error = "failed", str(e)
+        finally:
+            with self._lock:
+                self._running.pop(input_f, None)
+
+        if status != "done" and os.path.exists(output_f):
+            try:
+                os.remove(output_f)
+            except OSError as e:
+                print(f"Could not remove partial output {output_f}: {e}")
+        self._finish(
+            input_f,
+            output_f,
+            status,
+            error,
+            time.monotonic() - started,
+            job.name if job else None,
+        )
+
+    def _progress(self, input_f, snapshot):
+        self.reporter.emit(
+            "progress",
+            input=input_f,
+            progress=round(snapshot["progress"], 4),
+            fps=snapshot["fps"],
+            speed=snapshot["speed"],
+            eta=snapshot["eta"],
+            status=format_progress(snapshot),
+        )
+
+    def _finish(self, input_f, output_f, status, error, elapsed, job=None):
+        size = None
+        if status == "done" and os.path.exists(output_f):
+            size = os.path.getsize(output_f)
+        result = {
+            "input": input_f,
+            "output": output_f,
+            "job": job,
+            "status": status,
+            "error": error,
+            "elapsed": round(elapsed, 3),
+            "size": size,
+        }
+        with self._lock:
+            self.results.append(result)
+        self.reporter.emit("finished", **result)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m nff",
+        description="Encode files with nvencFFX settings, no GUI needed.",
+    )
+    parser.add_argument("inputs", nargs="*", help="input files or glob patterns")
+    parser.add_argument(
+        "-p",
+        "--preset",
+        help="preset name from presets/ or a preset JSON path (defaults otherwise)",
+    )
+    parser.add_argument(
+        "-o", "--output-dir", help="output folder (default: next to each input)"
+    )
+    parser.add_argument(
+        "-c", "--container", help="output extension such as mp4 or mkv"
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1, help="files encoded at the same time"
+    )
+    parser.add_argument(
+        "--chunks",
+        type=int,
+        default=1,
+        help="NVENC sessions per file for chunked encoding (1 = off)",
+    )
+    parser.add_argument("--ffmpeg", help="ffmpeg binary (default: from PATH)")
+    parser.add_argument("--ffprobe", help="ffprobe binary (default: from PATH)")
+    parser.add_argument(
+        "--cache-dir",
+        default=BASE_DIR,
+        help="folder for the probe, keyframe and capability caches",
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="print events as JSON lines"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="probe and plan, encode nothing"
+    )
+    parser.add_argument(
+        "--list-presets", action="store_true", help="print preset names and exit"
+    )
+    args = parser.parse_args(argv)
+
+    if args.list_presets:
+        return args
+    if not args.inputs:
+        parser.error("no inputs given")
+    if args.jobs < 1 or args.chunks < 1:
+        parser.error("--jobs and --chunks must be at least 1")
+    args.ffmpeg = args.ffmpeg or which("ffmpeg")
+    args.ffprobe = args.ffprobe or which("ffprobe")
+    if not args.ffmpeg or not args.ffprobe:
+        parser.error("ffmpeg/ffprobe not found, use --ffmpeg and --ffprobe")
+    if args.output_dir:
+        args.output_dir = os.path.abspath(args.output_dir)
+        os.makedirs(args.output_dir, exist_ok=True)
+    args.cache_dir = os.path.abspath(args.cache_dir)
+    os.makedirs(args.cache_dir, exist_ok=True)
+    return args
+
+
+def main(argv=None):
+    """Run the CLI, return the exit code (0 ok, 1 a file failed, 2 bad usage)"""
+    args = parse_args(argv)
+    reporter = Reporter(sys.stdout, args.json)
+    if args.list_presets:
+        for name in list_presets(PRESETS_DIR):
+            reporter.emit("preset", name=name)
+        return 0
+
+    # Library diagnostics are printed, keep stdout for the events
+    with redirect_stdout(sys.stderr):
+        try:
+            settings = (
+                load_preset(resolve_preset(args.preset))
+                if args.preset
+                else make_encode_settings()
+            )
+        except (OSError, ValueError) as e:
+            reporter.emit("error", error=f"Failed to load preset: {e}")
+            return 2
+
+        files, unmatched = expand_inputs(args.inputs)
+        for pattern in unmatched:
+            reporter.emit("error", error=f"No files match {pattern}")
+        if not files:
+            return 2
+
+        results = BatchRunner(args, settings, reporter).run(files)
+
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    reporter.emit("summary", files=len(results), **counts)
+    ok = ("done", "planned", "skipped")
+    return 0 if all(result["status"] in ok for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,3350 @@
+"""nvencFFX core: ffmpeg command building, probing, presets and encode jobs.
+
+Nothing here needs Tk or Windows, so the GUI, the `python -m nff` command
+line and scripts on any platform share the same code.
+"""
+
+# IMPORTS
+
+# Standard library
+import os
+import socket
+import subprocess
+import tempfile
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, deque
+from hashlib import sha1
+from json import dump, dumps, load, loads
+from math import ceil
+from re import search, sub
+from shutil import copy2, rmtree
+from threading import Event, Lock, Thread, Timer
+from types import MappingProxyType
+
+
+# FFMPEG COMMAND BUILDER
+# Defaults for every setting the command builder reads. Keys match
+# nff_settings.json and preset files, so either can be used as a snapshot.
+DEFAULT_ENCODE_SETTINGS = {
+    "codec": "hevc",
+    "bitrate": "6000",
+    "constant_qp_mode": True,
+    "quality_level": "30",
+    "audio_option": "copy",
+    "custom_abitrate": "160",
+    "encoder_threads": "4",
+    "encoder_preset": "p7",
+    "encoder_tune": "hq",
+    "encoder_profile": "main",
+    "encoder_level": "auto",
+    "encoder_tier": "1",
+    "encoder_coder": "cabac",
+    "encoder_hwaccel": "cuda",
+    "encoder_multipass": "qres",
+    "encoder_rc": "vbr",
+    "encoder_lookahead_level": "auto",
+    "encoder_split_encode_mode": "forced",
+    "fps_option": "source",
+    "custom_fps": "30",
+    "fps_mode": "auto",
+    "video_format_option": "source",
+    "custom_video_width": "1920",
+    "interpolation_algo": "bicubic",
+    "cuda_output_format": False,
+    "encoder_spatial_aq": True,
+    "encoder_temporal_aq": True,
+    "encoder_strict_gop": False,
+    "encoder_no_scenecut": False,
+    "encoder_weighted_pred": False,
+    "trim_streamcopy": False,
+    "precise_trim": False,
+    "smart_trim": False,
+    "enable_additional_options": False,
+    "additional_options": "",
+    "additional_filter_options": "",
+    "additional_audio_filter_options": "",
+}
+
+# Encoder options retargeted to the first video stream so copied streams
+# (cover art/attached pics) do not receive them
+V0_TARGETS_WITH_V = {
+    "-preset:v", "-tune:v", "-profile:v", "-level:v", "-tier:v", "-coder:v",
+    "-multipass:v", "-lookahead_level:v", "-split_encode_mode:v", "-spatial_aq:v",
+    "-temporal_aq:v", "-strict_gop:v", "-no-scenecut:v", "-weighted_pred:v",
+    "-rc:v", "-qp:v", "-b:v", "-maxrate:v", "-bufsize:v"
+}
+V0_TARGETS_NO_V = {
+    "-bf"
+}
+
+
+def make_encode_settings(settings_dict=None):
+    """Return an immutable settings snapshot with defaults for missing keys"""
+    snapshot = dict(DEFAULT_ENCODE_SETTINGS)
+    for key, value in (settings_dict or {}).items():
+        if key in DEFAULT_ENCODE_SETTINGS and value is not None:
+            snapshot[key] = value
+    return MappingProxyType(snapshot)
+
+
+def split_trim_options(additional_options):
+    """Split "-ss"/"-to" pairs out of an additional options string"""
+    trim_options = []
+    other_options = []
+    parts = additional_options.split()
+    i = 0
+    while i < len(parts):
+        if parts[i] in ("-ss", "-to") and i + 1 < len(parts):
+            trim_options.extend([parts[i], parts[i + 1]])
+            i += 2
+        else:
+            other_options.append(parts[i])
+            i += 1
+    return trim_options, other_options
+
+
+def strip_trim_options(command):
+    """Return a copy of a command list without "-ss"/"-to" and their values"""
+    filtered_cmd = []
+    i = 0
+    while i < len(command):
+        if command[i] in ("-ss", "-to"):
+            i += 2  # Skip the parameter and its value
+        else:
+            filtered_cmd.append(command[i])
+            i += 1
+    return filtered_cmd
+
+
+def retarget_command(command, input_f, output_f):
+    """Return a copy of a (custom) command with its input and output replaced"""
+    command = list(command)
+    try:
+        i_index = command.index("-i")
+        if i_index + 1 < len(command):
+            command[i_index + 1] = input_f
+    except ValueError:
+        pass
+
+    if len(command) > 0:
+        command[-1] = output_f
+    return command
+
+
+def with_input_seek(command, start, length):
+    """Return a copy of a command that only reads `length` seconds from `start`"""
+    command = list(command)
+    try:
+        i_index = command.index("-i")
+    except ValueError:
+        return command
+    command[i_index:i_index] = ["-ss", f"{start:.3f}", "-t", str(length)]
+    return command
+
+
+def build_audio_options(audio_opt, custom_abitrate):
+    """Return audio codec/bitrate flags for an audio option"""
+    if audio_opt == "disable":
+        return ["-an"]
+    elif audio_opt == "copy":
+        return ["-c:a", "copy"]
+    elif audio_opt == "aac_96k":
+        return ["-c:a", "aac", "-b:a", "96k"]
+    elif audio_opt == "aac_160k":
+        return ["-c:a", "aac", "-b:a", "160k"]
+    elif audio_opt == "aac_256k":
+        return ["-c:a", "aac", "-b:a", "256k"]
+    elif audio_opt == "opus_96k":
+        return ["-c:a", "libopus", "-b:a", "96k"]
+    elif audio_opt == "opus_160k":
+        return ["-c:a", "libopus", "-b:a", "160k"]
+    elif audio_opt == "opus_256k":
+        return ["-c:a", "libopus", "-b:a", "256k"]
+    elif audio_opt == "custom":
+        try:
+            int(custom_abitrate)
+        except ValueError:
+            raise ValueError("Custom audio bitrate must be a number.")
+        return ["-c:a", "aac", "-b:a", f"{custom_abitrate}k"]
+    return []
+
+
+def build_ffmpeg_command(ffmpeg_path, settings, input_f, output_f, keyframes=None):
+    """Build an encode command from a settings snapshot without touching the GUI.
+
+    `keyframes` (positions from the start of the input) moves a stream-copy
+    trim onto the keyframe the cut really starts at.
+    """
+    if not ffmpeg_path:
+        raise ValueError("FFmpeg path is not specified")
+    if not output_f:
+        raise ValueError("Please set an output file")
+    if not input_f:
+        raise ValueError("Please fill in all main fields.")
+
+    add_val = settings["additional_options"].strip()
+
+    # Basic command structure
+    command = [ffmpeg_path, "-hide_banner"]
+
+    # Handle Streamcopy option
+    if settings["trim_streamcopy"]:
+        # Extract trim options from additional_options if not in precise mode
+        if not settings["precise_trim"]:
+            trim_options, other_additional_options = split_trim_options(add_val)
+            if keyframes:
+                trim_options = snap_trim_options(trim_options, keyframes)
+        else:
+            # In precise mode, use all additional options as-is
+            trim_options, other_additional_options = [], add_val.split()
+
+        # Add trim options at the beginning if we have any
+        command.extend(trim_options)
+        command.extend(["-y", "-i", input_f])
+
+        if "-map" not in other_additional_options:
+            command.extend(["-map", "0", "-ignore_unknown"])
+
+        # Add other additional options (excluding trim options that were already added)
+        command.extend(other_additional_options)
+
+        # Video stream copy
+        command.extend(["-c:v", "copy"])
+
+        # Audio handling
+        command.extend(
+            build_audio_options(settings["audio_option"], settings["custom_abitrate"])
+        )
+
+        command.append(output_f)
+        return command
+
+    # Extract trim options from additional_options if not in precise mode
+    if not settings["precise_trim"]:
+        trim_options, other_additional_options = split_trim_options(add_val)
+    elif settings["enable_additional_options"]:
+        # In precise mode use all additional options as-is (when enabled)
+        trim_options, other_additional_options = [], add_val.split()
+    else:
+        trim_options, other_additional_options = [], []
+
+    # Add trim options at the beginning if we have any
+    command.extend(trim_options)
+
+    # Continue with hardware acceleration and threads
+    hwaccel = settings["encoder_hwaccel"]
+    if hwaccel != "auto":
+        command.extend(["-hwaccel:v", hwaccel])
+        if hwaccel == "cuda" and settings["cuda_output_format"]:
+            command.extend(["-hwaccel_output_format:v", "cuda"])
+
+    if settings["encoder_threads"] != "auto":
+        command.extend(["-threads", settings["encoder_threads"]])
+
+    command.extend(["-y", "-i", input_f])
+
+    if "-map" not in other_additional_options:
+        command.extend(["-map", "0", "-ignore_unknown"])
+
+    # Normal encoding path
+    if settings["constant_qp_mode"]:
+        # Constant QP mode
+        quality_val = settings["quality_level"]
+        try:
+            quality_int = int(quality_val)
+            if not (0 <= quality_int <= 51):
+                raise ValueError("Quality level must be between 0 and 51")
+        except ValueError:
+            raise ValueError("Quality level must be a number between 0 and 51")
+    else:
+        # Normal VBR/CBR mode
+        bitrate_val = settings["bitrate"]
+        try:
+            bitrate_int = int(bitrate_val)
+            maxrate_val = (bitrate_int * 12 + 9) // 10
+            bufsize_val = maxrate_val * 2
+        except ValueError:
+            raise ValueError("Video bitrate must be a number.")
+
+    vf_filters = []
+    fps_num = settings["fps_option"]
+    if fps_num == "custom":
+        fps_num = settings["custom_fps"]
+        if not fps_num:
+            raise ValueError("Please specify custom FPS.")
+    if fps_num != "source":
+        vf_filters.append(f"fps={fps_num}")
+    scale_width = settings["video_format_option"]
+    if scale_width == "custom":
+        scale_width = settings["custom_video_width"]
+        if not scale_width:
+            raise ValueError("Please specify custom video width.")
+    if scale_width != "source":
+        interp_flag = settings["interpolation_algo"]
+        vf_filters.append(f"scale={scale_width}:-2:flags={interp_flag}")
+
+    addvf_val = settings["additional_filter_options"].strip()
+    if addvf_val:
+        vf_filters.append(addvf_val)
+
+    # Skip -vf if user specified -filter_complex in Additional Options
+    has_filter_complex = "-filter_complex" in other_additional_options
+
+    if vf_filters and not has_filter_complex:
+        command.extend(["-vf", ",".join(vf_filters)])
+
+    if settings["fps_mode"] != "auto":
+        command.extend(["-fps_mode", settings["fps_mode"]])
+
+    # Add encoder settings based on mode
+    codec = settings["codec"]
+    codec_map = {"hevc": "hevc_nvenc", "av1": "av1_nvenc"}
+    command.extend(["-c:v", "copy", "-c:v:0", codec_map.get(codec, "h264_nvenc")])
+
+    if settings["encoder_preset"] != "auto":
+        command.extend(["-preset:v", settings["encoder_preset"]])
+
+    if settings["encoder_tune"] != "auto":
+        command.extend(["-tune:v", settings["encoder_tune"]])
+
+    if settings["encoder_profile"] != "auto" and codec != "av1":
+        command.extend(["-profile:v", settings["encoder_profile"]])
+
+    if settings["encoder_level"] != "auto":
+        command.extend(["-level:v", settings["encoder_level"]])
+
+    if codec in ("hevc", "av1"):
+        if settings["encoder_tier"] != "auto":
+            command.extend(["-tier:v", settings["encoder_tier"]])
+    else:
+        if settings["encoder_coder"] != "auto":
+            command.extend(["-coder:v", settings["encoder_coder"]])
+
+    if settings["encoder_multipass"] != "auto":
+        command.extend(["-multipass:v", settings["encoder_multipass"]])
+
+    if settings["encoder_lookahead_level"] != "auto":
+        command.extend(["-lookahead_level:v", settings["encoder_lookahead_level"]])
+
+    if codec in ("hevc", "av1"):
+        if settings["encoder_split_encode_mode"] != "auto":
+            command.extend(
+                ["-split_encode_mode:v", settings["encoder_split_encode_mode"]]
+            )
+
+    if settings["encoder_spatial_aq"]:
+        command.extend(["-spatial_aq:v", "1"])
+
+    if settings["encoder_temporal_aq"]:
+        command.extend(["-temporal_aq:v", "1"])
+
+    if settings["encoder_strict_gop"]:
+        command.extend(["-strict_gop:v", "1"])
+
+    if settings["encoder_no_scenecut"]:
+        command.extend(["-no-scenecut:v", "1"])
+
+    if settings["encoder_weighted_pred"]:
+        command.extend(["-weighted_pred:v", "1", "-bf", "0"])
+
+    # Add rate control parameters based on mode
+    if settings["constant_qp_mode"]:
+        command.extend(["-rc:v", "constqp", "-qp:v", quality_val])
+    else:
+        command.extend(
+            [
+                "-rc:v",
+                settings["encoder_rc"],
+                "-b:v",
+                f"{bitrate_val}k",
+                "-maxrate:v",
+                f"{maxrate_val}k",
+                "-bufsize:v",
+                f"{bufsize_val}k",
+            ]
+        )
+
+    # Add other additional options (excluding trim options that were already added)
+    command.extend(other_additional_options)
+
+    # Add audio filters if any
+    add_af_val = settings["additional_audio_filter_options"].strip()
+    if add_af_val:
+        command.extend(["-af", add_af_val])
+
+    # Audio settings
+    command.extend(
+        build_audio_options(settings["audio_option"], settings["custom_abitrate"])
+    )
+
+    command.append(output_f)
+
+    # Post-process: target video encoder options to the first video stream (:v:0)
+    # to avoid applying them to copied streams (like cover art/attached pics).
+    for idx in range(len(command)):
+        if command[idx] in V0_TARGETS_WITH_V:
+            command[idx] = command[idx] + ":0"
+        elif command[idx] in V0_TARGETS_NO_V:
+            command[idx] = command[idx] + ":v:0"
+
+    return command
+
+
+# KEYFRAME INDEX
+KEYFRAME_CACHE_FILES = 500  # Index files kept on disk, oldest removed first
+KEYFRAME_MEMORY_ENTRIES = 8
+
+
+def probe_keyframes(ffprobe_path, path, timeout=600):
+    """Keyframe timestamps of the first video stream from packet flags (no decoding)"""
+    command = [
+        ffprobe_path,
+        "-v",
+        "error",
+        "-select_streams",
+        "v:0",
+        "-show_entries",
+        "packet=pts_time,flags",
+        "-of",
+        "csv=p=0",
+        path,
+    ]
+    result = subprocess.run(
+        command,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        timeout=timeout,
+        creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or "ffprobe failed")
+
+    keyframes = []
+    for line in result.stdout.splitlines():
+        pts_time, _, flags = line.partition(",")
+        if "K" not in flags:
+            continue
+        try:
+            keyframes.append(float(pts_time))
+        except ValueError:
+            continue
+    return sorted(keyframes)
+
+
+def parse_time_option(value):
+    """Seconds from an ffmpeg time value ("SS[.ms]", "MM:SS", "HH:MM:SS[.ms]")"""
+    try:
+        seconds = 0.0
+        for part in value.split(":"):
+            seconds = seconds * 60 + float(part)
+        return seconds
+    except ValueError:
+        return None
+
+
+def keyframe_at_or_before(keyframes, seconds):
+    """Last keyframe not after `seconds` (where a stream copy starting there cuts)"""
+    index = bisect_right(keyframes, seconds + 1e-6)
+    return keyframes[index - 1] if index else None
+
+
+def nearest_keyframe(keyframes, seconds):
+    """Keyframe closest to `seconds`, or None without keyframes"""
+    index = bisect_left(keyframes, seconds)
+    candidates = keyframes[max(0, index - 1) : index + 1]
+    return min(candidates, key=lambda k: abs(k - seconds)) if candidates else None
+
+
+def snap_trim_options(trim_options, keyframes):
+    """Move a stream-copy "-ss" onto the keyframe the cut really lands on"""
+    snapped = list(trim_options)
+    for i in range(0, len(snapped) - 1, 2):
+        if snapped[i] != "-ss":
+            continue
+        seconds = parse_time_option(snapped[i + 1])
+        keyframe = None
+        if seconds is not None:
+            keyframe = keyframe_at_or_before(keyframes, seconds)
+        if keyframe is not None:
+            # Rounded up, a seek to just below the keyframe would use the one before
+            snapped[i + 1] = f"{max(0.0, keyframe) + 0.0005:.3f}"
+    return snapped
+
+
+class KeyframeIndex:
+    """Per-file keyframe timestamps from a packet scan, cached on disk.
+
+    Each index is a flat file of doubles (array("d")), so reopening a file
+    reads it back in milliseconds instead of rescanning every packet.
+    Timestamps are the raw packet times; subtract the container start time
+    to get positions as seen by "-ss".
+    """
+
+    def __init__(self, cache_dir, max_files=KEYFRAME_CACHE_FILES):
+        self.cache_dir = cache_dir
+        self.max_files = max_files
+        self._lock = Lock()
+        self._memory = OrderedDict()  # identity -> array("d")
+        self._in_flight = {}  # identity -> Event
+
+    def index_path(self, identity):
+        name = sha1(repr(identity).encode("utf-8")).hexdigest()[:24]
+        return os.path.join(self.cache_dir, f"{name}.kfi")
+
+    def get_cached(self, path):
+        """Keyframes of an unchanged file if indexed before, without scanning"""
+        try:
+            identity = ThumbnailService.file_identity(path)
+        except OSError:
+            return None
+        with self._lock:
+            keyframes = self._memory.get(identity)
+            if keyframes is not None:
+                self._memory.move_to_end(identity)
+                return keyframes
+
+        index_path = self.index_path(identity)
+        try:
+            keyframes = array("d")
+            with open(index_path, "rb") as file:
+                keyframes.frombytes(file.read())
+            os.utime(index_path)  # Keep recently used indexes when pruning
+        except OSError:
+            return None
+        self._remember(identity, keyframes)
+        return keyframes
+
+    def build(self, ffprobe_path, path, timeout=600):
+        """Keyframes of a file, scanning its packets at most once per version.
+
+        Raises subprocess.TimeoutExpired or RuntimeError when the scan fails.
+        """
+        identity = ThumbnailService.file_identity(path)
+        while True:
+            keyframes = self.get_cached(path)
+            if keyframes is not None:
+                return keyframes
+
+            with self._lock:
+                pending = self._in_flight.get(identity)
+                if pending is None:
+                    self._in_flight[identity] = Event()
+                    break
+            # Another thread is scanning this file, wait and reuse its result
+            pending.wait(timeout)
+
+        try:
+            if not ffprobe_path:
+                raise RuntimeError("ffprobe not found")
+            keyframes = array("d", probe_keyframes(ffprobe_path, path, timeout))
+            self._remember(identity, keyframes)
+            self._write(identity, keyframes)
+            return keyframes
+        finally:
+            with self._lock:
+                event = self._in_flight.pop(identity, None)
+            if event is not None:
+                event.set()
+
+    def _remember(self, identity, keyframes):
+        with self._lock:
+            self._memory[identity] = keyframes
+            self._memory.move_to_end(identity)
+            while len(self._memory) > KEYFRAME_MEMORY_ENTRIES:
+                self._memory.popitem(last=False)
+
+    def _write(self, identity, keyframes):
+        index_path = self.index_path(identity)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(index_path + ".tmp", "wb") as file:
+                file.write(keyframes.tobytes())
+            os.replace(index_path + ".tmp", index_path)
+
+            indexes = [
+                os.path.join(self.cache_dir, name)
+                for name in os.listdir(self.cache_dir)
+                if name.endswith(".kfi")
+            ]
+            indexes.sort(key=os.path.getmtime, reverse=True)
+            for old_path in indexes[self.max_files :]:
+                os.remove(old_path)
+        except OSError as e:
+            print(f"Error saving keyframe index: {e}")
+
+
+# CHUNKED ENCODING
+CHUNKED_ENCODE_OPTIONS = ["off", "2", "3", "4"]
+CHUNK_MIN_LENGTH = 20.0  # NVENC start-up and lookahead make shorter chunks wasteful
+CHUNKS_PER_SESSION = 2  # Spare chunks keep every session busy until the end
+
+
+def chunking_blocker(settings):
+    """Why a settings snapshot can't be encoded in chunks (None if it can)"""
+    if settings["trim_streamcopy"]:
+        return "Streamcopy is enabled"
+    if settings["smart_trim"]:
+        return "Smart trim is enabled"
+    options = settings["additional_options"].split()
+    if "-ss" in options or "-to" in options:
+        return "trimming is set"
+    if "-map" in options or "-filter_complex" in options:
+        return "Additional Options use -map or -filter_complex"
+    return None
+
+
+def plan_chunk_boundaries(keyframes, duration, count, min_length=CHUNK_MIN_LENGTH):
+    """Pick keyframes closest to `count` equal parts, no chunk under min_length"""
+    boundaries = []
+    last = 0.0
+    for i in range(1, count):
+        target = duration * i / count
+        candidates = [
+            keyframe
+            for keyframe in keyframes
+            if keyframe - last >= min_length and duration - keyframe >= min_length
+        ]
+        if not candidates:
+            break
+        last = min(candidates, key=lambda keyframe: abs(keyframe - target))
+        boundaries.append(last)
+    return boundaries
+
+
+def combine_progress(snapshots, duration):
+    """Merge the latest progress snapshot of every chunk into one for the UI"""
+    active = [snapshot for snapshot in snapshots if snapshot and not snapshot["done"]]
+    out_time = sum(snapshot["out_time"] for snapshot in snapshots if snapshot)
+    speed = sum(snapshot["speed"] for snapshot in active)
+    progress = min(out_time / duration, 1.0) if duration > 0 else 0.0
+    return {
+        "frame": sum(snapshot["frame"] for snapshot in snapshots if snapshot),
+        "fps": sum(snapshot["fps"] for snapshot in active),
+        "out_time": out_time,
+        "speed": speed,
+        "bitrate": "N/A",
+        "total_size": sum(snapshot["total_size"] for snapshot in snapshots if snapshot),
+        "dup": sum(snapshot["dup"] for snapshot in snapshots if snapshot),
+        "drop": sum(snapshot["drop"] for snapshot in snapshots if snapshot),
+        "progress": progress,
+        "eta": max(0.0, (duration - out_time) / speed) if speed > 0 else None,
+        "done": False,
+    }
+
+
+class FFmpegJob:
+    """Several hidden ffmpeg processes run as one cancellable job"""
+
+    name = "Encoding"
+
+    def __init__(self):
+        self._cancel = Event()
+        self._lock = Lock()
+        self._processes = []
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        """Stop all running steps (safe to call from any thread)"""
+        with self._lock:
+            self._cancel.set()
+            processes = list(self._processes)
+        for process in processes:
+            try:
+                process.terminate()
+            except Exception:
+                pass
+
+    def _run_collecting(self, command, cwd, name, errors):
+        try:
+            self._run_process(command, cwd, name)
+        except Exception as e:
+            errors.append(str(e))
+
+    def _run_process(self, command, cwd, name, progress=None, on_snapshot=None):
+        """Run one hidden ffmpeg process, raise with its last stderr line on failure"""
+        stderr_path = os.path.join(cwd, f"{name}.err")
+        with open(stderr_path, "w", encoding="utf-8") as stderr_file:
+            with self._lock:
+                if self.cancelled:
+                    return
+                process = subprocess.Popen(
+                    command,
+                    cwd=cwd,
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.PIPE if progress else subprocess.DEVNULL,
+                    stderr=stderr_file,
+                    text=True,
+                    encoding="utf-8",
+                    errors="replace",
+                    creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
+                )
+                self._processes.append(process)
+
+            if progress:
+                for line in process.stdout:
+                    if progress.feed(line):
+                        snapshot = progress.poll()
+                        if snapshot and on_snapshot:
+                            on_snapshot(snapshot)
+            process.wait()
+
+        with self._lock:
+            self._processes.remove(process)
+        if self.cancelled:
+            return
+        if process.returncode != 0:
+            with open(stderr_path, "r", encoding="utf-8", errors="replace") as f:
+                lines = [line.strip() for line in f if line.strip()]
+            raise RuntimeError(
+                lines[-1] if lines else f"FFmpeg exited with {process.returncode}"
+            )
+
+
+class EncodeJob(FFmpegJob):
+    """Encode one file with a single ffmpeg command (paths must be absolute)"""
+
+    def __init__(self, command, duration):
+        super().__init__()
+        self.command = command
+        self.duration = duration
+
+    def run(self, on_progress=None, on_status=None):
+        """Run the command, return False if cancelled, raise RuntimeError on failure"""
+        if on_status:
+            on_status("Encoding...")
+        work_dir = tempfile.mkdtemp(prefix="nff_encode_")
+        try:
+            self._run_process(
+                with_progress_pipe(self.command),
+                work_dir,
+                "encode",
+                FFmpegProgress(self.duration),
+                on_progress,
+            )
+            return not self.cancelled
+        finally:
+            rmtree(work_dir, ignore_errors=True)
+
+
+class ChunkedEncode(FFmpegJob):
+    """Encode one file as parallel keyframe-aligned chunks and join them losslessly.
+
+    The first video stream is split with the segment muxer (stream copy), the
+    chunks are encoded by up to `sessions` ffmpeg processes with the regular
+    command builder, audio is encoded once on the side, and the concat demuxer
+    joins everything into the output without re-encoding.
+    """
+
+    name = "Chunked encoding"
+
+    def __init__(
+        self,
+        ffmpeg_path,
+        ffprobe_path,
+        settings,
+        input_f,
+        output_f,
+        duration,
+        sessions,
+        start_time=0.0,
+        keyframe_index=None,
+    ):
+        super().__init__()
+        self.ffmpeg_path = ffmpeg_path
+        self.ffprobe_path = ffprobe_path
+        self.settings = settings
+        self.input_f = input_f
+        self.output_f = output_f
+        self.duration = duration
+        self.sessions = sessions
+        self.start_time = start_time
+        self.keyframe_index = keyframe_index
+
+    def run(self, on_progress=None, on_status=None):
+        """Run every step, return False if cancelled, raise RuntimeError on failure"""
+        on_status = on_status or (lambda text: None)
+        work_dir = tempfile.mkdtemp(
+            prefix="nff_chunks_", dir=os.path.dirname(os.path.abspath(self.output_f))
+        )
+        try:
+            on_status("Finding keyframes...")
+            # ffmpeg shifts the input to start at 0, so do the same with the keyframes
+            if self.keyframe_index is not None:
+                scanned = self.keyframe_index.build(self.ffprobe_path, self.input_f)
+            else:
+                scanned = probe_keyframes(self.ffprobe_path, self.input_f)
+            keyframes = [keyframe - self.start_time for keyframe in scanned]
+            boundaries = plan_chunk_boundaries(
+                keyframes, self.duration, self.sessions * CHUNKS_PER_SESSION
+            )
+            if self.cancelled:
+                return False
+
+            on_status(f"Splitting into {len(boundaries) + 1} chunks...")
+            self._run_process(
+                self._split_command(boundaries, work_dir), work_dir, "split"
+            )
+            sources = sorted(
+                name
+                for name in os.listdir(work_dir)
+                if name.startswith("source_") and name.endswith(".mkv")
+            )
+            if not sources:
+                raise RuntimeError("Splitting the video produced no chunks")
+            if self.cancelled:
+                return False
+
+            # Audio is encoded once while the video chunks are running
+            audio_errors = []
+            audio_file = None
+            audio_command = self._audio_command(work_dir)
+            if audio_command:
+                audio_file = audio_command[-1]
+                audio_thread = Thread(
+                    target=self._run_collecting,
+                    args=(audio_command, work_dir, "audio", audio_errors),
+                    daemon=True,
+                )
+                audio_thread.start()
+
+            on_status(
+                f"Encoding {len(sources)} chunks in {self.sessions} sessions..."
+            )
+            self._encode_chunks(sources, boundaries, work_dir, on_progress)
+
+            if audio_command:
+                audio_thread.join()
+                if audio_errors and not self.cancelled:
+                    raise RuntimeError(f"Audio encode failed: {audio_errors[0]}")
+            if self.cancelled:
+                return False
+
+            on_status("Joining chunks...")
+            list_path = os.path.join(work_dir, "chunks.txt")
+            with open(list_path, "w", encoding="utf-8") as f:
+                for name in sources:
+                    f.write(f"file 'encoded_{name[len('source_'):]}'\n")
+            self._run_process(
+                self._join_command(list_path, audio_file), work_dir, "join"
+            )
+            return not self.cancelled
+        finally:
+            rmtree(work_dir, ignore_errors=True)
+
+    def _split_command(self, boundaries, work_dir):
+        command = [
+            self.ffmpeg_path,
+            "-hide_banner",
+            "-y",
+            "-i",
+            self.input_f,
+            "-map",
+            "0:v:0",
+            "-c",
+            "copy",
+            "-f",
+            "segment",
+            "-reset_timestamps",
+            "1",
+        ]
+        if boundaries:
+            # Slightly early so float rounding can't push a cut to the next keyframe
+            command += [
+                "-segment_times",
+                ",".join(f"{max(0.0, t - 0.001):.6f}" for t in boundaries),
+            ]
+        command.append(os.path.join(work_dir, "source_%04d.mkv"))
+        return command
+
+    def _chunk_command(self, source, encoded):
+        """Regular encode command for one chunk: same encoder flags, video only"""
+        chunk_settings = dict(self.settings)
+        chunk_settings.update(
+            audio_option="disable", additional_audio_filter_options=""
+        )
+        return build_ffmpeg_command(
+            self.ffmpeg_path, make_encode_settings(chunk_settings), source, encoded
+        )
+
+    def _audio_command(self, work_dir):
+        """Separate audio encode, None when audio is dropped or copied at the join"""
+        audio_filters = self.settings["additional_audio_filter_options"].strip()
+        audio_option = self.settings["audio_option"]
+        if audio_option == "disable" or (audio_option == "copy" and not audio_filters):
+            return None
+
+        command = [
+            self.ffmpeg_path,
+            "-hide_banner",
+            "-y",
+            "-i",
+            self.input_f,
+            "-map",
+            "0:a?",
+        ]
+        if audio_filters:
+            command += ["-af", audio_filters]
+        command += build_audio_options(audio_option, self.settings["custom_abitrate"])
+        command.append(os.path.join(work_dir, "audio.mka"))
+        return command
+
+    def _join_command(self, list_path, audio_file):
+        command = [
+            self.ffmpeg_path,
+            "-hide_banner",
+            "-y",
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            list_path,
+            "-i",
+            self.input_f,
+        ]
+        if audio_file:
+            command += ["-i", audio_file]
+        command += ["-map", "0:v"]
+        if audio_file:
+            command += ["-map", "2:a?"]
+        elif self.settings["audio_option"] != "disable":
+            command += ["-map", "1:a?"]
+        command += [
+            "-map",
+            "1:s?",
+            "-map_metadata",
+            "1",
+            "-map_chapters",
+            "1",
+            "-c:v",
+            "copy",
+            "-c:a",
+            "copy",
+            self.output_f,
+        ]
+        return command
+
+    def _encode_chunks(self, sources, boundaries, work_dir, on_progress):
+        """Encode the chunks with a pool of `sessions` worker threads"""
+        starts = [0.0] + boundaries
+        if len(starts) == len(sources):
+            ends = starts[1:] + [self.duration]
+            lengths = [end - start for start, end in zip(starts, ends)]
+        else:
+            lengths = [self.duration / len(sources)] * len(sources)
+
+        snapshots = [None] * len(sources)
+        pending = list(range(len(sources)))
+        errors = []
+
+        def report(index, snapshot):
+            snapshots[index] = snapshot
+            if on_progress:
+                on_progress(combine_progress(snapshots, self.duration))
+
+        def worker():
+            while not self.cancelled and not errors:
+                with self._lock:
+                    if not pending:
+                        return
+                    index = pending.pop(0)
+                name = sources[index]
+                encoded = os.path.join(work_dir, f"encoded_{name[len('source_'):]}")
+                command = self._chunk_command(os.path.join(work_dir, name), encoded)
+                try:
+                    self._run_process(
+                        with_progress_pipe(command),
+                        work_dir,
+                        f"chunk_{index}",
+                        FFmpegProgress(lengths[index]),
+                        lambda snapshot, index=index: report(index, snapshot),
+                    )
+                except Exception as e:
+                    errors.append(str(e))
+
+        threads = [
+            Thread(target=worker, daemon=True)
+            for _ in range(min(self.sessions, len(sources)))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if errors and not self.cancelled:
+            raise RuntimeError(errors[0])
+
+
+# SMART CUT
+SMART_CUT_ENCODERS = {"h264": "h264_nvenc", "hevc": "hevc_nvenc"}
+# ffprobe profile names -> NVENC -profile:v values
+SMART_CUT_PROFILES = {
+    "h264": {
+        "Constrained Baseline": "baseline",
+        "Baseline": "baseline",
+        "Main": "main",
+        "High": "high",
+        "High 4:4:4 Predictive": "high444p",
+    },
+    "hevc": {"Main": "main", "Main 10": "main10", "Rext": "rext"},
+}
+# Source pixel formats -> NVENC input formats
+SMART_CUT_PIX_FMTS = {
+    "yuv420p": "yuv420p",
+    "yuvj420p": "yuv420p",
+    "nv12": "nv12",
+    "yuv420p10le": "p010le",
+    "p010le": "p010le",
+    "yuv444p": "yuv444p",
+}
+SMART_CUT_COLOR_OPTIONS = (
+    ("color_range", "-color_range"),
+    ("color_primaries", "-color_primaries"),
+    ("color_transfer", "-color_trc"),
+    ("color_space", "-colorspace"),
+)
+SMART_CUT_QP = 18  # Boundary GOPs when the source bitrate is unknown
+
+
+def smart_cut_blocker(settings, info):
+    """Why the trim can't be smart cut (None if it can)"""
+    if info is None or info.video_codec not in SMART_CUT_ENCODERS:
+        codec = info.video_codec if info and info.video_codec else "this"
+        return f"{codec} video can't be smart cut (H.264/HEVC only)"
+    trim_options, other_options = split_trim_options(
+        settings["additional_options"].strip()
+    )
+    if not trim_options:
+        return "no trim is set"
+    if other_options:
+        return "Additional Options other than trimming are set"
+    if settings["additional_filter_options"].strip():
+        return "video filters are set"
+    return None
+
+
+def smart_cut_range(settings, duration):
+    """(start, end) in seconds of the "-ss"/"-to" trim in Additional Options"""
+    trim_options, _ = split_trim_options(settings["additional_options"].strip())
+    values = dict(zip(trim_options[::2], trim_options[1::2]))
+    start = parse_time_option(values.get("-ss", "0")) or 0.0
+    end = parse_time_option(values.get("-to", "")) or duration
+    if duration > 0:
+        end = min(end, duration)
+    return max(0.0, start), end
+
+
+def plan_smart_cut(keyframes, start, end, frame_time):
+    """Split a trim into ("encode"|"copy", start, end) pieces.
+
+    Only the frames from the cut to the next keyframe (head) and from the last
+    keyframe to the end (tail) are re-encoded; whole GOPs in between are copied.
+    """
+    tolerance = frame_time / 2
+    head_end = None
+    index = bisect_left(keyframes, start - tolerance)
+    if index < len(keyframes):
+        head_end = keyframes[index]
+    tail_start = keyframe_at_or_before(keyframes, end + tolerance)
+    if head_end is None or tail_start is None or tail_start <= head_end + tolerance:
+        return [("encode", start, end)]
+
+    pieces = []
+    if head_end - start > tolerance:
+        pieces.append(("encode", start, head_end))
+    pieces.append(("copy", head_end, tail_start))
+    if end - tail_start > tolerance:
+        pieces.append(("encode", tail_start, end))
+    return pieces
+
+
+class SmartCut(FFmpegJob):
+    """Frame-accurate trim that re-encodes only the boundary GOPs.
+
+    The head (cut point to the next keyframe) and the tail (last keyframe to
+    the end point) are encoded with NVENC using the source codec, profile,
+    pixel format, colors and bitrate; the keyframe-aligned middle is stream
+    copied. The pieces are MPEG-TS so parameter sets travel in-band, and the
+    concat demuxer joins them with the trimmed audio into the output.
+    """
+
+    name = "Smart cut"
+
+    def __init__(
+        self,
+        ffmpeg_path,
+        ffprobe_path,
+        settings,
+        info,
+        output_f,
+        keyframe_index=None,
+    ):
+        super().__init__()
+        self.ffmpeg_path = ffmpeg_path
+        self.ffprobe_path = ffprobe_path
+        self.settings = settings
+        self.info = info
+        self.input_f = info.path
+        self.output_f = output_f
+        self.keyframe_index = keyframe_index
+        self.start, self.end = smart_cut_range(settings, info.duration)
+        self.frame_time = 1.0 / (info.fps or 30.0)
+
+    def run(self, on_progress=None, on_status=None):
+        """Run every step, return False if cancelled, raise RuntimeError on failure"""
+        on_status = on_status or (lambda text: None)
+        if self.end - self.start < self.frame_time:
+            raise RuntimeError("The trim is shorter than one frame")
+        work_dir = tempfile.mkdtemp(
+            prefix="nff_smartcut_", dir=os.path.dirname(os.path.abspath(self.output_f))
+        )
+        try:
+            on_status("Finding keyframes...")
+            if self.keyframe_index is not None:
+                scanned = self.keyframe_index.build(self.ffprobe_path, self.input_f)
+            else:
+                scanned = probe_keyframes(self.ffprobe_path, self.input_f)
+            keyframes = [keyframe - self.info.start_time for keyframe in scanned]
+            pieces = plan_smart_cut(keyframes, self.start, self.end, self.frame_time)
+            if self.cancelled:
+                return False
+
+            encoded = sum(
+                end - start for kind, start, end in pieces if kind == "encode"
+            )
+            on_status(
+                f"Re-encoding {format_timestamp(encoded)} at the cut points, "
+                "copying the rest..."
+            )
+            errors = []
+            threads = []
+            names = []
+            for index, (kind, start, end) in enumerate(pieces):
+                name = f"piece_{index}"
+                if kind == "copy":
+                    command = self._copy_command(start, end, name, work_dir)
+                    names.append(f"{name}_000.ts")
+                else:
+                    command = self._encode_command(start, end, name, work_dir)
+                    names.append(f"{name}.ts")
+                thread = Thread(
+                    target=self._run_collecting,
+                    args=(command, work_dir, name, errors),
+                    daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+            for thread in threads:
+                thread.join()
+            if errors and not self.cancelled:
+                raise RuntimeError(errors[0])
+            if self.cancelled:
+                return False
+
+            on_status("Joining pieces...")
+            list_path = os.path.join(work_dir, "pieces.txt")
+            with open(list_path, "w", encoding="utf-8") as f:
+                for name, (_, start, end) in zip(names, pieces):
+                    f.write(f"file '{name}'\nduration {end - start:.6f}\n")
+            self._run_process(
+                with_progress_pipe(self._join_command(list_path)),
+                work_dir,
+                "join",
+                FFmpegProgress(self.end - self.start),
+                on_progress,
+            )
+            return not self.cancelled
+        finally:
+            rmtree(work_dir, ignore_errors=True)
+
+    def _encode_command(self, start, end, name, work_dir):
+        """Decode-accurate NVENC encode of [start, end) matching the source stream"""
+        video = self.info.video_streams[0]
+        codec = self.info.video_codec
+        command = [
+            self.ffmpeg_path,
+            "-hide_banner",
+            "-y",
+            "-ss",
+            f"{start:.6f}",
+            "-i",
+            self.input_f,
+            # Half a frame short so the keyframe at `end` stays in the copied piece
+            "-t",
+            f"{end - start - self.frame_time / 2:.6f}",
+            "-map",
+            "0:v:0",
+            "-an",
+            "-sn",
+            "-dn",
+            "-fps_mode",
+            "passthrough",
+            "-c:v",
+            SMART_CUT_ENCODERS[codec],
+        ]
+        if self.settings["encoder_preset"] != "auto":
+            command += ["-preset", self.settings["encoder_preset"]]
+        profile = SMART_CUT_PROFILES[codec].get(video.get("profile", ""))
+        if profile:
+            command += ["-profile:v", profile]
+        pix_fmt = SMART_CUT_PIX_FMTS.get(self.info.pix_fmt)
+        if pix_fmt:
+            command += ["-pix_fmt", pix_fmt]
+        for key, option in SMART_CUT_COLOR_OPTIONS:
+            value = video.get(key)
+            if value and value != "unknown":
+                command += [option, value]
+
+        bit_rate = self.info.video_bit_rate or max(
+            0, self.info.bit_rate - self.info.audio_bit_rate
+        )
+        if bit_rate:
+            command += [
+                "-rc",
+                "vbr",
+                "-b:v",
+                str(bit_rate),
+                "-maxrate",
+                str(bit_rate * 2),
+                "-bufsize",
+                str(bit_rate * 2),
+            ]
+        else:
+            command += ["-rc", "constqp", "-qp", str(SMART_CUT_QP)]
+        command += ["-f", "mpegts", os.path.join(work_dir, f"{name}.ts")]
+        return command
+
+    def _copy_command(self, start, end, name, work_dir):
+        """Stream copy of the keyframe-aligned middle, split exactly at `end`"""
+        return [
+            self.ffmpeg_path,
+            "-hide_banner",
+            "-y",
+            # Just past the keyframe, input seeking lands exactly on it
+            "-ss",
+            f"{start + 0.0005:.6f}",
+            # Read a little past the last keyframe so the segmenter reaches it
+            "-t",
+            f"{end - start + 1:.6f}",
+            "-i",
+            self.input_f,
+            "-map",
+            "0:v:0",
+            "-c",
+            "copy",
+            "-f",
+            "segment",
+            "-segment_format",
+            "mpegts",
+            "-segment_times",
+            f"{end - start - 0.001:.6f}",
+            os.path.join(work_dir, f"{name}_%03d.ts"),
+        ]
+
+    def _join_command(self, list_path):
+        command = [
+            self.ffmpeg_path,
+            "-hide_banner",
+            "-y",
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            list_path,
+            "-ss",
+            f"{self.start:.6f}",
+            "-t",
+            f"{self.end - self.start:.6f}",
+            "-i",
+            self.input_f,
+            "-map",
+            "0:v",
+            "-map",
+            "1:a?",
+            "-map_metadata",
+            "1",
+            "-map_chapters",
+            "-1",
+            "-c:v",
+            "copy",
+        ]
+        audio_filters = self.settings["additional_audio_filter_options"].strip()
+        if audio_filters and self.settings["audio_option"] != "copy":
+            command += ["-af", audio_filters]
+        command += build_audio_options(
+            self.settings["audio_option"], self.settings["custom_abitrate"]
+        )
+        command += ["-avoid_negative_ts", "make_zero", self.output_f]
+        return command
+
+
+# MEDIA METADATA
+def parse_frame_rate(rate):
+    """Convert an ffprobe rate like "30000/1001" to a float (0.0 if unknown)"""
+    try:
+        if "/" in str(rate):
+            num, den = str(rate).split("/", 1)
+            return float(num) / float(den) if float(den) else 0.0
+        return float(rate)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def format_timestamp(seconds):
+    """Format seconds as HH:MM:SS.cc like ffmpeg does"""
+    seconds = max(0.0, seconds)
+    h = int(seconds // 3600)
+    m = int(seconds % 3600 // 60)
+    return f"{h:02d}:{m:02d}:{seconds % 60:05.2f}"
+
+
+class MediaInfo:
+    """Typed view of a single `ffprobe -show_format -show_streams` JSON probe"""
+
+    def __init__(self, path, data):
+        self.path = path
+        self.data = data
+        fmt = data.get("format", {})
+        self.format_name = fmt.get("format_name", "")
+        self.start_time = self._to_float(fmt.get("start_time"))
+        self.bit_rate = self._to_int(fmt.get("bit_rate"))  # bits per second
+        self.size = self._to_int(fmt.get("size"))
+
+        self.streams = data.get("streams", [])
+        self.video_streams = []
+        self.picture_streams = []
+        self.audio_streams = []
+        self.subtitle_streams = []
+        for stream in self.streams:
+            codec_type = stream.get("codec_type")
+            if codec_type == "video":
+                if stream.get("disposition", {}).get("attached_pic"):
+                    self.picture_streams.append(stream)
+                else:
+                    self.video_streams.append(stream)
+            elif codec_type == "audio":
+                self.audio_streams.append(stream)
+            elif codec_type == "subtitle":
+                self.subtitle_streams.append(stream)
+
+        # Some containers only report the duration per stream
+        self.duration = self._to_float(fmt.get("duration")) or max(
+            [self._to_float(s.get("duration")) for s in self.streams] or [0.0]
+        )
+
+        video = self.video_streams[0] if self.video_streams else {}
+        self.video_codec = video.get("codec_name", "")
+        self.width = self._to_int(video.get("width")) or None
+        self.height = self._to_int(video.get("height")) or None
+        self.pix_fmt = video.get("pix_fmt", "")
+        self.fps = parse_frame_rate(video.get("avg_frame_rate")) or parse_frame_rate(
+            video.get("r_frame_rate")
+        )
+        self.video_bit_rate = self._to_int(video.get("bit_rate"))
+        self.audio_bit_rate = sum(
+            self._to_int(s.get("bit_rate")) for s in self.audio_streams
+        )
+
+    @staticmethod
+    def _to_float(value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return 0.0
+
+    @staticmethod
+    def _to_int(value):
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            return 0
+
+    @staticmethod
+    def describe_stream(stream):
+        """One-line stream description in ffmpeg's own style (without the type)"""
+        codec = stream.get("codec_name", "unknown")
+        if stream.get("profile"):
+            codec += f" ({stream['profile']})"
+        parts = [codec]
+
+        codec_type = stream.get("codec_type")
+        if codec_type == "video":
+            if stream.get("pix_fmt"):
+                parts.append(stream["pix_fmt"])
+            if stream.get("width") and stream.get("height"):
+                parts.append(f"{stream['width']}x{stream['height']}")
+            fps = parse_frame_rate(stream.get("avg_frame_rate"))
+            if fps and not stream.get("disposition", {}).get("attached_pic"):
+                parts.append(f"{fps:.2f}".rstrip("0").rstrip(".") + " fps")
+        elif codec_type == "audio":
+            if stream.get("sample_rate"):
+                parts.append(f"{stream['sample_rate']} Hz")
+            if stream.get("channel_layout"):
+                parts.append(stream["channel_layout"])
+            elif stream.get("channels"):
+                parts.append(f"{stream['channels']} channels")
+            if stream.get("sample_fmt"):
+                parts.append(stream["sample_fmt"])
+
+        bit_rate = MediaInfo._to_int(stream.get("bit_rate"))
+        if bit_rate:
+            parts.append(f"{bit_rate // 1000} kb/s")
+
+        text = ", ".join(parts)
+        disposition = stream.get("disposition", {})
+        for flag in ("default", "forced", "attached_pic"):
+            if disposition.get(flag):
+                text += f" ({flag.replace('_', ' ')})"
+        return text
+
+    @staticmethod
+    def stream_label(stream):
+        """Stream header like `Stream #0:1(eng)`"""
+        language = stream.get("tags", {}).get("language")
+        label = f"Stream #0:{stream.get('index', 0)}"
+        return f"{label}({language})" if language else label
+
+    def describe(self):
+        """Compact multi-line summary used for the input file tooltip"""
+        lines = [f"Input: {self.format_name}, from '{os.path.basename(self.path)}'"]
+
+        duration_line = f"  Duration: {format_timestamp(self.duration)}"
+        duration_line += f", start: {self.start_time:.6f}"
+        if self.bit_rate:
+            duration_line += f", bitrate: {self.bit_rate // 1000} kb/s"
+        lines.append(duration_line)
+
+        for stream in self.streams:
+            codec_type = (stream.get("codec_type") or "data").capitalize()
+            lines.append(
+                f"  {self.stream_label(stream)}: {codec_type}: "
+                f"{self.describe_stream(stream)}"
+            )
+        return "\n".join(lines)
+
+
+class MetadataService:
+    """Single-pass ffprobe metadata cached in memory and on disk.
+
+    Entries are keyed by path and stay valid while the file size and mtime
+    are unchanged, so reopening the same files costs no probes. The disk
+    cache is read on first use rather than while the app starts.
+    """
+
+    CACHE_VERSION = 1
+
+    def __init__(self, cache_file, max_entries=2000):
+        self.cache_file = cache_file
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # normcase path -> {"size", "mtime_ns", "data"}
+        self._infos = {}  # normcase path -> MediaInfo built from the entry
+        self._in_flight = {}  # normcase path -> Event for probes already running
+        self._lock = Lock()
+        self._save_timer = None
+        self._loaded = False
+
+    def _load(self):
+        # Called with the lock held
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, "r", encoding="utf-8") as file:
+                    cache = load(file)
+                if cache.get("version") == self.CACHE_VERSION:
+                    self._entries.update(cache.get("entries", {}))
+        except Exception as e:
+            print(f"Error loading metadata cache: {e}")
+
+    def save(self):
+        """Write the cache to disk (atomic replace)"""
+        with self._lock:
+            self._save_timer = None
+            if not self._loaded:
+                return  # Never used, the file on disk is current
+            cache = {"version": self.CACHE_VERSION, "entries": dict(self._entries)}
+        try:
+            temp_file = self.cache_file + ".tmp"
+            with open(temp_file, "w", encoding="utf-8") as file:
+                dump(cache, file, ensure_ascii=False)
+            os.replace(temp_file, self.cache_file)
+        except Exception as e:
+            print(f"Error saving metadata cache: {e}")
+
+    def _schedule_save(self):
+        # Called with the lock held; many probes in a row are written once
+        if self._save_timer is None:
+            self._save_timer = Timer(2.0, self.save)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    @staticmethod
+    def _compact(data):
+        """Drop bulky tags from a probe, keeping what the app displays"""
+        fmt = {k: v for k, v in data.get("format", {}).items() if k != "tags"}
+        streams = []
+        for stream in data.get("streams", []):
+            stream = dict(stream)
+            tags = stream.pop("tags", {})
+            kept_tags = {
+                key.lower(): value
+                for key, value in tags.items()
+                if key.lower() in ("language", "title", "duration")
+            }
+            if kept_tags:
+                stream["tags"] = kept_tags
+            streams.append(stream)
+        return {"format": fmt, "streams": streams}
+
+    def get_cached(self, path):
+        """Return cached MediaInfo if the file is unchanged, without probing"""
+        key = os.path.normcase(os.path.abspath(path))
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+            if (
+                not entry
+                or entry["size"] != stat.st_size
+                or entry["mtime_ns"] != stat.st_mtime_ns
+            ):
+                self._infos.pop(key, None)
+                return None
+            self._entries.move_to_end(key)
+            info = self._infos.get(key)
+            if info is None:
+                info = self._infos[key] = MediaInfo(path, entry["data"])
+            return info
+
+    def probe(self, path, ffprobe_path, timeout=15):
+        """Return MediaInfo for a file, running ffprobe at most once per version.
+
+        Raises subprocess.TimeoutExpired or RuntimeError when probing fails.
+        """
+        key = os.path.normcase(os.path.abspath(path))
+        while True:
+            info = self.get_cached(path)
+            if info is not None:
+                return info
+
+            with self._lock:
+                pending = self._in_flight.get(key)
+                if pending is None:
+                    self._in_flight[key] = Event()
+                    break
+            # Another thread is probing this file, wait and reuse its result
+            pending.wait(timeout)
+
+        try:
+            if not ffprobe_path:
+                raise RuntimeError("ffprobe not found")
+
+            stat = os.stat(path)
+            command = [
+                ffprobe_path,
+                "-v",
+                "error",
+                "-print_format",
+                "json",
+                "-show_format",
+                "-show_streams",
+                path,
+            ]
+            result = subprocess.run(
+                command,
+                capture_output=True,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+                timeout=timeout,
+                creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
+            )
+            if result.returncode != 0:
+                raise RuntimeError(result.stderr.strip() or "ffprobe failed")
+
+            data = self._compact(loads(result.stdout or "{}"))
+            info = MediaInfo(path, data)
+            with self._lock:
+                self._entries[key] = {
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "data": data,
+                }
+                self._entries.move_to_end(key)
+                self._infos[key] = info
+                while len(self._entries) > self.max_entries:
+                    old_key, _ = self._entries.popitem(last=False)
+                    self._infos.pop(old_key, None)
+                self._schedule_save()
+            return info
+        finally:
+            with self._lock:
+                event = self._in_flight.pop(key, None)
+            if event is not None:
+                event.set()
+
+
+# FFMPEG CAPABILITIES
+CAPABILITY_TIMEOUT = 15
+# Capability -> ffmpeg option that lists it
+CAPABILITY_LISTS = {
+    "encoders": "-encoders",
+    "decoders": "-decoders",
+    "filters": "-filters",
+    "hwaccels": "-hwaccels",
+}
+# Options whose value names a codec or holds a filter graph
+CODEC_OPTIONS = ("-c", "-codec", "-vcodec", "-acodec", "-scodec")
+FILTER_OPTIONS = ("-vf", "-af", "-filter", "-filter_complex", "-lavfi")
+
+
+def parse_capability_list(kind, output):
+    """Names from the output of `ffmpeg -encoders/-decoders/-filters/-hwaccels`"""
+    names = set()
+    in_list = False
+    for line in output.splitlines():
+        parts = line.split()
+        if not parts:
+            continue
+        if kind == "filters":
+            # " TSC scale_cuda        V->V       GPU accelerated video resizer"
+            if len(parts) >= 3 and "->" in parts[2]:
+                names.add(parts[1])
+        elif kind == "hwaccels":
+            if in_list:
+                names.add(parts[0])
+            in_list = in_list or line.rstrip().endswith(":")
+        else:
+            # " V....D h264_nvenc           NVIDIA NVENC H.264 encoder"
+            if in_list and len(parts) >= 2:
+                names.add(parts[1])
+            in_list = in_list or parts[0].startswith("---")
+    return names
+
+
+def filter_names(graph):
+    """Filter names used in an ffmpeg filter graph"""
+    names = []
+    for chain in sub(r"\[[^\]]*\]", "", graph).replace(";", ",").split(","):
+        # Pieces of quoted or escaped option values never look like a name
+        match = search(r"^([a-z][a-z0-9_]*)(@\w+)?$", chain.split("=", 1)[0].strip())
+        if match:
+            names.append(match.group(1))
+    return names
+
+
+class FFmpegBuild:
+    """Encoders, decoders, filters and hwaccels of one ffmpeg binary"""
+
+    def __init__(self, data):
+        self.version = data.get("version", "")
+        self.encoders = frozenset(data.get("encoders", ()))
+        self.decoders = frozenset(data.get("decoders", ()))
+        self.filters = frozenset(data.get("filters", ()))
+        self.hwaccels = frozenset(data.get("hwaccels", ()))
+
+    @property
+    def cuda_scaling(self):
+        """True if frames can be decoded and scaled on the GPU"""
+        return "cuda" in self.hwaccels and "scale_cuda" in self.filters
+
+    def missing(self, command):
+        """What a command needs that this build lacks, e.g. ["filter libvmaf"]"""
+        missing = []
+        for index, option in enumerate(command[1:-1], 1):
+            value = command[index + 1]
+            name = option.split(":")[0]
+            # Options before the last input belong to an input
+            is_input = "-i" in command[index + 1 :]
+            if name in CODEC_OPTIONS and value != "copy":
+                if is_input and value not in self.decoders:
+                    missing.append(f"decoder {value}")
+                elif not is_input and value not in self.encoders:
+                    missing.append(f"encoder {value}")
+            elif name == "-hwaccel" and value not in ("auto", "none"):
+                if value not in self.hwaccels:
+                    missing.append(f"hwaccel {value}")
+            elif name in FILTER_OPTIONS or (
+                option == "-i" and command[index - 2 : index] == ["-f", "lavfi"]
+            ):
+                missing.extend(
+                    f"filter {filter_name}"
+                    for filter_name in filter_names(value)
+                    if filter_name not in self.filters
+                )
+        return list(dict.fromkeys(missing))
+
+
+class FFmpegCapabilities:
+    """What the selected ffmpeg build supports, probed once per binary.
+
+    Entries are keyed by path and stay valid while the binary's size and
+    mtime are unchanged, so a build is only listed again after an update.
+    Help texts shown by the help windows are cached with the entry.
+    """
+
+    CACHE_VERSION = 1
+
+    def __init__(self, cache_file, max_entries=8):
+        self.cache_file = cache_file
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # normcase path -> {"size", "mtime_ns", ...}
+        self._builds = {}  # normcase path -> FFmpegBuild built from the entry
+        self._in_flight = {}  # normcase path -> Event for probes already running
+        self._lock = Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, "r", encoding="utf-8") as file:
+                    cache = load(file)
+                if cache.get("version") == self.CACHE_VERSION:
+                    self._entries.update(cache.get("entries", {}))
+        except Exception as e:
+            print(f"Error loading capability cache: {e}")
+
+    def save(self):
+        """Write the cache to disk (atomic replace)"""
+        with self._lock:
+            cache = {"version": self.CACHE_VERSION, "entries": dict(self._entries)}
+        try:
+            temp_file = self.cache_file + ".tmp"
+            with open(temp_file, "w", encoding="utf-8") as file:
+                dump(cache, file, ensure_ascii=False)
+            os.replace(temp_file, self.cache_file)
+        except Exception as e:
+            print(f"Error saving capability cache: {e}")
+
+    def _entry(self, ffmpeg_path):
+        """(key, entry) with entry None if missing or stale; call with the lock held"""
+        key = os.path.normcase(os.path.abspath(ffmpeg_path))
+        try:
+            stat = os.stat(ffmpeg_path)
+        except OSError:
+            return key, None
+        entry = self._entries.get(key)
+        if (
+            not entry
+            or entry["size"] != stat.st_size
+            or entry["mtime_ns"] != stat.st_mtime_ns
+        ):
+            self._builds.pop(key, None)
+            return key, None
+        self._entries.move_to_end(key)
+        return key, entry
+
+    def get_cached(self, ffmpeg_path):
+        """Return the cached FFmpegBuild if the binary is unchanged, without probing"""
+        if not ffmpeg_path:
+            return None
+        with self._lock:
+            key, entry = self._entry(ffmpeg_path)
+            if entry is None:
+                return None
+            build = self._builds.get(key)
+            if build is None:
+                build = self._builds[key] = FFmpegBuild(entry["data"])
+            return build
+
+    @staticmethod
+    def _run(ffmpeg_path, args, timeout=CAPABILITY_TIMEOUT):
+        result = subprocess.run(
+            [ffmpeg_path, *args],
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            timeout=timeout,
+            creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or f"ffmpeg {args[-1]} failed")
+        return result.stdout or result.stderr
+
+    def probe(self, ffmpeg_path, timeout=CAPABILITY_TIMEOUT):
+        """Return the FFmpegBuild of a binary, listing it at most once per version.
+
+        Raises subprocess.TimeoutExpired, OSError or RuntimeError on failure.
+        """
+        key = os.path.normcase(os.path.abspath(ffmpeg_path))
+        while True:
+            build = self.get_cached(ffmpeg_path)
+            if build is not None:
+                return build
+
+            with self._lock:
+                pending = self._in_flight.get(key)
+                if pending is None:
+                    self._in_flight[key] = Event()
+                    break
+            # Another thread is probing this binary, wait and reuse its result
+            pending.wait(timeout)
+
+        try:
+            stat = os.stat(ffmpeg_path)
+            version = self._run(ffmpeg_path, ["-hide_banner", "-version"], timeout)
+            match = search(r"version\s+(\S+)", version)
+            data = {"version": match.group(1) if match else "unknown"}
+            for kind, option in CAPABILITY_LISTS.items():
+                output = self._run(ffmpeg_path, ["-hide_banner", option], timeout)
+                data[kind] = sorted(parse_capability_list(kind, output))
+
+            with self._lock:
+                self._entries[key] = {
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "data": data,
+                    "help": {},
+                }
+                self._entries.move_to_end(key)
+                self._builds[key] = build = FFmpegBuild(data)
+                while len(self._entries) > self.max_entries:
+                    old_key, _ = self._entries.popitem(last=False)
+                    self._builds.pop(old_key, None)
+        finally:
+            with self._lock:
+                event = self._in_flight.pop(key, None)
+            if event is not None:
+                event.set()
+        self.save()
+        return build
+
+    def help_text(self, ffmpeg_path, args, timeout=CAPABILITY_TIMEOUT):
+        """Output of `ffmpeg <args>`, run once per binary version"""
+        self.probe(ffmpeg_path, timeout)
+        topic = " ".join(args)
+        with self._lock:
+            _, entry = self._entry(ffmpeg_path)
+            text = entry["help"].get(topic) if entry else None
+        if text is not None:
+            return text
+
+        text = self._run(ffmpeg_path, args, timeout)
+        with self._lock:
+            _, entry = self._entry(ffmpeg_path)
+            if entry is None:
+                return text
+            entry["help"][topic] = text
+        self.save()
+        return text
+
+
+# SIZE ESTIMATION
+def audio_kbps_for_estimate(audio_option, custom_abitrate, source_kbps=0):
+    """Audio bitrate (kb/s) assumed by the size estimate"""
+    if audio_option == "disable":
+        return 0
+    if audio_option == "copy":
+        return source_kbps or 160
+    if audio_option == "custom":
+        try:
+            return int(custom_abitrate)
+        except ValueError:
+            return 160
+    for kbps in (96, 160, 256):
+        if audio_option.endswith(f"_{kbps}k"):
+            return kbps
+    return 160
+
+
+def estimate_size_mb(duration, video_kbps, audio_kbps):
+    """Estimated output size in MB for a duration (s) and bitrates (kb/s)"""
+    return (video_kbps + audio_kbps) * duration / 8 / 1024
+
+
+def estimate_output_size_mb(info, settings):
+    """Estimated output size in MB of one file from cached metadata and a settings snapshot"""
+    if settings["constant_qp_mode"] or settings["trim_streamcopy"]:
+        # No target bitrate: assume the output is about as large as the source
+        return (info.size or os.path.getsize(info.path)) / 1024 / 1024
+    try:
+        video_kbps = int(settings["bitrate"])
+    except ValueError:
+        video_kbps = info.video_bit_rate // 1000
+    audio_kbps = audio_kbps_for_estimate(
+        settings["audio_option"],
+        settings["custom_abitrate"],
+        info.audio_bit_rate // 1000,
+    )
+    return estimate_size_mb(info.duration, video_kbps, audio_kbps)
+
+
+def format_size_mb(size_mb):
+    """Human readable size for a value in MB"""
+    if size_mb >= 1024:
+        return f"{size_mb / 1024:.2f} GB"
+    return f"{size_mb:.2f} MB"
+
+
+# FFMPEG PROGRESS
+PROGRESS_UPDATE_INTERVAL = 0.1  # Max UI progress refresh rate per job (10 Hz)
+PROGRESS_KEYS = {
+    "frame",
+    "fps",
+    "bitrate",
+    "total_size",
+    "out_time_us",
+    "out_time_ms",
+    "out_time",
+    "dup_frames",
+    "drop_frames",
+    "speed",
+    "progress",
+}
+
+
+def with_progress_pipe(command):
+    """Return a copy of an ffmpeg command that reports `-progress` key=value pairs on stdout"""
+    command = list(command)
+    if "-progress" not in command:
+        command[1:1] = ["-progress", "pipe:1", "-nostats"]
+    return command
+
+
+class FFmpegProgress:
+    """Parser for ffmpeg's `-progress` key=value stream with a throttled output"""
+
+    def __init__(self, duration=0.0):
+        self.duration = duration
+        self.latest = None
+        self._values = {}
+        self._last_emit = 0.0
+
+    def feed(self, line):
+        """Consume one line of output, return True if it was a progress key"""
+        key, sep, value = line.strip().partition("=")
+        if not sep or not (key in PROGRESS_KEYS or key.startswith("stream_")):
+            return False
+        self._values[key] = value.strip()
+        if key == "progress":
+            # "progress" closes each block of keys
+            self.latest = self._snapshot(done=value.strip() == "end")
+        return True
+
+    def poll(self):
+        """Return the newest snapshot at most every PROGRESS_UPDATE_INTERVAL"""
+        if self.latest is None:
+            return None
+        now = time.monotonic()
+        if not self.latest["done"] and now - self._last_emit < PROGRESS_UPDATE_INTERVAL:
+            return None
+        self._last_emit = now
+        latest, self.latest = self.latest, None
+        return latest
+
+    def _number(self, key, cast=float):
+        try:
+            return cast(self._values.get(key, "").rstrip("x"))
+        except ValueError:
+            return cast(0)
+
+    def _snapshot(self, done):
+        # out_time_ms is microseconds as well (long-standing ffmpeg quirk)
+        out_time_us = self._number("out_time_us", int) or self._number("out_time_ms", int)
+        out_time = max(0.0, out_time_us / 1000000)
+        speed = self._number("speed")
+
+        progress = 0.0
+        eta = None
+        if self.duration > 0:
+            progress = 1.0 if done else min(out_time / self.duration, 1.0)
+            if speed > 0:
+                eta = max(0.0, (self.duration - out_time) / speed)
+
+        return {
+            "frame": self._number("frame", int),
+            "fps": self._number("fps"),
+            "out_time": out_time,
+            "speed": speed,
+            "bitrate": self._values.get("bitrate", "N/A"),
+            "total_size": self._number("total_size", int),
+            "dup": self._number("dup_frames", int),
+            "drop": self._number("drop_frames", int),
+            "progress": progress,
+            "eta": eta,
+            "done": done,
+        }
+
+
+def format_progress(snapshot):
+    """Single status line for a progress snapshot"""
+    text = (
+        f"frame={snapshot['frame']} fps={snapshot['fps']:.1f} "
+        f"time={format_timestamp(snapshot['out_time'])} "
+        f"bitrate={snapshot['bitrate']} "
+        f"size={format_size_mb(snapshot['total_size'] / 1024 / 1024)} "
+        f"speed={snapshot['speed']:.2f}x"
+    )
+    if snapshot["dup"] or snapshot["drop"]:
+        text += f" dup={snapshot['dup']} drop={snapshot['drop']}"
+    if snapshot["eta"] is not None:
+        text += f" ETA {format_timestamp(snapshot['eta'])[:8]}"
+    return text
+
+
+# UI UPDATE BUS
+class UiUpdateBus:
+    """Thread-safe channel from worker threads to the Tk thread.
+
+    Workers post(key, callback, *args) instead of calling master.after for
+    every line; only the latest post per key is kept, and the Tk thread runs
+    the pending callbacks in post order when it calls drain().
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._pending = OrderedDict()  # key -> (callback, args)
+
+    def post(self, key, callback, *args):
+        with self._lock:
+            # Re-insert so callbacks run in the order of their latest post
+            self._pending.pop(key, None)
+            self._pending[key] = (callback, args)
+
+    def discard(self, key):
+        """Drop a pending update, e.g. progress that a final state replaces"""
+        with self._lock:
+            self._pending.pop(key, None)
+
+    def drain(self):
+        """Run all pending callbacks (call on the Tk thread), return how many ran"""
+        with self._lock:
+            pending, self._pending = self._pending, OrderedDict()
+        for callback, args in pending.values():
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"UI update failed: {e}")
+        return len(pending)
+
+
+# LIVE AUDIO
+PCM_FEED_INTERVAL = 0.02  # Writer wake-up period while the ring is empty (s)
+PCM_FEED_MAX_GAP = 0.1  # Source silence (s) bridged with zeros
+PCM_FEED_BUFFER = 2.0  # Captured audio (s) the ring holds while ffmpeg is busy
+PCM_FEED_ACCEPT_TIMEOUT = 15  # Time ffmpeg gets to open the input (s)
+# Small send buffer so a stalled ffmpeg backs up into the counted ring
+PCM_FEED_SOCKET_BUFFER = 64 * 1024
+
+
+class PcmRingBuffer:
+    """Preallocated single-producer, single-consumer byte ring.
+
+    The capture callback only copies into the buffer and moves the write
+    counter. The writer thread only moves the read counter. Neither side
+    takes a lock or allocates. When the ring is full, a write is dropped
+    whole so frames stay aligned, and it is counted as an overflow.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._view = memoryview(bytearray(capacity))
+        self._written = 0
+        self._read = 0
+        self.overflows = 0
+        self.bytes_dropped = 0
+
+    def __len__(self):
+        return self._written - self._read
+
+    def write(self, data):
+        """Copy data in, return False (and count it) when it does not fit"""
+        size = len(data)
+        if size > self.capacity - (self._written - self._read):
+            self.overflows += 1
+            self.bytes_dropped += size
+            return False
+        start = self._written % self.capacity
+        first = min(size, self.capacity - start)
+        data = memoryview(data)
+        self._view[start : start + first] = data[:first]
+        if first < size:
+            self._view[: size - first] = data[first:]
+        self._written += size
+        return True
+
+    def peek(self):
+        """Readable bytes up to the end of the buffer, valid until consume()"""
+        start = self._read % self.capacity
+        return self._view[start : start + min(len(self), self.capacity - start)]
+
+    def consume(self, size):
+        self._read += size
+
+
+class PcmSocketFeed:
+    """Stream 16-bit PCM into a running ffmpeg while it is captured.
+
+    ffmpeg connects to a socket listening on 127.0.0.1 (see input_args), so
+    the audio is encoded and muxed together with the video in one pass.
+    write() only copies into a PcmRingBuffer, and a writer thread sends the
+    data on. A slow ffmpeg or disk therefore never blocks the capture
+    callback, and running out of buffer shows up as overflows in stats().
+
+    The stream follows a sample clock that starts when ffmpeg connects. If
+    no audio arrives for a while (WASAPI loopback is silent while nothing
+    plays, or samples were dropped), the gap is filled with zeros. Each such
+    silent stretch is one underrun. A sample's position is then its timestamp and the
+    track stays in step with the video.
+    """
+
+    def __init__(
+        self, rate, channels, max_gap=PCM_FEED_MAX_GAP, buffer_seconds=PCM_FEED_BUFFER
+    ):
+        self.rate = rate
+        self.channels = channels
+        self.frame_bytes = 2 * channels
+        self.max_gap = max_gap
+        self.samples_sent = 0
+        self.samples_padded = 0
+        self.underruns = 0
+        self._ring = PcmRingBuffer(int(buffer_seconds * rate) * self.frame_bytes)
+        self._connected = Event()
+        self._closed = Event()
+        self._listener = socket.create_server(("127.0.0.1", 0))
+        # Accepted connections inherit the send buffer size
+        self._listener.setsockopt(
+            socket.SOL_SOCKET, socket.SO_SNDBUF, PCM_FEED_SOCKET_BUFFER
+        )
+        self.port = self._listener.getsockname()[1]
+        self._thread = None
+
+    def input_args(self):
+        """ffmpeg options that open this feed as an input"""
+        return [
+            "-thread_queue_size",
+            "4096",
+            "-f",
+            "s16le",
+            "-ar",
+            str(self.rate),
+            "-ac",
+            str(self.channels),
+            "-i",
+            f"tcp://127.0.0.1:{self.port}",
+        ]
+
+    def start(self):
+        """Wait for ffmpeg to connect and pump audio to it in the background"""
+        self._thread = Thread(target=self._pump, daemon=True)
+        self._thread.start()
+
+    def write(self, data):
+        """Buffer captured bytes (safe to call from a capture callback)"""
+        if self._connected.is_set() and not self._closed.is_set():
+            self._ring.write(data)
+
+    def stats(self):
+        """Counters for the recording status, durations in seconds"""
+        return {
+            "overflows": self._ring.overflows,
+            "dropped": self._ring.bytes_dropped / self.frame_bytes / self.rate,
+            "underruns": self.underruns,
+            "padded": self.samples_padded / self.rate,
+            "buffered": len(self._ring) / self.frame_bytes / self.rate,
+        }
+
+    def close(self, timeout=2):
+        self._closed.set()
+        self._listener.close()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _pump(self):
+        self._listener.settimeout(PCM_FEED_ACCEPT_TIMEOUT)
+        try:
+            connection, _ = self._listener.accept()
+        except OSError as e:
+            if not self._closed.is_set():
+                print(f"Audio feed: ffmpeg did not connect ({e})")
+            return
+        finally:
+            self._listener.close()
+
+        with connection:
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            started = time.perf_counter()
+            padding = False
+            self._connected.set()
+            try:
+                while not self._closed.is_set():
+                    chunk = self._ring.peek()
+                    if chunk:
+                        connection.sendall(chunk)
+                        self._ring.consume(len(chunk))
+                        self.samples_sent += len(chunk) // self.frame_bytes
+                        padding = False
+                    else:
+                        time.sleep(PCM_FEED_INTERVAL)
+
+                    due = int((time.perf_counter() - started) * self.rate)
+                    gap = due - self.samples_sent
+                    if gap > self.max_gap * self.rate and not self._ring:
+                        connection.sendall(bytes(gap * self.frame_bytes))
+                        self.samples_sent += gap
+                        self.samples_padded += gap
+                        self.underruns += not padding
+                        padding = True
+            except OSError:
+                pass  # ffmpeg closed the input because the recording stopped
+
+
+def format_audio_feed_stats(stats):
+    """One-line summary of PcmSocketFeed.stats() for the recording status"""
+    return (
+        f"Audio: {stats['overflows']} overflows ({stats['dropped']:.2f} s dropped), "
+        f"{stats['underruns']} underruns ({stats['padded']:.1f} s silence), "
+        f"{stats['buffered']:.2f} s buffered"
+    )
+
+
+# CAPTURE STATISTICS
+# ffmpeg's `-progress` blocks give the encoder side of a screen capture;
+# "Thread message queue blocking" warnings mean an input queue
+# (-thread_queue_size) was full and the capture thread had to wait.
+CAPTURE_QUEUE_WARNING = "thread message queue blocking"
+CAPTURE_SLOW_SPEED = 0.98  # Encoder speed below this is falling behind
+CAPTURE_STATS_INTERVAL = 1.0  # UI and tray refresh period (s)
+CAPTURE_LOG_LINES = 20  # ffmpeg log lines kept for the stats file
+
+
+class CaptureStats:
+    """Running statistics of a screen capture from its ffmpeg output"""
+
+    def __init__(self, target_fps=0.0, settings=None):
+        self.target_fps = target_fps
+        self.settings = settings or {}
+        self.queue_warnings = 0
+        self.log = deque(maxlen=CAPTURE_LOG_LINES)
+        self._progress = FFmpegProgress()
+        self._started = time.monotonic()
+        self._first = None  # (monotonic, out_time) of the first progress block
+        self._last = None
+        self._last_emit = 0.0
+        self._worst = {"fps": None, "speed": None, "lag": 0.0}
+        self._slow_seconds = 0.0
+
+    def feed(self, line):
+        """Consume one line of ffmpeg output, return True if it was a progress key"""
+        if self._progress.feed(line):
+            if self._progress.latest:
+                self._add(self._progress.latest)
+                self._progress.latest = None
+            return True
+        line = line.strip()
+        if line:
+            if CAPTURE_QUEUE_WARNING in line.lower():
+                self.queue_warnings += 1
+            # Log lines only, the tail is kept for the stats file
+            self.log.append(line)
+        return False
+
+    def _add(self, snapshot):
+        now = time.monotonic()
+        if self._first is None:
+            self._first = (now, snapshot["out_time"])
+        elif self._last and self._last["speed"] < CAPTURE_SLOW_SPEED:
+            self._slow_seconds += now - self._last["at"]
+        # Wall time the encoder output trails the capture clock
+        lag = (now - self._first[0]) - (snapshot["out_time"] - self._first[1])
+        self._last = dict(snapshot, at=now, lag=max(0.0, lag))
+
+        if self._last["frame"] and now - self._first[0] >= 2:
+            # The first seconds are ffmpeg and NVENC warming up
+            worst = self._worst
+            if worst["fps"] is None or snapshot["fps"] < worst["fps"]:
+                worst["fps"] = snapshot["fps"]
+            if worst["speed"] is None or snapshot["speed"] < worst["speed"]:
+                worst["speed"] = snapshot["speed"]
+            worst["lag"] = max(worst["lag"], self._last["lag"])
+
+    def snapshot(self, audio=None):
+        """Current statistics, `audio` is PcmSocketFeed.stats() when recording sound"""
+        last = self._last or {}
+        return {
+            "elapsed": time.monotonic() - self._started,
+            "frames": last.get("frame", 0),
+            "fps": last.get("fps", 0.0),
+            "target_fps": self.target_fps,
+            "speed": last.get("speed", 0.0),
+            "dup": last.get("dup", 0),
+            "drop": last.get("drop", 0),
+            "lag": last.get("lag", 0.0),
+            "queue_warnings": self.queue_warnings,
+            "audio_buffered": audio["buffered"] if audio else None,
+            "audio_dropped": audio["dropped"] if audio else None,
+        }
+
+    def poll(self, audio=None):
+        """Return a snapshot at most every CAPTURE_STATS_INTERVAL"""
+        now = time.monotonic()
+        if self._last is None or now - self._last_emit < CAPTURE_STATS_INTERVAL:
+            return None
+        self._last_emit = now
+        return self.snapshot(audio)
+
+    def summary(self, audio=None):
+        """Final statistics with the worst values seen during the capture"""
+        summary = self.snapshot(audio)
+        frames = summary["frames"]
+        summary["dup_percent"] = 100 * summary["dup"] / frames if frames else 0.0
+        # Dropped frames never reach the output
+        captured = frames + summary["drop"]
+        summary["drop_percent"] = 100 * summary["drop"] / captured if captured else 0.0
+        summary["min_fps"] = self._worst["fps"]
+        summary["min_speed"] = self._worst["speed"]
+        summary["max_lag"] = self._worst["lag"]
+        summary["slow_seconds"] = self._slow_seconds
+        summary["log_tail"] = list(self.log)
+        return summary
+
+    def write(self, stats_file, audio=None):
+        """Save summary() and the capture settings as JSON, return the summary"""
+        summary = self.summary(audio)
+        try:
+            with open(stats_file, "w", encoding="utf-8") as file:
+                dump(
+                    {"stats": summary, "settings": self.settings},
+                    file,
+                    ensure_ascii=False,
+                    indent=2,
+                )
+        except Exception as e:
+            print(f"Error saving capture statistics: {e}")
+        return summary
+
+
+def format_capture_stats(snapshot, short=False):
+    """Status line for a CaptureStats snapshot, `short` fits the tray tooltip"""
+    if short:
+        return (
+            f"{snapshot['fps']:.0f}/{snapshot['target_fps']:g} fps, "
+            f"{snapshot['speed']:.2f}x, dup {snapshot['dup']}, drop {snapshot['drop']}"
+        )
+    text = (
+        f"Capture: {snapshot['fps']:.1f}/{snapshot['target_fps']:g} fps "
+        f"speed={snapshot['speed']:.2f}x dup={snapshot['dup']} drop={snapshot['drop']} "
+        f"lag={snapshot['lag']:.1f}s"
+    )
+    if snapshot["queue_warnings"]:
+        text += f" queue full x{snapshot['queue_warnings']}"
+    if snapshot["audio_buffered"] is not None:
+        text += f" audio queue={snapshot['audio_buffered']:.2f}s"
+    return text
+
+
+def capture_stats_file(output_file):
+    """Statistics file written next to a screen recording"""
+    return os.path.splitext(output_file)[0] + ".stats.json"
+
+
+# RECORDING RECOVERY
+# Recordings to MP4/MOV are written as a fragmented file: a fragment is
+# flushed every second, so an interrupted capture is playable up to its last
+# complete fragment and stopping never has to write a moov for the whole file.
+FRAGMENTED_EXTENSIONS = (".mp4", ".m4v", ".mov")
+RECORDING_FRAGMENT_OPTIONS = [
+    "-movflags",
+    "+frag_keyframe+empty_moov+default_base_moof",
+    "-frag_duration",
+    "1000000",
+]
+RECOVERY_MIN_AGE = 30  # Seconds a file must be idle before it is treated as orphaned
+
+
+def recording_output_options(output_path):
+    """Muxer options that keep a recording playable if it is interrupted"""
+    if os.path.splitext(output_path)[1].lower() in FRAGMENTED_EXTENSIONS:
+        return list(RECORDING_FRAGMENT_OPTIONS)
+    return []  # Matroska and MPEG-TS already survive an interruption
+
+
+def repair_fragmented_mp4(path):
+    """Cut a torn trailing box off a fragmented MP4.
+
+    Only the 8-16 byte box headers are read, so this takes the same time
+    for any recording length. Returns (fragments kept, bytes removed).
+    """
+    size = os.path.getsize(path)
+    offset = complete = fragments = 0
+    with open(path, "r+b") as file:
+        while offset + 8 <= size:
+            file.seek(offset)
+            header = file.read(16)
+            box_size = int.from_bytes(header[:4], "big")
+            kind = header[4:8]
+            if box_size == 1 and len(header) == 16:
+                box_size = int.from_bytes(header[8:16], "big")
+            if box_size < 8 or offset + box_size > size:
+                break  # Size 0 ("to end of file") is never written for fragments
+            offset += box_size
+            if kind == b"mdat":
+                fragments += 1
+            if kind != b"moof":
+                # A moof only counts once its mdat is complete
+                complete = offset
+        if complete < size:
+            file.truncate(complete)
+    return fragments, size - complete
+
+
+class RecordingJournal:
+    """Index of recordings in progress, kept so a crash can be recovered.
+
+    begin() records the output before ffmpeg starts and end() removes it
+    once ffmpeg has exited. Entries still there on the next launch belong
+    to recordings the app never finished, and recover() repairs them.
+    """
+
+    def __init__(self, journal_file):
+        self.journal_file = journal_file
+        self._lock = Lock()
+
+    def begin(self, output_path):
+        with self._lock:
+            entries = self._read()
+            entries[os.path.abspath(output_path)] = {"started": time.time()}
+            self._write(entries)
+
+    def end(self, output_path, interrupted=False):
+        """Forget a recording, repairing it first if ffmpeg had to be killed"""
+        if interrupted and os.path.exists(output_path):
+            try:
+                print(f"Repaired recording: {self._repair(output_path)}")
+            except OSError as e:
+                print(f"Could not repair recording: {e}")
+        with self._lock:
+            entries = self._read()
+            if entries.pop(os.path.abspath(output_path), None) is not None:
+                self._write(entries)
+
+    def recover(self):
+        """Repair interrupted recordings, return [(path, summary)]"""
+        recovered = []
+        with self._lock:
+            entries = self._read()
+            for path in list(entries):
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    del entries[path]  # Never written or already removed
+                    continue
+                if time.time() - stat.st_mtime < RECOVERY_MIN_AGE:
+                    continue  # Possibly still being written by another instance
+                try:
+                    recovered.append((path, self._repair(path)))
+                except OSError as e:
+                    recovered.append((path, f"could not be repaired: {e}"))
+                del entries[path]
+            self._write(entries)
+        return recovered
+
+    @staticmethod
+    def _repair(path):
+        if os.path.splitext(path)[1].lower() not in FRAGMENTED_EXTENSIONS:
+            size_mb = os.path.getsize(path) / 1024 / 1024
+            return f"kept as written ({format_size_mb(size_mb)})"
+        fragments, removed = repair_fragmented_mp4(path)
+        summary = f"{fragments} fragments kept"
+        if removed:
+            summary += f", {removed} torn bytes removed"
+        return summary
+
+    def _read(self):
+        try:
+            with open(self.journal_file, "r", encoding="utf-8") as file:
+                return load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, entries):
+        """Atomic replace, removing the file when nothing is recording"""
+        try:
+            if not entries:
+                if os.path.exists(self.journal_file):
+                    os.remove(self.journal_file)
+                return
+            temp_file = self.journal_file + ".tmp"
+            with open(temp_file, "w", encoding="utf-8") as file:
+                dump(entries, file, ensure_ascii=False)
+            os.replace(temp_file, self.journal_file)
+        except Exception as e:
+            print(f"Error saving recording journal: {e}")
+
+
+# INSTANT REPLAY
+REPLAY_MINUTES_OPTIONS = ["1", "2", "5", "10"]
+REPLAY_SEGMENT_SECONDS = 2  # Clip length granularity and the longest unsaved tail
+REPLAY_SEGMENT_PATTERN = "replay_%06d.ts"
+REPLAY_AUDIO_CODEC = "aac"  # Fits MPEG-TS and every clip container
+REPLAY_AUDIO_BITRATE = "160k"
+
+
+def replay_audio_options(audio_options):
+    """Audio flags for the replay segments, from build_audio_options().
+
+    MPEG-TS cannot carry the PCM that "copy" passes through from the
+    loopback feed, and Opus does not fit a .mov clip, so anything but AAC
+    is encoded to AAC, keeping the chosen bitrate.
+    """
+    if "-c:a" not in audio_options:
+        return list(audio_options)
+    if audio_options[audio_options.index("-c:a") + 1] == REPLAY_AUDIO_CODEC:
+        return list(audio_options)
+    bitrate = REPLAY_AUDIO_BITRATE
+    if "-b:a" in audio_options:
+        bitrate = audio_options[audio_options.index("-b:a") + 1]
+    return ["-c:a", REPLAY_AUDIO_CODEC, "-b:a", bitrate]
+
+
+class ReplayBuffer:
+    """The last few minutes of a capture as a ring of short MPEG-TS segments.
+
+    ffmpeg writes numbered segments into `directory` (see output_args). A
+    keyframe is forced at every segment start, so each segment decodes on
+    its own. A pruning thread deletes all but the newest `capacity`
+    complete segments, which bounds disk use by the buffer length rather
+    than by how long the capture runs. snapshot() hard-links the complete
+    segments into a clip folder. That takes milliseconds for any buffer
+    length and leaves the ring untouched, and ReplayClipJob joins the clip
+    from there without re-encoding.
+    """
+
+    def __init__(self, directory, minutes, segment_seconds=REPLAY_SEGMENT_SECONDS):
+        self.directory = directory
+        self.segment_seconds = segment_seconds
+        self.capacity = max(1, ceil(minutes * 60 / segment_seconds))
+        self._stop = Event()
+        self._thread = None
+        # Segments and clips of an earlier session are stale
+        rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+
+    def output_args(self):
+        """ffmpeg output options that write the segment ring"""
+        return [
+            "-force_key_frames",
+            f"expr:gte(t,n_forced*{self.segment_seconds})",
+            "-f",
+            "segment",
+            "-segment_time",
+            str(self.segment_seconds),
+            "-segment_format",
+            "mpegts",
+            "-reset_timestamps",
+            "1",
+            os.path.join(self.directory, REPLAY_SEGMENT_PATTERN),
+        ]
+
+    def start(self):
+        self._thread = Thread(target=self._prune_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop pruning and delete the ring (clips being joined are kept)"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(2)
+            self._thread = None
+        for path in self._segments():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def complete_segments(self):
+        """Finished segments, oldest first; the newest file is still written"""
+        return self._segments()[:-1][-self.capacity :]
+
+    def snapshot(self):
+        """Link the buffered segments into a new clip folder, return its path"""
+        clip_dir = tempfile.mkdtemp(prefix="clip_", dir=self.directory)
+        names = []
+        for source in self.complete_segments():
+            name = os.path.basename(source)
+            try:
+                os.link(source, os.path.join(clip_dir, name))
+            except FileNotFoundError:
+                continue  # Pruned in the meantime, it was the oldest
+            except OSError:
+                copy2(source, clip_dir)  # No hard links on this file system
+            names.append(name)
+        with open(os.path.join(clip_dir, "list.txt"), "w", encoding="utf-8") as f:
+            for name in names:
+                escaped = name.replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+        return clip_dir, len(names) * self.segment_seconds
+
+    def _segments(self):
+        try:
+            names = sorted(
+                name
+                for name in os.listdir(self.directory)
+                if name.startswith("replay_") and name.endswith(".ts")
+            )
+        except OSError:
+            return []
+        return [os.path.join(self.directory, name) for name in names]
+
+    def prune(self):
+        """Delete all but `capacity` complete segments and the one being written"""
+        for path in self._segments()[: -(self.capacity + 1)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # Still open; the next pass gets it
+
+    def _prune_loop(self):
+        while not self._stop.wait(self.segment_seconds / 2):
+            self.prune()
+
+
+class ReplayClipJob(FFmpegJob):
+    """Join a ReplayBuffer snapshot into one file with the concat demuxer"""
+
+    name = "Saving clip"
+
+    def __init__(self, ffmpeg_path, clip_dir, output_f):
+        super().__init__()
+        self.ffmpeg_path = ffmpeg_path
+        self.clip_dir = clip_dir
+        self.output_f = output_f
+
+    def run(self):
+        """Write the clip, return False if cancelled, raise RuntimeError on failure"""
+        try:
+            command = [
+                self.ffmpeg_path,
+                "-hide_banner",
+                "-y",
+                "-f",
+                "concat",
+                "-safe",
+                "0",
+                "-i",
+                "list.txt",
+                "-map",
+                "0",
+                "-c",
+                "copy",
+                self.output_f,
+            ]
+            self._run_process(command, self.clip_dir, "join")
+            return not self.cancelled
+        finally:
+            rmtree(self.clip_dir, ignore_errors=True)
+
+
+# PREVIEWS
+PREVIEW_LENGTH = 10  # Seconds encoded per preview
+PREVIEW_CACHE_SIZE = 8  # Encoded previews kept per session
+
+
+def preview_cache_key(command, input_f, start, length):
+    """Key of a preview encode: source version, position and every other argument"""
+    identity = ThumbnailService.file_identity(input_f)
+    # The output path is the last argument and derived from this key
+    arguments = [argument for argument in command[1:-1] if argument != input_f]
+    key = repr((identity, round(start, 3), length, arguments))
+    return sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+class PreviewCache:
+    """Encoded previews of this session by key, evicted files are deleted.
+
+    Only used from the Tk thread.
+    """
+
+    def __init__(self, directory, max_entries=PREVIEW_CACHE_SIZE):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> path
+
+    def path_for(self, key, base_name, ext):
+        os.makedirs(self.directory, exist_ok=True)
+        return os.path.join(self.directory, f"{base_name}_preview_{key}{ext}")
+
+    def get(self, key):
+        """Path of a finished preview, or None"""
+        path = self._entries.get(key)
+        if path is None or not os.path.exists(path):
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return path
+
+    def put(self, key, path):
+        self._entries[key] = path
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            _, old_path = self._entries.popitem(last=False)
+            self._remove(old_path)
+
+    def discard(self, path):
+        """Delete an unfinished (failed or cancelled) preview"""
+        self._remove(path)
+
+    def clear(self):
+        for path in self._entries.values():
+            self._remove(path)
+        self._entries.clear()
+
+    @staticmethod
+    def _remove(path):
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except OSError as e:
+            print(f"Error deleting temp file {path}: {e}")
+
+
+PREVIEW_SAMPLE_OPTIONS = ["1", "3", "5"]
+PREVIEW_SESSIONS = 3  # Concurrent sample encodes (consumer GPUs cap NVENC sessions)
+
+
+def preview_sample_points(duration, count, length=PREVIEW_LENGTH):
+    """Preview start times centred at (2i + 1) / 2count of the video (1 = midpoint)"""
+    last_start = max(0.0, duration - length)
+    points = [
+        min(max(0.0, duration * (2 * i + 1) / (2 * count) - length / 2), last_start)
+        for i in range(count)
+    ]
+    return list(dict.fromkeys(points))  # Short videos would repeat a sample
+
+
+def measure_preview_samples(samples):
+    """Fill in "size" (bytes) and "seconds" of encoded preview samples"""
+    for sample in samples:
+        sample["size"] = os.path.getsize(sample["output"])
+        if not sample.get("seconds"):
+            sample["seconds"] = sample["length"]
+        sample.setdefault("fps", None)
+
+
+def extrapolate_size_mb(samples, duration):
+    """Output size in MB at the average bytes per second of the samples"""
+    seconds = sum(sample["seconds"] for sample in samples)
+    if seconds <= 0:
+        return 0.0
+    return sum(sample["size"] for sample in samples) / seconds * duration / 1024 / 1024
+
+
+class PreviewSampler(FFmpegJob):
+    """Encode preview samples concurrently and measure what the encoder produced.
+
+    `samples` are dicts with "command" (None when already encoded), "output"
+    and "length". After run() every sample also has "size", "seconds" and
+    "fps" (None when it was not encoded in this run).
+    """
+
+    name = "Preview"
+
+    def __init__(
+        self, ffmpeg_path, samples, join_output=None, sessions=PREVIEW_SESSIONS
+    ):
+        super().__init__()
+        self.ffmpeg_path = ffmpeg_path
+        self.samples = samples
+        self.join_output = join_output
+        self.sessions = sessions
+
+    def run(self, on_progress=None):
+        """Encode and join, return False if cancelled, raise RuntimeError on failure"""
+        work_dir = tempfile.mkdtemp(prefix="nff_preview_")
+        try:
+            pending = [sample for sample in self.samples if sample["command"]]
+            total = sum(sample["length"] for sample in pending)
+            snapshots = [None] * len(pending)
+            queue = list(range(len(pending)))
+            errors = []
+
+            def report(index, snapshot):
+                snapshots[index] = snapshot
+                pending[index]["seconds"] = snapshot["out_time"]
+                pending[index]["fps"] = snapshot["fps"]
+                if on_progress:
+                    on_progress(combine_progress(snapshots, total))
+
+            def worker():
+                while not self.cancelled and not errors:
+                    with self._lock:
+                        if not queue:
+                            return
+                        index = queue.pop(0)
+                    try:
+                        self._run_process(
+                            with_progress_pipe(pending[index]["command"]),
+                            work_dir,
+                            f"sample_{index}",
+                            FFmpegProgress(pending[index]["length"]),
+                            lambda snapshot, index=index: report(index, snapshot),
+                        )
+                    except Exception as e:
+                        errors.append(str(e))
+
+            threads = [
+                Thread(target=worker, daemon=True)
+                for _ in range(min(self.sessions, len(pending)))
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            if errors and not self.cancelled:
+                raise RuntimeError(errors[0])
+            if self.cancelled:
+                return False
+
+            measure_preview_samples(self.samples)
+            if self.join_output:
+                list_path = os.path.join(work_dir, "samples.txt")
+                with open(list_path, "w", encoding="utf-8") as f:
+                    for sample in self.samples:
+                        escaped = sample["output"].replace("'", "'\\''")
+                        f.write(f"file '{escaped}'\n")
+                self._run_process(self._join_command(list_path), work_dir, "join")
+            return not self.cancelled
+        finally:
+            rmtree(work_dir, ignore_errors=True)
+
+    def _join_command(self, list_path):
+        """Concat the encoded samples into one playable file (stream copy)"""
+        return [
+            self.ffmpeg_path,
+            "-hide_banner",
+            "-y",
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            list_path,
+            "-map",
+            "0",
+            "-c",
+            "copy",
+            self.join_output,
+        ]
+
+
+# THUMBNAILS
+THUMBNAIL_SIZE = (352, 198)
+THUMBNAIL_CACHE_SIZE = 256  # Decoded JPEG frames kept in memory (~15 KB each)
+THUMBNAIL_MIN_STEP = 0.5  # Seconds; hovers closer than one step share a frame
+THUMBNAIL_STEPS = 500  # About one step per slider pixel on long files
+THUMBNAIL_PREFETCH = 3  # Positions decoded ahead in the drag direction
+THUMBNAIL_TIMEOUT = 5
+THUMBNAIL_DECODE_PATHS = ("nv12", "p010le", "cpu")
+
+
+def thumbnail_step(duration):
+    """Timestamp quantization step for a file of the given duration"""
+    return max(THUMBNAIL_MIN_STEP, duration / THUMBNAIL_STEPS)
+
+
+def thumbnail_command(ffmpeg_path, path, seconds, decode_path):
+    """ffmpeg command that writes one scaled frame as JPEG to stdout"""
+    width = THUMBNAIL_SIZE[0]
+    if decode_path == "cpu":
+        command = [ffmpeg_path]
+        scale = f"scale={width}:-1"
+    else:
+        command = [
+            ffmpeg_path,
+            "-threads",
+            "1",
+            "-hwaccel",
+            "cuda",
+            "-hwaccel_output_format",
+            "cuda",
+        ]
+        scale = (
+            f"scale_cuda={width}:-2:interp_algo=bilinear,"
+            f"hwdownload,format={decode_path}"
+        )
+    return command + [
+        "-ss",
+        str(seconds),
+        "-i",
+        path,
+        "-vframes",
+        "1",
+        "-vf",
+        scale,
+        "-q:v",
+        "2",
+        "-an",
+        "-f",
+        "mjpeg",
+        "pipe:1",
+    ]
+
+
+class ThumbnailService:
+    """Decodes trim-slider thumbnails on a worker thread with an LRU cache.
+
+    Frames are keyed by (file identity, quantized timestamp). Only the newest
+    request is decoded, prefetch positions fill idle time, and the decode path
+    that worked for a file (CUDA NV12/P010LE or CPU) is remembered so failing
+    CUDA attempts are not repeated for every frame.
+    """
+
+    def __init__(self, max_entries=THUMBNAIL_CACHE_SIZE, capabilities=None):
+        self.max_entries = max_entries
+        self.capabilities = capabilities
+        self._cache = OrderedDict()  # (identity, time) -> JPEG bytes
+        self._decode_paths = {}  # identity -> decode path that works
+        self._lock = Lock()
+        self._wake = Event()
+        self._wanted = None  # newest (key, ffmpeg_path, path, seconds, callback)
+        self._prefetch = []  # (key, ffmpeg_path, path, seconds)
+        self._thread = None
+
+    @staticmethod
+    def file_identity(path):
+        """(path, size, mtime) so a changed file never reuses old frames"""
+        stat = os.stat(path)
+        return (os.path.normcase(os.path.abspath(path)), stat.st_size, stat.st_mtime_ns)
+
+    @staticmethod
+    def quantize(seconds, step):
+        return round(round(seconds / step) * step, 3)
+
+    def get_cached(self, identity, seconds, step):
+        """Cached JPEG bytes for a position or None (call from any thread)"""
+        key = (identity, self.quantize(seconds, step))
+        with self._lock:
+            data = self._cache.get(key)
+            if data is not None:
+                self._cache.move_to_end(key)
+            return data
+
+    def request(self, ffmpeg_path, path, seconds, step, callback, prefetch=()):
+        """Decode a position in the background, replacing any older request.
+
+        callback(data) runs on the worker thread with JPEG bytes or None;
+        prefetch positions are decoded afterwards while nothing else waits.
+        """
+        identity = self.file_identity(path)
+        seconds = self.quantize(seconds, step)
+        with self._lock:
+            self._wanted = ((identity, seconds), ffmpeg_path, path, seconds, callback)
+            self._prefetch = []
+            for position in prefetch:
+                position = self.quantize(position, step)
+                if position >= 0 and (identity, position) not in self._cache:
+                    self._prefetch.append(
+                        ((identity, position), ffmpeg_path, path, position)
+                    )
+            if self._thread is None:
+                self._thread = Thread(target=self._worker, daemon=True)
+                self._thread.start()
+            self._wake.set()
+
+    def cancel(self):
+        """Drop the pending request and prefetch queue"""
+        with self._lock:
+            self._wanted = None
+            self._prefetch = []
+
+    def _worker(self):
+        while True:
+            self._wake.wait()
+            with self._lock:
+                if self._wanted is not None:
+                    key, ffmpeg_path, path, seconds, callback = self._wanted
+                    self._wanted = None
+                elif self._prefetch:
+                    key, ffmpeg_path, path, seconds = self._prefetch.pop(0)
+                    callback = None
+                else:
+                    self._wake.clear()
+                    continue
+                data = self._cache.get(key)
+
+            if data is None:
+                data = self._decode(key[0], ffmpeg_path, path, seconds)
+                if data is not None:
+                    with self._lock:
+                        self._cache[key] = data
+                        while len(self._cache) > self.max_entries:
+                            self._cache.popitem(last=False)
+            if callback:
+                try:
+                    callback(data)
+                except Exception as e:
+                    print(f"Thumbnail callback failed: {e}")
+
+    def _decode(self, identity, ffmpeg_path, path, seconds):
+        """Run ffmpeg with the remembered decode path, or find one that works"""
+        # Paths before the remembered one already failed for this file
+        known = self._decode_paths.get(identity)
+        if known is None and self.capabilities:
+            # Builds without CUDA scaling would fail both GPU paths every time
+            build = self.capabilities.get_cached(ffmpeg_path)
+            if build is not None and not build.cuda_scaling:
+                known = "cpu"
+        start = THUMBNAIL_DECODE_PATHS.index(known) if known else 0
+        for decode_path in THUMBNAIL_DECODE_PATHS[start:]:
+            try:
+                result = subprocess.run(
+                    thumbnail_command(ffmpeg_path, path, seconds, decode_path),
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    timeout=THUMBNAIL_TIMEOUT,
+                    creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
+                )
+            except (subprocess.TimeoutExpired, OSError) as e:
+                print(f"Thumbnail {decode_path} failed: {e}")
+                continue
+            if result.returncode == 0 and result.stdout:
+                self._decode_paths[identity] = decode_path
+                return result.stdout
+            print(
+                f"Thumbnail {decode_path} failed with return code {result.returncode}"
+            )
+        return None
+
+
+# QUALITY ANALYSIS
+QUALITY_METRICS = ["VMAF", "PSNR", "SSIM"]
+QUALITY_SEGMENT_OPTIONS = ["Auto", "1", "2", "4", "6", "8"]
+QUALITY_MIN_SEGMENT = 10.0  # Shorter windows spend more time seeking than scoring
+QUALITY_PSNR_CAP = 100.0  # psnr reports "inf" for identical frames
+QUALITY_LOG_FORMATS = ["Off", "JSON", "CSV"]
+QUALITY_WORST_COUNT = 5
+QUALITY_DIP_SPACING = 2.0  # Seconds between two reported worst timestamps
+QUALITY_JUMP_WINDOW = 10  # Seconds selected on the trim slider around a dip
+
+# Target VMAF search (bisection over constant QP on short samples)
+QP_SEARCH_MIN = 15
+QP_SEARCH_MAX = 45
+QP_SEARCH_STEPS = (QP_SEARCH_MAX - QP_SEARCH_MIN + 1).bit_length()
+QP_SEARCH_SAMPLES = 3
+QP_SEARCH_SAMPLE_LENGTH = 10  # Seconds per sample, like the 10s preview
+QP_SEARCH_IGNORED_KEYS = {
+    "constant_qp_mode",
+    "quality_level",
+    "bitrate",
+    "audio_option",
+    "custom_abitrate",
+}
+
+
+def quality_segment_count(duration, requested="Auto", cpu_count=None):
+    """Number of time segments to score in parallel for a file"""
+    cpu_count = cpu_count or os.cpu_count() or 1
+    if requested == "Auto":
+        # Each process decodes two streams serially, libvmaf uses the rest
+        count = min(8, max(1, cpu_count // 4))
+    else:
+        count = int(requested)
+    return max(1, min(count, int(duration // QUALITY_MIN_SEGMENT)))
+
+
+def split_segments(duration, count):
+    """Split a duration into (start, length) windows, the last one open-ended"""
+    length = duration / count
+    return [
+        (index * length, length if index < count - 1 else None)
+        for index in range(count)
+    ]
+
+
+def quality_log_name(metric, index):
+    return f"segment_{index}.json" if metric == "VMAF" else f"segment_{index}.log"
+
+
+def build_quality_command(
+    ffmpeg_path,
+    metric,
+    distorted,
+    reference,
+    log_name,
+    start=0.0,
+    length=None,
+    scale_to=None,
+    scale_flag="bicubic",
+    n_threads=1,
+):
+    """ffmpeg command scoring one time window of distorted against reference.
+
+    log_name must be a bare file name: the process runs inside the log
+    directory so Windows drive colons never need filtergraph escaping.
+    """
+    window = ["-ss", f"{start:.3f}"]
+    if length is not None:
+        window += ["-t", f"{length:.3f}"]
+
+    if metric == "VMAF":
+        metric_filter = (
+            f"libvmaf=log_fmt=json:log_path={log_name}:n_threads={n_threads}"
+        )
+    else:
+        metric_filter = f"{metric.lower()}=stats_file={log_name}"
+
+    if scale_to:
+        width, height = scale_to
+        lavfi = (
+            f"[0:v]scale={width}:{height}:flags={scale_flag}[dist];"
+            f"[1:v]null[ref];"
+            f"[dist][ref]{metric_filter}"
+        )
+    else:
+        lavfi = f"[0:v][1:v]{metric_filter}"
+
+    return [
+        ffmpeg_path,
+        "-hide_banner",
+        *window,
+        "-i",
+        distorted,
+        *window,
+        "-i",
+        reference,
+        "-lavfi",
+        lavfi,
+        "-threads",
+        str(n_threads),
+        "-f",
+        "null",
+        "-",
+    ]
+
+
+def read_quality_log(path, metric):
+    """Per-frame scores from a libvmaf JSON log or a psnr/ssim stats file"""
+    if metric == "VMAF":
+        with open(path, "r", encoding="utf-8") as f:
+            data = load(f)
+        return [float(frame["metrics"]["vmaf"]) for frame in data.get("frames", [])]
+
+    key = "psnr_avg:" if metric == "PSNR" else "All:"
+    scores = []
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            for field in line.split():
+                if field.startswith(key):
+                    scores.append(min(float(field[len(key):]), QUALITY_PSNR_CAP))
+                    break
+    return scores
+
+
+def merge_quality_segments(segments, fps):
+    """Join per-segment scores [(start, scores), ...] into (time, score) frames"""
+    frame_time = 1.0 / fps if fps else 0.0
+    frames = []
+    for start, scores in sorted(segments, key=lambda segment: segment[0]):
+        frames.extend((start + i * frame_time, score) for i, score in enumerate(scores))
+    return frames
+
+
+def summarize_quality(scores):
+    """Mean, min, 1st percentile and harmonic mean of per-frame scores"""
+    if not scores:
+        return None
+    ordered = sorted(scores)
+    count = len(ordered)
+
+    # 1st percentile with linear interpolation between neighbours
+    rank = (count - 1) * 0.01
+    low = int(rank)
+    high = min(low + 1, count - 1)
+    p1 = ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+    # libvmaf's pooling: shift by 1 so zero scores stay finite
+    harmonic_mean = count / sum(1.0 / (score + 1.0) for score in ordered) - 1.0
+
+    return {
+        "frames": count,
+        "mean": sum(ordered) / count,
+        "min": ordered[0],
+        "p1": p1,
+        "harmonic_mean": harmonic_mean,
+    }
+
+
+def format_quality_summary(metric, summary):
+    """One-line result for the status bar"""
+    digits = 4 if metric == "SSIM" else 2
+    return (
+        f"{metric} {summary['mean']:.{digits}f} "
+        f"(min {summary['min']:.{digits}f}, "
+        f"1% low {summary['p1']:.{digits}f}, "
+        f"harmonic {summary['harmonic_mean']:.{digits}f}) "
+        f"over {summary['frames']} frames"
+    )
+
+
+def worst_quality_frames(
+    frames, count=QUALITY_WORST_COUNT, spacing=QUALITY_DIP_SPACING
+):
+    """Lowest-scoring (time, score) frames, at most one per `spacing` seconds"""
+    worst = []
+    for time_s, score in sorted(frames, key=lambda frame: frame[1]):
+        if all(abs(time_s - picked) >= spacing for picked, _ in worst):
+            worst.append((time_s, score))
+            if len(worst) >= count:
+                break
+    return worst
+
+
+def quality_timeline(frames, duration, buckets):
+    """Worst score per time bucket, None where a bucket has no frames"""
+    timeline = [None] * buckets
+    if duration <= 0:
+        return timeline
+    for time_s, score in frames:
+        index = min(buckets - 1, max(0, int(time_s / duration * buckets)))
+        if timeline[index] is None or score < timeline[index]:
+            timeline[index] = score
+    return timeline
+
+
+def quality_log_path(output_f, metric, log_format):
+    """Per-frame log written next to the scored file"""
+    return f"{os.path.splitext(output_f)[0]}_{metric.lower()}.{log_format.lower()}"
+
+
+def write_quality_log(path, report):
+    """Write a quality report as JSON, or its per-frame scores as CSV"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            f.write(f"frame,time,{report['metric'].lower()}\n")
+            for index, (time_s, score) in enumerate(report["frames"]):
+                f.write(f"{index},{time_s:.3f},{score:.6f}\n")
+        else:
+            data = dict(report)
+            data["worst"] = [
+                {"time": round(time_s, 3), "score": score}
+                for time_s, score in report["worst"]
+            ]
+            data["frames"] = [
+                {"frame": index, "time": round(time_s, 3), "score": score}
+                for index, (time_s, score) in enumerate(report["frames"])
+            ]
+            dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def sample_starts(duration, count=QP_SEARCH_SAMPLES, length=QP_SEARCH_SAMPLE_LENGTH):
+    """Evenly spread start times of representative samples (skips intro/outro)"""
+    if duration <= length:
+        return [0.0]
+    return [(duration - length) * (i + 1) / (count + 1) for i in range(count)]
+
+
+def encode_settings_hash(settings):
+    """Short hash of the settings that shape a sample encode, except the QP"""
+    relevant = {
+        key: value
+        for key, value in settings.items()
+        if key not in QP_SEARCH_IGNORED_KEYS
+    }
+    return sha1(dumps(relevant, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def search_target_qp(evaluate, target, low=QP_SEARCH_MIN, high=QP_SEARCH_MAX):
+    """Bisect for the highest QP (lowest bitrate) whose score still meets target.
+
+    evaluate(qp) returns (score, kbps) and scores are assumed to fall as the
+    QP rises. Returns (qp, score, kbps), or None if even `low` misses.
+    """
+    best = None
+    while low <= high:
+        qp = (low + high) // 2
+        score, kbps = evaluate(qp)
+        if score >= target:
+            best = (qp, score, kbps)
+            low = qp + 1
+        else:
+            high = qp - 1
+    return best
+
+
+# PRESETS
+def list_presets(presets_dir):
+    """Names of the preset files in a directory, sorted"""
+    try:
+        return sorted(
+            os.path.splitext(name)[0]
+            for name in os.listdir(presets_dir)
+            if name.endswith(".json")
+        )
+    except OSError:
+        return []
+
+
+def load_preset(path):
+    """Settings snapshot of a preset file over the defaults.
+
+    Raises OSError or ValueError when the file can't be read.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        preset = load(file)
+    if not isinstance(preset, dict):
+        raise ValueError(f"Not a preset file: {path}")
+    return make_encode_settings(preset)
+
+
+# JOBS
+def batch_output_path(input_path, output_dir, codec, container=None):
+    """[name]_[codec]_custom.[ext] in output_dir (the input's folder if empty)"""
+    base_name = os.path.splitext(os.path.basename(input_path))[0]
+    extension = f".{container}" if container else os.path.splitext(input_path)[1]
+    return os.path.normpath(
+        os.path.join(
+            output_dir or os.path.dirname(input_path),
+            f"{base_name}_{codec}_custom{extension or '.mp4'}",
+        )
+    )
+
+
+def make_encode_job(
+    ffmpeg_path, ffprobe_path, settings, info, output_f, sessions=1, keyframe_index=None
+):
+    """The job the GUI would run for a probed input: smart cut, chunks or one pass"""
+    if settings["smart_trim"]:
+        blocker = smart_cut_blocker(settings, info)
+        if blocker is None:
+            return SmartCut(
+                ffmpeg_path, ffprobe_path, settings, info, output_f, keyframe_index
+            )
+        print(f"Smart trim skipped: {blocker}")
+
+    if sessions > 1:
+        blocker = chunking_blocker(settings)
+        if blocker is None and info.duration < 2 * CHUNK_MIN_LENGTH:
+            blocker = "the file is too short"
+        if blocker is None:
+            return ChunkedEncode(
+                ffmpeg_path,
+                ffprobe_path,
+                settings,
+                info.path,
+                output_f,
+                info.duration,
+                sessions,
+                info.start_time,
+                keyframe_index,
+            )
+        print(f"Chunked encoding skipped: {blocker}")
+
+    command = build_ffmpeg_command(ffmpeg_path, settings, info.path, output_f)
+    return EncodeJob(command, info.duration)
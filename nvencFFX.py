@@ -1,30 +1,140 @@
 # IMPORTS
+# Start-up timing includes the imports below (see StartupTimer)
+from time import perf_counter
+
+STARTED_AT = perf_counter()
 
 # Standard library
 import ctypes.wintypes
 import os
-from shutil import move
+from shutil import disk_usage, rmtree
 import subprocess
 import sys
 import tempfile
-import time
-import wave
 import tkinter as tk
-from collections import OrderedDict
 from datetime import datetime
 from io import BytesIO
-from json import dump, load
-from re import sub, search, compile, IGNORECASE
+from hashlib import sha1
+from json import dump, dumps, load
+from re import sub
 from shlex import split
-from threading import Event, Thread, Timer
+from threading import Event, Lock, Thread, Timer
 from tkinter import filedialog, messagebox, simpledialog
 from winsound import MB_ICONASTERISK, MessageBeep
 
 # Third-party
 import customtkinter as ctk
-from CTkToolTip import CTkToolTip
-from PIL import Image
-import pyaudiowpatch as pyaudio
+
+# Local
+from nff.core import (
+    CHUNK_MIN_LENGTH,
+    CHUNKED_ENCODE_OPTIONS,
+    PREVIEW_LENGTH,
+    PREVIEW_SAMPLE_OPTIONS,
+    QP_SEARCH_MIN,
+    QP_SEARCH_SAMPLE_LENGTH,
+    QP_SEARCH_STEPS,
+    QUALITY_JUMP_WINDOW,
+    QUALITY_LOG_FORMATS,
+    QUALITY_METRICS,
+    QUALITY_SEGMENT_OPTIONS,
+    REPLAY_MINUTES_OPTIONS,
+    THUMBNAIL_PREFETCH,
+    THUMBNAIL_SIZE,
+    CaptureStats,
+    ChunkedEncode,
+    FFmpegCapabilities,
+    FFmpegProgress,
+    KeyframeIndex,
+    MetadataService,
+    PreviewCache,
+    PcmSocketFeed,
+    PreviewSampler,
+    RecordingJournal,
+    ReplayBuffer,
+    ReplayClipJob,
+    SmartCut,
+    ThumbnailService,
+    UiUpdateBus,
+    audio_kbps_for_estimate,
+    batch_output_path,
+    build_audio_options,
+    build_ffmpeg_command,
+    build_quality_command,
+    capture_stats_file,
+    chunking_blocker,
+    encode_settings_hash,
+    estimate_output_size_mb,
+    estimate_size_mb,
+    extrapolate_size_mb,
+    format_audio_feed_stats,
+    format_capture_stats,
+    format_progress,
+    format_quality_summary,
+    format_size_mb,
+    format_timestamp,
+    keyframe_at_or_before,
+    list_presets,
+    make_encode_settings,
+    measure_preview_samples,
+    merge_quality_segments,
+    nearest_keyframe,
+    preview_cache_key,
+    preview_sample_points,
+    quality_log_name,
+    quality_log_path,
+    quality_segment_count,
+    quality_timeline,
+    recording_output_options,
+    read_quality_log,
+    replay_audio_options,
+    retarget_command,
+    sample_starts,
+    search_target_qp,
+    smart_cut_blocker,
+    split_segments,
+    strip_trim_options,
+    summarize_quality,
+    thumbnail_step,
+    with_input_seek,
+    with_progress_pipe,
+    worst_quality_frames,
+    write_quality_log,
+)
+
+# STARTUP TIMING
+STARTUP_TIMING_ENV = "NFF_STARTUP_TIMING"
+
+
+class StartupTimer:
+    """Start-up phase durations, printed when NFF_STARTUP_TIMING is set.
+
+    "1" prints one `Startup {...}` JSON line once the window is up, "exit"
+    also closes the app so benchmarks/startup.py can launch it repeatedly and
+    "panels" first prints a `Panels {...}` line timing each panel's first open.
+    """
+
+    def __init__(self, started_at):
+        self.mode = os.environ.get(STARTUP_TIMING_ENV, "")
+        self.marks = [("start", started_at)]
+
+    def mark(self, phase):
+        self.marks.append((phase, perf_counter()))
+
+    def report(self):
+        """Print and return the milliseconds spent in each phase"""
+        phases = {
+            phase: round((end - begin) * 1000, 1)
+            for (_, begin), (phase, end) in zip(self.marks, self.marks[1:])
+        }
+        phases["total"] = round((self.marks[-1][1] - self.marks[0][1]) * 1000, 1)
+        if self.mode:
+            print(f"Startup {dumps(phases)}", flush=True)
+        return phases
+
+
+startup_timer = StartupTimer(STARTED_AT)
+startup_timer.mark("imports")
 
 # Win32 constants
 GWL_WNDPROC = -4
@@ -52,6 +162,8 @@ IDM_START_RECORDING = 1001
 IDM_STOP_RECORDING = 1002
 IDM_OPEN_APP = 1003
 IDM_EXIT = 1004
+IDM_TOGGLE_REPLAY = 1005
+IDM_SAVE_REPLAY = 1006
 
 # Process snapshot constants for killing only our ffmpeg.exe
 TH32CS_SNAPPROCESS = 0x00000002
@@ -78,10 +190,18 @@ class PROCESSENTRY32W(ctypes.Structure):
 # Hotkey Win32 constants
 WM_HOTKEY = 0x0312
 MOD_ALT = 0x0001
+MOD_CONTROL = 0x0002
+MOD_SHIFT = 0x0004
 VK_F8 = 0x77
 VK_F9 = 0x78
+VK_F10 = 0x79
 HOTKEY_START_ID = 2001
 HOTKEY_STOP_ID = 2002
+HOTKEY_SAVE_REPLAY_ID = 2003
+HOTKEY_TOGGLE_REPLAY_ID = 2004
+# Alt + F10 and Alt + Shift + F10 are NVIDIA's own instant replay defaults
+SAVE_REPLAY_HOTKEY = "Ctrl + Alt + F10"
+TOGGLE_REPLAY_HOTKEY = "Ctrl + Alt + Shift + F10"
 
 # Win32 callback type for window procedures
 WNDPROC = ctypes.WINFUNCTYPE(
@@ -230,6 +350,290 @@ def is_us_english_layout():
         return False  # On error, assume not English (or fall back to default)
 
 
+def add_tooltip(widget, **kwargs):
+    """Attach a CTkToolTip that is built when the pointer first enters the widget.
+
+    Each CTkToolTip is a hidden Toplevel, so creating them up front slowed
+    down opening every window for tooltips that are rarely shown.
+    """
+    tooltip = None
+
+    def on_enter(event):
+        nonlocal tooltip
+        if tooltip is None:
+            # Imported on first hover, start-up does not need it
+            from CTkToolTip import CTkToolTip
+
+            tooltip = CTkToolTip(widget, **kwargs)
+            tooltip.on_enter(event)
+
+    widget.bind("<Enter>", on_enter, add="+")
+
+
+# FILMSTRIP
+FILMSTRIP_COLUMNS = 10
+FILMSTRIP_ROWS = 10
+FILMSTRIP_TILE = (192, 108)
+FILMSTRIP_CACHE_FILES = 200  # Sprites kept on disk, oldest removed first
+
+
+class FilmstripService:
+    """Keyframe-only filmstrip sprites for the trim slider, cached on disk.
+
+    One low-priority ffmpeg pass decodes keyframes only, picks evenly spaced
+    frames with the fps filter and packs them into a single JPEG with the
+    tile filter. The slider background and the hover preview slice tiles from
+    it instead of starting a decoder per position.
+    """
+
+    def __init__(self, cache_dir, max_files=FILMSTRIP_CACHE_FILES):
+        self.cache_dir = cache_dir
+        self.max_files = max_files
+        self._lock = Lock()
+        self._process = None
+        self._generation = 0
+        self._loaded = (None, None)  # (identity, PIL image) of the last load()
+
+    @property
+    def tiles(self):
+        return FILMSTRIP_COLUMNS * FILMSTRIP_ROWS
+
+    def sprite_path(self, identity):
+        name = sha1(repr(identity).encode("utf-8")).hexdigest()[:24]
+        return os.path.join(self.cache_dir, f"{name}.jpg")
+
+    def load(self, path):
+        """PIL image of a file's sprite, or None until it has been built"""
+        try:
+            identity = ThumbnailService.file_identity(path)
+        except OSError:
+            return None
+        if self._loaded[0] == identity:
+            return self._loaded[1]
+        sprite_path = self.sprite_path(identity)
+        if not os.path.exists(sprite_path):
+            return None
+        try:
+            from PIL import Image
+
+            image = Image.open(sprite_path)
+            image.load()
+        except Exception as e:
+            print(f"Error loading filmstrip: {e}")
+            return None
+        self._loaded = (identity, image)
+        return image
+
+    def build(self, ffmpeg_path, path, duration):
+        """Build the sprite unless cached, return its path or None.
+
+        Blocking; a newer build() call stops an older one that is running.
+        """
+        identity = ThumbnailService.file_identity(path)
+        sprite_path = self.sprite_path(identity)
+        if os.path.exists(sprite_path):
+            os.utime(sprite_path)  # Keep recently used sprites when pruning
+            return sprite_path
+        if duration <= 0:
+            return None
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        part_path = sprite_path[: -len(".jpg")] + ".part.jpg"
+        width, height = FILMSTRIP_TILE
+        video_filter = (
+            f"fps={self.tiles / duration:.6f},"
+            f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,"
+            f"tile={FILMSTRIP_COLUMNS}x{FILMSTRIP_ROWS}"
+        )
+        command = [
+            ffmpeg_path,
+            "-hide_banner",
+            "-nostdin",
+            "-threads",
+            "2",
+            "-skip_frame",
+            "nokey",
+            "-i",
+            path,
+            "-map",
+            "0:v:0",
+            "-an",
+            "-sn",
+            "-dn",
+            "-vf",
+            video_filter,
+            "-frames:v",
+            "1",
+            "-q:v",
+            "5",
+            "-y",
+            part_path,
+        ]
+        creationflags = 0
+        if os.name == "nt":
+            creationflags = (
+                subprocess.CREATE_NO_WINDOW | subprocess.BELOW_NORMAL_PRIORITY_CLASS
+            )
+
+        with self._lock:
+            self._stop_locked()
+            self._generation += 1
+            generation = self._generation
+            process = subprocess.Popen(
+                command,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                creationflags=creationflags,
+            )
+            self._process = process
+        process.wait()
+
+        with self._lock:
+            if self._process is process:
+                self._process = None
+            superseded = generation != self._generation
+        if superseded or process.returncode != 0 or not os.path.exists(part_path):
+            try:
+                os.remove(part_path)
+            except OSError:
+                pass
+            return None
+
+        os.replace(part_path, sprite_path)
+        self._prune()
+        return sprite_path
+
+    def cancel(self):
+        """Stop a running build (e.g. on exit)"""
+        with self._lock:
+            self._generation += 1
+            self._stop_locked()
+
+    def _stop_locked(self):
+        if self._process is not None:
+            try:
+                self._process.terminate()
+            except Exception:
+                pass
+            self._process = None
+
+    def _prune(self):
+        try:
+            sprites = [
+                os.path.join(self.cache_dir, name)
+                for name in os.listdir(self.cache_dir)
+                if name.endswith(".jpg") and not name.endswith(".part.jpg")
+            ]
+            sprites.sort(key=os.path.getmtime, reverse=True)
+            for old_path in sprites[self.max_files :]:
+                os.remove(old_path)
+        except OSError as e:
+            print(f"Error pruning filmstrip cache: {e}")
+
+    def tile(self, image, fraction):
+        """Tile nearest to a position (0..1 of the duration)"""
+        index = min(self.tiles - 1, max(0, int(fraction * self.tiles + 0.5)))
+        width, height = FILMSTRIP_TILE
+        x = (index % FILMSTRIP_COLUMNS) * width
+        y = (index // FILMSTRIP_COLUMNS) * height
+        return image.crop((x, y, x + width, y + height))
+
+    def strip(self, image, width, height):
+        """Row of tiles spanning `width` pixels, for the slider background"""
+        from PIL import Image
+
+        tile_width = max(1, round(height * FILMSTRIP_TILE[0] / FILMSTRIP_TILE[1]))
+        count = max(1, width // tile_width)
+        strip = Image.new("RGB", (width, height))
+        for slot in range(count):
+            left = slot * width // count
+            right = (slot + 1) * width // count
+            tile = self.tile(image, (slot + 0.5) / count)
+            strip.paste(tile.resize((right - left, height)), (left, 0))
+        return strip
+
+
+# UI UPDATE BUS
+UI_BUS_INTERVAL_MS = 50  # Tk thread drains worker updates at 20 Hz
+
+
+# LOOPBACK AUDIO
+class LoopbackCapture:
+    """WASAPI loopback of the default speakers, streamed into ffmpeg live.
+
+    Opening it finds the loopback device and sets up a PcmSocketFeed in its
+    format, so input_args() can go into the recording command before ffmpeg
+    starts. start() begins capturing once ffmpeg is running.
+    """
+
+    def __init__(self):
+        # PortAudio is only loaded once a recording needs it
+        import pyaudiowpatch as pyaudio
+
+        self._pyaudio = pyaudio
+        self._audio = pyaudio.PyAudio()
+        self._stream = None
+        try:
+            self.device = self._find_device()
+            self.feed = PcmSocketFeed(
+                int(self.device["defaultSampleRate"]),
+                self.device["maxInputChannels"],
+            )
+        except Exception:
+            self._audio.terminate()
+            raise
+
+    def _find_device(self):
+        try:
+            wasapi_info = self._audio.get_host_api_info_by_type(
+                self._pyaudio.paWASAPI
+            )
+        except OSError:
+            raise RuntimeError("WASAPI is not supported.")
+
+        default_speakers = self._audio.get_device_info_by_index(
+            wasapi_info["defaultOutputDevice"]
+        )
+        if default_speakers["isLoopbackDevice"]:
+            return default_speakers
+        for loopback in self._audio.get_loopback_device_info_generator():
+            if default_speakers["name"] in loopback["name"]:
+                return loopback
+        raise RuntimeError("loopback device not found.")
+
+    def input_args(self):
+        return self.feed.input_args()
+
+    def start(self):
+        pyaudio = self._pyaudio
+        self.feed.start()
+
+        def callback(in_data, frame_count, time_info, status):
+            self.feed.write(in_data)
+            return (in_data, pyaudio.paContinue)
+
+        self._stream = self._audio.open(
+            format=pyaudio.paInt16,
+            channels=self.feed.channels,
+            rate=self.feed.rate,
+            frames_per_buffer=512,
+            input=True,
+            input_device_index=self.device["index"],
+            stream_callback=callback,
+        )
+
+    def close(self):
+        try:
+            if self._stream is not None:
+                self._stream.stop_stream()
+                self._stream.close()
+        finally:
+            self._audio.terminate()
+            self.feed.close()
+
+
 # UI THEME
 # ctk.ThemeManager.theme["CTkFont"].update({"family": "Segoe UI", "size": 12})
 # ctk.set_window_scaling(2.0)
@@ -277,6 +681,9 @@ VIDEO_EXTENSIONS_FILTER = (
 )
 PRESERVE_EXTENSIONS = (".mp4", ".mkv", ".mov", ".ts", ".mts", ".m2ts", ".webm")
 
+# Concurrent batch jobs (consumer GPUs cap the number of NVENC sessions)
+BATCH_WORKER_OPTIONS = ["1", "2", "3", "4"]
+
 
 class TextCheckbox(ctk.CTkFrame):
     def __init__(self, master=None, text="", variable=None, command=None, **kwargs):
@@ -520,6 +927,8 @@ class TrayIcon:
         on_stop_callback,
         on_open_callback,
         on_exit_callback,
+        on_replay_callback=None,
+        on_save_replay_callback=None,
         version="",
     ):
         self.hwnd = hwnd
@@ -527,6 +936,9 @@ class TrayIcon:
         self.on_stop = on_stop_callback
         self.on_open = on_open_callback
         self.on_exit = on_exit_callback
+        self.on_replay = on_replay_callback
+        self.on_save_replay = on_save_replay_callback
+        self.tip = ""
         self.version = version
         self._active = False
 
@@ -560,9 +972,34 @@ class TrayIcon:
             ctypes.cast(self._wndproc_ref, ctypes.c_void_p).value,
         )
 
-        # Register global hotkeys (Alt + F8, Alt + F9)
-        _user32.RegisterHotKey(self.hwnd, HOTKEY_START_ID, MOD_ALT, VK_F8)
-        _user32.RegisterHotKey(self.hwnd, HOTKEY_STOP_ID, MOD_ALT, VK_F9)
+        # Register global hotkeys; one that another app holds fails to register
+        hotkeys = [
+            (HOTKEY_START_ID, MOD_ALT, VK_F8, "Alt + F8"),
+            (HOTKEY_STOP_ID, MOD_ALT, VK_F9, "Alt + F9"),
+        ]
+        if self.on_save_replay:
+            hotkeys.append(
+                (
+                    HOTKEY_SAVE_REPLAY_ID,
+                    MOD_CONTROL | MOD_ALT,
+                    VK_F10,
+                    SAVE_REPLAY_HOTKEY,
+                )
+            )
+        if self.on_replay:
+            hotkeys.append(
+                (
+                    HOTKEY_TOGGLE_REPLAY_ID,
+                    MOD_CONTROL | MOD_ALT | MOD_SHIFT,
+                    VK_F10,
+                    TOGGLE_REPLAY_HOTKEY,
+                )
+            )
+        self.failed_hotkeys = [
+            name
+            for hotkey_id, modifiers, key, name in hotkeys
+            if not _user32.RegisterHotKey(self.hwnd, hotkey_id, modifiers, key)
+        ]
 
     def _nid(self):
         nid = self._NOTIFYICONDATA()
@@ -572,7 +1009,10 @@ class TrayIcon:
         nid.uFlags = NIF_MESSAGE | NIF_ICON | NIF_TIP
         nid.uCallbackMessage = WM_USER_TRAY
         nid.hIcon = self._hicon
-        nid.szTip = f"nvencFFX {self.version}"
+        tip = f"nvencFFX {self.version}"
+        if self.tip:
+            tip += f"\n{self.tip}"
+        nid.szTip = tip[:127]
         return nid
 
     def show(self):
@@ -593,6 +1033,13 @@ class TrayIcon:
         nid.dwInfoFlags = 1  # NIIF_INFO
         _shell32.Shell_NotifyIconW(NIM_MODIFY, ctypes.byref(nid))
 
+    def set_tip(self, text):
+        """Show `text` under the app name in the tray icon tooltip"""
+        self.tip = text
+        if self._active:
+            nid = self._nid()
+            _shell32.Shell_NotifyIconW(NIM_MODIFY, ctypes.byref(nid))
+
     def hide(self):
         if not self._active:
             return
@@ -608,6 +1055,21 @@ class TrayIcon:
         _user32.AppendMenuW(
             hmenu, MF_STRING, IDM_STOP_RECORDING, "Stop Recording (Alt + F9)"
         )
+        if self.on_replay:
+            _user32.AppendMenuW(hmenu, MF_SEPARATOR, 0, None)
+            _user32.AppendMenuW(
+                hmenu,
+                MF_STRING,
+                IDM_TOGGLE_REPLAY,
+                f"Instant Replay On/Off ({TOGGLE_REPLAY_HOTKEY})",
+            )
+        if self.on_save_replay:
+            _user32.AppendMenuW(
+                hmenu,
+                MF_STRING,
+                IDM_SAVE_REPLAY,
+                f"Save Replay Clip ({SAVE_REPLAY_HOTKEY})",
+            )
         _user32.AppendMenuW(hmenu, MF_SEPARATOR, 0, None)
         _user32.AppendMenuW(hmenu, MF_STRING, IDM_OPEN_APP, "Open nvencFFX")
         _user32.AppendMenuW(hmenu, MF_STRING, IDM_EXIT, "Exit")
@@ -631,6 +1093,10 @@ class TrayIcon:
             Thread(target=self.on_open, daemon=True).start()
         elif cmd == IDM_EXIT:
             Thread(target=self.on_exit, daemon=True).start()
+        elif cmd == IDM_TOGGLE_REPLAY:
+            Thread(target=self.on_replay, daemon=True).start()
+        elif cmd == IDM_SAVE_REPLAY:
+            Thread(target=self.on_save_replay, daemon=True).start()
 
     def _wnd_proc(self, hwnd, msg, wparam, lparam):
         if msg == WM_HOTKEY:
@@ -640,6 +1106,12 @@ class TrayIcon:
             elif wparam == HOTKEY_STOP_ID:
                 Thread(target=self.on_stop, daemon=True).start()
                 return 0
+            elif wparam == HOTKEY_SAVE_REPLAY_ID:
+                Thread(target=self.on_save_replay, daemon=True).start()
+                return 0
+            elif wparam == HOTKEY_TOGGLE_REPLAY_ID:
+                Thread(target=self.on_replay, daemon=True).start()
+                return 0
         if msg == WM_USER_TRAY:
             # WM_RBUTTONUP = 0x0205, WM_CONTEXTMENU = 0x007B
             if lparam in (0x0205, 0x007B):
@@ -657,6 +1129,8 @@ class TrayIcon:
     def destroy(self):
         _user32.UnregisterHotKey(self.hwnd, HOTKEY_START_ID)
         _user32.UnregisterHotKey(self.hwnd, HOTKEY_STOP_ID)
+        _user32.UnregisterHotKey(self.hwnd, HOTKEY_SAVE_REPLAY_ID)
+        _user32.UnregisterHotKey(self.hwnd, HOTKEY_TOGGLE_REPLAY_ID)
         self.hide()
         if self._prev_wndproc:
             _user32.SetWindowLongPtrW(self.hwnd, GWL_WNDPROC, self._prev_wndproc)
@@ -669,19 +1143,25 @@ class BatchConverterWindow:
         self.main_app = main_app
         self.is_converting = False
         self.files = main_app.batch_files.copy()
-        self._saved_input_file = ""
-        self._saved_output_file = ""
+        self.settings_snapshot = None
+        self.container_snapshot = None
+        self.custom_command = None
+        self.ffmpeg_path = None
 
         # Use persistent variables from main app
         self.batch_output_folder = main_app.batch_output_folder
         self.change_container_var = main_app.batch_change_container
         self.output_container_var = main_app.batch_output_container
+        self.max_workers_var = main_app.batch_max_workers
+        self.active_jobs = {}
+        self._estimate_generation = 0
+        self._checking_disk_space = False
 
         # Create window
         self.window = ctk.CTkToplevel(master)
         self.window.title("Batch Converter")
-        self.window.geometry("600x400")
-        self.window.minsize(600, 400)
+        self.window.geometry("600x440")
+        self.window.minsize(600, 440)
         self.window.configure(fg_color=PRIMARY_BG)
 
         # Center window
@@ -692,7 +1172,7 @@ class BatchConverterWindow:
         master_height = master.winfo_height()
 
         window_width = 600
-        window_height = 400
+        window_height = 440
 
         x = master_x + (master_width - window_width) // 2
         y = master_y + (master_height - window_height) // 2
@@ -751,6 +1231,14 @@ class BatchConverterWindow:
         )
         self.output_path_display.pack(side="left")
 
+        self.total_size_label = ctk.CTkLabel(
+            self.output_path_frame,
+            text="",
+            font=("Segoe UI", 13),
+            text_color=PLACEHOLDER_COLOR,
+        )
+        self.total_size_label.pack(side="right")
+
         # Container options frame
         container_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
         container_frame.pack(fill="x", pady=(0, 10))
@@ -793,6 +1281,38 @@ class BatchConverterWindow:
         )
         self.container_menu.grid(row=0, column=2, sticky="ew", padx=(0, 0))
 
+        workers_label = ctk.CTkLabel(
+            container_frame,
+            text="Parallel conversions",
+            font=("Segoe UI", 13),
+            text_color=TEXT_COLOR_W,
+        )
+        workers_label.grid(row=1, column=1, sticky="w", padx=(0, 5), pady=(5, 0))
+
+        self.workers_menu = ctk.CTkOptionMenu(
+            container_frame,
+            values=BATCH_WORKER_OPTIONS,
+            variable=self.max_workers_var,
+            command=self._on_max_workers_changed,
+            fg_color=SECONDARY_BG,
+            button_color=ACCENT_GREEN,
+            button_hover_color=HOVER_GREEN,
+            dropdown_fg_color=SECONDARY_BG,
+            dropdown_hover_color=ACCENT_GREEN,
+            text_color=TEXT_COLOR_W,
+        )
+        self.workers_menu.grid(row=1, column=2, sticky="ew", pady=(5, 0))
+        add_tooltip(
+            self.workers_menu,
+            message="Number of files encoded at the same time.\n"
+            "Consumer GPUs limit the number of concurrent NVENC sessions.",
+            bg_color=SECONDARY_BG,
+            text_color=TEXT_COLOR_W,
+            alpha=1.0,
+            corner_radius=6,
+            delay=0.3,
+        )
+
         # Buttons frame
         buttons_frame = ctk.CTkFrame(main_frame, fg_color=PRIMARY_BG)
         buttons_frame.pack(fill="x", pady=5)
@@ -942,17 +1462,25 @@ class BatchConverterWindow:
         # Add to list
         file_info = {
             "path": file_path,
-            "status": "Ready",  # Ready, Converting, Done, Failed
+            "status": "Ready",  # Ready, Queued, Converting, Done, Failed, Cancelled
             "widgets": None,
         }
         self.files.append(file_info)
         self._update_files_display()
+        if self.is_converting:
+            # Files added mid-batch join the queue
+            self._queue_file(len(self.files) - 1)
+            self._fill_worker_slots()
         self._update_main_convert_button()
         self.main_app.batch_files = self.files.copy()
         self.window.lift()
 
     # Remove from list
     def _remove_file(self, index):
+        if self.is_converting:
+            # List indices must stay stable while jobs run, so "×" cancels instead
+            self._cancel_file(index)
+            return
         if 0 <= index < len(self.files):
             self.files.pop(index)
             self._update_files_display()
@@ -960,7 +1488,7 @@ class BatchConverterWindow:
             self.main_app.batch_files = self.files.copy()
 
     def _remove_all_files(self):
-        if self.files:
+        if self.files and not self.is_converting:
             self.files.clear()
             self._update_files_display()
             self._update_main_convert_button()
@@ -975,6 +1503,48 @@ class BatchConverterWindow:
         for i, file_info in enumerate(self.files):
             self._create_file_entry(i, file_info)
 
+        self._update_total_estimate()
+
+    def _update_total_estimate(self):
+        """Recalculate the batch-wide estimated size in the background"""
+        self._estimate_generation += 1
+        if not self.files:
+            self.total_size_label.configure(text="")
+            return
+
+        try:
+            settings = self.main_app._get_encode_settings()
+        except Exception:
+            return
+        paths = [file_info["path"] for file_info in self.files]
+        Thread(
+            target=self._compute_total_estimate,
+            args=(paths, settings, self._estimate_generation),
+            daemon=True,
+        ).start()
+
+    def _compute_total_estimate(self, paths, settings, generation):
+        total_mb = 0.0
+        unknown = 0
+        for path in paths:
+            if generation != self._estimate_generation:
+                return
+            try:
+                info = self.main_app.metadata.probe(path, self.main_app.ffprobe_path)
+                total_mb += estimate_output_size_mb(info, settings)
+            except Exception:
+                unknown += 1
+
+        text = f"Total: ~{format_size_mb(total_mb)}"
+        if unknown:
+            text += f" ({unknown} unknown)"
+
+        def update_label():
+            if generation == self._estimate_generation and self.window:
+                self.total_size_label.configure(text=text)
+
+        self.master.after(0, update_label)
+
     def _create_file_entry(self, index, file_info):
         file_frame = ctk.CTkFrame(self.scrollable_frame, fg_color=SECONDARY_BG)
         file_frame.pack(fill="x", pady=2)
@@ -992,7 +1562,7 @@ class BatchConverterWindow:
         name_label.pack(side="left", padx=5, fill="x", expand=True)
 
         # Status
-        status_label = ctk.CTkLabel(file_frame, text=file_info["status"], width=80)
+        status_label = ctk.CTkLabel(file_frame, text=file_info["status"], width=140)
         status_label.pack(side="left", padx=5)
 
         # Remove button
@@ -1043,12 +1613,27 @@ class BatchConverterWindow:
         if not self.files or self.is_converting:
             return
 
+        # Snapshot the settings once, jobs build their commands from it in worker threads
+        try:
+            self.ffmpeg_path = self.main_app._get_ffmpeg_executable()
+            self.settings_snapshot = self.main_app._get_encode_settings()
+            self.container_snapshot = self._get_output_container()
+            self.custom_command = self.main_app.custom_command
+            if not self.ffmpeg_path and self.custom_command is None:
+                raise ValueError("FFmpeg path is not specified")
+            command = self._build_job_command(self.files[0]["path"], "output.mp4")
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        if not self.main_app._command_supported(command):
+            return
+
         self.is_converting = True
-        self.current_file_index = 0
+        self.active_jobs = {}
 
-        # Save original input/output so we can restore after batch
-        self._saved_input_file = self.main_app.input_file.get()
-        self._saved_output_file = self.main_app.output_file.get()
+        # Resolve every output path up front so parallel jobs never share a target
+        for index in range(len(self.files)):
+            self._queue_file(index)
 
         self.main_app.progress_frame.grid()
         self.main_app.progress_value.set(0.0)
@@ -1058,39 +1643,86 @@ class BatchConverterWindow:
             text="Cancel", fg_color=ACCENT_RED, hover_color=HOVER_RED
         )
 
-        self._convert_next_file()
+        # Check free disk space for all queued files before the first job starts
+        self._checking_disk_space = True
+        queued = [
+            (file_info["path"], file_info["output"])
+            for file_info in self.files
+            if file_info["status"] == "Queued"
+        ]
+        Thread(
+            target=self._check_disk_space,
+            args=(queued, self.settings_snapshot),
+            daemon=True,
+        ).start()
 
-    def _convert_next_file(self):
-        if not self.window.winfo_exists():
-            self.is_converting = False
-            self._restore_input_output()
+    def _check_disk_space(self, queued, settings):
+        """Compare estimated output sizes with free space per output drive"""
+        needed = {}  # device -> [estimated MB, output folder]
+        for input_path, output_path in queued:
+            output_dir = os.path.dirname(output_path)
+            try:
+                info = self.main_app.metadata.probe(
+                    input_path, self.main_app.ffprobe_path
+                )
+                device = os.stat(output_dir).st_dev
+            except Exception:
+                continue
+            entry = needed.setdefault(device, [0.0, output_dir])
+            entry[0] += estimate_output_size_mb(info, settings)
+
+        shortfalls = []
+        for needed_mb, output_dir in needed.values():
+            try:
+                free_mb = disk_usage(output_dir).free / 1024 / 1024
+            except OSError:
+                continue
+            if needed_mb > free_mb:
+                shortfalls.append(
+                    f"{output_dir}: needs ~{format_size_mb(needed_mb)}, "
+                    f"{format_size_mb(free_mb)} free"
+                )
+
+        self.master.after(0, lambda: self._on_disk_space_checked(shortfalls))
+
+    def _on_disk_space_checked(self, shortfalls):
+        self._checking_disk_space = False
+        if not self.is_converting:
             return
-        if self.current_file_index >= len(self.files) or not self.is_converting:
-            self.is_converting = False
-            self.main_app.progress_frame.grid_remove()
-            self.main_app.ffmpeg_output.set("")
-            self.main_app.status_text.set("Batch conversion completed!")
-            self._update_main_convert_button()
-            self._restore_input_output()
+
+        if shortfalls and not messagebox.askyesno(
+            "Low Disk Space",
+            "The estimated batch output may not fit:\n\n"
+            + "\n".join(shortfalls)
+            + "\n\nStart the batch anyway?",
+        ):
+            self.cancel_batch_conversion()
             return
 
-        current_file = self.files[self.current_file_index]
-        self._update_file_status(self.current_file_index, "Converting")
+        self._fill_worker_slots()
 
-        # Set up conversion for current file
-        input_path = current_file["path"]
+    def _queue_file(self, index):
+        """Resolve the output path of a file and queue it unless it clashes"""
+        file_info = self.files[index]
+        file_info["progress"] = 0.0
+        file_info["output"] = self._get_output_path(file_info["path"])
+        output_key = os.path.normcase(file_info["output"])
 
-        # Generate output filename based on main app settings
-        base_name = os.path.splitext(os.path.basename(input_path))[0]
-        codec_suffix = (
-            "_hevc"
-            if self.main_app.video_codec.get() == "hevc"
-            else "_h264"
-            if self.main_app.video_codec.get() == "h264"
-            else "_av1"
-        )
+        if output_key == os.path.normcase(file_info["path"]):
+            self._update_file_status(index, "Skipped (output = input)")
+            return
+
+        for other_index, other_info in enumerate(self.files[:index]):
+            if not other_info["status"].startswith("Skipped") and (
+                os.path.normcase(other_info.get("output", "")) == output_key
+            ):
+                self._update_file_status(index, f"Skipped (same as #{other_index + 1})")
+                return
+
+        self._update_file_status(index, "Queued")
 
-        # Get output directory
+    def _get_output_path(self, input_path):
+        # Generate output filename based on main app settings
         if self.batch_output_folder.get():
             output_dir = self.batch_output_folder.get()
         elif self.main_app.last_output_dir.get() and os.path.exists(
@@ -1100,41 +1732,89 @@ class BatchConverterWindow:
         else:
             output_dir = os.path.dirname(input_path)
 
-        # Determine extension: either use override from dropdown or preserve original input extension
-        if self.change_container_var.get():
-            original_extension = "." + self.output_container_var.get()
+        # Files added mid-batch are named after the settings they are encoded with
+        if self.is_converting and self.settings_snapshot:
+            codec = self.settings_snapshot["codec"]
+            container = self.container_snapshot
         else:
-            original_extension = os.path.splitext(input_path)[1] or ".mp4"
+            codec = self.main_app.video_codec.get()
+            container = self._get_output_container()
 
-        output_path = os.path.normpath(
-            os.path.join(
-                output_dir, f"{base_name}{codec_suffix}_custom{original_extension}"
-            )
-        )
+        return batch_output_path(input_path, output_dir, codec, container)
+
+    def _get_output_container(self):
+        """Container override from the dropdown, None keeps the input's extension"""
+        if self.change_container_var.get():
+            return self.output_container_var.get()
+        return None
 
+    def _get_max_workers(self):
         try:
-            # Set current file for conversion
-            self.main_app.input_file.set(input_path)
-            self.main_app.output_file.set(output_path)
-            self.main_app._get_video_duration()
+            max_workers = int(self.max_workers_var.get())
+        except (TypeError, ValueError):
+            max_workers = 1
+        return max(1, min(max_workers, int(BATCH_WORKER_OPTIONS[-1])))
 
-            # Build and execute command
-            command = self.main_app._build_ffmpeg_command()
+    def _on_max_workers_changed(self, *args):
+        # Raising the limit mid-batch starts the extra workers right away
+        if self.is_converting:
+            self._fill_worker_slots()
 
-            # Run conversion in thread
-            conversion_thread = Thread(
-                target=self._run_single_conversion,
-                args=(command, self.current_file_index),
-                daemon=True,
-            )
-            conversion_thread.start()
+    def _next_queued_index(self):
+        for index, file_info in enumerate(self.files):
+            if file_info["status"] == "Queued":
+                return index
+        return None
 
-        except Exception as e:
-            self._update_file_status(self.current_file_index, f"Failed: {str(e)}")
-            self.current_file_index += 1
-            self.master.after(100, self._convert_next_file)
+    def _fill_worker_slots(self):
+        if not self.window or not self.window.winfo_exists():
+            self.is_converting = False
+            return
+
+        if self._checking_disk_space:
+            return
 
-    def _run_single_conversion(self, command, file_index):
+        while self.is_converting and len(self.active_jobs) < self._get_max_workers():
+            index = self._next_queued_index()
+            if index is None:
+                break
+            self._launch_job(index)
+
+        if not self.active_jobs and (
+            not self.is_converting or self._next_queued_index() is None
+        ):
+            self._finish_batch()
+
+    def _launch_job(self, index):
+        file_info = self.files[index]
+        self._update_file_status(index, "Converting")
+
+        output_path = file_info["output"]
+        job = {
+            "process": None,
+            "cancelled": False,
+            "duration": 0,
+            "output_mtime": os.path.getmtime(output_path)
+            if os.path.exists(output_path)
+            else None,
+        }
+        self.active_jobs[index] = job
+
+        Thread(
+            target=self._run_single_conversion,
+            args=(file_info["path"], output_path, index, job),
+            daemon=True,
+        ).start()
+
+    def _build_job_command(self, input_path, output_path):
+        """Build the command of one batch file from the settings snapshot"""
+        if self.custom_command is not None:
+            return retarget_command(self.custom_command, input_path, output_path)
+        return build_ffmpeg_command(
+            self.ffmpeg_path, self.settings_snapshot, input_path, output_path
+        )
+
+    def _run_single_conversion(self, input_path, output_path, file_index, job):
         startupinfo = None
         creationflags = 0
 
@@ -1144,9 +1824,13 @@ class BatchConverterWindow:
             startupinfo.wShowWindow = subprocess.SW_HIDE
             creationflags = subprocess.CREATE_NO_WINDOW
 
+        status = "Failed"
         try:
+            command = self._build_job_command(input_path, output_path)
+            job["duration"] = self.main_app._probe_duration(input_path)
+
             process = subprocess.Popen(
-                command,
+                with_progress_pipe(command),
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
                 text=True,
@@ -1156,9 +1840,11 @@ class BatchConverterWindow:
                 encoding="utf-8",
                 errors="replace",
             )
+            job["process"] = process
+            progress = FFmpegProgress(job["duration"])
 
             for line in process.stdout:
-                if not self.is_converting:
+                if not self.is_converting or job["cancelled"]:
                     process.terminate()
                     try:
                         process.wait(timeout=5)
@@ -1166,74 +1852,156 @@ class BatchConverterWindow:
                         process.kill()
                     break
 
-                if line:
-                    self.master.after(
-                        0,
-                        lambda line_text=line: self.main_app.ffmpeg_output.set(
-                            line_text
-                        ),
-                    )
-                    self.master.after(
-                        0,
-                        lambda line_text=line: self.main_app._update_progress(
-                            line_text
-                        ),
-                    )
+                if progress.feed(line):
+                    snapshot = progress.poll()
+                    if snapshot:
+                        self.main_app.ui_bus.post(
+                            ("batch_progress", file_index),
+                            self._on_job_progress,
+                            file_index,
+                            snapshot,
+                        )
 
             process.wait()
 
-            if process.returncode == 0 and self.is_converting:
-                self.master.after(
-                    0, lambda: self._update_file_status(file_index, "Done")
-                )
-            elif self.is_converting:
-                self.master.after(
-                    0, lambda: self._update_file_status(file_index, "Failed")
-                )
-            else:
-                self.master.after(
-                    0, lambda: self._update_file_status(file_index, "Cancelled")
-                )
+            if not self.is_converting or job["cancelled"]:
+                status = "Cancelled"
+            elif process.returncode == 0:
+                status = "Done"
 
         except Exception as e:
-            error_msg = str(e)
-            status = "Cancelled" if not self.is_converting else f"Failed: {error_msg}"
-            self.master.after(0, lambda: self._update_file_status(file_index, status))
+            if not self.is_converting or job["cancelled"]:
+                status = "Cancelled"
+            else:
+                status = f"Failed: {str(e)}"
 
         finally:
-            if self.is_converting:
-                self.current_file_index += 1
-                self.master.after(100, self._convert_next_file)
-            else:
-                self.master.after(0, lambda: self.main_app.ffmpeg_output.set(""))
+            self.main_app.ui_bus.discard(("batch_progress", file_index))
+            if status != "Done":
+                self._remove_partial_output(file_index, job)
+            self.master.after(0, lambda: self._on_job_finished(file_index, status))
+
+    def _remove_partial_output(self, file_index, job):
+        """Delete output written by a failed or cancelled job"""
+        output_path = self.files[file_index].get("output")
+        if not output_path or not os.path.exists(output_path):
+            return
+        try:
+            # Leave untouched files from earlier runs alone
+            if os.path.getmtime(output_path) != job["output_mtime"]:
+                os.remove(output_path)
+        except OSError as e:
+            print(f"Could not remove partial output {output_path}: {e}")
+
+    def _on_job_progress(self, file_index, snapshot):
+        if file_index not in self.active_jobs:
+            return
+        progress = snapshot["progress"]
+        self.files[file_index]["progress"] = progress
+        self._update_file_status(file_index, f"Converting {progress * 100:.0f}%")
+        self.main_app.ffmpeg_output.set(
+            f"[{file_index + 1}] {format_progress(snapshot)}"
+        )
+        self._update_overall_progress()
 
-    def cancel_batch_conversion(self):
+    def _on_job_finished(self, file_index, status):
+        self.active_jobs.pop(file_index, None)
+        if self.files is None:
+            return
+
+        self.files[file_index]["progress"] = 1.0
+        self._update_file_status(file_index, status)
+        self._update_overall_progress()
+
+        if not self.active_jobs:
+            self.main_app.ffmpeg_output.set("")
+        self._fill_worker_slots()
+
+    def _update_overall_progress(self):
+        if not self.is_converting:
+            return
+
+        batch_files = [
+            file_info
+            for file_info in self.files
+            if not file_info["status"].startswith(("Ready", "Skipped"))
+        ]
+        if not batch_files:
+            return
+
+        completed = 0.0
+        for file_info in batch_files:
+            if file_info["status"].startswith("Converting"):
+                completed += file_info.get("progress", 0.0)
+            elif file_info["status"] != "Queued":
+                completed += 1.0
+        progress = completed / len(batch_files)
+        self.main_app.progress_value.set(progress)
+        self.main_app.progress_label.configure(text=f"{progress * 100:.1f}%")
+
+    def _finish_batch(self):
+        was_converting = self.is_converting
         self.is_converting = False
-        if 0 <= self.current_file_index < len(self.files):
-            self._update_file_status(self.current_file_index, "Cancelled")
-        self.main_app.ffmpeg_output.set("")
-        self.main_app.status_text.set("Batch conversion cancelled")
-        self._update_main_convert_button()
         self.main_app.progress_frame.grid_remove()
         self.main_app.progress_value.set(0.0)
-        self._restore_input_output()
-
-    def _restore_input_output(self):
-        """Restore original input/output file paths after batch conversion"""
-        if hasattr(self, "_saved_input_file") and self._saved_input_file:
-            self.main_app.input_file.set(self._saved_input_file)
-        if hasattr(self, "_saved_output_file") and self._saved_output_file:
-            self.main_app.output_file.set(self._saved_output_file)
+        self.main_app.ffmpeg_output.set("")
 
-    def _on_close(self):
-        if self.is_converting:
-            self.window.withdraw()
+        # Summary is built from per-file results, so it does not depend on finish order
+        done = sum(1 for file_info in self.files if file_info["status"] == "Done")
+        failed = sum(
+            1 for file_info in self.files if file_info["status"].startswith("Failed")
+        )
+        if was_converting:
+            summary = f"Batch conversion completed: {done} done"
         else:
-            self._update_main_convert_button()
-            self.main_app.progress_frame.grid_remove()
-            self.main_app.batch_files = self.files
-            # Clean up drop target before destroying window
-            if hasattr(self, "drop_target"):
+            summary = f"Batch conversion cancelled: {done} done"
+        if failed:
+            summary += f", {failed} failed"
+        self.main_app.status_text.set(summary)
+
+        self._update_main_convert_button()
+
+    def _cancel_file(self, index):
+        """Cancel a single queued or running file without stopping the batch"""
+        job = self.active_jobs.get(index)
+        if job:
+            job["cancelled"] = True
+            if job["process"] and job["process"].poll() is None:
+                try:
+                    job["process"].terminate()
+                except Exception:
+                    pass
+            self._update_file_status(index, "Cancelling...")
+        elif self.files[index]["status"] == "Queued":
+            self._update_file_status(index, "Cancelled")
+            self._update_overall_progress()
+
+    def cancel_batch_conversion(self):
+        self.is_converting = False
+        for index, file_info in enumerate(self.files):
+            if file_info["status"] == "Queued":
+                self._update_file_status(index, "Cancelled")
+        for index in list(self.active_jobs):
+            self._cancel_file(index)
+
+        self.main_app.status_text.set("Batch conversion cancelled")
+        self._update_main_convert_button()
+        self.main_app.progress_frame.grid_remove()
+        self.main_app.progress_value.set(0.0)
+
+        # Running jobs report back through _on_job_finished once ffmpeg exits
+        if not self.active_jobs:
+            self._finish_batch()
+
+    def _on_close(self):
+        if self.is_converting:
+            self.window.withdraw()
+        else:
+            self._update_main_convert_button()
+            self.main_app.progress_frame.grid_remove()
+            self.main_app.batch_files = self.files
+            # Clean up drop target before destroying window
+            if hasattr(self, "drop_target"):
                 self.drop_target.cleanup()
             self.window.destroy()
             # Clear reference in main app so _open_batch_converter creates a new one
@@ -1243,1026 +2011,1675 @@ class BatchConverterWindow:
             self.window = None
 
 
-# MAIN
-class VideoConverterApp:
-    # INITIALIZATION
-    def __init__(self, master):
-        self.preview_job = None  # used for debouncing preview creation
-        self.batch_converter_window = None
-        self.map_window = None
-        self.map_selection_cache = {}
-        self.batch_files = []
-        self.video_metadata_cache = {}
+# QUALITY ANALYSIS WINDOW
+class QualityAnalysisWindow:
+    def __init__(self, master, main_app):
         self.master = master
-        self.version = "1.8.1"
-        master.title(f"nvencFFX {self.version}")
+        self.main_app = main_app
+        self.is_running = False
+        self.processes = []
+        self._lock = Lock()
+        self._cancel_event = Event()
 
-        dpi = get_real_dpi()
-        scaling = int(round((dpi / 96) * 100))
-        self.scaling = scaling
+        self.metric_var = main_app.quality_metric
+        self.segments_var = main_app.quality_segments
+        self.log_format_var = main_app.quality_log_format
+        self.target_var = main_app.quality_target
+        self.report = None
 
-        if scaling >= 200:
-            h, min_h, max_h = 600, 600, 650
-        elif scaling >= 125:
-            h, min_h, max_h = 650, 650, 800
-        else:
-            h, min_h, max_h = 700, 700, 900
+        # Create window
+        self.window = ctk.CTkToplevel(master)
+        self.window.title("Quality Analysis")
+        self.window.configure(fg_color=PRIMARY_BG)
+        self.window.resizable(False, False)
 
-        master.geometry(f"820x{h}")
-        master.minsize(820, min_h)
-        master.maxsize(820, max_h)
-        master.resizable(False, True)
-        master.configure(fg_color=PRIMARY_BG)
+        # Center window
+        master.update_idletasks()
+        window_width = 520
+        window_height = 430
+        x = master.winfo_x() + (master.winfo_width() - window_width) // 2
+        y = master.winfo_y() + (master.winfo_height() - window_height) // 2
+        self.window.geometry(f"{window_width}x{window_height}+{x}+{y}")
+        self.window.after(100, self.window.focus_force)
 
-        # Main container
-        self.main_container = ctk.CTkScrollableFrame(master, fg_color=PRIMARY_BG)
-        self.main_container.pack(fill="both", expand=True, padx=10, pady=10)
+        # Set icon
+        if os.path.exists(icon_path):
+            self.window.after(201, lambda: self.window.iconbitmap(icon_path))
 
-        # Content frame
-        self.content_frame = ctk.CTkFrame(self.main_container, fg_color=PRIMARY_BG)
-        self.content_frame.pack(fill="x", expand=False)
+        self._create_widgets()
+        self.window.protocol("WM_DELETE_WINDOW", self._on_close)
 
-        # Convert frame
-        self.button_frame = ctk.CTkFrame(master, fg_color=PRIMARY_BG)
-        self.button_frame.pack(fill="x", padx=15, pady=(0, 15))
+    def _create_widgets(self):
+        main_frame = ctk.CTkFrame(self.window, fg_color=PRIMARY_BG)
+        main_frame.pack(fill="both", expand=True, padx=10, pady=10)
 
-        # Create presets directory
-        self.presets_dir = os.path.join(
-            os.path.dirname(os.path.abspath(__file__)), "presets"
+        options_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
+        options_frame.pack(fill="x", pady=(0, 10))
+        options_frame.columnconfigure(1, weight=1)
+        options_frame.columnconfigure(3, weight=1)
+
+        ctk.CTkLabel(options_frame, text="Metric", text_color=TEXT_COLOR_W).grid(
+            row=0, column=0, sticky="w", padx=(0, 5)
+        )
+        self.metric_menu = ctk.CTkOptionMenu(
+            options_frame,
+            values=QUALITY_METRICS,
+            variable=self.metric_var,
+            fg_color=SECONDARY_BG,
+            button_color=ACCENT_GREEN,
+            button_hover_color=HOVER_GREEN,
+            dropdown_fg_color=SECONDARY_BG,
+            dropdown_hover_color=ACCENT_GREEN,
+            text_color=TEXT_COLOR_W,
+        )
+        self.metric_menu.grid(row=0, column=1, sticky="ew", padx=(0, 10))
+        add_tooltip(
+            self.metric_menu,
+            message="VMAF = perceptual score (0-100), slowest\n"
+            "PSNR = signal-to-noise ratio in dB, fast\n"
+            "SSIM = structural similarity (0-1), fast",
+            bg_color=SECONDARY_BG,
+            text_color=TEXT_COLOR_W,
+            alpha=1.0,
+            corner_radius=6,
+            delay=0.3,
         )
-        if not os.path.exists(self.presets_dir):
-            os.makedirs(self.presets_dir)
 
-        self._setup_variables()
-        self._create_widgets()
+        ctk.CTkLabel(options_frame, text="Segments", text_color=TEXT_COLOR_W).grid(
+            row=0, column=2, sticky="w", padx=(0, 5)
+        )
+        self.segments_menu = ctk.CTkOptionMenu(
+            options_frame,
+            values=QUALITY_SEGMENT_OPTIONS,
+            variable=self.segments_var,
+            fg_color=SECONDARY_BG,
+            button_color=ACCENT_GREEN,
+            button_hover_color=HOVER_GREEN,
+            dropdown_fg_color=SECONDARY_BG,
+            dropdown_hover_color=ACCENT_GREEN,
+            text_color=TEXT_COLOR_W,
+        )
+        self.segments_menu.grid(row=0, column=3, sticky="ew")
+        add_tooltip(
+            self.segments_menu,
+            message="The whole file is split into time segments\n"
+            "that are scored by parallel FFmpeg processes.\n"
+            "Auto picks a count from the number of CPU cores.",
+            bg_color=SECONDARY_BG,
+            text_color=TEXT_COLOR_W,
+            alpha=1.0,
+            corner_radius=6,
+            delay=0.3,
+        )
 
-        # Find FFmpeg executables (critical dependency)
-        self.ffmpeg_path = self._find_executable("ffmpeg.exe")
-        self.ffprobe_path = None
+        ctk.CTkLabel(options_frame, text="Frame log", text_color=TEXT_COLOR_W).grid(
+            row=1, column=0, sticky="w", padx=(0, 5), pady=(5, 0)
+        )
+        self.log_format_menu = ctk.CTkOptionMenu(
+            options_frame,
+            values=QUALITY_LOG_FORMATS,
+            variable=self.log_format_var,
+            fg_color=SECONDARY_BG,
+            button_color=ACCENT_GREEN,
+            button_hover_color=HOVER_GREEN,
+            dropdown_fg_color=SECONDARY_BG,
+            dropdown_hover_color=ACCENT_GREEN,
+            text_color=TEXT_COLOR_W,
+        )
+        self.log_format_menu.grid(
+            row=1, column=1, sticky="ew", padx=(0, 10), pady=(5, 0)
+        )
+        add_tooltip(
+            self.log_format_menu,
+            message="Save the per-frame scores next to the output file\n"
+            "(e.g. video_vmaf.json or video_vmaf.csv)",
+            bg_color=SECONDARY_BG,
+            text_color=TEXT_COLOR_W,
+            alpha=1.0,
+            corner_radius=6,
+            delay=0.3,
+        )
 
-        # Load saved settings (updates ffmpeg_custom_path)
-        self._load_settings()
+        self.progress_bar = ctk.CTkProgressBar(
+            main_frame, fg_color=SECONDARY_BG, progress_color=ACCENT_GREEN
+        )
+        self.progress_bar.set(0)
+        self.progress_bar.pack(fill="x", pady=(0, 5))
 
-        # Determine the actual ffmpeg path to use
-        custom_ffmpeg = self.ffmpeg_custom_path.get()
-        if (
-            custom_ffmpeg
-            and custom_ffmpeg != self.ffmpeg_path_placeholder
-            and os.path.exists(custom_ffmpeg)
-        ):
-            actual_ffmpeg = custom_ffmpeg
+        self.result_label = ctk.CTkLabel(
+            main_frame,
+            text="Scores the whole output file against the input file",
+            font=("Segoe UI", 13),
+            text_color=PLACEHOLDER_COLOR,
+            wraplength=430,
+        )
+        self.result_label.pack(fill="x", pady=(0, 5))
+
+        # Timeline of the worst score per time slice, click to jump the trim slider
+        self.timeline_canvas = ctk.CTkCanvas(
+            main_frame, height=60, bg=SECONDARY_BG, highlightthickness=0
+        )
+        self.timeline_canvas.pack(fill="x", pady=(0, 5))
+        self.timeline_canvas.bind("<Configure>", lambda e: self._draw_timeline())
+        self.timeline_canvas.bind("<Button-1>", self._on_timeline_click)
+        add_tooltip(
+            self.timeline_canvas,
+            message="Worst score over time (red = reported dips).\n"
+            "Click to select that part on the trim slider.",
+            bg_color=SECONDARY_BG,
+            text_color=TEXT_COLOR_W,
+            alpha=1.0,
+            corner_radius=6,
+            delay=0.3,
+        )
+
+        # Worst timestamps
+        self.worst_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
+        self.worst_frame.pack(fill="x", pady=(0, 5))
+
+        # Target VMAF search
+        search_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
+        search_frame.pack(fill="x", pady=(5, 0))
+
+        ctk.CTkLabel(search_frame, text="Target VMAF", text_color=TEXT_COLOR_W).pack(
+            side="left", padx=(0, 5)
+        )
+        self.target_entry = ctk.CTkEntry(
+            search_frame, textvariable=self.target_var, width=60
+        )
+        self.target_entry.pack(side="left", padx=(0, 10))
+
+        self.search_btn = ctk.CTkButton(
+            search_frame,
+            text="Find QP",
+            command=self._toggle_search,
+            fg_color=ACCENT_GREY,
+            hover_color=HOVER_GREY,
+            text_color=TEXT_COLOR_B,
+        )
+        self.search_btn.pack(side="left", expand=True, fill="x")
+        add_tooltip(
+            self.search_btn,
+            message="Encode a few 10s samples of the input with the current settings,\n"
+            "bisect the constant QP and apply the highest QP (lowest bitrate)\n"
+            "whose VMAF still meets the target. Results are cached per session.",
+            bg_color=SECONDARY_BG,
+            text_color=TEXT_COLOR_W,
+            alpha=1.0,
+            corner_radius=6,
+            delay=0.3,
+        )
+
+        self.analyze_btn = ctk.CTkButton(
+            main_frame,
+            text="Analyze",
+            command=self._toggle_analysis,
+            fg_color=ACCENT_GREEN,
+            hover_color=HOVER_GREEN,
+            text_color=TEXT_COLOR_B,
+        )
+        self.analyze_btn.pack(fill="x", pady=(5, 0))
+
+    def _toggle_analysis(self):
+        if self.is_running:
+            self.cancel_analysis()
         else:
-            actual_ffmpeg = self.ffmpeg_path
+            self.start_analysis()
 
-        # Update self.ffmpeg_path to the actual one (so it's consistent)
-        self.ffmpeg_path = actual_ffmpeg
+    def start_analysis(self):
+        input_f = self.main_app.input_file.get()
+        output_f = self.main_app.output_file.get()
 
-        # Determine ffprobe path based on actual ffmpeg
-        if self.ffmpeg_path:
-            ffprobe_path = os.path.join(
-                os.path.dirname(self.ffmpeg_path), "ffprobe.exe"
+        if not input_f or input_f.startswith("Drag and drop") or not output_f:
+            messagebox.showwarning(
+                "Warning", "Please specify both Input and Output files."
             )
-            if os.path.exists(ffprobe_path):
-                self.ffprobe_path = ffprobe_path
-            else:
-                self.ffprobe_path = self._find_executable("ffprobe.exe")
-        else:
-            self.ffprobe_path = self._find_executable("ffprobe.exe")
+            return
 
-        self._update_codec_settings()
+        if not os.path.exists(input_f) or not os.path.exists(output_f):
+            messagebox.showwarning("Warning", "Input or Output file does not exist.")
+            return
 
-        # Set the FFmpeg path in the UI if found
-        if self.ffmpeg_path:
-            self.ffmpeg_custom_path.set(self.ffmpeg_path)
+        ffmpeg_path = self.main_app._get_ffmpeg_executable()
+        if not ffmpeg_path:
+            messagebox.showerror("Error", "FFmpeg path is not specified")
+            return
+        command = build_quality_command(
+            ffmpeg_path,
+            self.metric_var.get(),
+            output_f,
+            input_f,
+            quality_log_name(self.metric_var.get(), 0),
+        )
+        if not self.main_app._command_supported(command):
+            return
 
-        if self.ffmpeg_path:
-            self.ffmpeg_path_entry.configure(text_color=TEXT_COLOR_W)
+        self._set_running(self.analyze_btn)
+        self.result_label.configure(text="Probing files...", text_color=TEXT_COLOR_W)
 
-        # JSON Trace changes
-        self.video_codec.trace_add("write", self._update_output_filename)
+        Thread(
+            target=self._run_analysis,
+            args=(
+                ffmpeg_path,
+                input_f,
+                output_f,
+                self.metric_var.get(),
+                self.segments_var.get(),
+                self.main_app.interpolation_algo.get(),
+                self.log_format_var.get(),
+                self._cancel_event,
+            ),
+            daemon=True,
+        ).start()
 
-        self.conversion_process = None
-        self.conversion_thread = None
-        self.is_converting = False
+    def _toggle_search(self):
+        if self.is_running:
+            self.cancel_analysis()
+        else:
+            self.start_search()
 
-        self._create_trim_slider()
+    def start_search(self):
+        input_f = self.main_app.input_file.get()
 
-        self._center_window()
-        self.drop_target = DropTarget(self.master.winfo_id(), self._handle_dropped_file)
-        self._create_thumbnail_preview()
-        self._setup_keyboard_shortcuts()
-        self._toggle_custom_abitrate()
-        self._toggle_custom_fps_entry()
-        self._toggle_custom_video_width_entry()
+        if not input_f or input_f.startswith("Drag and drop"):
+            messagebox.showwarning("Warning", "Please specify an Input file.")
+            return
 
-        if len(sys.argv) > 1:
-            self._handle_dropped_file(sys.argv[1])
-        self.preview_temp_files = []  # Add list for preview temporary files
-        self.trim_streamcopy.trace_add(
-            "write", lambda *args: self._update_preview_button_state()
-        )
+        if not os.path.exists(input_f):
+            messagebox.showwarning("Warning", "Input file does not exist.")
+            return
 
-        # Help windows
-        self.output_window_open = False
-        self.open_help_windows = {}
+        try:
+            target = float(self.target_var.get())
+            if not (0 < target <= 100):
+                raise ValueError
+        except ValueError:
+            messagebox.showerror(
+                "Error", "Target VMAF must be a number between 0 and 100"
+            )
+            return
 
-        # Initialize tray icon
-        hwnd = self.master.winfo_id()
-        icon_path = get_icon_path()
-        self._tray_icon = TrayIcon(
-            hwnd,
-            icon_path,
-            on_start_callback=lambda: self.master.after(0, self._start_recording),
-            on_stop_callback=lambda: self.master.after(0, self._stop_recording),
-            on_open_callback=lambda: self.master.after(0, self._restore_app),
-            on_exit_callback=lambda: self.master.after(0, self._on_close),
-            version=self.version,
+        if self.main_app.trim_streamcopy.get():
+            messagebox.showwarning(
+                "Warning", "Target VMAF search needs encoding, disable Streamcopy."
+            )
+            return
+
+        ffmpeg_path = self.main_app._get_ffmpeg_executable()
+        if not ffmpeg_path:
+            messagebox.showerror("Error", "FFmpeg path is not specified")
+            return
+        settings = self.main_app._get_encode_settings()
+        commands = (
+            build_ffmpeg_command(ffmpeg_path, settings, input_f, "sample.mkv"),
+            build_quality_command(ffmpeg_path, "VMAF", "sample.mkv", input_f, "log"),
         )
-        self._tray_icon.show()
+        if not all(self.main_app._command_supported(c) for c in commands):
+            return
 
-        # JSON Settings
-        self.ffmpeg_custom_path.trace_add(
-            "write", lambda *args: self._on_setting_changed()
-        )
-        self.last_input_dir.trace_add("write", lambda *args: self._on_setting_changed())
-        self.last_output_dir.trace_add(
-            "write", lambda *args: self._on_setting_changed()
+        self._set_running(self.search_btn)
+        self.result_label.configure(
+            text="Cutting samples...", text_color=TEXT_COLOR_W
         )
-        self.video_codec.trace_add("write", lambda *args: self._on_setting_changed())
-        self.constant_qp_mode.trace_add(
-            "write", lambda *args: self._on_setting_changed()
-        )
-        self.quality_level.trace_add("write", lambda *args: self._on_setting_changed())
-        self.bitrate.trace_add("write", lambda *args: self._on_setting_changed())
-        self.audio_option.trace_add("write", lambda *args: self._on_setting_changed())
-        self._toggle_constant_qp_mode()  # Enabled CQP by default
 
-        # Encoder Settings
-        self.threads.trace_add("write", lambda *args: self._on_setting_changed())
-        self.preset.trace_add("write", lambda *args: self._on_setting_changed())
-        self.tune.trace_add("write", lambda *args: self._on_setting_changed())
-        self.profile.trace_add("write", lambda *args: self._on_setting_changed())
-        self.level.trace_add("write", lambda *args: self._on_setting_changed())
-        self.tier.trace_add("write", lambda *args: self._on_setting_changed())
-        self.coder.trace_add("write", lambda *args: self._on_setting_changed())
-        self.hwaccel.trace_add("write", lambda *args: self._on_setting_changed())
-        self.multipass.trace_add("write", lambda *args: self._on_setting_changed())
-        self.rc.trace_add("write", lambda *args: self._on_setting_changed())
-        self.lookahead_level.trace_add(
-            "write", lambda *args: self._on_setting_changed()
-        )
-        self.split_encode_mode.trace_add(
-            "write", lambda *args: self._on_setting_changed()
-        )
-        # FPS and Scaling Settings
-        self.fps_option.trace_add("write", lambda *args: self._on_setting_changed())
-        self.custom_fps.trace_add("write", lambda *args: self._on_setting_changed())
-        self.fps_mode.trace_add("write", lambda *args: self._on_setting_changed())
-        self.video_format_option.trace_add(
-            "write", lambda *args: self._on_setting_changed()
-        )
-        self.custom_video_width.trace_add(
-            "write", lambda *args: self._on_setting_changed()
-        )
+        Thread(
+            target=self._run_search,
+            args=(
+                ffmpeg_path,
+                input_f,
+                settings,
+                target,
+                self._cancel_event,
+            ),
+            daemon=True,
+        ).start()
 
-        # Encoder Flags
-        self.cuda_output_format.trace_add(
-            "write", lambda *args: self._on_setting_changed()
-        )
-        self.spatial_aq.trace_add("write", lambda *args: self._on_setting_changed())
-        self.temporal_aq.trace_add("write", lambda *args: self._on_setting_changed())
-        self.tune.trace_add("write", lambda *args: self._on_tune_changed())
-        self.strict_gop.trace_add("write", lambda *args: self._on_setting_changed())
-        self.no_scenecut.trace_add("write", lambda *args: self._on_setting_changed())
-        self.weighted_pred.trace_add("write", lambda *args: self._on_setting_changed())
-        self.custom_abitrate.trace_add(
-            "write", lambda *args: self._on_setting_changed()
-        )
-        # Load new added custom preset at next start
-        self.selected_preset.trace_add(
-            "write", lambda *args: self._on_setting_changed()
-        )
-        self.custom_preset_name.trace_add(
-            "write", lambda *args: self._on_setting_changed()
-        )
+    def _run_search(self, ffmpeg_path, input_f, settings, target, cancel):
+        sample_dir = tempfile.mkdtemp(prefix="nff_qpsearch_")
+        try:
+            info = self.main_app.metadata.probe(input_f, self.main_app.ffprobe_path)
+            if info.duration <= 0:
+                raise RuntimeError("Could not determine video duration")
+
+            # Encoded samples are scored at the source size when the settings scale
+            scale_to = None
+            if settings["video_format_option"] != "source":
+                scale_to = (info.width, info.height)
+
+            windows = [
+                (start, min(QP_SEARCH_SAMPLE_LENGTH, info.duration - start))
+                for start in sample_starts(info.duration)
+            ]
+            cache_key = (
+                os.path.normcase(os.path.abspath(input_f)),
+                os.stat(input_f).st_mtime_ns,
+                encode_settings_hash(settings),
+            )
+            samples = []
+            steps = []
+
+            def evaluate(qp):
+                cached = self.main_app.qp_search_cache.get(cache_key + (qp,))
+                if cached is None:
+                    if not samples:
+                        samples.extend(
+                            self._cut_samples(
+                                ffmpeg_path, input_f, windows, sample_dir, cancel
+                            )
+                        )
+                    cached = self._score_qp(
+                        ffmpeg_path, settings, qp, samples, scale_to, sample_dir, cancel
+                    )
+                    self.main_app.qp_search_cache[cache_key + (qp,)] = cached
+
+                score, kbps = cached
+                steps.append(qp)
+                self.main_app.ui_bus.post(
+                    "quality_result",
+                    self._set_result,
+                    f"QP {qp}: VMAF {score:.2f} at {kbps:.0f} kbps",
+                    TEXT_COLOR_W,
+                )
+                self.main_app.ui_bus.post(
+                    "quality_progress",
+                    self._set_progress,
+                    min(1.0, len(steps) / QP_SEARCH_STEPS),
+                )
+                return cached
 
-        # Batch Converter Settings
-        self.batch_output_folder.trace_add(
-            "write", lambda *args: self._on_setting_changed()
-        )
-        self.batch_change_container.trace_add(
-            "write", lambda *args: self._on_setting_changed()
+            best = search_target_qp(evaluate, target)
+            if cancel.is_set():
+                return
+            self.main_app.ui_bus.post(
+                "quality_done", self._on_search_done, target, best, info.duration
+            )
+
+        except Exception as e:
+            if not cancel.is_set():
+                self.main_app.ui_bus.post(
+                    "quality_done",
+                    self._on_analysis_failed,
+                    f"Target VMAF search failed: {str(e)}",
+                )
+        finally:
+            self.main_app.ui_bus.discard("quality_progress")
+            rmtree(sample_dir, ignore_errors=True)
+
+    def _cut_samples(self, ffmpeg_path, input_f, windows, sample_dir, cancel):
+        """Stream-copy the sample windows out of the input in parallel"""
+        samples = [
+            (os.path.join(sample_dir, f"sample_{index}.mkv"), length)
+            for index, (_, length) in enumerate(windows)
+        ]
+        commands = [
+            [
+                ffmpeg_path,
+                "-hide_banner",
+                "-ss",
+                f"{start:.3f}",
+                "-i",
+                input_f,
+                "-map",
+                "0:v:0",
+                "-t",
+                f"{length:.3f}",
+                "-c",
+                "copy",
+                "-y",
+                sample_path,
+            ]
+            for (start, length), (sample_path, _) in zip(windows, samples)
+        ]
+        self._run_parallel(
+            [
+                (command, sample_dir, f"cut_{index}")
+                for index, command in enumerate(commands)
+            ],
+            cancel,
         )
-        self.batch_output_container.trace_add(
-            "write", lambda *args: self._on_setting_changed()
+        return samples
+
+    def _score_qp(
+        self, ffmpeg_path, settings, qp, samples, scale_to, sample_dir, cancel
+    ):
+        """Encode all samples at one QP concurrently, return (VMAF, kbps)"""
+        qp_settings = dict(settings)
+        qp_settings.update(
+            constant_qp_mode=True, quality_level=str(qp), audio_option="disable"
+        )
+        qp_settings = make_encode_settings(qp_settings)
+
+        jobs = []
+        encoded_paths = []
+        for index, (sample_path, _) in enumerate(samples):
+            encoded_path = os.path.join(sample_dir, f"qp{qp}_{index}.mkv")
+            encoded_paths.append(encoded_path)
+            jobs.append(
+                (
+                    strip_trim_options(
+                        build_ffmpeg_command(
+                            ffmpeg_path, qp_settings, sample_path, encoded_path
+                        )
+                    ),
+                    sample_dir,
+                    f"encode_qp{qp}_{index}",
+                )
+            )
+        self._run_parallel(jobs, cancel)
+
+        n_threads = max(1, (os.cpu_count() or 1) // len(samples))
+        jobs = [
+            (
+                build_quality_command(
+                    ffmpeg_path,
+                    "VMAF",
+                    encoded_path,
+                    sample_path,
+                    f"qp{qp}_{index}.json",
+                    scale_to=scale_to,
+                    scale_flag=settings["interpolation_algo"],
+                    n_threads=n_threads,
+                ),
+                sample_dir,
+                f"score_qp{qp}_{index}",
+            )
+            for index, ((sample_path, _), encoded_path) in enumerate(
+                zip(samples, encoded_paths)
+            )
+        ]
+        self._run_parallel(jobs, cancel)
+
+        scores = []
+        for index in range(len(samples)):
+            scores.extend(
+                read_quality_log(
+                    os.path.join(sample_dir, f"qp{qp}_{index}.json"), "VMAF"
+                )
+            )
+        summary = summarize_quality(scores)
+        if summary is None:
+            raise RuntimeError(f"VMAF log for QP {qp} contained no frames")
+
+        total_bytes = sum(os.path.getsize(path) for path in encoded_paths)
+        total_seconds = sum(length for _, length in samples)
+        kbps = total_bytes * 8 / 1000 / total_seconds if total_seconds > 0 else 0
+        return summary["mean"], kbps
+
+    def _run_parallel(self, jobs, cancel):
+        """Run (command, cwd, name) jobs at the same time, raise the first error"""
+        errors = []
+
+        def run(command, cwd, name):
+            try:
+                self._run_hidden(command, cwd, name, cancel)
+            except Exception as e:
+                errors.append(str(e))
+
+        threads = [Thread(target=run, args=job, daemon=True) for job in jobs]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if cancel.is_set():
+            raise RuntimeError("Cancelled")
+        if errors:
+            raise RuntimeError(errors[0])
+
+    def _run_hidden(self, command, cwd, name, cancel):
+        """Run an ffmpeg process without a window, raise with its last stderr line"""
+        startupinfo = None
+        creationflags = 0
+        if os.name == "nt":
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+            startupinfo.wShowWindow = subprocess.SW_HIDE
+            creationflags = subprocess.CREATE_NO_WINDOW
+
+        stderr_path = os.path.join(cwd, f"{name}.err")
+        with open(stderr_path, "w", encoding="utf-8") as stderr_file:
+            with self._lock:
+                if cancel.is_set():
+                    return
+                process = subprocess.Popen(
+                    command,
+                    cwd=cwd,
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL,
+                    stderr=stderr_file,
+                    startupinfo=startupinfo,
+                    creationflags=creationflags,
+                )
+                self.processes.append(process)
+            process.wait()
+
+        if cancel.is_set():
+            return
+        if process.returncode != 0:
+            with open(stderr_path, "r", encoding="utf-8", errors="replace") as f:
+                lines = [line.strip() for line in f if line.strip()]
+            raise RuntimeError(
+                lines[-1] if lines else f"FFmpeg exited with {process.returncode}"
+            )
+
+    def _on_search_done(self, target, best, duration):
+        self._reset_controls()
+        if self.window:
+            self.progress_bar.set(1)
+
+        if best is None:
+            message = (
+                f"Target VMAF {target:g} not reached even at QP {QP_SEARCH_MIN}"
+            )
+            self.main_app.status_text.set(message)
+            if self.window:
+                self.result_label.configure(text=message, text_color=ACCENT_RED)
+            return
+
+        qp, score, kbps = best
+        size_mb = estimate_size_mb(duration, kbps, 0)
+        message = (
+            f"QP {qp} meets VMAF {target:g}: {score:.2f} at ~{kbps:.0f} kbps "
+            f"(~{format_size_mb(size_mb)} video)"
         )
 
-    def _setup_variables(self):
-        # Initialize all Tkinter control variables
-        self.ffprobe_cache = OrderedDict()
-        self.input_file_tooltip = None
-        self._tooltip_generation = 0
-        self._tooltip_cancel = Event()
-        self.input_file = ctk.StringVar()
-        self.output_file = ctk.StringVar()
-        self.bitrate = ctk.StringVar(value="6000")
-        self.ffmpeg_output = ctk.StringVar(value="")
-        self.audio_option = ctk.StringVar(value="copy")
-        self.custom_abitrate = ctk.StringVar(value="160")
-        self.enable_audio_options = ctk.BooleanVar(value=False)
-        self.enable_encoder_options = ctk.BooleanVar(value=False)
-        self.threads = ctk.StringVar(value="4")
-        self.preset = ctk.StringVar(value="p7")
-        self.tune = ctk.StringVar(value="hq")
-        self.profile = ctk.StringVar(value="main")
-        self.level = ctk.StringVar(value="auto")
-        self.tier = ctk.StringVar(value="1")
-        self.hwaccel = ctk.StringVar(value="cuda")
-        self.multipass = ctk.StringVar(value="qres")
-        self.rc = ctk.StringVar(value="vbr")
-        self.rc_locked = ctk.BooleanVar(value=False)
-        self.lookahead_level = ctk.StringVar(value="auto")
-        self.split_encode_mode = ctk.StringVar(value="forced")
-        self.cuda_output_format = ctk.BooleanVar(value=False)
-        self.spatial_aq = ctk.BooleanVar(value=True)
-        self.temporal_aq = ctk.BooleanVar(value=True)
-        self.strict_gop = ctk.BooleanVar(value=False)
-        self.no_scenecut = ctk.BooleanVar(value=False)
-        self.weighted_pred = ctk.BooleanVar(value=False)
-        self.enable_fps_scale_options = ctk.BooleanVar(value=False)
-        self.fps_option = ctk.StringVar(value="source")
-        self.custom_fps = ctk.StringVar(value="30")
-        self.fps_mode = ctk.StringVar(value="auto")
-        self.video_format_option = ctk.StringVar(value="source")
-        self.custom_video_width = ctk.StringVar(value="1920")
-        self.interpolation_algo = ctk.StringVar(value="bicubic")
-        self.enable_additional_options = ctk.BooleanVar(value=False)
-        self.additional_options = ctk.StringVar(value="")
-        self.additional_filter_options = ctk.StringVar(value="")
-        self.additional_audio_filter_options = ctk.StringVar(value="")
-        self.additional_options_placeholder = (
-            "e.g. -aq-strength 8; -cq 0; -bf 0 or -bf 4;"
-            " -intra-refresh 1; -forced-idr 1"
+        # Apply the found QP to the main window
+        self.main_app.constant_qp_mode.set(True)
+        self.main_app.quality_level.set(str(qp))
+        self.main_app._toggle_constant_qp_mode()
+
+        self.main_app.status_text.set(message)
+        if self.window:
+            self.result_label.configure(text=message, text_color=ACCENT_GREEN)
+        MessageBeep(MB_ICONASTERISK)
+
+    def _run_analysis(
+        self,
+        ffmpeg_path,
+        input_f,
+        output_f,
+        metric,
+        segments,
+        scale_flag,
+        log_format,
+        cancel,
+    ):
+        log_dir = tempfile.mkdtemp(prefix="nff_quality_")
+        try:
+            ffprobe_path = self.main_app.ffprobe_path
+            ref_info = self.main_app.metadata.probe(input_f, ffprobe_path)
+            dist_info = self.main_app.metadata.probe(output_f, ffprobe_path)
+            if None in (
+                ref_info.width,
+                ref_info.height,
+                dist_info.width,
+                dist_info.height,
+            ):
+                raise RuntimeError("Could not determine video resolution")
+
+            duration = dist_info.duration or ref_info.duration
+            if duration <= 0:
+                raise RuntimeError("Could not determine video duration")
+
+            # Scale the output to the size of the original when they differ
+            scale_to = None
+            ref_size = (ref_info.width, ref_info.height)
+            if ref_size != (dist_info.width, dist_info.height):
+                scale_to = ref_size
+
+            count = quality_segment_count(duration, segments)
+            windows = split_segments(duration, count)
+            n_threads = max(1, (os.cpu_count() or 1) // count)
+            fractions = [0.0] * count
+            results = [None] * count
+            errors = []
+
+            self.main_app.ui_bus.post(
+                "quality_result",
+                self._set_result,
+                f"Scoring {count} segment(s) in parallel...",
+                TEXT_COLOR_W,
+            )
+
+            def score_segment(index, start, length):
+                command = build_quality_command(
+                    ffmpeg_path,
+                    metric,
+                    output_f,
+                    input_f,
+                    quality_log_name(metric, index),
+                    start,
+                    length,
+                    scale_to,
+                    scale_flag,
+                    n_threads,
+                )
+                try:
+                    self._run_segment(
+                        command,
+                        log_dir,
+                        index,
+                        length or duration - start,
+                        fractions,
+                        cancel,
+                    )
+                    log_path = os.path.join(log_dir, quality_log_name(metric, index))
+                    results[index] = (start, read_quality_log(log_path, metric))
+                except Exception as e:
+                    errors.append(str(e))
+
+            threads = [
+                Thread(target=score_segment, args=(index, start, length), daemon=True)
+                for index, (start, length) in enumerate(windows)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            if cancel.is_set():
+                return
+            if errors:
+                raise RuntimeError(errors[0])
+
+            frames = merge_quality_segments(results, dist_info.fps)
+            summary = summarize_quality([score for _, score in frames])
+            if summary is None:
+                raise RuntimeError(f"{metric} log contained no frames")
+
+            label = format_quality_summary(metric, summary)
+            if scale_to:
+                label += " (with scaling)"
+
+            report = {
+                "metric": metric,
+                "reference": input_f,
+                "distorted": output_f,
+                "duration": duration,
+                "summary": summary,
+                "worst": worst_quality_frames(frames),
+                "frames": frames,
+            }
+            if log_format != "Off":
+                log_path = quality_log_path(output_f, metric, log_format)
+                try:
+                    write_quality_log(log_path, report)
+                    label += f"\nFrame log: {os.path.basename(log_path)}"
+                except Exception as e:
+                    print(f"Error writing quality log: {e}")
+                    label += f"\nCould not write frame log: {str(e)}"
+
+            self.main_app.ui_bus.post(
+                "quality_done", self._on_analysis_done, label, report
+            )
+
+        except Exception as e:
+            if not cancel.is_set():
+                self.main_app.ui_bus.post(
+                    "quality_done",
+                    self._on_analysis_failed,
+                    f"Quality analysis failed: {str(e)}",
+                )
+        finally:
+            self.main_app.ui_bus.discard("quality_progress")
+            rmtree(log_dir, ignore_errors=True)
+
+    def _run_segment(self, command, log_dir, index, length, fractions, cancel):
+        """Run one segment's ffmpeg process, report its share of the progress"""
+        startupinfo = None
+        creationflags = 0
+        if os.name == "nt":
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+            startupinfo.wShowWindow = subprocess.SW_HIDE
+            creationflags = subprocess.CREATE_NO_WINDOW
+
+        stderr_path = os.path.join(log_dir, f"segment_{index}.err")
+        with open(stderr_path, "w", encoding="utf-8") as stderr_file:
+            with self._lock:
+                if cancel.is_set():
+                    return
+                process = subprocess.Popen(
+                    with_progress_pipe(command),
+                    cwd=log_dir,
+                    stdout=subprocess.PIPE,
+                    stderr=stderr_file,
+                    universal_newlines=True,
+                    startupinfo=startupinfo,
+                    creationflags=creationflags,
+                    encoding="utf-8",
+                    errors="replace",
+                )
+                self.processes.append(process)
+
+            progress = FFmpegProgress(length)
+            for line in process.stdout:
+                if progress.feed(line):
+                    snapshot = progress.poll()
+                    if snapshot:
+                        fractions[index] = snapshot["progress"]
+                        self.main_app.ui_bus.post(
+                            "quality_progress",
+                            self._set_progress,
+                            sum(fractions) / len(fractions),
+                        )
+            process.wait()
+
+        if cancel.is_set():
+            return
+        if process.returncode != 0:
+            with open(stderr_path, "r", encoding="utf-8", errors="replace") as f:
+                lines = [line.strip() for line in f if line.strip()]
+            raise RuntimeError(
+                lines[-1] if lines else f"FFmpeg exited with {process.returncode}"
+            )
+
+    def _set_progress(self, value):
+        if self.window:
+            self.progress_bar.set(value)
+
+    def _set_result(self, text, color):
+        if self.window:
+            self.result_label.configure(text=text, text_color=color)
+
+    def _on_analysis_done(self, label, report):
+        self._reset_controls()
+        self.main_app.status_text.set(label.splitlines()[0])
+        if self.window:
+            self.report = report
+            self.progress_bar.set(1)
+            self.result_label.configure(text=label, text_color=ACCENT_GREEN)
+            self._draw_timeline()
+            self._update_worst_list()
+        MessageBeep(MB_ICONASTERISK)
+
+    def _draw_timeline(self):
+        """Draw the worst score per time slice, with the reported dips in red"""
+        canvas = self.timeline_canvas
+        canvas.delete("all")
+        if not self.report:
+            return
+        width = max(canvas.winfo_width(), 100)
+        height = max(canvas.winfo_height(), 20)
+        duration = self.report["duration"]
+        timeline = quality_timeline(self.report["frames"], duration, width // 2)
+
+        scores = [score for score in timeline if score is not None]
+        if not scores:
+            return
+        low, high = min(scores), max(scores)
+        span = (high - low) or 1.0
+
+        # Bars grow downwards from the top, so dips stand out as long bars
+        for index, score in enumerate(timeline):
+            if score is None:
+                continue
+            depth = 2 + (high - score) / span * (height - 4)
+            canvas.create_rectangle(
+                index * 2, 0, index * 2 + 2, depth, fill=ACCENT_GREEN, outline=""
+            )
+
+        for time_s, _ in self.report["worst"]:
+            x = time_s / duration * width if duration > 0 else 0
+            canvas.create_line(x, 0, x, height, fill=ACCENT_RED, width=2)
+
+    def _update_worst_list(self):
+        """Show the worst timestamps as buttons that select them on the trim slider"""
+        for widget in self.worst_frame.winfo_children():
+            widget.destroy()
+        if not self.report:
+            return
+
+        digits = 4 if self.report["metric"] == "SSIM" else 2
+        for time_s, score in self.report["worst"]:
+            ctk.CTkButton(
+                self.worst_frame,
+                text=f"{format_timestamp(time_s)[:8]}\n{score:.{digits}f}",
+                command=lambda t=time_s: self.main_app._jump_trim_to(t),
+                fg_color=SECONDARY_BG,
+                hover_color=HOVER_GREEN,
+                text_color=TEXT_COLOR_W,
+                height=36,
+                width=80,
+            ).pack(side="left", expand=True, fill="x", padx=2)
+
+    def _on_timeline_click(self, event):
+        if not self.report:
+            return
+        width = max(self.timeline_canvas.winfo_width(), 1)
+        self.main_app._jump_trim_to(event.x / width * self.report["duration"])
+
+    def _on_analysis_failed(self, message):
+        self._reset_controls()
+        self.main_app.status_text.set(message)
+        if self.window:
+            self.result_label.configure(text=message, text_color=ACCENT_RED)
+
+    def _set_running(self, button):
+        """Turn the button that started a job into Cancel, lock everything else"""
+        self.is_running = True
+        self._cancel_event = Event()
+        self.progress_bar.set(0)
+        button.configure(text="Cancel", fg_color=ACCENT_RED, hover_color=HOVER_RED)
+        for widget in (self.analyze_btn, self.search_btn):
+            if widget is not button:
+                widget.configure(state="disabled")
+        self.metric_menu.configure(state="disabled")
+        self.segments_menu.configure(state="disabled")
+        self.log_format_menu.configure(state="disabled")
+        self.target_entry.configure(state="disabled")
+        self.report = None
+        self._draw_timeline()
+        self._update_worst_list()
+
+    def _reset_controls(self):
+        self.is_running = False
+        with self._lock:
+            self.processes = []
+        if self.window:
+            self.analyze_btn.configure(
+                text="Analyze",
+                fg_color=ACCENT_GREEN,
+                hover_color=HOVER_GREEN,
+                state="normal",
+            )
+            self.search_btn.configure(
+                text="Find QP",
+                fg_color=ACCENT_GREY,
+                hover_color=HOVER_GREY,
+                state="normal",
+            )
+            self.metric_menu.configure(state="normal")
+            self.segments_menu.configure(state="normal")
+            self.log_format_menu.configure(state="normal")
+            self.target_entry.configure(state="normal")
+
+    def cancel_analysis(self):
+        with self._lock:
+            self._cancel_event.set()
+            processes = list(self.processes)
+        for process in processes:
+            try:
+                process.terminate()
+            except Exception:
+                pass
+        self.main_app.ui_bus.discard("quality_progress")
+        self.main_app.ui_bus.discard("quality_result")
+        self._reset_controls()
+        self.main_app.status_text.set("Quality analysis cancelled")
+        if self.window:
+            self.progress_bar.set(0)
+            self.result_label.configure(
+                text="Quality analysis cancelled", text_color=PLACEHOLDER_COLOR
+            )
+
+    def _on_close(self):
+        if self.is_running:
+            self.cancel_analysis()
+        self.window.destroy()
+        self.window = None
+        self.main_app.quality_window = None
+
+
+# MAIN
+class VideoConverterApp:
+    # INITIALIZATION
+    def __init__(self, master):
+        self.batch_converter_window = None
+        self.quality_window = None
+        self.map_window = None
+        self.map_selection_cache = {}
+        self.batch_files = []
+        self.ui_bus = UiUpdateBus()
+        self.capabilities = FFmpegCapabilities(
+            os.path.join(
+                os.path.dirname(os.path.abspath(__file__)), "nff_capabilities.json"
+            )
         )
-        self.additional_filter_options_placeholder = (
-            "e.g.setpts=0.5*PTS - speed up video x2; crop=iw:min(ih\\,iw*9/16)"
+        self.thumbnails = ThumbnailService(capabilities=self.capabilities)
+        self.recording_journal = RecordingJournal(
+            os.path.join(
+                os.path.dirname(os.path.abspath(__file__)), "nff_recordings.json"
+            )
         )
-        self.additional_audio_filter_options_placeholder = "e.g. atempo=2.0, volume=1.5"
-        self.status_text = ctk.StringVar(value="Ready for conversion")
-        self.estimated_file_size = ctk.StringVar(value="")
-        self.progress_value = ctk.DoubleVar(value=0.0)
-        self.selected_preset = ctk.StringVar(value="none")
-        self.enable_presets = ctk.BooleanVar(value=False)
-        self.ffmpeg_custom_path = ctk.StringVar(value="")
-        self.ffmpeg_path_placeholder = "Path to ffmpeg.exe (required)"
-        self.bitrate.trace_add("write", lambda *args: self._calculate_estimated_size())
-        self.audio_option.trace_add(
-            "write", lambda *args: self._calculate_estimated_size()
+        self.filmstrips = FilmstripService(
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "nff_filmstrips")
         )
-        self.custom_abitrate.trace_add(
-            "write", lambda *args: self._calculate_estimated_size()
+        self._filmstrip_photo = None
+        self._filmstrip_key = None
+        self.keyframes = KeyframeIndex(
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "nff_keyframes")
         )
-        self.video_codec = ctk.StringVar(value="hevc")
-        self.coder = ctk.StringVar(value="cabac")
-        self.trim_start = ctk.StringVar(value="00:00:00")
-        self.trim_end = ctk.StringVar(value="00:00:00")
-        self.trim_streamcopy = ctk.BooleanVar(value=False)
-        self.constant_qp_mode = ctk.BooleanVar(value=True)  # Enabled CQP by default
-        self.quality_level = ctk.StringVar(value="30")
-        self.quality_level.trace_add(
-            "write", lambda *args: self._calculate_estimated_size()
+        self._keyframe_positions = (None, None)
+        self.metadata = MetadataService(
+            os.path.join(
+                os.path.dirname(os.path.abspath(__file__)), "nff_probe_cache.json"
+            )
         )
-        self.is_creating_preview = False
-        self.custom_command = None
-        self.last_input_dir = ctk.StringVar(value="")
-        self.last_output_dir = ctk.StringVar(value="")
-        self.precise_trim = ctk.BooleanVar(value=False)
-        # Screen recording variables
-        self.is_recording = False
-        self.recording_process = None
-        # Preview 10s
-        self.preview_process = None
-        # Custom presets
-        self.custom_preset_name = ctk.StringVar(value="")
-        self.custom_preset_selected = ctk.StringVar(value="")
-        self.loading_preset = False
+        startup_timer.mark("services")
+        self.master = master
+        self.version = "1.8.1"
+        master.title(f"nvencFFX {self.version}")
 
-        # Batch converter persistent variables
-        self.batch_output_folder = ctk.StringVar(value="")
-        self.batch_change_container = ctk.BooleanVar(value=False)
-        self.batch_output_container = ctk.StringVar(value="mp4")
+        dpi = get_real_dpi()
+        scaling = int(round((dpi / 96) * 100))
+        self.scaling = scaling
 
-    def _create_widgets(self):
-        # Build the entire GUI interface
-        main_frame = ctk.CTkFrame(
-            self.content_frame, fg_color=PRIMARY_BG, corner_radius=25
-        )
-        main_frame.pack(fill="both", expand=True, padx=15, pady=15)
+        if scaling >= 200:
+            h, min_h, max_h = 600, 600, 650
+        elif scaling >= 125:
+            h, min_h, max_h = 650, 650, 800
+        else:
+            h, min_h, max_h = 700, 700, 900
 
-        # Input File
-        ctk.CTkLabel(main_frame, text="Input File:").grid(
-            row=0, column=0, sticky="w", padx=10, pady=5
-        )
-        self.input_file_entry = ctk.CTkEntry(
-            main_frame,
-            textvariable=self.input_file,
-            width=350,
-            fg_color=SECONDARY_BG,
-            text_color=TEXT_COLOR_W,
-        )
-        self.input_file_entry.grid(row=0, column=1, padx=5, pady=5)
-        self.input_file_entry.insert(
-            0, "Drag and drop a video file here or use the 'Browse' button."
-        )
-        self.input_file_entry.configure(text_color=PLACEHOLDER_COLOR)
-        self.input_file_entry.bind("<FocusIn>", self._on_input_file_focus_in)
-        self.input_file_entry.bind("<FocusOut>", self._on_input_file_focus_out)
-        self.input_file.trace_add("write", self._on_input_file_change)
+        master.geometry(f"820x{h}")
+        master.minsize(820, min_h)
+        master.maxsize(820, max_h)
+        master.resizable(False, True)
+        master.configure(fg_color=PRIMARY_BG)
 
-        # Browse button
-        self.btn_browse = ctk.CTkButton(
-            main_frame,
-            text="Browse",
-            command=self._browse_input,
-            fg_color=ACCENT_GREEN,
-            hover_color=HOVER_GREEN,
-            text_color=TEXT_COLOR_B,
-        )
-        self.btn_browse.grid(row=0, column=2, padx=5, pady=5)
-        self.btn_browse.bind(
-            "<Button-3>", lambda e: self._explore_path(e, self.input_file.get())
-        )
-        CTkToolTip(
-            self.btn_browse,
-            message="Right-click to open containing folder",
-            bg_color=SECONDARY_BG,
-            text_color=TEXT_COLOR_W,
-            alpha=1.0,
-            corner_radius=6,
-            delay=0.3,
-        )
+        # Main container
+        self.main_container = ctk.CTkScrollableFrame(master, fg_color=PRIMARY_BG)
+        self.main_container.pack(fill="both", expand=True, padx=10, pady=10)
 
-        # Output File
-        ctk.CTkLabel(main_frame, text="Output File:").grid(
-            row=1, column=0, sticky="w", padx=10, pady=5
-        )
-        self.output_file_placeholder = (
-            "Also used as the destination file for screen recordings"
-        )
-        self.output_file_entry = ctk.CTkEntry(
-            main_frame,
-            textvariable=self.output_file,
-            width=350,
-            fg_color=SECONDARY_BG,
-            text_color=TEXT_COLOR_W,
-        )
-        self.output_file_entry.grid(row=1, column=1, padx=5, pady=5)
-        self.output_file_entry.insert(0, self.output_file_placeholder)
-        self.output_file_entry.configure(text_color=PLACEHOLDER_COLOR)
-        self.output_file_entry.bind("<FocusIn>", self._on_output_file_focus_in)
-        self.output_file_entry.bind("<FocusOut>", self._on_output_file_focus_out)
-        self.output_file.trace_add("write", self._on_output_file_change)
+        # Content frame
+        self.content_frame = ctk.CTkFrame(self.main_container, fg_color=PRIMARY_BG)
+        self.content_frame.pack(fill="x", expand=False)
 
-        # Save As button
-        self.btn_save_as = ctk.CTkButton(
-            main_frame,
-            text="Save As",
-            command=self._browse_output,
-            fg_color=ACCENT_GREEN,
-            hover_color=HOVER_GREEN,
-            text_color=TEXT_COLOR_B,
-        )
-        self.btn_save_as.grid(row=1, column=2, padx=5, pady=5)
-        self.btn_save_as.bind(
-            "<Button-3>", lambda e: self._explore_path(e, self.output_file.get())
-        )
-        CTkToolTip(
-            self.btn_save_as,
-            message="Right-click to open containing folder",
-            bg_color=SECONDARY_BG,
-            text_color=TEXT_COLOR_W,
-            alpha=1.0,
-            corner_radius=6,
-            delay=0.3,
-        )
+        # Convert frame
+        self.button_frame = ctk.CTkFrame(master, fg_color=PRIMARY_BG)
+        self.button_frame.pack(fill="x", padx=15, pady=(0, 15))
 
-        # FFmpeg Path
-        ctk.CTkLabel(main_frame, text="FFmpeg Path:").grid(
-            row=2, column=0, sticky="w", padx=10, pady=5
-        )
-        self.ffmpeg_path_entry = ctk.CTkEntry(
-            main_frame,
-            textvariable=self.ffmpeg_custom_path,
-            width=350,
-            fg_color=SECONDARY_BG,
-            text_color=TEXT_COLOR_W,
+        # Create presets directory
+        self.presets_dir = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "presets"
         )
-        self.ffmpeg_path_entry.grid(row=2, column=1, padx=5, pady=5)
-        self.ffmpeg_path_entry.insert(0, self.ffmpeg_path_placeholder)
-        self.ffmpeg_path_entry.configure(text_color=PLACEHOLDER_COLOR)
-        self.ffmpeg_path_entry.bind("<FocusIn>", self._on_ffmpeg_path_focus_in)
-        self.ffmpeg_path_entry.bind("<FocusOut>", self._on_ffmpeg_path_focus_out)
+        if not os.path.exists(self.presets_dir):
+            os.makedirs(self.presets_dir)
 
-        # Browse button for FFmpeg
-        self.btn_ffmpeg = ctk.CTkButton(
-            main_frame,
-            text="FFmpeg",
-            command=self._browse_ffmpeg,
-            fg_color=ACCENT_GREY,
-            hover_color=HOVER_GREY,
-            text_color=TEXT_COLOR_B,
-        )
-        self.btn_ffmpeg.grid(row=2, column=2, padx=5, pady=5)
-        self.btn_ffmpeg.bind(
-            "<Button-3>", lambda e: self._explore_path(e, self.ffmpeg_custom_path.get())
-        )
-        CTkToolTip(
-            self.btn_ffmpeg,
-            message="Right-click to open containing folder",
-            bg_color=SECONDARY_BG,
-            text_color=TEXT_COLOR_W,
-            alpha=1.0,
-            corner_radius=6,
-            delay=0.3,
-        )
+        self._setup_variables()
+        self._create_widgets()
+        startup_timer.mark("widgets")
 
-        # Video Bitrate/Quality Level
-        self.bitrate_label = ctk.CTkLabel(main_frame, text="Video Bitrate (k):")
-        self.bitrate_label.grid(row=3, column=0, sticky="w", padx=10, pady=5)
+        # Find FFmpeg executables (critical dependency)
+        self.ffmpeg_path = self._find_executable("ffmpeg.exe")
+        self.ffprobe_path = None
 
-        # Frame for bitrate/quality controls
-        bitrate_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
-        bitrate_frame.grid(row=3, column=1, sticky="w", padx=5, pady=5)
+        # Load saved settings (updates ffmpeg_custom_path)
+        self._load_settings()
 
-        self.bitrate_entry = ctk.CTkEntry(
-            bitrate_frame,
-            textvariable=self.bitrate,
-            width=80,
-            justify="center",
-            fg_color=SECONDARY_BG,
-            text_color=TEXT_COLOR_W,
-        )
-        self.bitrate_entry.pack(side="left")
+        # Determine the actual ffmpeg path to use
+        custom_ffmpeg = self.ffmpeg_custom_path.get()
+        if (
+            custom_ffmpeg
+            and custom_ffmpeg != self.ffmpeg_path_placeholder
+            and os.path.exists(custom_ffmpeg)
+        ):
+            actual_ffmpeg = custom_ffmpeg
+        else:
+            actual_ffmpeg = self.ffmpeg_path
 
-        # Constant QP mode checkbox
-        self.constant_qp_checkbox = ctk.CTkCheckBox(
-            bitrate_frame,
-            text="Constant QP mode",
-            variable=self.constant_qp_mode,
-            command=self._toggle_constant_qp_mode,
-            fg_color=ACCENT_GREEN,
-            hover_color=HOVER_GREEN,
-        )
-        self.constant_qp_checkbox.pack(side="left", padx=(10, 0))
+        # Update self.ffmpeg_path to the actual one (so it's consistent)
+        self.ffmpeg_path = actual_ffmpeg
 
-        self.btn_output = ctk.CTkButton(
-            main_frame,
-            text="Output",
-            command=self._show_output_command,
-            fg_color=ACCENT_GREY,
-            hover_color=HOVER_GREY,
-            text_color=TEXT_COLOR_B,
-        )
-        self.btn_output.grid(row=3, column=2, sticky="w", padx=5, pady=5)
-        self.btn_output.bind("<Button-3>", lambda e: self._copy_command_to_clipboard())
-        CTkToolTip(
-            self.btn_output,
-            message="Right-click to copy command to clipboard",
-            bg_color=SECONDARY_BG,
-            text_color=TEXT_COLOR_W,
-            alpha=1.0,
-            corner_radius=6,
-            delay=0.3,
-        )
+        # Determine ffprobe path based on actual ffmpeg
+        if self.ffmpeg_path:
+            ffprobe_path = os.path.join(
+                os.path.dirname(self.ffmpeg_path), "ffprobe.exe"
+            )
+            if os.path.exists(ffprobe_path):
+                self.ffprobe_path = ffprobe_path
+            else:
+                self.ffprobe_path = self._find_executable("ffprobe.exe")
+        else:
+            self.ffprobe_path = self._find_executable("ffprobe.exe")
 
-        ctk.CTkButton(
-            main_frame,
-            text="Help",
-            command=self._show_main_help,
-            fg_color=ACCENT_GREY,
-            hover_color=HOVER_GREY,
-            text_color=TEXT_COLOR_B,
-        ).grid(row=4, column=2, sticky="w", padx=5, pady=5)
+        self._update_codec_settings()
+        self._probe_ffmpeg_capabilities()
+        startup_timer.mark("settings")
 
-        # Video Codec Selection
-        ctk.CTkLabel(main_frame, text="Video Codec:").grid(
-            row=4, column=0, sticky="w", padx=10, pady=5
-        )
-        codec_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
-        codec_frame.grid(row=4, column=1, sticky="w", padx=5, pady=5)
+        # Set the FFmpeg path in the UI if found
+        if self.ffmpeg_path:
+            self.ffmpeg_custom_path.set(self.ffmpeg_path)
 
-        hevc_rb = ctk.CTkRadioButton(
-            codec_frame,
-            text="HEVC",
-            variable=self.video_codec,
-            value="hevc",
-            command=self._update_codec_settings,
-            fg_color=ACCENT_GREEN,
-            hover_color=HOVER_GREEN,
-        )
-        hevc_rb.pack(side="left", padx=5)
+        if self.ffmpeg_path:
+            self.ffmpeg_path_entry.configure(text_color=TEXT_COLOR_W)
 
-        h264_rb = ctk.CTkRadioButton(
-            codec_frame,
-            text="H.264",
-            variable=self.video_codec,
-            value="h264",
-            command=self._update_codec_settings,
-            fg_color=ACCENT_GREEN,
-            hover_color=HOVER_GREEN,
-        )
-        h264_rb.pack(side="left", padx=5)
+        # JSON Trace changes
+        self.video_codec.trace_add("write", self._update_output_filename)
 
-        av1_rb = ctk.CTkRadioButton(
-            codec_frame,
-            text="AV1",
-            variable=self.video_codec,
-            value="av1",
-            command=self._update_codec_settings,
-            fg_color=ACCENT_GREEN,
-            hover_color=HOVER_GREEN,
-        )
-        av1_rb.pack(side="left", padx=5)
+        self.conversion_process = None
+        self.conversion_thread = None
+        self.is_converting = False
 
-        # Encoder Options
-        encoder_options_frame_toggle = TextCheckbox(
-            main_frame,
-            text="Advanced Encoder Settings",
-            variable=self.enable_encoder_options,
-            command=self._toggle_encoder_options_frame,
-        )
-        encoder_options_frame_toggle.grid(row=5, column=0, sticky="w", padx=10, pady=5)
+        # Worker threads post UI updates to the bus, drained here at 20 Hz
+        self.master.after(UI_BUS_INTERVAL_MS, self._drain_ui_bus)
 
-        # Auto button
-        self.auto_button = ctk.CTkButton(
-            main_frame,
-            text="Auto",
-            command=self._apply_auto_encoder_settings,
-            fg_color=ACCENT_GREEN,
-            hover_color=HOVER_GREEN,
-            text_color=TEXT_COLOR_B,
-            width=80,
-        )
-        self.auto_button.grid(row=5, column=1, sticky="w", padx=5)
-        self.auto_button.grid_remove()
+        self._create_trim_slider()
 
-        # Default button
-        self.default_button = ctk.CTkButton(
-            main_frame,
-            text="Default",
-            command=lambda: self._apply_preset("none"),
-            fg_color=ACCENT_GREEN,
-            hover_color=HOVER_GREEN,
-            text_color=TEXT_COLOR_B,
-            width=80,
+        self._center_window()
+        self.drop_target = None  # Registered with the tray icon in _finish_startup
+        self._create_thumbnail_preview()
+        self._setup_keyboard_shortcuts()
+        self._toggle_custom_abitrate()
+        self._toggle_custom_fps_entry()
+        self._toggle_custom_video_width_entry()
+
+        if len(sys.argv) > 1:
+            self._handle_dropped_file(sys.argv[1])
+        self.preview_cache = PreviewCache(
+            os.path.join(tempfile.gettempdir(), "nff_previews")
         )
-        self.default_button.grid(row=5, column=1, sticky="w", padx=95)
-        self.default_button.grid_remove()
+        self.trim_streamcopy.trace_add(
+            "write", lambda *args: self._update_preview_button_state()
+        )
+        # The stream-copy cut marker depends on both trim modes
+        for trim_mode in (self.trim_streamcopy, self.precise_trim):
+            trim_mode.trace_add("write", lambda *args: self._update_trim_slider())
 
-        self.encoder_options_frame = ctk.CTkFrame(main_frame, fg_color=SECONDARY_BG)
+        # Help windows
+        self.output_window_open = False
+        self.open_help_windows = {}
 
-        left_column_frame = ctk.CTkFrame(
-            self.encoder_options_frame, fg_color="transparent"
+        # Tray icon, hotkeys and drag-and-drop wait until the window is up
+        self._tray_icon = None
+        self.master.after(0, self._finish_startup)
+
+        # JSON Settings
+        self.ffmpeg_custom_path.trace_add(
+            "write", lambda *args: self._on_setting_changed()
         )
-        left_column_frame.grid(
-            row=1, column=0, columnspan=2, padx=5, pady=5, sticky="nsew"
+        self.last_input_dir.trace_add("write", lambda *args: self._on_setting_changed())
+        self.last_output_dir.trace_add(
+            "write", lambda *args: self._on_setting_changed()
+        )
+        self.video_codec.trace_add("write", lambda *args: self._on_setting_changed())
+        self.constant_qp_mode.trace_add(
+            "write", lambda *args: self._on_setting_changed()
         )
+        self.quality_level.trace_add("write", lambda *args: self._on_setting_changed())
+        self.bitrate.trace_add("write", lambda *args: self._on_setting_changed())
+        self.audio_option.trace_add("write", lambda *args: self._on_setting_changed())
+        self._toggle_constant_qp_mode()  # Enabled CQP by default
 
-        # FF Threads
-        ctk.CTkLabel(left_column_frame, text="FF Threads:").grid(
-            row=0, column=0, sticky="w", padx=5, pady=2
+        # Encoder Settings
+        self.threads.trace_add("write", lambda *args: self._on_setting_changed())
+        self.preset.trace_add("write", lambda *args: self._on_setting_changed())
+        self.tune.trace_add("write", lambda *args: self._on_setting_changed())
+        self.profile.trace_add("write", lambda *args: self._on_setting_changed())
+        self.level.trace_add("write", lambda *args: self._on_setting_changed())
+        self.tier.trace_add("write", lambda *args: self._on_setting_changed())
+        self.coder.trace_add("write", lambda *args: self._on_setting_changed())
+        self.hwaccel.trace_add("write", lambda *args: self._on_setting_changed())
+        self.multipass.trace_add("write", lambda *args: self._on_setting_changed())
+        self.rc.trace_add("write", lambda *args: self._on_setting_changed())
+        self.lookahead_level.trace_add(
+            "write", lambda *args: self._on_setting_changed()
         )
-        preset_option_menu = ctk.CTkOptionMenu(
-            left_column_frame,
-            variable=self.threads,
-            values=["auto"] + [str(i) for i in range(1, 17)],
-            fg_color=PRIMARY_BG,
-            button_color=ACCENT_GREEN,
-            button_hover_color=HOVER_GREEN,
-            dropdown_fg_color=SECONDARY_BG,
-            dropdown_hover_color=ACCENT_GREEN,
+        self.split_encode_mode.trace_add(
+            "write", lambda *args: self._on_setting_changed()
+        )
+        self.chunked_encode.trace_add("write", lambda *args: self._on_setting_changed())
+        # FPS and Scaling Settings
+        self.fps_option.trace_add("write", lambda *args: self._on_setting_changed())
+        self.custom_fps.trace_add("write", lambda *args: self._on_setting_changed())
+        self.fps_mode.trace_add("write", lambda *args: self._on_setting_changed())
+        self.video_format_option.trace_add(
+            "write", lambda *args: self._on_setting_changed()
+        )
+        self.custom_video_width.trace_add(
+            "write", lambda *args: self._on_setting_changed()
         )
-        preset_option_menu.grid(row=0, column=1, sticky="ew", padx=5, pady=2)
 
-        # Preset
-        ctk.CTkLabel(left_column_frame, text="Preset:").grid(
-            row=1, column=0, sticky="w", padx=5, pady=2
+        # Encoder Flags
+        self.cuda_output_format.trace_add(
+            "write", lambda *args: self._on_setting_changed()
         )
-        preset_option_menu = ctk.CTkOptionMenu(
-            left_column_frame,
-            variable=self.preset,
-            values=["auto"] + [f"p{i}" for i in range(1, 8)],
-            fg_color=PRIMARY_BG,
-            button_color=ACCENT_GREEN,
-            button_hover_color=HOVER_GREEN,
-            dropdown_fg_color=SECONDARY_BG,
-            dropdown_hover_color=ACCENT_GREEN,
+        self.spatial_aq.trace_add("write", lambda *args: self._on_setting_changed())
+        self.temporal_aq.trace_add("write", lambda *args: self._on_setting_changed())
+        self.tune.trace_add("write", lambda *args: self._on_tune_changed())
+        self.strict_gop.trace_add("write", lambda *args: self._on_setting_changed())
+        self.no_scenecut.trace_add("write", lambda *args: self._on_setting_changed())
+        self.weighted_pred.trace_add("write", lambda *args: self._on_setting_changed())
+        self.custom_abitrate.trace_add(
+            "write", lambda *args: self._on_setting_changed()
+        )
+        # Load new added custom preset at next start
+        self.selected_preset.trace_add(
+            "write", lambda *args: self._on_setting_changed()
+        )
+        self.custom_preset_name.trace_add(
+            "write", lambda *args: self._on_setting_changed()
         )
-        preset_option_menu.grid(row=1, column=1, sticky="ew", padx=5, pady=2)
 
-        # Tune
-        ctk.CTkLabel(left_column_frame, text="Tune:").grid(
-            row=2, column=0, sticky="w", padx=5, pady=2
+        # Batch Converter Settings
+        self.batch_output_folder.trace_add(
+            "write", lambda *args: self._on_setting_changed()
         )
-        tune_option_menu = ctk.CTkOptionMenu(
-            left_column_frame,
-            variable=self.tune,
-            values=["auto", "hq", "uhq", "ll", "ull", "lossless"],
-            fg_color=PRIMARY_BG,
-            button_color=ACCENT_GREEN,
-            button_hover_color=HOVER_GREEN,
-            dropdown_fg_color=SECONDARY_BG,
-            dropdown_hover_color=ACCENT_GREEN,
+        self.batch_change_container.trace_add(
+            "write", lambda *args: self._on_setting_changed()
         )
-        tune_option_menu.grid(row=2, column=1, sticky="ew", padx=5, pady=2)
-
-        # Profile
-        self.profile_label = ctk.CTkLabel(left_column_frame, text="Profile:")
-        self.profile_label.grid(row=3, column=0, sticky="w", padx=5, pady=2)
-        profile_option_menu = ctk.CTkOptionMenu(
-            left_column_frame,
-            variable=self.profile,
-            values=["auto", "main", "main10", "rext"],
-            fg_color=PRIMARY_BG,
-            button_color=ACCENT_GREEN,
-            button_hover_color=HOVER_GREEN,
-            dropdown_fg_color=SECONDARY_BG,
-            dropdown_hover_color=ACCENT_GREEN,
+        self.batch_output_container.trace_add(
+            "write", lambda *args: self._on_setting_changed()
+        )
+        self.batch_max_workers.trace_add(
+            "write", lambda *args: self._on_setting_changed()
         )
-        profile_option_menu.grid(row=3, column=1, sticky="ew", padx=5, pady=2)
 
-        # Level
-        ctk.CTkLabel(left_column_frame, text="Level:").grid(
-            row=4, column=0, sticky="w", padx=5, pady=2
+        # Quality Analysis Settings
+        self.quality_metric.trace_add("write", lambda *args: self._on_setting_changed())
+        self.quality_segments.trace_add(
+            "write", lambda *args: self._on_setting_changed()
         )
-        level_option_menu = ctk.CTkOptionMenu(
-            left_column_frame,
-            variable=self.level,
-            values=[
-                "auto",
-                "1.0",
-                "2.0",
-                "2.1",
-                "3.0",
-                "3.1",
-                "4.0",
-                "4.1",
-                "5.0",
-                "5.1",
-                "5.2",
-                "6.0",
-                "6.1",
-                "6.2",
-            ],
-            fg_color=PRIMARY_BG,
-            button_color=ACCENT_GREEN,
-            button_hover_color=HOVER_GREEN,
-            dropdown_fg_color=SECONDARY_BG,
-            dropdown_hover_color=ACCENT_GREEN,
+        self.quality_log_format.trace_add(
+            "write", lambda *args: self._on_setting_changed()
         )
-        level_option_menu.grid(row=4, column=1, sticky="ew", padx=5, pady=2)
+        self.quality_target.trace_add("write", lambda *args: self._on_setting_changed())
+        self.preview_samples.trace_add(
+            "write", lambda *args: self._on_setting_changed()
+        )
+        self.preview_join.trace_add("write", lambda *args: self._on_setting_changed())
+        self.replay_minutes.trace_add(
+            "write", lambda *args: self._on_setting_changed()
+        )
+        startup_timer.mark("app init")
 
-        # Tier Label (for HEVC and AV1)
-        self.tier_label = ctk.CTkLabel(left_column_frame, text="Tier:")
-        self.tier_label.grid(row=5, column=0, sticky="w", padx=5, pady=2)
+    def _finish_startup(self):
+        """Register drag-and-drop, the tray icon and hotkeys after the first paint"""
+        self.master.update_idletasks()
+        startup_timer.mark("first paint")
 
-        # Tier OptionMenu
-        self.tier_option_menu = ctk.CTkOptionMenu(
-            left_column_frame,
-            variable=self.tier,
-            values=["auto", "0", "1"],
-            fg_color=PRIMARY_BG,
-            button_color=ACCENT_GREEN,
-            button_hover_color=HOVER_GREEN,
-            dropdown_fg_color=SECONDARY_BG,
-            dropdown_hover_color=ACCENT_GREEN,
+        hwnd = self.master.winfo_id()
+        self.drop_target = DropTarget(hwnd, self._handle_dropped_file)
+        self._tray_icon = TrayIcon(
+            hwnd,
+            get_icon_path(),
+            on_start_callback=lambda: self.master.after(0, self._start_recording),
+            on_stop_callback=lambda: self.master.after(0, self._stop_recording),
+            on_open_callback=lambda: self.master.after(0, self._restore_app),
+            on_exit_callback=lambda: self.master.after(0, self._on_close),
+            on_replay_callback=lambda: self.master.after(
+                0, self._toggle_instant_replay
+            ),
+            on_save_replay_callback=lambda: self.master.after(
+                0, self._save_replay_clip
+            ),
+            version=self.version,
         )
-        self.tier_option_menu.grid(row=5, column=1, sticky="ew", padx=5, pady=2)
+        self._tray_icon.show()
+        if self._tray_icon.failed_hotkeys:
+            taken = ", ".join(self._tray_icon.failed_hotkeys)
+            print(f"Hotkeys already used by another application: {taken}")
+            self.status_text.set(f"Hotkeys unavailable (used by another app): {taken}")
+            self._tray_icon.show_balloon(
+                "Hotkeys Unavailable",
+                f"{taken} already used by another application. "
+                "Use the tray menu instead.",
+            )
+        startup_timer.mark("tray and drop target")
 
-        # Coder Label (only for H.264)
-        self.coder_label = ctk.CTkLabel(left_column_frame, text="Coder:")
-        self.coder_label.grid(row=5, column=0, sticky="w", padx=5, pady=2)
-        self.coder_label.grid_remove()  # hide by default
+        Thread(target=self._recover_recordings, daemon=True).start()
 
-        # Coder OptionMenu
-        self.coder_option_menu = ctk.CTkOptionMenu(
-            left_column_frame,
-            variable=self.coder,
-            values=["auto", "cabac", "cavlc", "ac", "vlc"],
-            fg_color=PRIMARY_BG,
-            button_color=ACCENT_GREEN,
-            button_hover_color=HOVER_GREEN,
-            dropdown_fg_color=SECONDARY_BG,
-            dropdown_hover_color=ACCENT_GREEN,
-        )
-        self.coder_option_menu.grid(row=5, column=1, sticky="ew", padx=5, pady=2)
-        self.coder_option_menu.grid_remove()  # hide by default
+        startup_timer.report()
+        if startup_timer.mode == "panels":
+            self._report_panel_timings()
+        if startup_timer.mode in ("exit", "panels"):
+            self._on_close()
 
-        right_column_frame = ctk.CTkFrame(
-            self.encoder_options_frame, fg_color="transparent"
-        )
-        right_column_frame.grid(
-            row=1, column=2, columnspan=2, padx=5, pady=5, sticky="nsew"
-        )
+    def _recover_recordings(self):
+        """Repair recordings a crash left unfinished in the journal"""
+        for path, summary in self.recording_journal.recover():
+            print(f"Recovered interrupted recording {path}: {summary}")
+            filename = os.path.basename(path)
+            self.master.after(
+                0,
+                lambda name=filename: self.status_text.set(
+                    f"Recovered interrupted recording: {name}"
+                ),
+            )
+            if self._tray_icon:
+                self.master.after(
+                    0,
+                    lambda name=filename: self._tray_icon.show_balloon(
+                        "Recording Recovered", f"File: {name}"
+                    ),
+                )
 
-        self.tune_option_menu = tune_option_menu
-        self.profile_option_menu = profile_option_menu
-        self.level_option_menu = level_option_menu
+    def _report_panel_timings(self):
+        """Open every collapsible panel once and print what each open cost"""
+        panels = {
+            "encoder": (
+                self.enable_encoder_options,
+                self._toggle_encoder_options_frame,
+            ),
+            "fps and scaling": (
+                self.enable_fps_scale_options,
+                self._toggle_fps_scale_options_frame,
+            ),
+            "audio": (self.enable_audio_options, self._toggle_audio_options_frame),
+            "additional": (
+                self.enable_additional_options,
+                self._toggle_additional_options_frame,
+            ),
+            "presets": (self.enable_presets, self._toggle_presets_frame),
+        }
+        timings = {}
+        for name, (enabled, toggle) in panels.items():
+            began = perf_counter()
+            enabled.set(True)
+            toggle()
+            self.master.update_idletasks()
+            timings[name] = round((perf_counter() - began) * 1000, 1)
+        print(f"Panels {dumps(timings)}", flush=True)
 
-        # HW Accel
-        ctk.CTkLabel(right_column_frame, text="HW Accel:").grid(
-            row=0, column=0, sticky="w", padx=5, pady=2
+    def _setup_variables(self):
+        # Initialize all Tkinter control variables
+        self.input_file_tooltip = None
+        self._tooltip_generation = 0
+        self._tooltip_cancel = Event()
+        self.input_file = ctk.StringVar()
+        self.output_file = ctk.StringVar()
+        self.bitrate = ctk.StringVar(value="6000")
+        self.ffmpeg_output = ctk.StringVar(value="")
+        self.audio_option = ctk.StringVar(value="copy")
+        self.custom_abitrate = ctk.StringVar(value="160")
+        self.enable_audio_options = ctk.BooleanVar(value=False)
+        self.enable_encoder_options = ctk.BooleanVar(value=False)
+        self.threads = ctk.StringVar(value="4")
+        self.preset = ctk.StringVar(value="p7")
+        self.tune = ctk.StringVar(value="hq")
+        self.profile = ctk.StringVar(value="main")
+        self.level = ctk.StringVar(value="auto")
+        self.tier = ctk.StringVar(value="1")
+        self.hwaccel = ctk.StringVar(value="cuda")
+        self.multipass = ctk.StringVar(value="qres")
+        self.rc = ctk.StringVar(value="vbr")
+        self.rc_locked = ctk.BooleanVar(value=False)
+        self.lookahead_level = ctk.StringVar(value="auto")
+        self.split_encode_mode = ctk.StringVar(value="forced")
+        self.chunked_encode = ctk.StringVar(value="off")
+        self.encode_job = None
+        self.cuda_output_format = ctk.BooleanVar(value=False)
+        self.spatial_aq = ctk.BooleanVar(value=True)
+        self.temporal_aq = ctk.BooleanVar(value=True)
+        self.strict_gop = ctk.BooleanVar(value=False)
+        self.no_scenecut = ctk.BooleanVar(value=False)
+        self.weighted_pred = ctk.BooleanVar(value=False)
+        self.enable_fps_scale_options = ctk.BooleanVar(value=False)
+        self.fps_option = ctk.StringVar(value="source")
+        self.custom_fps = ctk.StringVar(value="30")
+        self.fps_mode = ctk.StringVar(value="auto")
+        self.video_format_option = ctk.StringVar(value="source")
+        self.custom_video_width = ctk.StringVar(value="1920")
+        self.interpolation_algo = ctk.StringVar(value="bicubic")
+        self.interpolation_description = ctk.StringVar(
+            value="Smooth and balanced quality."
         )
-        hwaccel_option_menu = ctk.CTkOptionMenu(
-            right_column_frame,
-            variable=self.hwaccel,
-            values=["auto", "cuda", "d3d11va", "d3d12va", "opencl", "vulkan"],
-            command=lambda _: self._update_cuda_output_format_state(),
-            fg_color=PRIMARY_BG,
-            button_color=ACCENT_GREEN,
-            button_hover_color=HOVER_GREEN,
-            dropdown_fg_color=SECONDARY_BG,
-            dropdown_hover_color=ACCENT_GREEN,
+        self.interpolation_algo.trace_add(
+            "write", lambda *args: self._update_interpolation_description()
         )
-        hwaccel_option_menu.grid(row=0, column=1, sticky="ew", padx=5, pady=2)
-
-        # Multipass
-        ctk.CTkLabel(right_column_frame, text="Multipass:").grid(
-            row=1, column=0, sticky="w", padx=5, pady=2
+        self.enable_additional_options = ctk.BooleanVar(value=False)
+        self.additional_options = ctk.StringVar(value="")
+        self.additional_filter_options = ctk.StringVar(value="")
+        self.additional_audio_filter_options = ctk.StringVar(value="")
+        self.additional_options_placeholder = (
+            "e.g. -aq-strength 8; -cq 0; -bf 0 or -bf 4;"
+            " -intra-refresh 1; -forced-idr 1"
         )
-        multipass_option_menu = ctk.CTkOptionMenu(
-            right_column_frame,
-            variable=self.multipass,
-            values=["auto", "disabled", "qres", "fullres"],
-            fg_color=PRIMARY_BG,
-            button_color=ACCENT_GREEN,
-            button_hover_color=HOVER_GREEN,
-            dropdown_fg_color=SECONDARY_BG,
-            dropdown_hover_color=ACCENT_GREEN,
+        self.additional_filter_options_placeholder = (
+            "e.g.setpts=0.5*PTS - speed up video x2; crop=iw:min(ih\\,iw*9/16)"
         )
-        multipass_option_menu.grid(row=1, column=1, sticky="ew", padx=5, pady=2)
+        self.additional_audio_filter_options_placeholder = "e.g. atempo=2.0, volume=1.5"
+        self.status_text = ctk.StringVar(value="Ready for conversion")
+        self.estimated_file_size = ctk.StringVar(value="")
+        self.progress_value = ctk.DoubleVar(value=0.0)
+        self.selected_preset = ctk.StringVar(value="none")
+        self.enable_presets = ctk.BooleanVar(value=False)
+        self.preset_indicator_state = {
+            "text": "No preset selected",
+            "text_color": PLACEHOLDER_COLOR,
+        }
+        self.ffmpeg_custom_path = ctk.StringVar(value="")
+        self.ffmpeg_path_placeholder = "Path to ffmpeg.exe (required)"
+        self._size_estimate_job = None
+        self._size_probes_pending = set()
+        self.bitrate.trace_add("write", lambda *args: self._schedule_size_estimate())
+        self.audio_option.trace_add(
+            "write", lambda *args: self._schedule_size_estimate()
+        )
+        self.custom_abitrate.trace_add(
+            "write", lambda *args: self._schedule_size_estimate()
+        )
+        self.video_codec = ctk.StringVar(value="hevc")
+        self.coder = ctk.StringVar(value="cabac")
+        self.trim_start = ctk.StringVar(value="00:00:00")
+        self.trim_end = ctk.StringVar(value="00:00:00")
+        self.trim_streamcopy = ctk.BooleanVar(value=False)
+        self.constant_qp_mode = ctk.BooleanVar(value=True)  # Enabled CQP by default
+        self.quality_level = ctk.StringVar(value="30")
+        self.quality_level.trace_add(
+            "write", lambda *args: self._schedule_size_estimate()
+        )
+        self.is_creating_preview = False
+        self.custom_command = None
+        self.last_input_dir = ctk.StringVar(value="")
+        self.last_output_dir = ctk.StringVar(value="")
+        self.precise_trim = ctk.BooleanVar(value=False)
+        self.smart_trim = ctk.BooleanVar(value=False)
+        self.snap_keyframes = ctk.BooleanVar(value=False)
+        # Screen recording variables
+        self.is_recording = False
+        self.recording_process = None
+        self.loopback_capture = None
+        self.replay_buffer = None
+        self.capture_stats = None
+        self._recording_monitor = None
+        # Preview 10s
+        self.preview_job = None
+        # Custom presets
+        self.custom_preset_name = ctk.StringVar(value="")
+        self.custom_preset_selected = ctk.StringVar(value="")
+        self.loading_preset = False
 
-        # Rate-Control
-        ctk.CTkLabel(right_column_frame, text="Rate-Control:").grid(
-            row=2, column=0, sticky="w", padx=5, pady=2
-        )
-        self.rc_option_menu = ctk.CTkOptionMenu(
-            right_column_frame,
-            variable=self.rc,
-            values=["vbr", "cbr"],
-            fg_color=PRIMARY_BG,
-            button_color=ACCENT_GREEN,
-            button_hover_color=HOVER_GREEN,
-            dropdown_fg_color=SECONDARY_BG,
-            dropdown_hover_color=ACCENT_GREEN,
+        # Batch converter persistent variables
+        self.batch_output_folder = ctk.StringVar(value="")
+        self.batch_change_container = ctk.BooleanVar(value=False)
+        self.batch_output_container = ctk.StringVar(value="mp4")
+        self.batch_max_workers = ctk.StringVar(value="2")
+
+        # Quality analysis persistent variables
+        self.quality_metric = ctk.StringVar(value="VMAF")
+        self.quality_segments = ctk.StringVar(value="Auto")
+        self.quality_log_format = ctk.StringVar(value="JSON")
+        self.quality_target = ctk.StringVar(value="95")
+        self.qp_search_cache = {}  # (input, mtime, settings hash, qp) -> (vmaf, kbps)
+        # Preview sampling persistent variables
+        self.preview_samples = ctk.StringVar(value="1")
+        self.preview_join = ctk.BooleanVar(value=True)
+        # Instant replay persistent variables
+        self.replay_minutes = ctk.StringVar(value="5")
+
+    def _create_widgets(self):
+        # Build the entire GUI interface
+        main_frame = ctk.CTkFrame(
+            self.content_frame, fg_color=PRIMARY_BG, corner_radius=25
         )
-        self.rc_option_menu.grid(row=2, column=1, sticky="ew", padx=5, pady=2)
+        main_frame.pack(fill="both", expand=True, padx=15, pady=15)
+        # Collapsed panels are built into it on first open
+        self.main_frame = main_frame
 
-        # Lookahead Level
-        self.lookahead_level_label = ctk.CTkLabel(
-            right_column_frame, text="Lookahead Level:"
+        # Input File
+        ctk.CTkLabel(main_frame, text="Input File:").grid(
+            row=0, column=0, sticky="w", padx=10, pady=5
         )
-        self.lookahead_level_menu = ctk.CTkOptionMenu(
-            right_column_frame,
-            variable=self.lookahead_level,
-            values=["auto"] + [str(i) for i in range(16)],
-            fg_color=PRIMARY_BG,
-            button_color=ACCENT_GREEN,
-            button_hover_color=HOVER_GREEN,
-            dropdown_fg_color=SECONDARY_BG,
-            dropdown_hover_color=ACCENT_GREEN,
+        self.input_file_entry = ctk.CTkEntry(
+            main_frame,
+            textvariable=self.input_file,
+            width=350,
+            fg_color=SECONDARY_BG,
+            text_color=TEXT_COLOR_W,
         )
-        self.lookahead_level_label.grid(row=3, column=0, sticky="w", padx=5, pady=2)
-        self.lookahead_level_menu.grid(row=3, column=1, sticky="ew", padx=5, pady=2)
-
-        # Split Encode Mode
-        self.split_encode_label = ctk.CTkLabel(right_column_frame, text="Split Encode:")
-        self.split_encode_label.grid(row=4, column=0, sticky="w", padx=5, pady=2)
-
-        self.split_encode_menu = ctk.CTkOptionMenu(
-            right_column_frame,
-            variable=self.split_encode_mode,
-            values=["auto", "disabled", "forced", "2", "3"],
-            fg_color=PRIMARY_BG,
-            button_color=ACCENT_GREEN,
-            button_hover_color=HOVER_GREEN,
-            dropdown_fg_color=SECONDARY_BG,
-            dropdown_hover_color=ACCENT_GREEN,
+        self.input_file_entry.grid(row=0, column=1, padx=5, pady=5)
+        self.input_file_entry.insert(
+            0, "Drag and drop a video file here or use the 'Browse' button."
         )
-        self.split_encode_menu.grid(row=4, column=1, sticky="ew", padx=5, pady=2)
+        self.input_file_entry.configure(text_color=PLACEHOLDER_COLOR)
+        self.input_file_entry.bind("<FocusIn>", self._on_input_file_focus_in)
+        self.input_file_entry.bind("<FocusOut>", self._on_input_file_focus_out)
+        self.input_file.trace_add("write", self._on_input_file_change)
 
-        # Checkboxes
-        self.cuda_output_format_checkbox = ctk.CTkCheckBox(
-            right_column_frame,
-            text="CUDA Output Format",
-            variable=self.cuda_output_format,
+        # Browse button
+        self.btn_browse = ctk.CTkButton(
+            main_frame,
+            text="Browse",
+            command=self._browse_input,
             fg_color=ACCENT_GREEN,
             hover_color=HOVER_GREEN,
+            text_color=TEXT_COLOR_B,
         )
-        self.cuda_output_format_checkbox.grid(
-            row=0, column=2, columnspan=2, sticky="w", padx=15, pady=2
+        self.btn_browse.grid(row=0, column=2, padx=5, pady=5)
+        self.btn_browse.bind(
+            "<Button-3>", lambda e: self._explore_path(e, self.input_file.get())
+        )
+        add_tooltip(
+            self.btn_browse,
+            message="Right-click to open containing folder",
+            bg_color=SECONDARY_BG,
+            text_color=TEXT_COLOR_W,
+            alpha=1.0,
+            corner_radius=6,
+            delay=0.3,
         )
 
-        ctk.CTkCheckBox(
-            right_column_frame,
-            text="Spatial AQ",
-            variable=self.spatial_aq,
-            fg_color=ACCENT_GREEN,
-            hover_color=HOVER_GREEN,
-        ).grid(row=1, column=2, columnspan=2, sticky="w", padx=15, pady=2)
-
-        ctk.CTkCheckBox(
-            right_column_frame,
-            text="Temporal AQ",
-            variable=self.temporal_aq,
-            fg_color=ACCENT_GREEN,
-            hover_color=HOVER_GREEN,
-        ).grid(row=2, column=2, columnspan=2, sticky="w", padx=15, pady=2)
-
-        ctk.CTkCheckBox(
-            right_column_frame,
-            text="Strict GOP",
-            variable=self.strict_gop,
-            fg_color=ACCENT_GREEN,
-            hover_color=HOVER_GREEN,
-        ).grid(row=3, column=2, columnspan=2, sticky="w", padx=15, pady=2)
+        # Output File
+        ctk.CTkLabel(main_frame, text="Output File:").grid(
+            row=1, column=0, sticky="w", padx=10, pady=5
+        )
+        self.output_file_placeholder = (
+            "Also used as the destination file for screen recordings"
+        )
+        self.output_file_entry = ctk.CTkEntry(
+            main_frame,
+            textvariable=self.output_file,
+            width=350,
+            fg_color=SECONDARY_BG,
+            text_color=TEXT_COLOR_W,
+        )
+        self.output_file_entry.grid(row=1, column=1, padx=5, pady=5)
+        self.output_file_entry.insert(0, self.output_file_placeholder)
+        self.output_file_entry.configure(text_color=PLACEHOLDER_COLOR)
+        self.output_file_entry.bind("<FocusIn>", self._on_output_file_focus_in)
+        self.output_file_entry.bind("<FocusOut>", self._on_output_file_focus_out)
+        self.output_file.trace_add("write", self._on_output_file_change)
 
-        ctk.CTkCheckBox(
-            right_column_frame,
-            text="No-Scenecut",
-            variable=self.no_scenecut,
+        # Save As button
+        self.btn_save_as = ctk.CTkButton(
+            main_frame,
+            text="Save As",
+            command=self._browse_output,
             fg_color=ACCENT_GREEN,
             hover_color=HOVER_GREEN,
-        ).grid(row=4, column=2, columnspan=2, sticky="w", padx=15, pady=2)
+            text_color=TEXT_COLOR_B,
+        )
+        self.btn_save_as.grid(row=1, column=2, padx=5, pady=5)
+        self.btn_save_as.bind(
+            "<Button-3>", lambda e: self._explore_path(e, self.output_file.get())
+        )
+        add_tooltip(
+            self.btn_save_as,
+            message="Right-click to open containing folder",
+            bg_color=SECONDARY_BG,
+            text_color=TEXT_COLOR_W,
+            alpha=1.0,
+            corner_radius=6,
+            delay=0.3,
+        )
 
-        ctk.CTkCheckBox(
-            right_column_frame,
-            text="Weighted Prediction",
-            variable=self.weighted_pred,
-            fg_color=ACCENT_GREEN,
-            hover_color=HOVER_GREEN,
-        ).grid(row=5, column=2, columnspan=2, sticky="w", padx=15, pady=2)
+        # FFmpeg Path
+        ctk.CTkLabel(main_frame, text="FFmpeg Path:").grid(
+            row=2, column=0, sticky="w", padx=10, pady=5
+        )
+        self.ffmpeg_path_entry = ctk.CTkEntry(
+            main_frame,
+            textvariable=self.ffmpeg_custom_path,
+            width=350,
+            fg_color=SECONDARY_BG,
+            text_color=TEXT_COLOR_W,
+        )
+        self.ffmpeg_path_entry.grid(row=2, column=1, padx=5, pady=5)
+        self.ffmpeg_path_entry.insert(0, self.ffmpeg_path_placeholder)
+        self.ffmpeg_path_entry.configure(text_color=PLACEHOLDER_COLOR)
+        self.ffmpeg_path_entry.bind("<FocusIn>", self._on_ffmpeg_path_focus_in)
+        self.ffmpeg_path_entry.bind("<FocusOut>", self._on_ffmpeg_path_focus_out)
 
-        # FPS and Scaling
-        fps_scale_frame_toggle = TextCheckbox(
+        # Browse button for FFmpeg
+        self.btn_ffmpeg = ctk.CTkButton(
             main_frame,
-            text="FPS and Scaling Settings",
-            variable=self.enable_fps_scale_options,
-            command=self._toggle_fps_scale_options_frame,
+            text="FFmpeg",
+            command=self._browse_ffmpeg,
+            fg_color=ACCENT_GREY,
+            hover_color=HOVER_GREY,
+            text_color=TEXT_COLOR_B,
+        )
+        self.btn_ffmpeg.grid(row=2, column=2, padx=5, pady=5)
+        self.btn_ffmpeg.bind(
+            "<Button-3>", lambda e: self._explore_path(e, self.ffmpeg_custom_path.get())
+        )
+        add_tooltip(
+            self.btn_ffmpeg,
+            message="Right-click to open containing folder",
+            bg_color=SECONDARY_BG,
+            text_color=TEXT_COLOR_W,
+            alpha=1.0,
+            corner_radius=6,
+            delay=0.3,
         )
-        fps_scale_frame_toggle.grid(row=7, column=0, sticky="w", padx=10, pady=5)
 
-        self.fps_scale_options_frame = ctk.CTkFrame(main_frame, fg_color=SECONDARY_BG)
+        # Video Bitrate/Quality Level
+        self.bitrate_label = ctk.CTkLabel(main_frame, text="Video Bitrate (k):")
+        self.bitrate_label.grid(row=3, column=0, sticky="w", padx=10, pady=5)
 
-        # FPS
-        ctk.CTkLabel(self.fps_scale_options_frame, text="FPS:").grid(
-            row=1, column=0, sticky="w", padx=10, pady=5
-        )
-        fps_options = [
-            ("Source", "source"),
-            ("60", "60"),
-            ("50", "50"),
-            ("30", "30"),
-            ("23.976", "24000/1001"),
-        ]
+        # Frame for bitrate/quality controls
+        bitrate_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
+        bitrate_frame.grid(row=3, column=1, sticky="w", padx=5, pady=5)
 
-        for i, (text, value) in enumerate(fps_options):
-            rb = ctk.CTkRadioButton(
-                self.fps_scale_options_frame,
-                text=text,
-                variable=self.fps_option,
-                value=value,
-                command=self._toggle_custom_fps_entry,
-                fg_color=ACCENT_GREEN,
-                hover_color=HOVER_GREEN,
-            )
-            rb.grid(row=1, column=i + 1, sticky="w", padx=2)
+        self.bitrate_entry = ctk.CTkEntry(
+            bitrate_frame,
+            textvariable=self.bitrate,
+            width=80,
+            justify="center",
+            fg_color=SECONDARY_BG,
+            text_color=TEXT_COLOR_W,
+        )
+        self.bitrate_entry.pack(side="left")
 
-        # Custom FPS
-        rb_custom = ctk.CTkRadioButton(
-            self.fps_scale_options_frame,
-            text="Custom",
-            variable=self.fps_option,
-            value="custom",
-            command=self._toggle_custom_fps_entry,
+        # Constant QP mode checkbox
+        self.constant_qp_checkbox = ctk.CTkCheckBox(
+            bitrate_frame,
+            text="Constant QP mode",
+            variable=self.constant_qp_mode,
+            command=self._toggle_constant_qp_mode,
             fg_color=ACCENT_GREEN,
             hover_color=HOVER_GREEN,
         )
-        rb_custom.grid(row=2, column=1, sticky="w", padx=2, pady=(10, 10))
+        self.constant_qp_checkbox.pack(side="left", padx=(10, 0))
 
-        self.custom_fps_entry = ctk.CTkEntry(
-            self.fps_scale_options_frame,
-            textvariable=self.custom_fps,
-            width=80,
-            justify="center",
+        self.btn_output = ctk.CTkButton(
+            main_frame,
+            text="Output",
+            command=self._show_output_command,
             fg_color=ACCENT_GREY,
-            text_color=PLACEHOLDER_COLOR,
+            hover_color=HOVER_GREY,
+            text_color=TEXT_COLOR_B,
         )
-        self.custom_fps_entry.grid(row=2, column=0, sticky="w", padx=20)
-        self.custom_fps_entry.configure(state="disabled")
-
-        # FPS Mode
-        ctk.CTkLabel(self.fps_scale_options_frame, text="FPS Mode:").grid(
-            row=3, column=0, sticky="w", padx=10, pady=5
+        self.btn_output.grid(row=3, column=2, sticky="w", padx=5, pady=5)
+        self.btn_output.bind("<Button-3>", lambda e: self._copy_command_to_clipboard())
+        add_tooltip(
+            self.btn_output,
+            message="Right-click to copy command to clipboard",
+            bg_color=SECONDARY_BG,
+            text_color=TEXT_COLOR_W,
+            alpha=1.0,
+            corner_radius=6,
+            delay=0.3,
         )
 
-        fps_mode_options = [
-            ("Auto", "auto"),
-            ("Constant", "cfr"),
-            ("Variable", "vfr"),
-            ("Passthrough", "passthrough"),
-        ]
-
-        for i, (text, value) in enumerate(fps_mode_options):
-            rb = ctk.CTkRadioButton(
-                self.fps_scale_options_frame,
-                text=text,
-                variable=self.fps_mode,
-                value=value,
-                fg_color=ACCENT_GREEN,
-                hover_color=HOVER_GREEN,
-            )
-            rb.grid(row=3, column=i + 1, sticky="w", padx=2)
+        ctk.CTkButton(
+            main_frame,
+            text="Help",
+            command=self._show_main_help,
+            fg_color=ACCENT_GREY,
+            hover_color=HOVER_GREY,
+            text_color=TEXT_COLOR_B,
+        ).grid(row=4, column=2, sticky="w", padx=5, pady=5)
 
-        # Video Format
-        ctk.CTkLabel(self.fps_scale_options_frame, text="Video Format:").grid(
-            row=4, column=0, sticky="w", padx=10, pady=2
+        # Video Codec Selection
+        ctk.CTkLabel(main_frame, text="Video Codec:").grid(
+            row=4, column=0, sticky="w", padx=10, pady=5
         )
-        video_format_options = [
-            ("Source", "source"),
-            ("HD", "1280"),
-            ("FHD", "1920"),
-            ("QHD", "2560"),
-            ("4K", "3840"),
-        ]
+        codec_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
+        codec_frame.grid(row=4, column=1, sticky="w", padx=5, pady=5)
 
-        for i, (text, value) in enumerate(video_format_options):
-            rb = ctk.CTkRadioButton(
-                self.fps_scale_options_frame,
-                text=text,
-                variable=self.video_format_option,
-                value=value,
-                command=self._toggle_custom_video_width_entry,
-                fg_color=ACCENT_GREEN,
-                hover_color=HOVER_GREEN,
-            )
-            rb.grid(row=4, column=i + 1, sticky="w", padx=2)
+        hevc_rb = ctk.CTkRadioButton(
+            codec_frame,
+            text="HEVC",
+            variable=self.video_codec,
+            value="hevc",
+            command=self._update_codec_settings,
+            fg_color=ACCENT_GREEN,
+            hover_color=HOVER_GREEN,
+        )
+        hevc_rb.pack(side="left", padx=5)
 
-        # Custom Video Format
-        rb_custom_video = ctk.CTkRadioButton(
-            self.fps_scale_options_frame,
-            text="Custom",
-            variable=self.video_format_option,
-            value="custom",
-            command=self._toggle_custom_video_width_entry,
+        h264_rb = ctk.CTkRadioButton(
+            codec_frame,
+            text="H.264",
+            variable=self.video_codec,
+            value="h264",
+            command=self._update_codec_settings,
             fg_color=ACCENT_GREEN,
             hover_color=HOVER_GREEN,
         )
-        rb_custom_video.grid(row=5, column=1, sticky="w", padx=2, pady=10)
+        h264_rb.pack(side="left", padx=5)
 
-        self.custom_video_width_entry = ctk.CTkEntry(
-            self.fps_scale_options_frame,
-            textvariable=self.custom_video_width,
-            width=80,
-            justify="center",
-            fg_color=ACCENT_GREY,
-            text_color=PLACEHOLDER_COLOR,
+        av1_rb = ctk.CTkRadioButton(
+            codec_frame,
+            text="AV1",
+            variable=self.video_codec,
+            value="av1",
+            command=self._update_codec_settings,
+            fg_color=ACCENT_GREEN,
+            hover_color=HOVER_GREEN,
         )
-        self.custom_video_width_entry.grid(row=5, column=0, sticky="w", padx=20)
-        self.custom_video_width_entry.configure(state="disabled")
+        av1_rb.pack(side="left", padx=5)
 
-        # Interpolation
-        ctk.CTkLabel(self.fps_scale_options_frame, text="Interpolation Algo:").grid(
-            row=6, column=0, sticky="w", padx=10, pady=10
+        # Encoder Options
+        encoder_options_frame_toggle = TextCheckbox(
+            main_frame,
+            text="Advanced Encoder Settings",
+            variable=self.enable_encoder_options,
+            command=self._toggle_encoder_options_frame,
         )
+        encoder_options_frame_toggle.grid(row=5, column=0, sticky="w", padx=10, pady=5)
 
-        self.interpolation_description = ctk.StringVar(
-            value="Smooth and balanced quality."
+        # Auto button
+        self.auto_button = ctk.CTkButton(
+            main_frame,
+            text="Auto",
+            command=self._apply_auto_encoder_settings,
+            fg_color=ACCENT_GREEN,
+            hover_color=HOVER_GREEN,
+            text_color=TEXT_COLOR_B,
+            width=80,
         )
-        self.interpolation_algo.trace_add(
-            "write", lambda *args: self._update_interpolation_description()
+        self.auto_button.grid(row=5, column=1, sticky="w", padx=5)
+        self.auto_button.grid_remove()
+
+        # Default button
+        self.default_button = ctk.CTkButton(
+            main_frame,
+            text="Default",
+            command=lambda: self._apply_preset("none"),
+            fg_color=ACCENT_GREEN,
+            hover_color=HOVER_GREEN,
+            text_color=TEXT_COLOR_B,
+            width=80,
         )
+        self.default_button.grid(row=5, column=1, sticky="w", padx=95)
+        self.default_button.grid_remove()
 
-        interp_option_menu = ctk.CTkOptionMenu(
-            self.fps_scale_options_frame,
-            variable=self.interpolation_algo,
-            values=["bilinear", "bicubic", "neighbor", "area", "lanczos", "spline"],
-            fg_color=PRIMARY_BG,
-            button_color=ACCENT_GREEN,
-            button_hover_color=HOVER_GREEN,
-            dropdown_fg_color=SECONDARY_BG,
-            dropdown_hover_color=ACCENT_GREEN,
+        self.encoder_options_frame = None  # Built on first open
+
+        # FPS and Scaling
+        fps_scale_frame_toggle = TextCheckbox(
+            main_frame,
+            text="FPS and Scaling Settings",
+            variable=self.enable_fps_scale_options,
+            command=self._toggle_fps_scale_options_frame,
         )
-        interp_option_menu.grid(row=6, column=1, sticky="ew", padx=5, pady=2)
+        fps_scale_frame_toggle.grid(row=7, column=0, sticky="w", padx=10, pady=5)
 
-        ctk.CTkLabel(
-            self.fps_scale_options_frame,
-            textvariable=self.interpolation_description,
-            text_color=PLACEHOLDER_COLOR,
-            wraplength=100,
-            anchor="w",
-            justify="left",
-        ).grid(row=6, column=2, sticky="w", padx=5)
+        self.fps_scale_options_frame = None  # Built on first open
 
         # Audio Settings Toggle
         audio_frame_toggle = TextCheckbox(
@@ -2273,74 +3690,9 @@ class VideoConverterApp:
         )
         audio_frame_toggle.grid(row=9, column=0, sticky="w", padx=10, pady=5)
 
-        # Audio Frame
-        self.audio_frame = ctk.CTkFrame(main_frame, fg_color=SECONDARY_BG)
-        audio_options_subframe = ctk.CTkFrame(self.audio_frame, fg_color="transparent")
-        audio_options_subframe.pack(fill="x", padx=10, pady=5)
-
-        first_row_options = [
-            ("Disable", "disable"),
-            ("Source", "copy"),
-            ("AAC 96", "aac_96k"),
-            ("AAC 160", "aac_160k"),
-            ("AAC 256", "aac_256k"),
-        ]
-
-        second_row_options = [
-            ("Opus 96", "opus_96k"),
-            ("Opus 160", "opus_160k"),
-            ("Opus 256", "opus_256k"),
-        ]
-
-        # AAC row
-        for i, (text, value) in enumerate(first_row_options):
-            rb = ctk.CTkRadioButton(
-                audio_options_subframe,
-                text=text,
-                variable=self.audio_option,
-                value=value,
-                command=self._toggle_custom_abitrate,
-                fg_color=ACCENT_GREEN,
-                hover_color=HOVER_GREEN,
-            )
-            rb.grid(row=0, column=i, sticky="w", padx=15, pady=10)
-
-        # Custom AAC bitrate
-        self.custom_audio_rb = ctk.CTkRadioButton(
-            audio_options_subframe,
-            text="Custom",
-            variable=self.audio_option,
-            value="custom",
-            command=self._toggle_custom_abitrate,
-            fg_color=ACCENT_GREEN,
-            hover_color=HOVER_GREEN,
-        )
-        self.custom_audio_rb.grid(row=1, column=1, sticky="w", padx=15, pady=2)
-
-        self.custom_abitrate_entry = ctk.CTkEntry(
-            audio_options_subframe,
-            textvariable=self.custom_abitrate,
-            width=80,
-            justify="center",
-            fg_color=ACCENT_GREY,
-            text_color=PLACEHOLDER_COLOR,
-        )
-        self.custom_abitrate_entry.grid(row=1, column=0, sticky="w", padx=20)
-        self.custom_abitrate_entry.configure(state="disabled")
-
-        # Opus row
-        for i, (text, value) in enumerate(second_row_options):
-            rb = ctk.CTkRadioButton(
-                audio_options_subframe,
-                text=text,
-                variable=self.audio_option,
-                value=value,
-                command=self._toggle_custom_abitrate,
-                fg_color=ACCENT_GREEN,
-                hover_color=HOVER_GREEN,
-            )
-            rb.grid(row=1, column=i + 2, sticky="w", padx=15, pady=10)
-
+        # Audio Frame
+        self.audio_frame = None  # Built on first open
+
         # Additional Options
         additional_options_toggle = TextCheckbox(
             main_frame,
@@ -2415,7 +3767,7 @@ class VideoConverterApp:
         ctk.CTkCheckBox(
             trim_frame,
             text="Copy",
-            command=lambda: self.audio_option.set("copy"),
+            command=self._on_streamcopy_toggle,
             variable=self.trim_streamcopy,
             width=70,
             fg_color=ACCENT_GREEN,
@@ -2427,10 +3779,31 @@ class VideoConverterApp:
             trim_frame,
             text="Precise",
             variable=self.precise_trim,
+            width=70,
             fg_color=ACCENT_GREEN,
             hover_color=HOVER_GREEN,
         ).grid(row=1, column=8)
 
+        # Smart trim checkbox (re-encode only the GOPs at the cut points)
+        ctk.CTkCheckBox(
+            trim_frame,
+            text="Smart",
+            command=self._on_smart_trim_toggle,
+            variable=self.smart_trim,
+            width=70,
+            fg_color=ACCENT_GREEN,
+            hover_color=HOVER_GREEN,
+        ).grid(row=1, column=9)
+
+        # Snap slider handles to keyframes
+        ctk.CTkCheckBox(
+            trim_frame,
+            text="Snap",
+            variable=self.snap_keyframes,
+            fg_color=ACCENT_GREEN,
+            hover_color=HOVER_GREEN,
+        ).grid(row=1, column=10)
+
         # FF Options
         ctk.CTkLabel(self.additional_options_frame, text="Add FF Options:").grid(
             row=2, column=0, sticky="w", padx=10, pady=10
@@ -2740,104 +4113,7 @@ class VideoConverterApp:
             command=self._toggle_presets_frame,
         )
         presets_frame_toggle.grid(row=13, column=0, sticky="w", padx=10, pady=5)
-        self.presets_frame = ctk.CTkFrame(main_frame, fg_color=SECONDARY_BG)
-
-        preset_options = [
-            ("Default (Reset)", "none"),
-            ("FHD Fast", "fhdf"),
-            ("FHD Quality", "fhdq"),
-            ("HD Fast", "hdf"),
-            ("HD Quality", "hdq"),
-        ]
-
-        for i, (text, value) in enumerate(preset_options):
-            rb = ctk.CTkRadioButton(
-                self.presets_frame,
-                text=text,
-                variable=self.selected_preset,
-                value=value,
-                command=lambda v=value: self._apply_preset(v),
-                fg_color=ACCENT_GREEN,
-                hover_color=HOVER_GREEN,
-            )
-            rb.grid(row=1, column=i, padx=10, pady=5, sticky="w")
-
-        custom_row_frame = ctk.CTkFrame(self.presets_frame, fg_color="transparent")
-        custom_row_frame.grid(
-            row=2, column=0, columnspan=5, sticky="ew", padx=0, pady=5
-        )
-
-        # Custom Radio Button
-        self.custom_preset_rb = ctk.CTkRadioButton(
-            custom_row_frame,
-            text="Custom",
-            variable=self.selected_preset,
-            value="custom",
-            command=self._on_custom_preset_selected,
-            fg_color=ACCENT_GREEN,
-            hover_color=HOVER_GREEN,
-        )
-        self.custom_preset_rb.pack(side="left", padx=(10, 5))
-
-        # Preset Label
-        ctk.CTkLabel(custom_row_frame, text="Preset:").pack(side="left", padx=(30, 5))
-
-        # Preset dropdown
-        self.custom_preset_dropdown = ctk.CTkOptionMenu(
-            custom_row_frame,
-            variable=self.custom_preset_name,
-            values=self._get_preset_list(),
-            command=self._load_custom_preset,
-            fg_color=PRIMARY_BG,
-            button_color=ACCENT_GREEN,
-            button_hover_color=HOVER_GREEN,
-            dropdown_fg_color=SECONDARY_BG,
-            dropdown_hover_color=ACCENT_GREEN,
-            width=170,
-            dynamic_resizing=False,
-        )
-        self.custom_preset_dropdown.pack(side="left", padx=5)
-
-        self.save_as_preset_btn = ctk.CTkButton(
-            custom_row_frame,
-            text="Save As",
-            command=self._save_preset_as,
-            fg_color=ACCENT_GREEN,
-            hover_color=HOVER_GREEN,
-            text_color=TEXT_COLOR_B,
-            width=70,
-        )
-        self.save_as_preset_btn.pack(side="left", padx=(15, 5))
-
-        self.save_preset_btn = ctk.CTkButton(
-            custom_row_frame,
-            text="Save",
-            command=self._save_preset,
-            fg_color=ACCENT_GREEN,
-            hover_color=HOVER_GREEN,
-            text_color=TEXT_COLOR_B,
-            width=60,
-        )
-        self.save_preset_btn.pack(side="left", padx=5)
-
-        self.delete_preset_btn = ctk.CTkButton(
-            custom_row_frame,
-            text="Delete",
-            command=self._delete_preset,
-            fg_color=ACCENT_RED,
-            hover_color=HOVER_RED,
-            text_color=TEXT_COLOR_B,
-            width=60,
-        )
-        self.delete_preset_btn.pack(side="left", padx=5)
-
-        # Preset Indicator
-        self.preset_indicator = ctk.CTkLabel(
-            self.presets_frame, text="No preset selected", text_color=PLACEHOLDER_COLOR
-        )
-        self.preset_indicator.grid(
-            row=3, column=0, columnspan=6, padx=10, pady=5, sticky="w"
-        )
+        self.presets_frame = None  # Built on first open
 
         ctk.CTkLabel(main_frame, textvariable=self.estimated_file_size).grid(
             row=16, column=0, sticky="w", padx=5, pady=2
@@ -2892,9 +4168,9 @@ class VideoConverterApp:
         self.play_output_button.pack(side="left", expand=True, fill="x", padx=(2, 2))
         self.play_output_button.configure(command=self._play_output_file)
         self.play_output_button.bind("<Button-3>", self._on_vmaf_right_click)
-        CTkToolTip(
+        add_tooltip(
             self.play_output_button,
-            message="Right-click to run VMAF analysis",
+            message="Right-click to run VMAF/PSNR/SSIM quality analysis",
             bg_color=SECONDARY_BG,
             text_color=TEXT_COLOR_W,
             alpha=1.0,
@@ -2912,6 +4188,16 @@ class VideoConverterApp:
         )
         self.play10s_button.pack(side="left", expand=True, fill="x", padx=(2, 2))
         self.play10s_button.configure(command=self._create_10s_preview)
+        self.play10s_button.bind("<Button-3>", self._show_preview_menu)
+        add_tooltip(
+            self.play10s_button,
+            message="Right-click to preview several points of the video",
+            bg_color=SECONDARY_BG,
+            text_color=TEXT_COLOR_W,
+            alpha=1.0,
+            corner_radius=6,
+            delay=0.3,
+        )
 
         self.batch_convert_button = ctk.CTkButton(
             self.play_buttons_frame,
@@ -2934,6 +4220,16 @@ class VideoConverterApp:
         )
         self.screen_record_button.pack(side="left", expand=True, fill="x", padx=(2, 0))
         self.screen_record_button.configure(command=self._screen_record)
+        self.screen_record_button.bind("<Button-3>", self._show_record_menu)
+        add_tooltip(
+            self.screen_record_button,
+            message="Right-click for instant replay",
+            bg_color=SECONDARY_BG,
+            text_color=TEXT_COLOR_W,
+            alpha=1.0,
+            corner_radius=6,
+            delay=0.3,
+        )
 
         # Convert Button
         self.convert_button = ctk.CTkButton(
@@ -2970,15 +4266,12 @@ class VideoConverterApp:
     # CUSTOM PRESET METHODS
     def _get_preset_list(self):
         """Get list of saved presets"""
-        try:
-            files = os.listdir(self.presets_dir)
-            presets = [os.path.splitext(f)[0] for f in files if f.endswith(".json")]
-            return presets
-        except Exception:
-            return []
+        return list_presets(self.presets_dir)
 
     def _update_preset_dropdown(self):
         """Update the preset dropdown list"""
+        if self.presets_frame is None:
+            return  # The dropdown lists presets when it is built
         presets = self._get_preset_list()
         self.custom_preset_dropdown.configure(values=presets)
 
@@ -2993,245 +4286,60 @@ class VideoConverterApp:
     def _load_custom_preset(self, preset_name):
         """Load a custom preset"""
         try:
-            preset_file = os.path.join(self.presets_dir, f"{preset_name}.json")
-            if os.path.exists(preset_file):
-                with open(preset_file, "r", encoding="utf-8") as file:
-                    settings = load(file)
-
-                self.loading_preset = True
-                self._apply_settings_dict(settings)
-                self.custom_preset_name.set(preset_name)
-                self.custom_preset_selected.set(preset_name)
-                self.loading_preset = False
-
-                self.custom_preset_selected.set(preset_name)
-                if self.selected_preset.get() != "custom":
-                    self.selected_preset.set("custom")
-                self.preset_indicator.configure(
-                    text=f"Loaded preset: {preset_name}", text_color=ACCENT_GREEN
-                )
-                self._save_settings()
-            else:
-                messagebox.showerror("Error", f"Preset file not found: {preset_file}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load preset: {str(e)}")
-
-    def _save_preset_as(self):
-        """Save current settings as a new preset"""
-        preset_name = simpledialog.askstring("Save Preset", "Enter preset name:")
-        if not preset_name:
-            return
-
-        # Check if preset already exists
-        preset_file = os.path.join(self.presets_dir, f"{preset_name}.json")
-        if os.path.exists(preset_file):
-            if not messagebox.askyesno(
-                "Overwrite", f"Preset '{preset_name}' already exists. Overwrite?"
-            ):
-                return
-
-        self._save_preset_to_file(preset_name)
-        self._update_preset_dropdown()
-        self.custom_preset_name.set(preset_name)
-        self.custom_preset_selected.set(preset_name)
-        self.selected_preset.set("custom")
-        self.preset_indicator.configure(
-            text=f"Preset saved: {preset_name}", text_color=ACCENT_GREEN
-        )
-
-    def _on_vmaf_right_click(self, event=None):
-        """Handle right-click on Play Output File button for VMAF analysis"""
-        # Cancel if already running
-        if getattr(self, "_vmaf_running", False):
-            self._cancel_vmaf()
-            return
-
-        input_f = self.input_file.get()
-        output_f = self.output_file.get()
-
-        if not input_f or input_f.startswith("Drag and drop") or not output_f:
-            messagebox.showwarning(
-                "Warning", "Please specify both Input and Output files."
-            )
-            return
-
-        if not os.path.exists(input_f) or not os.path.exists(output_f):
-            messagebox.showwarning("Warning", "Input or Output file does not exist.")
-            return
-
-        # Start analysis in a separate thread
-        self._vmaf_running = True
-        Thread(target=self._run_vmaf_analysis, daemon=True).start()
-
-    def _cancel_vmaf(self):
-        """Cancel running VMAF analysis"""
-        self._vmaf_running = False
-        if hasattr(self, "_vmaf_process") and self._vmaf_process:
-            try:
-                self._vmaf_process.terminate()
-            except Exception:
-                pass
-        self.status_text.set("VMAF analysis cancelled")
-        self.ffmpeg_output.set("")
-
-    def _run_vmaf_analysis(self):
-        try:
-            input_f = self.input_file.get()
-            output_f = self.output_file.get()
-
-            if not os.path.exists(input_f) or not os.path.exists(output_f):
-                self.master.after(
-                    0,
-                    lambda: messagebox.showwarning(
-                        "Warning", "Input or Output file does not exist."
-                    ),
-                )
-                return
-
-            n_threads = os.cpu_count()  # use os.cpu_count() instead of multiprocessing
-            ffmpeg_path = (
-                self.ffmpeg_custom_path.get()
-                if self.ffmpeg_custom_path.get()
-                and self.ffmpeg_custom_path.get() != self.ffmpeg_path_placeholder
-                else self.ffmpeg_path
-            )
-
-            if not ffmpeg_path:
-                self.master.after(
-                    0,
-                    lambda: messagebox.showerror(
-                        "Error", "FFmpeg path is not specified"
-                    ),
-                )
-                return
-
-            # Get resolutions of both videos
-            in_w, in_h = self._get_video_resolution(input_f)
-            out_w, out_h = self._get_video_resolution(output_f)
-
-            if None in (in_w, in_h, out_w, out_h):
-                self.master.after(
-                    0,
-                    lambda: messagebox.showerror(
-                        "Error", "Could not determine video resolution"
-                    ),
-                )
-                return
-
-            need_scaling = (in_w != out_w) or (in_h != out_h)
-            scale_flag = self.interpolation_algo.get()  # scaling algorithm from GUI
-
-            if need_scaling:
-                # Scale first input (output) to match the size of the second input (original)
-                lavfi_filter = (
-                    f"[0:v]scale={in_w}:{in_h}:flags={scale_flag}[dist];"
-                    f"[1:v]null[ref];"
-                    f"[dist][ref]libvmaf=n_threads={n_threads}:n_subsample=10"
-                )
-                score_label = "VMAF score (with scaling)"
-            else:
-                lavfi_filter = f"libvmaf=n_threads={n_threads}:n_subsample=10"
-                score_label = "VMAF score"
-
-            command = [
-                ffmpeg_path,
-                "-t",
-                "30",
-                "-i",
-                output_f,  # distorted video
-                "-t",
-                "30",
-                "-i",
-                input_f,  # original video
-                "-lavfi",
-                lavfi_filter,
-                "-f",
-                "null",
-                "-",
-            ]
-
-            self.master.after(
-                0, lambda: self.status_text.set("VMAF Analysis in progress...")
-            )
-            self.master.after(
-                0, lambda: self.ffmpeg_output.set("Calculating VMAF score...")
-            )
-
-            # Pass the label to _execute_vmaf
-            self._execute_vmaf(command, score_label)
-
-        except Exception as e:
-            self.master.after(
-                0,
-                lambda msg=f"VMAF Analysis failed: {str(e)}": messagebox.showerror(
-                    "Error", msg
-                ),
-            )
-
-    def _execute_vmaf(self, command, score_label="VMAF score"):
-        """Execute the FFmpeg command and parse VMAF score"""
-        startupinfo = None
-        creationflags = 0
-        if os.name == "nt":
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            startupinfo.wShowWindow = subprocess.SW_HIDE
-            creationflags = subprocess.CREATE_NO_WINDOW
-
-        try:
-            self._vmaf_process = subprocess.Popen(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True,
-                startupinfo=startupinfo,
-                creationflags=creationflags,
-                encoding="utf-8",
-                errors="replace",
-            )
+            preset_file = os.path.join(self.presets_dir, f"{preset_name}.json")
+            if os.path.exists(preset_file):
+                with open(preset_file, "r", encoding="utf-8") as file:
+                    settings = load(file)
 
-            vmaf_score = None
-            for line in self._vmaf_process.stdout:
-                if not self._vmaf_running:
-                    self._vmaf_process.terminate()
-                    break
+                self.loading_preset = True
+                self._apply_settings_dict(settings)
+                self.custom_preset_name.set(preset_name)
+                self.custom_preset_selected.set(preset_name)
+                self.loading_preset = False
 
-                line = line.strip()
-                if line:
-                    self.master.after(0, lambda l=line: self.ffmpeg_output.set(l))
-                    # Look for VMAF score
-                    match = search(r"VMAF score:\s*([\d.]+)", line)
-                    if match:
-                        vmaf_score = match.group(1)
+                self.custom_preset_selected.set(preset_name)
+                if self.selected_preset.get() != "custom":
+                    self.selected_preset.set("custom")
+                self._set_preset_indicator(
+                    text=f"Loaded preset: {preset_name}", text_color=ACCENT_GREEN
+                )
+                self._save_settings()
+            else:
+                messagebox.showerror("Error", f"Preset file not found: {preset_file}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load preset: {str(e)}")
 
-            self._vmaf_process.wait()
+    def _save_preset_as(self):
+        """Save current settings as a new preset"""
+        preset_name = simpledialog.askstring("Save Preset", "Enter preset name:")
+        if not preset_name:
+            return
 
-            if vmaf_score and self._vmaf_running:
-                try:
-                    score_float = float(vmaf_score)
-                    formatted_score = f"{score_label}: {score_float:.2f}"
-                    self.master.after(
-                        0, lambda s=formatted_score: self.status_text.set(s)
-                    )
-                    self.master.after(0, lambda: MessageBeep(MB_ICONASTERISK))
-                except ValueError:
-                    self.master.after(
-                        0, lambda: self.status_text.set("Error parsing VMAF score")
-                    )
-            elif self._vmaf_running:
-                self.master.after(
-                    0, lambda: self.status_text.set("VMAF score not found in output")
-                )
+        # Check if preset already exists
+        preset_file = os.path.join(self.presets_dir, f"{preset_name}.json")
+        if os.path.exists(preset_file):
+            if not messagebox.askyesno(
+                "Overwrite", f"Preset '{preset_name}' already exists. Overwrite?"
+            ):
+                return
 
-        except Exception as e:
-            self.master.after(
-                0,
-                lambda msg=f"Error executing VMAF: {str(e)}": self.status_text.set(msg),
-            )
-        finally:
-            self._vmaf_running = False
-            self._vmaf_process = None
-            self.master.after(0, lambda: self.ffmpeg_output.set(""))
+        self._save_preset_to_file(preset_name)
+        self._update_preset_dropdown()
+        self.custom_preset_name.set(preset_name)
+        self.custom_preset_selected.set(preset_name)
+        self.selected_preset.set("custom")
+        self._set_preset_indicator(
+            text=f"Preset saved: {preset_name}", text_color=ACCENT_GREEN
+        )
+
+    def _on_vmaf_right_click(self, event=None):
+        """Open the quality analysis window from the Play Output File button"""
+        if not self.quality_window or not self.quality_window.window.winfo_exists():
+            self.quality_window = QualityAnalysisWindow(self.master, self)
+        else:
+            self.quality_window.window.deiconify()
+            self.quality_window.window.lift()
+            self.quality_window.window.focus_force()
 
     def _save_preset(self):
         """Save current settings to selected preset"""
@@ -3252,7 +4360,7 @@ class VideoConverterApp:
 
         self._save_preset_to_file(preset_name)
         self.selected_preset.set("custom")
-        self.preset_indicator.configure(
+        self._set_preset_indicator(
             text=f"Preset saved: {preset_name}", text_color=ACCENT_GREEN
         )
 
@@ -3288,7 +4396,7 @@ class VideoConverterApp:
                 self.custom_preset_name.set("")
                 self.custom_preset_selected.set("")
                 self.selected_preset.set("none")
-                self.preset_indicator.configure(
+                self._set_preset_indicator(
                     text=f"Preset deleted: {preset_name}", text_color=ACCENT_GREEN
                 )
             except Exception as e:
@@ -3389,6 +4497,10 @@ class VideoConverterApp:
         if encoder_split_encode_mode:
             self.split_encode_mode.set(encoder_split_encode_mode)
 
+        chunked_encode = settings_dict.get("chunked_encode", "")
+        if chunked_encode in CHUNKED_ENCODE_OPTIONS:
+            self.chunked_encode.set(chunked_encode)
+
         # Boolean encoder settings
         cuda_output_format = settings_dict.get("cuda_output_format")
         if cuda_output_format is not None:
@@ -3456,6 +4568,14 @@ class VideoConverterApp:
         if precise_trim is not None:
             self.precise_trim.set(precise_trim)
 
+        smart_trim = settings_dict.get("smart_trim")
+        if smart_trim is not None:
+            self.smart_trim.set(smart_trim)
+
+        snap_keyframes = settings_dict.get("snap_keyframes")
+        if snap_keyframes is not None:
+            self.snap_keyframes.set(snap_keyframes)
+
         # Additional Options
         additional_options = settings_dict.get("additional_options", "")
         if additional_options:
@@ -3516,6 +4636,40 @@ class VideoConverterApp:
         if batch_output_container:
             self.batch_output_container.set(batch_output_container)
 
+        batch_max_workers = settings_dict.get("batch_max_workers", "")
+        if batch_max_workers in BATCH_WORKER_OPTIONS:
+            self.batch_max_workers.set(batch_max_workers)
+
+        quality_metric = settings_dict.get("quality_metric", "")
+        if quality_metric in QUALITY_METRICS:
+            self.quality_metric.set(quality_metric)
+
+        quality_segments = settings_dict.get("quality_segments", "")
+        if quality_segments in QUALITY_SEGMENT_OPTIONS:
+            self.quality_segments.set(quality_segments)
+
+        quality_log_format = settings_dict.get("quality_log_format", "")
+        if quality_log_format in QUALITY_LOG_FORMATS:
+            self.quality_log_format.set(quality_log_format)
+
+        quality_target = settings_dict.get("quality_target", "")
+        if quality_target:
+            self.quality_target.set(quality_target)
+
+        # Preview sampling settings
+        preview_samples = settings_dict.get("preview_samples", "")
+        if preview_samples in PREVIEW_SAMPLE_OPTIONS:
+            self.preview_samples.set(preview_samples)
+
+        preview_join = settings_dict.get("preview_join")
+        if preview_join is not None:
+            self.preview_join.set(preview_join)
+
+        # Instant replay settings
+        replay_minutes = settings_dict.get("replay_minutes", "")
+        if replay_minutes in REPLAY_MINUTES_OPTIONS:
+            self.replay_minutes.set(replay_minutes)
+
         # Check if preset's preset file still exists
         if selected_preset == "custom" and custom_preset_selected:
             preset_file = os.path.join(
@@ -3574,6 +4728,7 @@ class VideoConverterApp:
             "encoder_rc": self.rc.get(),
             "encoder_lookahead_level": self.lookahead_level.get(),
             "encoder_split_encode_mode": self.split_encode_mode.get(),
+            "chunked_encode": self.chunked_encode.get(),
             # FPS and scaling settings
             "fps_option": self.fps_option.get(),
             "custom_fps": self.custom_fps.get(),
@@ -3593,6 +4748,8 @@ class VideoConverterApp:
             "trim_end": self.trim_end.get(),
             "trim_streamcopy": self.trim_streamcopy.get(),
             "precise_trim": self.precise_trim.get(),
+            "smart_trim": self.smart_trim.get(),
+            "snap_keyframes": self.snap_keyframes.get(),
             # Additional Options Fields
             "additional_options": self.additional_options.get()
             if self.additional_options.get() != self.additional_options_placeholder
@@ -3614,25 +4771,42 @@ class VideoConverterApp:
             "batch_output_folder": self.batch_output_folder.get(),
             "batch_change_container": self.batch_change_container.get(),
             "batch_output_container": self.batch_output_container.get(),
+            "batch_max_workers": self.batch_max_workers.get(),
+            # Quality Analysis Settings
+            "quality_metric": self.quality_metric.get(),
+            "quality_segments": self.quality_segments.get(),
+            "quality_log_format": self.quality_log_format.get(),
+            "quality_target": self.quality_target.get(),
+            # Preview Sampling Settings
+            "preview_samples": self.preview_samples.get(),
+            "preview_join": self.preview_join.get(),
+            # Instant Replay Settings
+            "replay_minutes": self.replay_minutes.get(),
             "version": self.version,
         }
         return settings
 
+    def _set_preset_indicator(self, text, text_color):
+        """Show preset status, kept until the presets panel is built"""
+        self.preset_indicator_state = {"text": text, "text_color": text_color}
+        if self.presets_frame is not None:
+            self.preset_indicator.configure(text=text, text_color=text_color)
+
     def _update_preset_indicator(self):
         """Update the preset indicator label based on current preset selection."""
         selected_preset = self.selected_preset.get()
         custom_preset_selected = self.custom_preset_selected.get()
 
         if not selected_preset or selected_preset == "none":
-            self.preset_indicator.configure(
+            self._set_preset_indicator(
                 text="No preset selected", text_color=PLACEHOLDER_COLOR
             )
         elif selected_preset == "custom" and custom_preset_selected:
-            self.preset_indicator.configure(
+            self._set_preset_indicator(
                 text=f"Loaded preset: {custom_preset_selected}", text_color=ACCENT_GREEN
             )
         elif selected_preset == "custom":
-            self.preset_indicator.configure(
+            self._set_preset_indicator(
                 text="Custom preset (unnamed)", text_color=ACCENT_GREEN
             )
         else:
@@ -3643,7 +4817,7 @@ class VideoConverterApp:
                 "hdq": "HD Quality",
             }
             display_name = preset_display_names.get(selected_preset, selected_preset)
-            self.preset_indicator.configure(
+            self._set_preset_indicator(
                 text=f"{display_name} preset applied", text_color=ACCENT_GREEN
             )
 
@@ -3654,6 +4828,8 @@ class VideoConverterApp:
         except Exception as e:
             messagebox.showerror("Error", str(e))
             return
+        if not self._command_supported(command):
+            return
 
         self.progress_value.set(0.0)
         self.progress_label.configure(text="0%")
@@ -3665,13 +4841,115 @@ class VideoConverterApp:
 
         self.status_text.set("Conversion in progress...")
         self.ffmpeg_output.set("Starting conversion...")
-        self.conversion_thread = Thread(target=self._run_ffmpeg, args=(command,))
+        duration = self._get_video_duration(update_ui=False)
+
+        self.encode_job = self._make_smart_cut_job() or self._make_chunked_job(
+            duration
+        )
+        if self.encode_job:
+            self.conversion_thread = Thread(
+                target=self._run_encode_job, args=(self.encode_job,)
+            )
+        else:
+            self.conversion_thread = Thread(
+                target=self._run_ffmpeg, args=(command, duration)
+            )
         self.conversion_thread.start()
 
+    def _make_chunked_job(self, duration):
+        """Return a ChunkedEncode for the current file, or None to encode in one pass"""
+        sessions = self.chunked_encode.get()
+        if sessions == "off" or self.custom_command is not None:
+            return None
+
+        settings = self._get_encode_settings()
+        blocker = chunking_blocker(settings)
+        if blocker is None and duration < 2 * CHUNK_MIN_LENGTH:
+            blocker = "the file is too short"
+        if blocker is not None:
+            print(f"Chunked encoding skipped: {blocker}")
+            return None
+
+        input_f = self.input_file.get()
+        info = self.metadata.get_cached(input_f)
+        return ChunkedEncode(
+            self._get_ffmpeg_executable(),
+            self.ffprobe_path,
+            settings,
+            input_f,
+            self.output_file.get(),
+            duration,
+            int(sessions),
+            info.start_time if info else 0.0,
+            self.keyframes,
+        )
+
+    def _make_smart_cut_job(self):
+        """Return a SmartCut when Smart trim is on and the trim allows it"""
+        if not self.smart_trim.get() or self.custom_command is not None:
+            return None
+
+        settings = self._get_encode_settings()
+        info = self.metadata.get_cached(self.input_file.get())
+        blocker = smart_cut_blocker(settings, info)
+        if blocker is not None:
+            print(f"Smart trim skipped: {blocker}")
+            return None
+
+        return SmartCut(
+            self._get_ffmpeg_executable(),
+            self.ffprobe_path,
+            settings,
+            info,
+            self.output_file.get(),
+            self.keyframes,
+        )
+
+    def _run_encode_job(self, job):
+        """Worker thread for a chunked encode or smart cut, reports like _run_ffmpeg"""
+        error = None
+        try:
+            finished = job.run(
+                on_progress=lambda snapshot: self.ui_bus.post(
+                    "progress", self._update_progress, snapshot
+                ),
+                on_status=lambda text: self.ui_bus.post(
+                    "ffmpeg_output", self.ffmpeg_output.set, text
+                ),
+            )
+        except Exception as e:
+            finished = False
+            error = str(e)
+        self.ui_bus.discard("progress")
+        self.ui_bus.discard("ffmpeg_output")
+        self.master.after(0, lambda: self._on_encode_job_finished(job, finished, error))
+
+    def _on_encode_job_finished(self, job, finished, error):
+        if self.encode_job is job:
+            self.encode_job = None
+        self.ffmpeg_output.set("")
+        self.progress_frame.grid_remove()
+        self.convert_button.configure(
+            text="Convert", fg_color=ACCENT_GREEN, hover_color=HOVER_GREEN
+        )
+
+        if finished:
+            self.status_text.set("Conversion complete!")
+            MessageBeep(MB_ICONASTERISK)
+        elif job.cancelled:
+            self.status_text.set("Conversion cancelled by user")
+            messagebox.showinfo("Cancelled", "Conversion was cancelled")
+        else:
+            self.status_text.set("Conversion error!")
+            messagebox.showerror("Error", f"{job.name} failed: {error}")
+        self.is_converting = False
+
     def _cancel_conversion(self):
         # Cancel single conversion — just set the flag, _run_ffmpeg handles UI
         if self.is_converting:
             self.is_converting = False
+            if self.encode_job:
+                self.encode_job.cancel()
 
         # Also cancel batch conversion if active
         if (
@@ -3684,18 +4962,12 @@ class VideoConverterApp:
 
     def _cancel_preview(self):
         """Cancel preview creation"""
-        if self.is_creating_preview and self.preview_process:
-            try:
-                self.preview_process.terminate()
-                self.preview_process.wait(timeout=2)
-            except (subprocess.TimeoutExpired, Exception):
-                try:
-                    self.preview_process.kill()
-                except Exception:
-                    pass
+        if self.is_creating_preview and self.preview_job:
+            # The job's finish handler deletes the unfinished files
+            self.preview_job.cancel()
 
             self.is_creating_preview = False
-            self.preview_process = None
+            self.preview_job = None
             self.status_text.set("Preview creation cancelled")
             self.ffmpeg_output.set("")
             self.progress_frame.grid_remove()
@@ -3735,11 +5007,17 @@ class VideoConverterApp:
             # Start recording
             self._start_recording()
 
-    def _start_recording(self):
+    def _start_recording(self, replay=False):
+        # replay=True captures into the instant replay ring instead of a file
+        if self.is_recording:
+            return
         if not hasattr(self, "original_title"):
             self.original_title = self.master.title()
 
-        self.master.title("Screen is recording now - nvencFFX")
+        if replay:
+            self.master.title("Instant replay is running - nvencFFX")
+        else:
+            self.master.title("Screen is recording now - nvencFFX")
         if not self.ffmpeg_path:
             messagebox.showerror("Error", "FFmpeg path is not specified.")
             return
@@ -3756,14 +5034,8 @@ class VideoConverterApp:
             desktop = os.path.join(os.path.expanduser("~"), "Desktop")
             output_file = os.path.join(desktop, f"screen_record-{date_str}.mp4")
 
-        # Set up temporary files for video and audio
+        # Video and loopback audio are muxed straight into the output
         self.final_record_file = output_file
-        self.temp_video_file = os.path.join(
-            tempfile.gettempdir(), f"temp_vid_{date_str}.mp4"
-        )
-        self.temp_audio_file = os.path.join(
-            tempfile.gettempdir(), f"temp_aud_{date_str}.wav"
-        )
 
         # Get FPS - use 60 if source or not specified
         fps = self.fps_option.get()
@@ -3784,10 +5056,19 @@ class VideoConverterApp:
             "lavfi",
             "-i",
             f"ddagrab=framerate={fps}",
-            "-vf",
-            "setparams=range=limited",
         ]
 
+        # Loopback audio reaches the same ffmpeg through a local socket
+        self.loopback_capture = None
+        if self.audio_option.get() != "disable":
+            try:
+                self.loopback_capture = LoopbackCapture()
+                command.extend(self.loopback_capture.input_args())
+            except Exception as e:
+                print(f"Audio recording error: {e}")
+
+        command.extend(["-vf", "setparams=range=limited"])
+
         # Encoder settings
         codec_map = {"hevc": "hevc_nvenc", "h264": "h264_nvenc", "av1": "av1_nvenc"}
         codec = codec_map.get(self.video_codec.get(), "hevc_nvenc")
@@ -3820,8 +5101,58 @@ class VideoConverterApp:
                 except Exception:
                     command.extend(val.split())
 
-        # Constant FPS + No audio
-        command.extend(["-fps_mode", self.fps_mode.get(), "-an", self.temp_video_file])
+        # Constant FPS, audio encoded live with the user's Audio Settings
+        command.extend(["-fps_mode", self.fps_mode.get()])
+        if self.loopback_capture:
+            command.extend(["-map", "0:v:0", "-map", "1:a:0"])
+            audio_options = build_audio_options(
+                self.audio_option.get(), self.custom_abitrate.get()
+            )
+            if replay:
+                # The segments are MPEG-TS, which cannot carry "Source" PCM
+                audio_options = replay_audio_options(audio_options)
+            command.extend(audio_options)
+        else:
+            command.append("-an")
+        # Settings saved with the capture statistics, to compare runs
+        try:
+            target_fps = float(fps)
+        except ValueError:
+            target_fps = 0.0
+        constant_qp = self.constant_qp_mode.get()
+        self.capture_stats = CaptureStats(
+            target_fps,
+            {
+                "codec": codec,
+                "preset": self.preset.get(),
+                "rate_control": "constqp" if constant_qp else self.rc.get(),
+                "qp": self.quality_level.get() if constant_qp else None,
+                "bitrate_kbps": None if constant_qp else self.bitrate.get(),
+                "fps": fps,
+                "fps_mode": self.fps_mode.get(),
+                "audio": (
+                    self.audio_option.get() if self.loopback_capture else "disable"
+                ),
+                "command": " ".join(command),
+            },
+        )
+
+        if replay:
+            # Only the last minutes are kept, in a bounded ring of segments
+            self.replay_buffer = ReplayBuffer(
+                os.path.join(tempfile.gettempdir(), "nff_replay"),
+                int(self.replay_minutes.get()),
+            )
+            command.extend(self.replay_buffer.output_args())
+        else:
+            # Fragmented output stays playable if ffmpeg or the app dies
+            command.extend(recording_output_options(self.final_record_file))
+            command.append(self.final_record_file)
+
+        if not self._command_supported(command):
+            self._close_loopback_capture()
+            self._release_replay_buffer()
+            return
 
         # PRINT THE COMMAND TO CONSOLE
         print("Screen recording command:")
@@ -3831,16 +5162,30 @@ class VideoConverterApp:
             # Update UI first
             self.is_recording = True
             self.screen_record_button.configure(
-                text="Stop Recording", fg_color=ACCENT_RED, hover_color=HOVER_RED
+                text="Stop Replay" if replay else "Stop Recording",
+                fg_color=ACCENT_RED,
+                hover_color=HOVER_RED,
             )
-            self.status_text.set("Screen is recording now...")
+            if replay:
+                self.status_text.set(
+                    f"Instant replay is running, {SAVE_REPLAY_HOTKEY} saves a clip"
+                )
+            else:
+                self.status_text.set("Screen is recording now...")
             self.ffmpeg_output.set("Screen recording starting...")
 
             # Notify user
             if hasattr(self, "_tray_icon") and self._tray_icon:
-                self._tray_icon.show_balloon(
-                    "Recording Started", "Screen is being captured..."
-                )
+                if replay:
+                    self._tray_icon.show_balloon(
+                        "Instant Replay Started",
+                        f"Keeping the last {self.replay_minutes.get()} min, "
+                        f"{SAVE_REPLAY_HOTKEY} saves a clip",
+                    )
+                else:
+                    self._tray_icon.show_balloon(
+                        "Recording Started", "Screen is being captured..."
+                    )
 
             # Minimize window after 1 second
             self._iconify_job = self.master.after(1000, self.master.iconify)
@@ -3858,8 +5203,13 @@ class VideoConverterApp:
                         startupinfo.wShowWindow = subprocess.SW_HIDE
                         creationflags = subprocess.CREATE_NO_WINDOW
 
+                    if self.replay_buffer:
+                        self.replay_buffer.start()
+                    else:
+                        self.recording_journal.begin(self.final_record_file)
+                    # -progress blocks feed the capture statistics
                     self.recording_process = subprocess.Popen(
-                        command,
+                        with_progress_pipe(command),
                         stdin=subprocess.PIPE,
                         stdout=subprocess.PIPE,
                         stderr=subprocess.STDOUT,
@@ -3873,20 +5223,16 @@ class VideoConverterApp:
 
                     self.ffmpeg_output.set("Screen recording started...")
 
-                    # Start audio recording thread if not disabled
-                    if (
-                        getattr(self, "audio_option", None)
-                        and self.audio_option.get() != "disable"
-                    ):
-                        self.audio_thread = Thread(target=self._record_audio_loop)
-                        self.audio_thread.daemon = True
-                        self.audio_thread.start()
+                    if self.loopback_capture:
+                        self.loopback_capture.start()
 
                     # Start monitoring thread
-                    recording_thread = Thread(
-                        target=self._monitor_recording, daemon=True
+                    self._recording_monitor = Thread(
+                        target=self._monitor_recording,
+                        args=(self.recording_process, self.capture_stats),
+                        daemon=True,
                     )
-                    recording_thread.start()
+                    self._recording_monitor.start()
                 except Exception as e:
                     self.master.after(
                         0,
@@ -3906,6 +5252,11 @@ class VideoConverterApp:
         if hasattr(self, "original_title"):
             self.master.title(self.original_title)
         self.is_recording = False
+        self._close_loopback_capture()
+        if self.replay_buffer:
+            self._release_replay_buffer()
+        else:
+            self.recording_journal.end(self.final_record_file)
         self.recording_process = None
         self.screen_record_button.configure(
             text="Screen Record", fg_color=ACCENT_GREY, hover_color=HOVER_GREY
@@ -3915,60 +5266,127 @@ class VideoConverterApp:
         self.master.deiconify()
         messagebox.showerror("Error", f"Failed to start screen recording: {error_msg}")
 
-    def _record_audio_loop(self):
+    def _release_replay_buffer(self):
+        """Stop pruning the instant replay ring and delete its segments"""
+        replay_buffer, self.replay_buffer = self.replay_buffer, None
+        if replay_buffer:
+            replay_buffer.stop()
+
+    def _toggle_instant_replay(self):
+        if self.is_recording:
+            if self.replay_buffer:
+                self._stop_recording()
+        elif not self.replay_buffer:
+            self._start_recording(replay=True)
+
+    def _save_replay_clip(self):
+        """Save the instant replay buffer as a clip without re-encoding"""
+        if not (self.is_recording and self.replay_buffer):
+            self.status_text.set("Instant replay is not running")
+            if self._tray_icon:
+                self._tray_icon.show_balloon(
+                    "Instant Replay", f"Start it with {TOGGLE_REPLAY_HOTKEY} first"
+                )
+            return
         try:
-            with pyaudio.PyAudio() as p:
-                try:
-                    wasapi_info = p.get_host_api_info_by_type(pyaudio.paWASAPI)
-                except OSError:
-                    print("Error: WASAPI is not supported.")
-                    return
+            # Linking the segments is instant; joining them runs in the background
+            clip_dir, seconds = self.replay_buffer.snapshot()
+        except OSError as e:
+            self.status_text.set(f"Could not save replay: {e}")
+            return
+        if not seconds:
+            rmtree(clip_dir, ignore_errors=True)
+            self.status_text.set("Instant replay has nothing buffered yet")
+            return
+
+        date_str = datetime.now().strftime("%d_%m_%y-%H_%M_%S")
+        extension = os.path.splitext(self.final_record_file)[1] or ".mp4"
+        output_file = os.path.join(
+            os.path.dirname(self.final_record_file), f"replay-{date_str}{extension}"
+        )
+        job = ReplayClipJob(self.ffmpeg_path, clip_dir, output_file)
+        self.status_text.set(f"Saving the last {seconds} s of replay...")
 
-                default_speakers = p.get_device_info_by_index(
-                    wasapi_info["defaultOutputDevice"]
+        def save():
+            filename = os.path.basename(output_file)
+            try:
+                job.run()
+            except Exception as e:
+                print(f"Saving replay clip failed: {e}")
+                self.master.after(
+                    0, lambda: self.status_text.set("Error saving replay clip")
+                )
+                return
+            self.master.after(
+                0, lambda: self.status_text.set(f"Replay clip saved: {filename}")
+            )
+            MessageBeep(MB_ICONASTERISK)
+            if self._tray_icon:
+                self.master.after(
+                    0,
+                    lambda: self._tray_icon.show_balloon(
+                        "Replay Saved", f"File: {filename}"
+                    ),
                 )
-                if not default_speakers["isLoopbackDevice"]:
-                    found = False
-                    for loopback in p.get_loopback_device_info_generator():
-                        if default_speakers["name"] in loopback["name"]:
-                            default_speakers = loopback
-                            found = True
-                            break
-                    if not found:
-                        print("Audio error: loopback device not found.")
-                        return
 
-                wave_file = wave.open(self.temp_audio_file, "wb")
-                try:
-                    wave_file.setnchannels(default_speakers["maxInputChannels"])
-                    wave_file.setsampwidth(pyaudio.get_sample_size(pyaudio.paInt16))
-                    wave_file.setframerate(int(default_speakers["defaultSampleRate"]))
-
-                    def callback(in_data, frame_count, time_info, status):
-                        try:
-                            wave_file.writeframes(in_data)
-                        except Exception as e:
-                            print(f"Audio write error: {e}")
-                        return (in_data, pyaudio.paContinue)
-
-                    with p.open(
-                        format=pyaudio.paInt16,
-                        channels=default_speakers["maxInputChannels"],
-                        rate=int(default_speakers["defaultSampleRate"]),
-                        frames_per_buffer=512,
-                        input=True,
-                        input_device_index=default_speakers["index"],
-                        stream_callback=callback,
-                    ) as stream:
-                        while self.is_recording:
-                            time.sleep(0.1)
-                finally:
-                    wave_file.close()
+        Thread(target=save, daemon=True).start()
+
+    def _show_record_menu(self, event):
+        """Right-click menu of the record button: instant replay"""
+        menu = tk.Menu(
+            self.master,
+            tearoff=0,
+            bg=SECONDARY_BG,
+            fg=TEXT_COLOR_W,
+            activebackground=ACCENT_GREEN,
+            activeforeground=TEXT_COLOR_B,
+            selectcolor=TEXT_COLOR_W,
+        )
+        replaying = self.is_recording and self.replay_buffer is not None
+        menu.add_command(
+            label="Stop Instant Replay" if replaying else "Start Instant Replay",
+            accelerator=TOGGLE_REPLAY_HOTKEY.replace(" ", ""),
+            command=self._toggle_instant_replay,
+            state="normal" if replaying or not self.is_recording else "disabled",
+        )
+        menu.add_command(
+            label="Save Replay Clip",
+            accelerator=SAVE_REPLAY_HOTKEY.replace(" ", ""),
+            command=self._save_replay_clip,
+            state="normal" if replaying else "disabled",
+        )
+        menu.add_separator()
+        for option in REPLAY_MINUTES_OPTIONS:
+            menu.add_radiobutton(
+                label=f"Keep last {option} min",
+                variable=self.replay_minutes,
+                value=option,
+            )
+        try:
+            menu.tk_popup(event.x_root, event.y_root)
+        finally:
+            menu.grab_release()
+
+    def _close_loopback_capture(self):
+        """Release the loopback device and its feed, return the feed's stats"""
+        capture, self.loopback_capture = self.loopback_capture, None
+        if not capture:
+            return None
+        try:
+            capture.close()
         except Exception as e:
             print(f"Audio recording error: {e}")
+        stats = capture.feed.stats()
+        print(format_audio_feed_stats(stats))
+        return stats
 
     def _stop_recording(self):
         self.is_recording = False
+        self.ui_bus.discard("ffmpeg_output")
+        self.ui_bus.discard("recording_status")
+        self.ui_bus.discard("tray_tip")
+        if self._tray_icon:
+            self._tray_icon.set_tip("")
         if hasattr(self, "original_title"):
             self.master.title(self.original_title)
 
@@ -3984,6 +5402,8 @@ class VideoConverterApp:
 
         if not self.recording_process:
             # Timer was cancelled before FFmpeg started — just reset UI
+            self._close_loopback_capture()
+            self._release_replay_buffer()
             self.screen_record_button.configure(
                 text="Screen Record", fg_color=ACCENT_GREY, hover_color=HOVER_GREY
             )
@@ -4006,15 +5426,27 @@ class VideoConverterApp:
     def _finalize_recording(self):
         try:
             # Wait for process to finish
+            killed = False
             try:
                 self.recording_process.wait(timeout=5)
             except subprocess.TimeoutExpired:
                 self.recording_process.kill()
-
-            # Ensure audio thread is finished
-            if hasattr(self, "audio_thread") and self.audio_thread:
-                self.audio_thread.join(timeout=2)
-                self.audio_thread = None
+                self.recording_process.wait()
+                killed = True
+
+            # ffmpeg has read its last audio, release the loopback device
+            audio_stats = self._close_loopback_capture()
+            replay = self.replay_buffer is not None
+            if self._recording_monitor:
+                # Let the monitor read ffmpeg's last progress block
+                self._recording_monitor.join(2)
+                self._recording_monitor = None
+            if replay:
+                # Clips already saved keep their own links to the segments
+                self._release_replay_buffer()
+            else:
+                # A killed ffmpeg can leave a torn last fragment
+                self.recording_journal.end(self.final_record_file, interrupted=killed)
 
             self.recording_process = None
             self.master.after(
@@ -4024,77 +5456,36 @@ class VideoConverterApp:
                 ),
             )
 
+            if replay:
+                self.master.after(
+                    0, lambda: self.status_text.set("Instant replay stopped")
+                )
+                self.master.after(0, lambda: self.ffmpeg_output.set(""))
+                return
+
             # --- CHECK: Ensure video file was actually created ---
             if (
-                not os.path.exists(self.temp_video_file)
-                or os.path.getsize(self.temp_video_file) == 0
+                not os.path.exists(self.final_record_file)
+                or os.path.getsize(self.final_record_file) == 0
             ):
                 raise Exception(
                     "FFmpeg failed to generate the video file. Check encoder settings."
                 )
 
-            self.master.after(
-                0, lambda: self.status_text.set("Muxing audio and video...")
-            )
-            self.master.after(
-                0,
-                lambda: self.ffmpeg_output.set(
-                    "Muxing audio and video... please wait."
-                ),
-            )
-
-            startupinfo = None
-            creationflags = 0
-            if os.name == "nt":
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                startupinfo.wShowWindow = subprocess.SW_HIDE
-                creationflags = subprocess.CREATE_NO_WINDOW
-
-            has_audio = (
-                getattr(self, "audio_option", None)
-                and self.audio_option.get() != "disable"
-                and os.path.exists(getattr(self, "temp_audio_file", ""))
-                and os.path.getsize(self.temp_audio_file) > 100
-            )
-
-            if has_audio:
-                mux_cmd = [
-                    self.ffmpeg_path,
-                    "-y",
-                    "-i",
-                    self.temp_video_file,
-                    "-i",
-                    self.temp_audio_file,
-                    "-c:v",
-                    "copy",
-                ]
-                # Apply user's Audio Settings (codec, bitrate)
-                self._append_audio_options(mux_cmd)
-                mux_cmd.extend(
-                    ["-map", "0:v:0", "-map", "1:a:0", self.final_record_file]
-                )
-
-                # Run muxing and check for success
-                result = subprocess.run(
-                    mux_cmd, startupinfo=startupinfo, creationflags=creationflags
-                )
-                if result.returncode != 0 or not os.path.exists(self.final_record_file):
-                    raise Exception("Failed to mux audio and video streams.")
-            else:
-                move(self.temp_video_file, self.final_record_file)
-
-            # Cleanup
-            for f in [self.temp_video_file, self.temp_audio_file]:
-                try:
-                    if os.path.exists(f):
-                        os.remove(f)
-                except Exception:
-                    pass
-
-            self.master.after(
-                0, lambda: self.status_text.set("Screen recording stopped")
+            summary = self.capture_stats.write(
+                capture_stats_file(self.final_record_file), audio_stats
             )
+            print(format_capture_stats(summary))
+
+            status = "Screen recording stopped"
+            problems = []
+            if summary["drop"]:
+                problems.append(f"{summary['drop']} frames dropped")
+            if audio_stats and audio_stats["overflows"]:
+                problems.append(f"{audio_stats['dropped']:.2f} s of audio dropped")
+            if problems:
+                status += f" ({', '.join(problems)}, see the .stats.json file)"
+            self.master.after(0, lambda: self.status_text.set(status))
             filename = os.path.basename(getattr(self, "final_record_file", "output"))
             self.master.after(0, lambda: self.ffmpeg_output.set(f"Saved to {filename}"))
 
@@ -4115,21 +5506,39 @@ class VideoConverterApp:
             )
             self.master.after(0, lambda msg=str(e): self.ffmpeg_output.set(msg))
 
-    def _monitor_recording(self):
-        """Monitor the recording process output"""
-        while self.is_recording and self.recording_process:
-            try:
-                line = self.recording_process.stdout.readline()
-                if not line:
-                    break
-
-                if self.is_recording:  # Check again in case it changed
-                    self.master.after(
-                        0, lambda l=line: self.ffmpeg_output.set(l.strip())
+    def _monitor_recording(self, process, stats):
+        """Parse the recording output into capture statistics until ffmpeg exits"""
+        try:
+            # Read to the end so the final counters reach the stats file
+            for line in process.stdout:
+                # Log lines are kept in stats.log for the stats file
+                stats.feed(line)
+                if not self.is_recording:  # Check again in case it changed
+                    continue
+                capture = self.loopback_capture
+                audio = capture.feed.stats() if capture else None
+                snapshot = stats.poll(audio)
+                if not snapshot:
+                    continue
+                self.ui_bus.post(
+                    "ffmpeg_output",
+                    self.ffmpeg_output.set,
+                    format_capture_stats(snapshot),
+                )
+                if audio:
+                    self.ui_bus.post(
+                        "recording_status",
+                        self.status_text.set,
+                        format_audio_feed_stats(audio),
                     )
-
-            except Exception:
-                break
+                if self._tray_icon:
+                    self.ui_bus.post(
+                        "tray_tip",
+                        self._tray_icon.set_tip,
+                        format_capture_stats(snapshot, short=True),
+                    )
+        except Exception:
+            pass
 
         # If we get here and still recording, process ended unexpectedly
         if self.is_recording:
@@ -4170,8 +5579,6 @@ class VideoConverterApp:
             self._cancel_preview()
             return
 
-        self.preview_process = None
-
         if self.trim_streamcopy.get():
             messagebox.showerror("Error", "Preview is not available in Streamcopy mode")
             return
@@ -4194,17 +5601,12 @@ class VideoConverterApp:
             messagebox.showerror("Error", "Could not get video duration")
             return
 
-        # Calculate video midpoint
+        # Sample points (the midpoint for a single sample)
         duration = self.total_duration
-        mid_point = max(0, (duration - 10) / 2)
+        points = preview_sample_points(duration, int(self.preview_samples.get()))
 
-        # Create temporary files
         input_path = self.input_file.get()
         base_name = os.path.splitext(os.path.basename(input_path))[0]
-        temp_dir = tempfile.gettempdir()
-
-        # Clean up previous temporary files
-        self._cleanup_preview_files()
 
         # Get input file extension
         input_ext = os.path.splitext(input_path)[1] or ".mp4"
@@ -4215,94 +5617,17 @@ class VideoConverterApp:
         if not output_ext:
             output_ext = input_ext
 
-        # Temporary file for streamcopy (use input file extension)
-        temp_streamcopy = os.path.join(
-            temp_dir, f"{base_name}_streamcopy10s{input_ext}"
-        )
-        self.preview_temp_files.append(temp_streamcopy)
-
-        # Temporary file for encoded preview (use output file extension if specified, otherwise input extension)
-        temp_encoded = os.path.join(temp_dir, f"{base_name}_encoded10s{output_ext}")
-        self.preview_temp_files.append(temp_encoded)
-
-        # Command to create streamcopy
-        streamcopy_cmd = [
-            self.ffmpeg_path,
-            "-ss",
-            str(mid_point),
-            "-i",
-            input_path,
-            "-map",
-            "0",
-            "-ignore_unknown",
-            "-t",
-            "10",
-            "-c",
-            "copy",
-            "-y",
-            temp_streamcopy,
-        ]
-
-        # Execute streamcopy
-        try:
-            subprocess.run(
-                streamcopy_cmd, check=True, creationflags=subprocess.CREATE_NO_WINDOW
-            )
-        except subprocess.CalledProcessError as e:
-            messagebox.showerror("Error", f"Streamcopy failed: {e}")
-            return
-
         # Build encoding command
         try:
-            # if custom command exists
-            if self.custom_command is not None:
-                encode_cmd = self.custom_command.copy()
-
-                # Remove any existing -ss and -to parameters from custom command
-                filtered_cmd = []
-                i = 0
-                while i < len(encode_cmd):
-                    if encode_cmd[i] in ["-ss", "-to"]:
-                        i += 2  # Skip the parameter and its value
-                    else:
-                        filtered_cmd.append(encode_cmd[i])
-                        i += 1
-                encode_cmd = filtered_cmd
-
-                # Replace input file and output file
-                try:
-                    i_index = encode_cmd.index("-i")
-                    if i_index + 1 < len(encode_cmd):
-                        encode_cmd[i_index + 1] = temp_streamcopy
-                except ValueError:
-                    encode_cmd.extend(["-i", temp_streamcopy])
-
-                if len(encode_cmd) > 0:
-                    encode_cmd[-1] = temp_encoded
-            else:
-                # Build command using GUI settings but remove trim options
-                original_input = self.input_file.get()
-                original_output = self.output_file.get()
-
-                self.input_file.set(temp_streamcopy)
-                self.output_file.set(temp_encoded)
-
-                # Build the command and remove -ss and -to parameters
-                encode_cmd = self._build_ffmpeg_command(preview=True)
-
-                # Remove any -ss and -to parameters from the built command
-                filtered_cmd = []
-                i = 0
-                while i < len(encode_cmd):
-                    if encode_cmd[i] in ["-ss", "-to"]:
-                        i += 2  # Skip the parameter and its value
-                    else:
-                        filtered_cmd.append(encode_cmd[i])
-                        i += 1
-                encode_cmd = filtered_cmd
-
-                self.input_file.set(original_input)
-                self.output_file.set(original_output)
+            # Build command for the source (custom command or GUI settings)
+            # and remove trim options, each sample seeks the source itself
+            encode_cmd = strip_trim_options(
+                self._build_ffmpeg_command(
+                    preview=True,
+                    input_f=input_path,
+                    output_f=f"preview{output_ext}",
+                )
+            )
 
             # Add -map 0 after -i for preview encoding if not already present
             # and if user didn't manually add -map in additional options
@@ -4328,9 +5653,58 @@ class VideoConverterApp:
                 except ValueError:
                     pass
 
+            if not self._command_supported(encode_cmd):
+                return
+
+            # Same source, position and settings: reuse the earlier encode
+            samples = []
+            for point in points:
+                sample_cmd = with_input_seek(encode_cmd, point, PREVIEW_LENGTH)
+                key = preview_cache_key(sample_cmd, input_path, point, PREVIEW_LENGTH)
+                output_path = self.preview_cache.get(key)
+                if output_path is None:
+                    output_path = self.preview_cache.path_for(
+                        key, base_name, output_ext
+                    )
+                    sample_cmd[-1] = output_path
+                else:
+                    sample_cmd = None
+                samples.append(
+                    {
+                        "start": point,
+                        "length": min(PREVIEW_LENGTH, duration - point),
+                        "key": key,
+                        "command": sample_cmd,
+                        "output": output_path,
+                    }
+                )
+
+            join = None
+            if len(samples) > 1 and self.preview_join.get():
+                join_key = sha1(
+                    "".join(sample["key"] for sample in samples).encode("utf-8")
+                ).hexdigest()[:16]
+                join = {"key": join_key, "output": self.preview_cache.get(join_key)}
+
+            if all(sample["command"] is None for sample in samples) and (
+                join is None or join["output"]
+            ):
+                measure_preview_samples(samples)
+                self._show_preview_result(samples, join, duration, cached=True)
+                return
+
+            if join is not None and not join["output"]:
+                join["output"] = self.preview_cache.path_for(
+                    join["key"], base_name, output_ext
+                )
+                join["new"] = True
+
             # Start preview encoding with progress
             self.is_creating_preview = True
-            self.status_text.set("Creating 10-second preview...")
+            if len(samples) > 1:
+                self.status_text.set(f"Creating {len(samples)} preview samples...")
+            else:
+                self.status_text.set("Creating 10-second preview...")
             self.ffmpeg_output.set("Starting preview encoding...")
             self.progress_value.set(0.0)
             self.progress_label.configure(text="0%")
@@ -4342,8 +5716,14 @@ class VideoConverterApp:
             )
 
             # Start encoding in separate thread
+            self.preview_job = PreviewSampler(
+                self.ffmpeg_path,
+                samples,
+                join["output"] if join and join.get("new") else None,
+            )
             preview_thread = Thread(
-                target=self._run_preview_encoding, args=(encode_cmd, temp_encoded)
+                target=self._run_preview_job,
+                args=(self.preview_job, samples, join, duration),
             )
             preview_thread.daemon = True
             preview_thread.start()
@@ -4352,6 +5732,35 @@ class VideoConverterApp:
             messagebox.showerror("Error", f"Preview encoding failed: {e}")
             self.is_creating_preview = False
 
+    def _show_preview_menu(self, event):
+        """Right-click menu of the preview button: sample points and joining"""
+        menu = tk.Menu(
+            self.master,
+            tearoff=0,
+            bg=SECONDARY_BG,
+            fg=TEXT_COLOR_W,
+            activebackground=ACCENT_GREEN,
+            activeforeground=TEXT_COLOR_B,
+            selectcolor=TEXT_COLOR_W,
+        )
+        labels = {
+            "1": "Midpoint (1 sample)",
+            "3": "3 samples (17/50/83%)",
+            "5": "5 samples (10/30/50/70/90%)",
+        }
+        for option in PREVIEW_SAMPLE_OPTIONS:
+            menu.add_radiobutton(
+                label=labels[option], variable=self.preview_samples, value=option
+            )
+        menu.add_separator()
+        menu.add_checkbutton(
+            label="Join samples into one file", variable=self.preview_join
+        )
+        try:
+            menu.tk_popup(event.x_root, event.y_root)
+        finally:
+            menu.grab_release()
+
     # INPUT & DROP HANDLING
     def _handle_dropped_file(self, file_path):
         # run another thread
@@ -4436,6 +5845,8 @@ class VideoConverterApp:
 
         # Valid file: show tooltip
         if getattr(self, "input_file_tooltip", None) is None:
+            from CTkToolTip import CTkToolTip
+
             self.input_file_tooltip = CTkToolTip(
                 self.input_file_entry,
                 delay=0.5,
@@ -4460,6 +5871,46 @@ class VideoConverterApp:
             daemon=True,
         ).start()
 
+        # Keyframe index and filmstrip for the trim slider
+        Thread(target=self._index_input_file, args=(input_file,), daemon=True).start()
+
+    def _index_input_file(self, file_path):
+        if not os.path.isfile(file_path):
+            return
+        if not getattr(self, "ffmpeg_path", None) or not self.ffprobe_path:
+            return
+        try:
+            duration = self.metadata.probe(file_path, self.ffprobe_path).duration
+            self.keyframes.build(self.ffprobe_path, file_path)
+            self.ui_bus.post("keyframes", self._on_input_indexed, file_path)
+        except Exception as e:
+            print(f"Error indexing keyframes: {e}")
+            return
+        try:
+            if self.filmstrips.build(self.ffmpeg_path, file_path, duration):
+                self.ui_bus.post("filmstrip", self._on_input_indexed, file_path)
+        except Exception as e:
+            print(f"Error building filmstrip: {e}")
+
+    def _on_input_indexed(self, file_path):
+        if file_path == self.input_file.get():
+            self._update_trim_slider()
+
+    def _input_keyframes(self, input_f=None):
+        """Keyframe positions from the start of the input, if it is indexed"""
+        input_f = input_f or self.input_file.get()
+        if not input_f or input_f.startswith("Drag and drop"):
+            return None
+        keyframes = self.keyframes.get_cached(input_f)
+        info = self.metadata.get_cached(input_f)
+        if not keyframes or info is None:
+            return None
+        if self._keyframe_positions[0] is not keyframes:
+            offset = info.start_time or 0.0
+            positions = [keyframe - offset for keyframe in keyframes]
+            self._keyframe_positions = (keyframes, positions)
+        return self._keyframe_positions[1]
+
     def _update_tooltip_async(self, file_path, generation, cancel_event):
         if cancel_event.is_set():
             return
@@ -4468,75 +5919,13 @@ class VideoConverterApp:
             self.master.after(0, lambda: self._set_tooltip_message("ffprobe not found"))
             return
 
-        if file_path in self.ffprobe_cache:
-            self.ffprobe_cache.move_to_end(file_path)
-            self.master.after(
-                0, lambda: self._set_tooltip_message(self.ffprobe_cache[file_path])
-            )
-            return
-
-        command = [self.ffprobe_path, "-hide_banner", file_path]
-
         try:
-            result = subprocess.run(
-                command,
-                capture_output=True,
-                text=True,
-                encoding="utf-8",
-                errors="replace",
-                timeout=10,
-                creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
-            )
-
-            if cancel_event.is_set():
-                return
-
-            # ffprobe output is usually in stderr
-            output = (result.stderr or "").strip()
-            if not output:
-                output = (result.stdout or "").strip()
-
-            # Filter out verbose metadata tags and chapters to keep tooltip compact
-            if output:
-                lines = output.splitlines()
-                filtered = []
-                metadata_indent = -1
-                chapters_indent = -1
-                for line in lines:
-                    stripped = line.strip()
-                    indent = len(line) - len(line.lstrip()) if stripped else 0
-
-                    # Detect "Metadata:" header and remember its indent level
-                    if stripped == "Metadata:":
-                        metadata_indent = indent
-                        continue
-                    # Inside a metadata block: skip lines indented deeper
-                    if metadata_indent >= 0:
-                        if stripped and indent > metadata_indent:
-                            continue
-                        # Line at same or lesser indent → metadata block ended
-                        metadata_indent = -1
-
-                    # Detect "Chapters:" header and remember its indent level
-                    if stripped == "Chapters:":
-                        chapters_indent = indent
-                        continue
-                    # Inside a chapters block: skip lines indented deeper
-                    if chapters_indent >= 0:
-                        if stripped and indent > chapters_indent:
-                            continue
-                        chapters_indent = -1
-
-                    filtered.append(line)
-                output = "\n".join(filtered).strip()
-
-            # Limit cache to 50 entries
-            if len(self.ffprobe_cache) >= 50:
-                self.ffprobe_cache.popitem(last=False)
-            self.ffprobe_cache[file_path] = output
+            output = self.metadata.probe(
+                file_path, self.ffprobe_path, timeout=10
+            ).describe()
 
             # Check if this thread is still the latest one
-            if self._tooltip_generation == generation:
+            if not cancel_event.is_set() and self._tooltip_generation == generation:
                 self.master.after(0, lambda: self._set_tooltip_message(output))
         except subprocess.TimeoutExpired:
             if self._tooltip_generation == generation:
@@ -4758,6 +6147,7 @@ class VideoConverterApp:
                 self.ffprobe_path = ffprobe_path
             else:
                 self.ffprobe_path = None
+            self._probe_ffmpeg_capabilities()
 
     # LOAD AND SAVE SETTINGS
     def _find_executable(self, name):
@@ -4831,35 +6221,7 @@ class VideoConverterApp:
         if not input_file or input_file.startswith("Drag and drop"):
             return 0
 
-        # Check cache first
-        if input_file in self.video_metadata_cache:
-            duration = self.video_metadata_cache[input_file]
-        else:
-            command = [
-                self.ffprobe_path,
-                "-v",
-                "error",
-                "-show_entries",
-                "format=duration",
-                "-of",
-                "default=noprint_wrappers=1:nokey=1",
-                input_file,
-            ]
-
-            try:
-                result = subprocess.run(
-                    command,
-                    check=True,
-                    capture_output=True,
-                    text=True,
-                    encoding="utf-8",
-                    errors="replace",
-                    creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
-                )
-                duration = float(result.stdout.strip())
-                self.video_metadata_cache[input_file] = duration
-            except Exception:
-                duration = 0
+        duration = self._probe_duration(input_file)
 
         # Update instance variable and UI if requested
         self.total_duration = duration
@@ -4869,354 +6231,98 @@ class VideoConverterApp:
 
         return duration
 
+    def _probe_duration(self, input_file):
+        """Get duration of any file without touching the GUI (thread-safe)"""
+        try:
+            return self.metadata.probe(input_file, self.ffprobe_path).duration
+        except Exception:
+            return 0
+
     def _get_video_resolution(self, file_path):
         """Return (width, height) of video or (None, None) on error."""
         if not self.ffprobe_path or not file_path:
             return None, None
-        cmd = [
-            self.ffprobe_path,
-            "-v",
-            "error",
-            "-select_streams",
-            "v:0",
-            "-show_entries",
-            "stream=width,height",
-            "-of",
-            "csv=p=0",
-            file_path,
-        ]
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                encoding="utf-8",
-                errors="replace",
-                check=True,
-                creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
-                timeout=10,
-            )
-            output = result.stdout.strip()
-            if output and "," in output:
-                w, h = output.split(",")
-                return int(w), int(h)
+            info = self.metadata.probe(file_path, self.ffprobe_path)
+            return info.width, info.height
         except Exception:
-            pass
-        return None, None
-
-    def _build_ffmpeg_command(self, preview=False):
-        if self.custom_command is not None:
-            if preview:
-                command = self.custom_command.copy()
-                try:
-                    i_index = command.index("-i")
-                    if i_index + 1 < len(command):
-                        command[i_index + 1] = self.input_file.get()
-                except ValueError:
-                    pass
-
-                if len(command) > 0:
-                    command[-1] = self.output_file.get()
-                return command
-            else:
-                return self.custom_command
-
-        # Use custom path if specified, otherwise use found path
-        ffmpeg_path = (
-            self.ffmpeg_custom_path.get()
-            if self.ffmpeg_custom_path.get()
-            and self.ffmpeg_custom_path.get() != self.ffmpeg_path_placeholder
-            else self.ffmpeg_path
-        )
-        if not ffmpeg_path:
-            raise ValueError("FFmpeg path is not specified")
-
-        input_f = self.input_file.get()
-        if not self.output_file.get():
-            raise ValueError("Please set an output file")
-        output_f = self.output_file.get()
-
-        if not input_f or not output_f:
-            raise ValueError("Please fill in all main fields.")
-
-        # Basic command structure
-        command = [ffmpeg_path, "-hide_banner"]
-
-        # Handle Streamcopy option
-        if self.trim_streamcopy.get():
-            # Extract trim options from additional_options if not in precise mode
-            trim_options = []
-            other_additional_options = []
-
-            if not self.precise_trim.get():
-                add_val = self.additional_options.get().strip()
-                if add_val and add_val != self.additional_options_placeholder:
-                    # Split the additional options string
-                    parts = add_val.split()
-                    i = 0
-                    while i < len(parts):
-                        if parts[i] == "-ss" and i + 1 < len(parts):
-                            trim_options.extend([parts[i], parts[i + 1]])
-                            i += 2
-                        elif parts[i] == "-to" and i + 1 < len(parts):
-                            trim_options.extend([parts[i], parts[i + 1]])
-                            i += 2
-                        else:
-                            other_additional_options.append(parts[i])
-                            i += 1
-            else:
-                # In precise mode, use all additional options as-is
-                add_val = self.additional_options.get().strip()
-                if add_val and add_val != self.additional_options_placeholder:
-                    other_additional_options.extend(add_val.split())
-
-            # Add trim options at the beginning if we have any
-            if trim_options:
-                command.extend(trim_options)
-
-            command.extend(["-y", "-i", input_f])
-
-            if "-map" not in other_additional_options:
-                command.extend(["-map", "0", "-ignore_unknown"])
-
-            # Add other additional options (excluding trim options that were already added)
-            if other_additional_options:
-                command.extend(other_additional_options)
-
-            # Video stream copy
-            command.extend(["-c:v", "copy"])
-
-            # Audio handling
-            self._append_audio_options(command)
-
-            command.append(output_f)
-            return command
-
-        # Initialize variables for trim options and other additional options
-        trim_options = []
-        other_additional_options = []
-
-        # Extract trim options from additional_options if not in precise mode
-        if not self.precise_trim.get() and not self.trim_streamcopy.get():
-            add_val = self.additional_options.get().strip()
-            if add_val and add_val != self.additional_options_placeholder:
-                # Split the additional options string
-                parts = add_val.split()
-                i = 0
-                while i < len(parts):
-                    if parts[i] == "-ss" and i + 1 < len(parts):
-                        trim_options.extend([parts[i], parts[i + 1]])
-                        i += 2
-                    elif parts[i] == "-to" and i + 1 < len(parts):
-                        trim_options.extend([parts[i], parts[i + 1]])
-                        i += 2
-                    else:
-                        other_additional_options.append(parts[i])
-                        i += 1
-        else:
-            # In precise mode or when additional options are disabled, use all additional options as-is
-            if self.enable_additional_options.get():
-                add_val = self.additional_options.get().strip()
-                if add_val and add_val != self.additional_options_placeholder:
-                    other_additional_options.extend(add_val.split())
-
-        # Add trim options at the beginning if we have any
-        if trim_options:
-            command.extend(trim_options)
-
-        # Continue with hardware acceleration and threads
-        if self.hwaccel.get() != "auto":
-            command.extend(["-hwaccel:v", self.hwaccel.get()])
-            if self.hwaccel.get() == "cuda" and self.cuda_output_format.get():
-                command.extend(["-hwaccel_output_format:v", "cuda"])
-
-        if self.threads.get() != "auto":
-            command.extend(["-threads", self.threads.get()])
-
-        command.extend(["-y", "-i", input_f])
+            return None, None
 
-        if "-map" not in other_additional_options:
-            command.extend(["-map", "0", "-ignore_unknown"])
+    def _get_ffmpeg_executable(self):
+        """Return the custom FFmpeg path if set, otherwise the detected one"""
+        custom_path = self.ffmpeg_custom_path.get()
+        if custom_path and custom_path != self.ffmpeg_path_placeholder:
+            return custom_path
+        return self.ffmpeg_path
+
+    def _probe_ffmpeg_capabilities(self):
+        """List what the selected ffmpeg build supports (once per binary version)"""
+        ffmpeg_path = self._get_ffmpeg_executable()
+        if not ffmpeg_path or not os.path.isfile(ffmpeg_path):
+            return
 
-        # Normal encoding path
-        if self.constant_qp_mode.get():
-            # Constant QP mode
-            quality_val = self.quality_level.get()
-            try:
-                quality_int = int(quality_val)
-                if not (0 <= quality_int <= 51):
-                    raise ValueError("Quality level must be between 0 and 51")
-            except ValueError:
-                raise ValueError("Quality level must be a number between 0 and 51")
-        else:
-            # Normal VBR/CBR mode
-            bitrate_val = self.bitrate.get()
+        def probe():
             try:
-                bitrate_int = int(bitrate_val)
-                maxrate_val = (bitrate_int * 12 + 9) // 10
-                bufsize_val = maxrate_val * 2
-            except ValueError:
-                raise ValueError("Video bitrate must be a number.")
-
-        vf_filters = []
-        fps_num = self.fps_option.get()
-        if fps_num == "custom":
-            fps_num = self.custom_fps.get()
-            if not fps_num:
-                raise ValueError("Please specify custom FPS.")
-        if fps_num != "source":
-            vf_filters.append(f"fps={fps_num}")
-        scale_width = self.video_format_option.get()
-        if scale_width == "custom":
-            scale_width = self.custom_video_width.get()
-            if not scale_width:
-                raise ValueError("Please specify custom video width.")
-        if scale_width != "source":
-            interp_flag = self.interpolation_algo.get()
-            vf_filters.append(f"scale={scale_width}:-2:flags={interp_flag}")
-
-        addvf_val = self.additional_filter_options.get().strip()
-        if addvf_val and addvf_val != self.additional_filter_options_placeholder:
-            vf_filters.append(addvf_val)
-
-        # Skip -vf if user specified -filter_complex in Additional Options
-        has_filter_complex = "-filter_complex" in (other_additional_options or [])
-
-        if vf_filters and not has_filter_complex:
-            command.extend(["-vf", ",".join(vf_filters)])
-
-        if self.fps_mode.get() != "auto":
-            command.extend(["-fps_mode", self.fps_mode.get()])
-
-        # Add encoder settings based on mode
-        codec_map = {"hevc": "hevc_nvenc", "av1": "av1_nvenc"}
-        command.extend(["-c:v", "copy", "-c:v:0", codec_map.get(self.video_codec.get(), "h264_nvenc")])
-
-        if self.preset.get() != "auto":
-            command.extend(["-preset:v", self.preset.get()])
-
-        if self.tune.get() != "auto":
-            command.extend(["-tune:v", self.tune.get()])
-
-        if self.profile.get() != "auto" and self.video_codec.get() != "av1":
-            command.extend(["-profile:v", self.profile.get()])
-
-        if self.level.get() != "auto":
-            command.extend(["-level:v", self.level.get()])
-
-        if self.video_codec.get() in ("hevc", "av1"):
-            if self.tier.get() != "auto":
-                command.extend(["-tier:v", self.tier.get()])
-        else:
-            if self.coder.get() != "auto":
-                command.extend(["-coder:v", self.coder.get()])
-
-        if self.multipass.get() != "auto":
-            command.extend(["-multipass:v", self.multipass.get()])
-
-        if self.lookahead_level.get() != "auto":
-            command.extend(["-lookahead_level:v", self.lookahead_level.get()])
-
-        if self.video_codec.get() in ("hevc", "av1"):
-            if self.split_encode_mode.get() != "auto":
-                command.extend(["-split_encode_mode:v", self.split_encode_mode.get()])
-
-        if self.spatial_aq.get():
-            command.extend(["-spatial_aq:v", "1"])
-
-        if self.temporal_aq.get():
-            command.extend(["-temporal_aq:v", "1"])
-
-        if self.strict_gop.get():
-            command.extend(["-strict_gop:v", "1"])
-
-        if self.no_scenecut.get():
-            command.extend(["-no-scenecut:v", "1"])
-
-        if self.weighted_pred.get():
-            command.extend(["-weighted_pred:v", "1", "-bf", "0"])
-
-        # Add rate control parameters based on mode
-        if self.constant_qp_mode.get():
-            command.extend(["-rc:v", "constqp", "-qp:v", quality_val])
-        else:
-            command.extend(
-                [
-                    "-rc:v",
-                    self.rc.get(),
-                    "-b:v",
-                    f"{bitrate_val}k",
-                    "-maxrate:v",
-                    f"{maxrate_val}k",
-                    "-bufsize:v",
-                    f"{bufsize_val}k",
-                ]
+                build = self.capabilities.probe(ffmpeg_path)
+            except Exception as e:
+                print(f"FFmpeg capability probe failed: {e}")
+                return
+            print(f"FFmpeg {build.version} ({ffmpeg_path})")
+            missing = [
+                encoder
+                for encoder in ("h264_nvenc", "hevc_nvenc", "av1_nvenc")
+                if encoder not in build.encoders
+            ]
+            if not build.cuda_scaling:
+                missing.append("CUDA scaling")
+            if missing:
+                print(f"This FFmpeg build lacks: {', '.join(missing)}")
+
+        Thread(target=probe, daemon=True).start()
+
+    def _command_supported(self, command):
+        """Tell the user and return False if the ffmpeg build cannot run a command"""
+        build = self.capabilities.get_cached(command[0] if command else None)
+        if build is None:
+            # Not probed yet, ffmpeg reports the problem itself
+            return True
+        missing = build.missing(command)
+        if missing:
+            messagebox.showerror(
+                "Error",
+                f"This FFmpeg build ({build.version}) does not support:\n"
+                + "\n".join(missing),
             )
+            return False
+        return True
 
-        # Add other additional options (excluding trim options that were already added)
-        if other_additional_options:
-            command.extend(other_additional_options)
-
-        # Add audio filters if any
-        add_af_val = self.additional_audio_filter_options.get().strip()
-        if (
-            add_af_val
-            and add_af_val != self.additional_audio_filter_options_placeholder
-        ):
-            command.extend(["-af", add_af_val])
+    def _get_encode_settings(self):
+        """Snapshot the command builder settings (must run on the Tk thread)"""
+        settings = self._get_current_settings()
+        settings["enable_additional_options"] = self.enable_additional_options.get()
+        return make_encode_settings(settings)
 
-        # Audio settings
-        self._append_audio_options(command)
+    def _build_ffmpeg_command(self, preview=False, input_f=None, output_f=None):
+        if input_f is None:
+            input_f = self.input_file.get()
+        if output_f is None:
+            output_f = self.output_file.get()
 
-        command.append(output_f)
+        if self.custom_command is not None:
+            if preview:
+                return retarget_command(self.custom_command, input_f, output_f)
+            else:
+                return self.custom_command
 
-        # Post-process: target video encoder options to the first video stream (:v:0)
-        # to avoid applying them to copied streams (like cover art/attached pics).
-        v0_targets_with_v = {
-            "-preset:v", "-tune:v", "-profile:v", "-level:v", "-tier:v", "-coder:v",
-            "-multipass:v", "-lookahead_level:v", "-split_encode_mode:v", "-spatial_aq:v",
-            "-temporal_aq:v", "-strict_gop:v", "-no-scenecut:v", "-weighted_pred:v",
-            "-rc:v", "-qp:v", "-b:v", "-maxrate:v", "-bufsize:v"
-        }
-        v0_targets_no_v = {
-            "-bf"
-        }
-        for idx in range(len(command)):
-            if command[idx] in v0_targets_with_v:
-                command[idx] = command[idx] + ":0"
-            elif command[idx] in v0_targets_no_v:
-                command[idx] = command[idx] + ":v:0"
-
-        return command
-
-    def _append_audio_options(self, command):
-        """Append audio codec/bitrate flags to the command list."""
-        audio_opt = self.audio_option.get()
-        if audio_opt == "disable":
-            command.append("-an")
-        elif audio_opt == "copy":
-            command.extend(["-c:a", "copy"])
-        elif audio_opt == "aac_96k":
-            command.extend(["-c:a", "aac", "-b:a", "96k"])
-        elif audio_opt == "aac_160k":
-            command.extend(["-c:a", "aac", "-b:a", "160k"])
-        elif audio_opt == "aac_256k":
-            command.extend(["-c:a", "aac", "-b:a", "256k"])
-        elif audio_opt == "opus_96k":
-            command.extend(["-c:a", "libopus", "-b:a", "96k"])
-        elif audio_opt == "opus_160k":
-            command.extend(["-c:a", "libopus", "-b:a", "160k"])
-        elif audio_opt == "opus_256k":
-            command.extend(["-c:a", "libopus", "-b:a", "256k"])
-        elif audio_opt == "custom":
-            abitrate_val = self.custom_abitrate.get()
-            try:
-                int(abitrate_val)
-                command.extend(["-c:a", "aac", "-b:a", f"{abitrate_val}k"])
-            except ValueError:
-                raise ValueError("Custom audio bitrate must be a number.")
+        return build_ffmpeg_command(
+            self._get_ffmpeg_executable(),
+            self._get_encode_settings(),
+            input_f,
+            output_f,
+            self._input_keyframes(input_f),
+        )
 
-    def _run_ffmpeg(self, command):
+    def _run_ffmpeg(self, command, duration=0):
         startupinfo = None
         creationflags = 0
         if os.name == "nt":
@@ -5226,7 +6332,7 @@ class VideoConverterApp:
             creationflags = subprocess.CREATE_NO_WINDOW
         try:
             self.conversion_process = subprocess.Popen(
-                command,
+                with_progress_pipe(command),
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
                 text=True,
@@ -5237,6 +6343,7 @@ class VideoConverterApp:
                 errors="replace",
             )
             last_line = ""
+            progress = FFmpegProgress(duration)
             for line in self.conversion_process.stdout:
                 if not self.is_converting:
                     self.conversion_process.terminate()
@@ -5246,12 +6353,18 @@ class VideoConverterApp:
                         self.conversion_process.kill()
                     break
 
+                if progress.feed(line):
+                    snapshot = progress.poll()
+                    if snapshot:
+                        self.ui_bus.post("progress", self._update_progress, snapshot)
+                    continue
+
                 line = line.strip()
                 if line:
+                    # Log lines only, kept for the error report
                     last_line = line
-                    self.master.after(0, lambda l=line: self.ffmpeg_output.set(l))
-                    self.master.after(0, lambda l=line: self._update_progress(l))
             self.conversion_process.wait()
+            self.ui_bus.discard("progress")
             if self.conversion_process.returncode == 0:
                 self.master.after(
                     0, lambda: self.status_text.set("Conversion complete!")
@@ -5351,109 +6464,22 @@ class VideoConverterApp:
             )
             self.is_converting = False
 
-    def _run_ffprobe_for_size(
-        self, input_f, bitrate_int, audio_option, custom_abitrate
-    ):
-        command = [
-            self.ffprobe_path,
-            "-v",
-            "error",
-            "-show_entries",
-            "format=duration",
-            "-of",
-            "default=noprint_wrappers=1:nokey=1",
-            input_f,
-        ]
-        startupinfo = None
-        creationflags = 0
-        if os.name == "nt":
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            startupinfo.wShowWindow = subprocess.SW_HIDE
-            creationflags = subprocess.CREATE_NO_WINDOW
+    def _probe_for_size(self, input_f):
+        """Probe a file once for the size estimate, then recalculate from the cache"""
         try:
-            process = subprocess.Popen(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
-                startupinfo=startupinfo,
-                creationflags=creationflags,
-                encoding="utf-8",
-                errors="replace",
-            )
-            duration_str = process.stdout.read().strip()
-            process.wait()
-            if process.returncode == 0 and duration_str:
-                try:
-                    duration = float(duration_str)
-                    audio_bitrate_for_estimation = 160
-
-                    if audio_option == "custom":
-                        try:
-                            audio_bitrate_for_estimation = int(custom_abitrate)
-                        except ValueError:
-                            pass
-                    elif audio_option == "aac_256k" or audio_option == "opus_256k":
-                        audio_bitrate_for_estimation = 256
-                    elif audio_option == "aac_160k" or audio_option == "opus_160k":
-                        audio_bitrate_for_estimation = 160
-                    elif audio_option == "aac_96k" or audio_option == "opus_96k":
-                        audio_bitrate_for_estimation = 96
-                    elif audio_option == "disable":
-                        audio_bitrate_for_estimation = 0
-
-                    filesize_mb = (
-                        (bitrate_int + audio_bitrate_for_estimation)
-                        * duration
-                        / 8
-                        / 1024
-                    )
-                    self.master.after(
-                        0,
-                        lambda: self.estimated_file_size.set(
-                            f"Estimated size: {filesize_mb:.2f} MB"
-                        ),
-                    )
-                except ValueError:
-                    self.master.after(0, lambda: self.estimated_file_size.set(""))
-            else:
-                self.master.after(
-                    0,
-                    lambda: self.estimated_file_size.set(
-                        "Estimated size: Could not get duration"
-                    ),
-                )
-                self.master.after(
-                    0, lambda: self.status_text.set("Ready for conversion")
-                )
-        except FileNotFoundError:
-            self.master.after(
-                0, lambda: self.status_text.set("Error: ffprobe.exe not found.")
-            )
-            self.master.after(
-                0,
-                lambda: messagebox.showerror(
-                    "Error",
-                    "ffprobe.exe not found. Ensure it's in the program folder "
-                    "or system PATH.",
-                ),
-            )
+            self.metadata.probe(input_f, self.ffprobe_path)
+            self.master.after(0, lambda: self._on_size_probe_done(input_f))
         except Exception:
-            self.master.after(
-                0,
-                lambda: self.status_text.set(
-                    "Error estimating size: Could not get duration"
-                ),
-            )
-            self.master.after(
-                0,
-                lambda: messagebox.showerror(
-                    "Unexpected Error",
-                    "An unexpected error occurred during size estimation",
-                ),
-            )
+            self.master.after(0, lambda: self._on_size_probe_done(input_f, failed=True))
+
+    def _on_size_probe_done(self, input_f, failed=False):
+        self._size_probes_pending.discard(input_f)
+        if input_f != self.input_file.get():
+            return
+        if failed:
+            self.estimated_file_size.set("Estimated size: Could not get duration")
+        else:
+            self._calculate_estimated_size()
 
     # PROGRESS & UI UPDATES
     # App window position
@@ -5465,7 +6491,16 @@ class VideoConverterApp:
         y = 50
         self.master.geometry(f"+{x}+{y}")
 
+    def _schedule_size_estimate(self):
+        """Debounce size estimation while a field is being edited"""
+        if self._size_estimate_job is not None:
+            self.master.after_cancel(self._size_estimate_job)
+        self._size_estimate_job = self.master.after(
+            150, self._calculate_estimated_size
+        )
+
     def _calculate_estimated_size(self):
+        self._size_estimate_job = None
         if self.constant_qp_mode.get():
             self.estimated_file_size.set("Estimated size: Not available for CQP")
             return
@@ -5487,13 +6522,25 @@ class VideoConverterApp:
             self.estimated_file_size.set("")
             return
 
-        audio_opt = self.audio_option.get()
-        custom_ab = self.custom_abitrate.get()
+        info = self.metadata.get_cached(input_f)
+        if info is None:
+            # At most one background probe per file, the result lands in the cache
+            if input_f not in self._size_probes_pending:
+                self._size_probes_pending.add(input_f)
+                Thread(target=self._probe_for_size, args=(input_f,), daemon=True).start()
+            return
 
-        Thread(
-            target=self._run_ffprobe_for_size,
-            args=(input_f, bitrate_int, audio_opt, custom_ab),
-        ).start()
+        if info.duration <= 0:
+            self.estimated_file_size.set("Estimated size: Could not get duration")
+            return
+
+        audio_kbps = audio_kbps_for_estimate(
+            self.audio_option.get(),
+            self.custom_abitrate.get(),
+            info.audio_bit_rate // 1000,
+        )
+        filesize_mb = estimate_size_mb(info.duration, bitrate_int, audio_kbps)
+        self.estimated_file_size.set(f"Estimated size: {filesize_mb:.2f} MB")
 
     def _update_output_filename(self, *args):
         if self.input_file.get() and not self.input_file.get().startswith(
@@ -5545,10 +6592,29 @@ class VideoConverterApp:
             self.output_file.set(new_output)
 
     def _update_codec_settings(self):
-        current_tune = self.tune.get()
+        codec = self.video_codec.get()
+        if codec == "av1":
+            self.profile.set("")
+        else:
+            self.profile.set("main")
+
+        if codec not in ("hevc", "av1"):
+            # H.264 has no uhq tune and always uses the default lookahead
+            if self.tune.get() == "uhq":
+                self.tune.set("hq")
+            self.lookahead_level.set("auto")
+
+            self.custom_command = None
+            self._on_tune_changed()
+
+        self._update_codec_widgets()
+
+    def _update_codec_widgets(self):
+        """Show the encoder panel controls that apply to the selected codec"""
+        if self.encoder_options_frame is None:
+            return
         if self.video_codec.get() == "hevc":
             # HEVC settings
-            self.profile.set("main")
             self.tune_option_menu.configure(
                 values=["auto", "hq", "uhq", "ll", "ull", "lossless"]
             )
@@ -5590,7 +6656,6 @@ class VideoConverterApp:
 
         elif self.video_codec.get() == "av1":
             # AV1 settings
-            self.profile.set("")
             self.tune_option_menu.configure(
                 values=["auto", "hq", "uhq", "ll", "ull", "lossless"]
             )
@@ -5641,7 +6706,6 @@ class VideoConverterApp:
 
         else:
             # H.264 settings
-            self.profile.set("main")
             self.tune_option_menu.configure(
                 values=["auto", "hq", "ll", "ull", "lossless"]
             )
@@ -5680,9 +6744,6 @@ class VideoConverterApp:
                 ]
             )
 
-            if current_tune == "uhq":
-                self.tune.set("hq")
-
             self.coder_label.grid()
             self.coder_option_menu.grid()
             self.tier_label.grid_remove()
@@ -5694,21 +6755,19 @@ class VideoConverterApp:
 
             self.split_encode_label.grid_remove()
             self.split_encode_menu.grid_remove()
-            # Hide lookahead controls for H.264 and force -1
+            # Hide lookahead controls for H.264
             self.lookahead_level_label.grid_remove()
             self.lookahead_level_menu.grid_remove()
-            self.lookahead_level.set("auto")
-
-            self.custom_command = None
-            self._on_tune_changed()
 
     def _update_cuda_output_format_state(self):
         """Enables the CUDA Output Format checkbox only when cuda is selected."""
-        if self.hwaccel.get() == "cuda":
-            self.cuda_output_format_checkbox.configure(state="normal")
-        else:
-            self.cuda_output_format_checkbox.configure(state="disabled")
+        enabled = self.hwaccel.get() == "cuda"
+        if not enabled:
             self.cuda_output_format.set(False)
+        if self.encoder_options_frame is not None:
+            self.cuda_output_format_checkbox.configure(
+                state="normal" if enabled else "disabled"
+            )
 
     def _on_tune_changed(self):
         """Automatically disable AQ settings when lossless mode is selected"""
@@ -5852,21 +6911,16 @@ class VideoConverterApp:
         if required_height != current_height:
             self.master.geometry(f"820x{required_height}")
 
-    def _update_progress(self, line):
-        if "time=" in line:
-            time_pos = line.find("time=")
-            time_str = line[time_pos + 5 :].split()[0]
-            try:
-                h, m, s = time_str.split(":")
-                total_seconds = int(h) * 3600 + int(m) * 60 + float(s)
-                if not hasattr(self, "total_duration"):
-                    self._get_video_duration()
-                if hasattr(self, "total_duration") and self.total_duration > 0:
-                    progress = total_seconds / self.total_duration
-                    self.progress_value.set(progress)
-                    self.progress_label.configure(text=f"{progress * 100:.1f}%")
-            except Exception:
-                pass
+    def _drain_ui_bus(self):
+        """Apply worker updates on the Tk thread at a fixed rate"""
+        self.ui_bus.drain()
+        self.master.after(UI_BUS_INTERVAL_MS, self._drain_ui_bus)
+
+    def _update_progress(self, snapshot):
+        """Show a progress snapshot from FFmpegProgress"""
+        self.progress_value.set(snapshot["progress"])
+        self.progress_label.configure(text=f"{snapshot['progress'] * 100:.1f}%")
+        self.ffmpeg_output.set(format_progress(snapshot))
 
     # TRIM & TIME LOGIC
     def _create_trim_slider(self):
@@ -5984,6 +7038,9 @@ class VideoConverterApp:
         if width < 10:  # Minimum width
             width = 820
 
+        # Filmstrip behind the track once the sprite has been built
+        self._draw_filmstrip(width)
+
         # Draw the track
         self.trim_canvas.create_line(10, 15, width - 10, 15, fill="#555555", width=3)
 
@@ -5998,11 +7055,51 @@ class VideoConverterApp:
             end_pos - 8, 15 - 8, end_pos + 8, 15 + 8, fill=ACCENT_GREEN, outline=""
         )
 
-        # Draw current selection
-        if start_pos < end_pos:
-            self.trim_canvas.create_rectangle(
-                start_pos, 12, end_pos, 18, fill=ACCENT_GREEN, outline=""
-            )
+        # Draw current selection
+        if start_pos < end_pos:
+            self.trim_canvas.create_rectangle(
+                start_pos, 12, end_pos, 18, fill=ACCENT_GREEN, outline=""
+            )
+
+        self._draw_keyframe_marks(width)
+
+    def _draw_keyframe_marks(self, width):
+        """Keyframe ticks, and where a stream copy will really cut the start"""
+        keyframes = self._input_keyframes()
+        duration = getattr(self, "total_duration", 0) or 0
+        if not keyframes or duration <= 0:
+            return
+
+        track = width - 20
+        if len(keyframes) <= track // 4:  # Only when ticks stay readable
+            for keyframe in keyframes:
+                x = 10 + keyframe / duration * track
+                self.trim_canvas.create_line(x, 25, x, 30, fill=PLACEHOLDER_COLOR)
+
+        if self.trim_streamcopy.get() and not self.precise_trim.get():
+            start_seconds = self._time_str_to_seconds(self.trim_start.get())
+            cut = keyframe_at_or_before(keyframes, start_seconds)
+            if cut is not None:
+                x = 10 + max(0.0, cut) / duration * track
+                self.trim_canvas.create_line(x, 2, x, 28, fill=ACCENT_RED, width=2)
+
+    def _draw_filmstrip(self, width):
+        """Slice the cached sprite into a strip spanning the slider track"""
+        input_f = self.input_file.get()
+        image = None
+        if input_f and not input_f.startswith("Drag and drop"):
+            image = self.filmstrips.load(input_f)
+        if image is None:
+            return
+
+        key = (id(image), width)
+        if self._filmstrip_key != key:
+            from PIL import ImageTk
+
+            strip = self.filmstrips.strip(image, width - 20, 30)
+            self._filmstrip_photo = ImageTk.PhotoImage(strip)
+            self._filmstrip_key = key
+        self.trim_canvas.create_image(10, 0, image=self._filmstrip_photo, anchor="nw")
 
     def _on_slider_click(self, event):
         """Handle click on slider"""
@@ -6043,8 +7140,17 @@ class VideoConverterApp:
         if new_seconds >= self.total_duration:
             new_seconds = max(0, self.total_duration - 0.1)
 
-        # Show preview
-        self._schedule_thumbnail_preview(x, new_seconds)
+        if self.snap_keyframes.get():
+            keyframe = nearest_keyframe(self._input_keyframes() or [], new_seconds)
+            if keyframe is not None and self.dragging_handle == "start":
+                # Whole second at or just after the keyframe, so a stream
+                # copy from there starts exactly on it
+                new_seconds = max(0.0, -(-(keyframe - 0.001) // 1))
+            elif keyframe is not None:
+                new_seconds = min(round(keyframe), self.total_duration)
+
+        # Show preview (cached frames instantly, others from the worker)
+        self._show_thumbnail_preview(x, new_seconds, dragging=True)
 
         if self.dragging_handle == "start":
             # Ensure start doesn't go past end
@@ -6057,1165 +7163,1725 @@ class VideoConverterApp:
             new_seconds = max(new_seconds, start_seconds + 1)  # At least 1 second gap
             self.trim_end.set(self._seconds_to_time_str(new_seconds))
 
-        # Redraw slider and update trim options
-        self._draw_trim_slider()
+        # Redraw slider and update trim options
+        self._draw_trim_slider()
+
+    def _on_slider_release(self, event):
+        # Hide preview popup
+        self._hide_thumbnail_preview()
+
+    def _reset_trim_slider(self):
+        """Reset trim slider to full duration"""
+        self.trim_start.set("00:00:00")
+
+        if self.input_file.get() and not self.input_file.get().startswith(
+            "Drag and drop"
+        ):
+            self._set_trim_end_to_duration()
+        else:
+            self.trim_end.set("00:00:00")
+
+        self._draw_trim_slider()
+
+    def _update_trim_slider(self):
+        """Update slider when video duration changes"""
+        if hasattr(self, "trim_canvas"):
+            self._draw_trim_slider()
+
+    def _jump_trim_to(self, seconds):
+        """Select QUALITY_JUMP_WINDOW seconds around a timestamp on the trim slider"""
+        duration = self._get_video_duration(update_ui=False)
+        if duration <= 0:
+            return
+
+        start = max(0, int(seconds - QUALITY_JUMP_WINDOW / 2))
+        end = min(int(duration), start + QUALITY_JUMP_WINDOW)
+        start = max(0, min(start, end - QUALITY_JUMP_WINDOW))
+
+        if not self.enable_additional_options.get():
+            self.enable_additional_options.set(True)
+            self._toggle_additional_options_frame()
+
+        self.trim_start.set(self._seconds_to_time_str(start))
+        self.trim_end.set(self._seconds_to_time_str(end))
+        self._update_trim_slider()
+        self.status_text.set(
+            f"Trim set to {self._seconds_to_time_str(start)} - "
+            f"{self._seconds_to_time_str(end)}"
+        )
+
+    def _validate_time_format(self, time_str):
+        """Simple validation for HH:MM:SS format"""
+        if not time_str or not isinstance(time_str, str):
+            return False
+
+        parts = time_str.split(":")
+        if len(parts) != 3:
+            return False
+
+        try:
+            hours = int(parts[0])
+            minutes = int(parts[1])
+            seconds = int(parts[2])
+            return 0 <= hours < 24 and 0 <= minutes < 60 and 0 <= seconds < 60
+        except ValueError:
+            return False
+
+    def _validate_trim_time(self, time_var, is_start):
+        """Validate time input only when field loses focus"""
+        time_str = time_var.get()
+
+        # Skip validation if field is empty or doesn't contain colons
+        if not time_str or ":" not in time_str:
+            return True
+
+        # Validate time format
+        if not self._validate_time_format(time_str):
+            messagebox.showerror("Error", "Time format should be HH:MM:SS")
+            return False
+
+        # Convert to seconds
+        time_seconds = max(0, self._time_str_to_seconds(time_str))
+
+        # Get video duration
+        duration = self._get_video_duration(update_ui=False)
+
+        # Check if time exceeds video duration
+        if duration > 0 and time_seconds > duration:
+            messagebox.showerror(
+                "Error",
+                f"Time exceeds video duration ({self._seconds_to_time_str(duration)})",
+            )
+            return False
+
+        # Get the other time value
+        other_time_str = self.trim_end.get() if is_start else self.trim_start.get()
+
+        # Only validate against other time if it's also valid
+        if (
+            other_time_str
+            and ":" in other_time_str
+            and self._validate_time_format(other_time_str)
+        ):
+            other_time_seconds = self._time_str_to_seconds(other_time_str)
+
+            if is_start and time_seconds >= other_time_seconds:
+                messagebox.showerror("Error", "Start time must be before end time")
+                return False
+            elif not is_start and time_seconds <= other_time_seconds:
+                messagebox.showerror("Error", "End time must be after start time")
+                return False
+
+        # Update slider if it exists
+        if hasattr(self, "trim_canvas"):
+            self.master.after(100, self._draw_trim_slider)
+
+        return True
+
+    def _validate_and_update_trim_time(self, time_var, is_start):
+        """Validate time input when Enter is pressed and update slider"""
+        time_str = time_var.get()
+
+        # Skip validation if field is empty or doesn't contain colons
+        if not time_str or ":" not in time_str:
+            return
+
+        # Validate time format
+        if not self._validate_time_format(time_str):
+            messagebox.showerror("Error", "Time format should be HH:MM:SS")
+            return
+
+        # Convert to seconds
+        time_seconds = max(0, self._time_str_to_seconds(time_str))
+
+        # Get video duration
+        duration = self._get_video_duration(update_ui=False)
+
+        # Check if time exceeds video duration
+        if duration > 0 and time_seconds > duration:
+            messagebox.showerror(
+                "Error",
+                f"Time exceeds video duration ({self._seconds_to_time_str(duration)})",
+            )
+            return
+
+        # Get the other time value
+        other_time_str = self.trim_end.get() if is_start else self.trim_start.get()
+
+        # Only validate against other time if it's also valid
+        if (
+            other_time_str
+            and ":" in other_time_str
+            and self._validate_time_format(other_time_str)
+        ):
+            other_time_seconds = self._time_str_to_seconds(other_time_str)
+
+            if is_start and time_seconds >= other_time_seconds:
+                messagebox.showerror("Error", "Start time must be before end time")
+                return
+            elif not is_start and time_seconds <= other_time_seconds:
+                messagebox.showerror("Error", "End time must be after start time")
+                return
+
+        # Update slider if it exists
+        if hasattr(self, "trim_canvas"):
+            self.master.after(100, self._draw_trim_slider)
+
+    def _open_map_window(self):
+        """Open a window to visually select streams for mapping"""
+        if self.map_window and self.map_window.winfo_exists():
+            self.map_window.lift()
+            self.map_window.focus_force()
+            return
+
+        input_file = self.input_file.get()
+        if not input_file or input_file.startswith("Drag and drop"):
+            messagebox.showwarning("Warning", "Please select an input file first.")
+            return
+
+        if not os.path.exists(input_file):
+            messagebox.showwarning("Error", "Input file does not exist.")
+            return
+
+        if not self.ffprobe_path:
+            messagebox.showerror("Error", "ffprobe.exe not found.")
+            return
+
+        # Show map window
+        self.map_window = self._create_stream_map_window(input_file)
+
+    def _create_stream_map_window(self, input_file):
+        map_window = ctk.CTkToplevel(self.master)
+        map_window.title(f"Stream Selection - {os.path.basename(input_file)}")
+
+        map_window.configure(fg_color=PRIMARY_BG)
+        map_window.geometry("600x600")
+        map_window.minsize(600, 550)
+
+        # Center relative to parent
+        self.master.update_idletasks()
+        x = self.master.winfo_x() + (self.master.winfo_width() - 600) // 2
+        y = self.master.winfo_y() + (self.master.winfo_height() - 600) // 2
+        map_window.geometry(f"+{x}+{y}")
+
+        # Ensure window is on top
+        map_window.after(100, map_window.lift)
+        map_window.after(110, map_window.focus_force)
+
+        # Set icon
+        icon_path = get_icon_path()
+        if os.path.exists(icon_path):
+            map_window.after(201, lambda: map_window.iconbitmap(icon_path))
+
+        # Main container
+        main_frame = ctk.CTkFrame(map_window, fg_color=PRIMARY_BG)
+        main_frame.pack(fill="both", expand=True, padx=10, pady=10)
+
+        # Header
+        header_label = ctk.CTkLabel(
+            main_frame,
+            text="Select streams to include in the output file:",
+            font=("Segoe UI", 14),
+            text_color=TEXT_COLOR_W,
+        )
+        header_label.pack(pady=(0, 10))
+
+        # Scrollable area for checkboxes
+        scroll_frame = ctk.CTkScrollableFrame(
+            main_frame,
+            fg_color=SECONDARY_BG,
+            scrollbar_button_color=ACCENT_GREY,
+            scrollbar_button_hover_color=HOVER_GREY,
+        )
+        scroll_frame.pack(fill="both", expand=True, pady=(0, 10))
+
+        # Dictionary to store checkboxes: {idx: {"var": var, "map_code": map_code}}
+        stream_vars = {}
+
+        def add_stream_section(title, streams):
+            if not streams:
+                return
+
+            section_label = ctk.CTkLabel(
+                scroll_frame,
+                text=title,
+                font=("Segoe UI", 13),
+                text_color=TEXT_COLOR_W,
+            )
+            section_label.pack(anchor="w", pady=(10, 5), padx=10)
+
+            for s in streams:
+                idx = s["index"]
+                label_text = s["text"]
+                map_code = s["map_code"]
+
+                # Restore previous selection if available for this file
+                saved_selection = self.map_selection_cache.get(input_file, {})
+                default_val = saved_selection.get(idx, True)
+
+                var = ctk.BooleanVar(value=default_val)
+                stream_vars[idx] = {"var": var, "map_code": map_code}
+
+                cb = ctk.CTkCheckBox(
+                    scroll_frame,
+                    text=label_text,
+                    variable=var,
+                    font=("Segoe UI", 13),
+                    fg_color=ACCENT_GREEN,
+                    hover_color=HOVER_GREEN,
+                    text_color=TEXT_COLOR_W,
+                )
+                cb.pack(anchor="w", padx=25, pady=2)
+
+        loading_label = ctk.CTkLabel(
+            scroll_frame,
+            text="Analyzing file, please wait...",
+            font=("Segoe UI", 13),
+            text_color=ACCENT_GREY,
+        )
+        loading_label.pack(pady=40)
 
-    def _on_slider_release(self, event):
-        # Cancel any scheduled preview job
-        if getattr(self, "preview_job", None):
+        def fetch_and_populate():
             try:
-                self.master.after_cancel(self.preview_job)
-            except Exception:
-                pass
-            self.preview_job = None
-        # Hide preview popup
-        self._hide_thumbnail_preview()
+                info = self.metadata.probe(input_file, self.ffprobe_path)
 
-    def _reset_trim_slider(self):
-        """Reset trim slider to full duration"""
-        self.trim_start.set("00:00:00")
+                v_streams = []
+                p_streams = []
+                a_streams = []
+                s_streams = []
 
-        if self.input_file.get() and not self.input_file.get().startswith(
-            "Drag and drop"
-        ):
-            self._set_trim_end_to_duration()
-        else:
-            self.trim_end.set("00:00:00")
+                v_count = 0
+                a_count = 0
+                s_count = 0
 
-        self._draw_trim_slider()
+                for stream in info.streams:
+                    idx = stream.get("index", 0)
+                    s_type = stream.get("codec_type")
+                    language = stream.get("tags", {}).get("language")
+                    extra = f"({language})" if language else ""
+                    full_text = f"Stream #{idx}{extra}: {info.describe_stream(stream)}"
+
+                    if s_type == "video":
+                        map_code = f"0:v:{v_count}"
+                        v_count += 1
+                        if stream in info.picture_streams:
+                            p_streams.append(
+                                {"index": idx, "text": full_text, "map_code": map_code}
+                            )
+                        else:
+                            v_streams.append(
+                                {"index": idx, "text": full_text, "map_code": map_code}
+                            )
+                    elif s_type == "audio":
+                        map_code = f"0:a:{a_count}"
+                        a_count += 1
+                        a_streams.append(
+                            {"index": idx, "text": full_text, "map_code": map_code}
+                        )
+                    elif s_type == "subtitle":
+                        map_code = f"0:s:{s_count}"
+                        s_count += 1
+                        s_streams.append(
+                            {"index": idx, "text": full_text, "map_code": map_code}
+                        )
 
-    def _update_trim_slider(self):
-        """Update slider when video duration changes"""
-        if hasattr(self, "trim_canvas"):
-            self._draw_trim_slider()
+                def update_ui():
+                    if loading_label.winfo_exists():
+                        loading_label.destroy()
 
-    def _validate_time_format(self, time_str):
-        """Simple validation for HH:MM:SS format"""
-        if not time_str or not isinstance(time_str, str):
-            return False
+                    if not (v_streams or a_streams or s_streams or p_streams):
+                        error_label = ctk.CTkLabel(
+                            scroll_frame,
+                            text="No streams found or error parsing output",
+                            text_color=ACCENT_RED,
+                        )
+                        error_label.pack(pady=20)
+                    else:
+                        add_stream_section("Video", v_streams)
+                        add_stream_section("Audio", a_streams)
+                        add_stream_section("Subtitle", s_streams)
+                        add_stream_section("Pictures", p_streams)
 
-        parts = time_str.split(":")
-        if len(parts) != 3:
-            return False
+                    # Enable buttons now that streams are loaded
+                    apply_btn.configure(state="normal")
+                    check_btn.configure(state="normal")
+                    uncheck_btn.configure(state="normal")
 
-        try:
-            hours = int(parts[0])
-            minutes = int(parts[1])
-            seconds = int(parts[2])
-            return 0 <= hours < 24 and 0 <= minutes < 60 and 0 <= seconds < 60
-        except ValueError:
-            return False
+                map_window.after(0, update_ui)
 
-    def _validate_trim_time(self, time_var, is_start):
-        """Validate time input only when field loses focus"""
-        time_str = time_var.get()
+            except Exception as e:
 
-        # Skip validation if field is empty or doesn't contain colons
-        if not time_str or ":" not in time_str:
-            return True
+                def show_error():
+                    if loading_label.winfo_exists():
+                        loading_label.destroy()
+                    error_label = ctk.CTkLabel(
+                        scroll_frame, text=f"Error: {str(e)}", text_color=ACCENT_RED
+                    )
+                    error_label.pack(pady=20)
 
-        # Validate time format
-        if not self._validate_time_format(time_str):
-            messagebox.showerror("Error", "Time format should be HH:MM:SS")
-            return False
+                map_window.after(0, show_error)
 
-        # Convert to seconds
-        time_seconds = max(0, self._time_str_to_seconds(time_str))
+        # Buttons frame
+        btn_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
+        btn_frame.pack(fill="x", pady=(0, 5))
 
-        # Get video duration
-        duration = self._get_video_duration(update_ui=False)
+        def save_selection():
+            self.map_selection_cache[input_file] = {
+                idx: data["var"].get() for idx, data in stream_vars.items()
+            }
 
-        # Check if time exceeds video duration
-        if duration > 0 and time_seconds > duration:
-            messagebox.showerror(
-                "Error",
-                f"Time exceeds video duration ({self._seconds_to_time_str(duration)})",
-            )
-            return False
+        def apply_map():
+            selected_vars = [data["var"].get() for data in stream_vars.values()]
+            all_selected = all(selected_vars)
 
-        # Get the other time value
-        other_time_str = self.trim_end.get() if is_start else self.trim_start.get()
+            if not any(selected_vars):
+                messagebox.showwarning(
+                    "Warning", "At least one stream must be selected."
+                )
+                return
 
-        # Only validate against other time if it's also valid
-        if (
-            other_time_str
-            and ":" in other_time_str
-            and self._validate_time_format(other_time_str)
-        ):
-            other_time_seconds = self._time_str_to_seconds(other_time_str)
+            save_selection()
 
-            if is_start and time_seconds >= other_time_seconds:
-                messagebox.showerror("Error", "Start time must be before end time")
-                return False
-            elif not is_start and time_seconds <= other_time_seconds:
-                messagebox.showerror("Error", "End time must be after start time")
-                return False
+            current_options = self.additional_options.get()
+            if current_options == self.additional_options_placeholder:
+                current_options = ""
 
-        # Update slider if it exists
-        if hasattr(self, "trim_canvas"):
-            self.master.after(100, self._draw_trim_slider)
+            # Remove old -map and -ignore_unknown
+            cleaned_options = sub(r"-map\s+\S+", "", current_options)
+            cleaned_options = sub(r"-ignore_unknown\s*", "", cleaned_options).strip()
 
-        return True
+            if all_selected:
+                # If everything is selected, we don't need explicit -map 0:x
+                # FFmpeg's default or our default _build_ffmpeg_command logic will handle it
+                new_options = cleaned_options
+            else:
+                selected_codes = [
+                    data["map_code"]
+                    for data in stream_vars.values()
+                    if data["var"].get()
+                ]
+                map_str = "-ignore_unknown " + " ".join(
+                    [f"-map {code}" for code in selected_codes]
+                )
+                new_options = f"{cleaned_options} {map_str}".strip()
 
-    def _validate_and_update_trim_time(self, time_var, is_start):
-        """Validate time input when Enter is pressed and update slider"""
-        time_str = time_var.get()
+            if not new_options:
+                self.additional_options.set(self.additional_options_placeholder)
+                self.additional_options_entry.configure(text_color=PLACEHOLDER_COLOR)
+            else:
+                self.additional_options.set(new_options)
+                self.additional_options_entry.configure(text_color=TEXT_COLOR_W)
 
-        # Skip validation if field is empty or doesn't contain colons
-        if not time_str or ":" not in time_str:
-            return
+            self.map_window = None
+            map_window.destroy()
 
-        # Validate time format
-        if not self._validate_time_format(time_str):
-            messagebox.showerror("Error", "Time format should be HH:MM:SS")
-            return
+        def on_close():
+            if stream_vars:
+                save_selection()
+            self.map_window = None
+            map_window.destroy()
 
-        # Convert to seconds
-        time_seconds = max(0, self._time_str_to_seconds(time_str))
+        def check_all():
+            for data in stream_vars.values():
+                data["var"].set(True)
 
-        # Get video duration
-        duration = self._get_video_duration(update_ui=False)
+        def uncheck_all():
+            for data in stream_vars.values():
+                data["var"].set(False)
 
-        # Check if time exceeds video duration
-        if duration > 0 and time_seconds > duration:
-            messagebox.showerror(
-                "Error",
-                f"Time exceeds video duration ({self._seconds_to_time_str(duration)})",
-            )
-            return
+        apply_btn = ctk.CTkButton(
+            btn_frame,
+            text="Apply",
+            command=apply_map,
+            fg_color=ACCENT_GREEN,
+            hover_color=HOVER_GREEN,
+            text_color=TEXT_COLOR_B,
+            state="disabled",
+        )
+        apply_btn.pack(side="left", expand=True, fill="x", padx=(0, 5))
 
-        # Get the other time value
-        other_time_str = self.trim_end.get() if is_start else self.trim_start.get()
+        check_btn = ctk.CTkButton(
+            btn_frame,
+            text="Check All",
+            command=check_all,
+            fg_color=ACCENT_GREY,
+            hover_color=HOVER_GREY,
+            text_color=TEXT_COLOR_B,
+            state="disabled",
+        )
+        check_btn.pack(side="left", expand=True, fill="x", padx=(0, 5))
 
-        # Only validate against other time if it's also valid
-        if (
-            other_time_str
-            and ":" in other_time_str
-            and self._validate_time_format(other_time_str)
-        ):
-            other_time_seconds = self._time_str_to_seconds(other_time_str)
+        uncheck_btn = ctk.CTkButton(
+            btn_frame,
+            text="Uncheck All",
+            command=uncheck_all,
+            fg_color=ACCENT_GREY,
+            hover_color=HOVER_GREY,
+            text_color=TEXT_COLOR_B,
+            state="disabled",
+        )
+        uncheck_btn.pack(side="left", expand=True, fill="x", padx=(0, 5))
+
+        close_btn = ctk.CTkButton(
+            btn_frame,
+            text="Close",
+            command=on_close,
+            fg_color=ACCENT_GREY,
+            hover_color=HOVER_GREY,
+            text_color=TEXT_COLOR_B,
+        )
+        close_btn.pack(side="left", expand=True, fill="x")
 
-            if is_start and time_seconds >= other_time_seconds:
-                messagebox.showerror("Error", "Start time must be before end time")
-                return
-            elif not is_start and time_seconds <= other_time_seconds:
-                messagebox.showerror("Error", "End time must be after start time")
-                return
+        # Start analysis in background thread now that everything is initialized
+        Thread(target=fetch_and_populate, daemon=True).start()
 
-        # Update slider if it exists
-        if hasattr(self, "trim_canvas"):
-            self.master.after(100, self._draw_trim_slider)
+        map_window.protocol("WM_DELETE_WINDOW", on_close)
+        map_window.lift()
+        map_window.focus_force()
+        return map_window
 
-    def _open_map_window(self):
-        """Open a window to visually select streams for mapping"""
-        if self.map_window and self.map_window.winfo_exists():
-            self.map_window.lift()
-            self.map_window.focus_force()
+    def _add_trim_options(self):
+        """Add trim options to the additional options field"""
+        # Validate both times first
+        if not self._validate_trim_time(
+            self.trim_start, True
+        ) or not self._validate_trim_time(self.trim_end, False):
             return
 
-        input_file = self.input_file.get()
-        if not input_file or input_file.startswith("Drag and drop"):
-            messagebox.showwarning("Warning", "Please select an input file first.")
-            return
+        start_time = self.trim_start.get()
+        end_time = self.trim_end.get()
 
-        if not os.path.exists(input_file):
-            messagebox.showwarning("Error", "Input file does not exist.")
-            return
+        trim_options = f"-ss {start_time} -to {end_time}"
 
-        if not self.ffprobe_path:
-            messagebox.showerror("Error", "ffprobe.exe not found.")
-            return
+        current_options = self.additional_options.get()
+        if current_options == self.additional_options_placeholder:
+            current_options = ""
 
-        # Show map window
-        self.map_window = self._create_stream_map_window(input_file)
+        current_options = self._remove_existing_trim_options(current_options)
 
-    def _create_stream_map_window(self, input_file):
-        map_window = ctk.CTkToplevel(self.master)
-        map_window.title(f"Stream Selection - {os.path.basename(input_file)}")
+        if current_options:
+            new_options = f"{current_options} {trim_options}"
+        else:
+            new_options = trim_options
 
-        map_window.configure(fg_color=PRIMARY_BG)
-        map_window.geometry("600x600")
-        map_window.minsize(600, 550)
+        self.additional_options.set(new_options)
+        self.additional_options_entry.configure(text_color=TEXT_COLOR_W)
 
-        # Center relative to parent
-        self.master.update_idletasks()
-        x = self.master.winfo_x() + (self.master.winfo_width() - 600) // 2
-        y = self.master.winfo_y() + (self.master.winfo_height() - 600) // 2
-        map_window.geometry(f"+{x}+{y}")
+    def _on_streamcopy_toggle(self):
+        self.audio_option.set("copy")
+        self.smart_trim.set(False)
 
-        # Ensure window is on top
-        map_window.after(100, map_window.lift)
-        map_window.after(110, map_window.focus_force)
+    def _on_smart_trim_toggle(self):
+        """Smart trim is a mode of its own, not combined with Copy or Precise"""
+        if self.smart_trim.get():
+            self.trim_streamcopy.set(False)
+            self.precise_trim.set(False)
 
-        # Set icon
-        icon_path = get_icon_path()
-        if os.path.exists(icon_path):
-            map_window.after(201, lambda: map_window.iconbitmap(icon_path))
+    def _remove_existing_trim_options(self, options_str):
+        """Remove any existing trim-related options from the string"""
+        options_str = sub(r"-ss\s+\S+", "", options_str)
+        options_str = sub(r"-to\s+\S+", "", options_str)
+        options_str = sub(r"-c\s+copy", "", options_str)
+        options_str = " ".join(options_str.split())
+        return options_str.strip()
 
-        # Main container
-        main_frame = ctk.CTkFrame(map_window, fg_color=PRIMARY_BG)
-        main_frame.pack(fill="both", expand=True, padx=10, pady=10)
+    # PREVIEW & PLAYBACK
+    def _create_thumbnail_preview(self):
+        """Create a thumbnail preview window"""
+        self.preview_window = None
+        self.preview_label = None
+        self.preview_visible = False
+        self._thumbnail_request = 0
+        self._thumbnail_last_seconds = None
 
-        # Header
-        header_label = ctk.CTkLabel(
-            main_frame,
-            text="Select streams to include in the output file:",
-            font=("Segoe UI", 14),
-            text_color=TEXT_COLOR_W,
+    def _run_preview_job(self, job, samples, join, duration):
+        """Worker thread for the preview samples, reports like _run_ffmpeg"""
+        error = None
+        try:
+            finished = job.run(
+                on_progress=lambda snapshot: self.ui_bus.post(
+                    "progress", self._update_progress, snapshot
+                )
+            )
+        except Exception as e:
+            finished = False
+            error = str(e)
+        self.ui_bus.discard("progress")
+        self.master.after(
+            0,
+            lambda: self._on_preview_finished(
+                job, samples, join, duration, finished, error
+            ),
         )
-        header_label.pack(pady=(0, 10))
 
-        # Scrollable area for checkboxes
-        scroll_frame = ctk.CTkScrollableFrame(
-            main_frame,
-            fg_color=SECONDARY_BG,
-            scrollbar_button_color=ACCENT_GREY,
-            scrollbar_button_hover_color=HOVER_GREY,
-        )
-        scroll_frame.pack(fill="both", expand=True, pady=(0, 10))
+    def _on_preview_finished(self, job, samples, join, duration, finished, error):
+        if not finished:
+            # Failed or cancelled: drop what this run wrote
+            for sample in samples:
+                if sample["command"]:
+                    self.preview_cache.discard(sample["output"])
+            if join and join.get("new"):
+                self.preview_cache.discard(join["output"])
 
-        # Dictionary to store checkboxes: {idx: {"var": var, "map_code": map_code}}
-        stream_vars = {}
+        if self.preview_job is not job:
+            return  # Cancelled, _cancel_preview already reset the UI
+        self.preview_job = None
+        self.is_creating_preview = False
+        self.progress_frame.grid_remove()
+        self.play10s_button.configure(
+            text="Play 10s Preview", fg_color=ACCENT_GREY, hover_color=HOVER_GREY
+        )
 
-        def add_stream_section(title, streams):
-            if not streams:
-                return
+        if not finished:
+            self.status_text.set("Preview creation failed!")
+            self.ffmpeg_output.set(f"Preview error: {error}" if error else "")
+            return
 
-            section_label = ctk.CTkLabel(
-                scroll_frame,
-                text=title,
-                font=("Segoe UI", 13),
-                text_color=TEXT_COLOR_W,
+        for sample in samples:
+            if sample["command"]:
+                self.preview_cache.put(sample["key"], sample["output"])
+        if join:
+            self.preview_cache.put(join["key"], join["output"])
+        self._show_preview_result(samples, join, duration)
+
+    def _show_preview_result(self, samples, join, duration, cached=False):
+        """Per-sample encoder stats, a size estimate from them, then play"""
+        lines = []
+        for sample in samples:
+            kbps = sample["size"] * 8 / 1000 / max(sample["seconds"], 0.001)
+            speed = f"{sample['fps']:.0f} fps" if sample["fps"] else "cached"
+            lines.append(
+                f"{sample['start'] / duration * 100:3.0f}% "
+                f"({format_timestamp(sample['start'])[:8]}): {speed}, "
+                f"{kbps:.0f} kb/s, {format_size_mb(sample['size'] / 1024 / 1024)}"
             )
-            section_label.pack(anchor="w", pady=(10, 5), padx=10)
+        estimate = extrapolate_size_mb(samples, duration)
+        self.estimated_file_size.set(
+            f"Estimated size: {format_size_mb(estimate)} (from preview)"
+        )
+        self.ffmpeg_output.set("\n".join(lines))
+        if cached:
+            self.status_text.set("Preview played from cache")
+        else:
+            self.status_text.set("Preview created successfully!")
 
-            for s in streams:
-                idx = s["index"]
-                label_text = s["text"]
-                map_code = s["map_code"]
+        # Play the joined file, or the sample with the highest bitrate
+        if join:
+            output_path = join["output"]
+        else:
+            output_path = max(
+                samples,
+                key=lambda sample: sample["size"] / max(sample["seconds"], 0.001),
+            )["output"]
+        if os.path.exists(output_path):
+            os.startfile(output_path)
 
-                # Restore previous selection if available for this file
-                saved_selection = self.map_selection_cache.get(input_file, {})
-                default_val = saved_selection.get(idx, True)
+    def _cleanup_preview_files(self):
+        """Clean up preview temporary files"""
+        self.preview_cache.clear()
 
-                var = ctk.BooleanVar(value=default_val)
-                stream_vars[idx] = {"var": var, "map_code": map_code}
+    def _show_thumbnail_preview(self, x_pos, time_seconds, dragging=False):
+        """Show thumbnail preview at specified position and time"""
+        input_f = self.input_file.get()
+        if not input_f or input_f.startswith("Drag and drop"):
+            return
 
-                cb = ctk.CTkCheckBox(
-                    scroll_frame,
-                    text=label_text,
-                    variable=var,
-                    font=("Segoe UI", 13),
-                    fg_color=ACCENT_GREEN,
-                    hover_color=HOVER_GREEN,
-                    text_color=TEXT_COLOR_W,
-                )
-                cb.pack(anchor="w", padx=25, pady=2)
+        if not self.ffmpeg_path or not os.path.exists(input_f):
+            return
 
-        loading_label = ctk.CTkLabel(
-            scroll_frame,
-            text="Analyzing file, please wait...",
-            font=("Segoe UI", 13),
-            text_color=ACCENT_GREY,
+        # Fix for the end (No frame)
+        duration = self._get_video_duration(update_ui=False)
+        if duration > 0 and time_seconds > duration:
+            time_seconds = max(0, duration - 0.1)
+        step = thumbnail_step(duration)
+
+        self._create_preview_window()
+        self._thumbnail_request += 1
+        request = self._thumbnail_request
+
+        try:
+            data = self.thumbnails.get_cached(
+                ThumbnailService.file_identity(input_f), time_seconds, step
+            )
+        except OSError:
+            return
+        if data is not None:
+            self._display_thumbnail(data, x_pos)
+        elif duration > 0:
+            # Nearest filmstrip tile until the exact frame is decoded
+            image = self.filmstrips.load(input_f)
+            if image is not None:
+                tile = self.filmstrips.tile(image, time_seconds / duration)
+                self._display_thumbnail_image(tile, x_pos)
+
+        # Prefetch ahead of the handle in the direction it is being dragged
+        prefetch = []
+        last_seconds = self._thumbnail_last_seconds
+        if dragging and last_seconds is not None and time_seconds != last_seconds:
+            delta = max(abs(time_seconds - last_seconds), step)
+            if time_seconds < last_seconds:
+                delta = -delta
+            prefetch = [
+                time_seconds + delta * i
+                for i in range(1, THUMBNAIL_PREFETCH + 1)
+                if 0 <= time_seconds + delta * i < duration
+            ]
+        self._thumbnail_last_seconds = time_seconds
+
+        self.thumbnails.request(
+            self.ffmpeg_path,
+            input_f,
+            time_seconds,
+            step,
+            lambda data: self.ui_bus.post(
+                "thumbnail", self._on_thumbnail_ready, request, x_pos, data
+            ),
+            prefetch,
         )
-        loading_label.pack(pady=40)
 
-        def fetch_and_populate():
-            try:
-                cmd = [self.ffprobe_path, "-hide_banner", input_file]
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    encoding="utf-8",
-                    errors="replace",
-                    creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
-                )
+    def _create_preview_window(self):
+        """Create the borderless thumbnail window on first use"""
+        if self.preview_window:
+            return
+        self.preview_window = ctk.CTkToplevel(self.master)
+        self.preview_window.title("Preview")
+        self.preview_window.overrideredirect(True)
+        self.preview_window.attributes("-topmost", True)
+        self.preview_window.configure(fg_color=PRIMARY_BG)
+
+        self.preview_label = ctk.CTkLabel(
+            self.preview_window,
+            text="",
+            width=THUMBNAIL_SIZE[0],
+            height=THUMBNAIL_SIZE[1],
+            fg_color=SECONDARY_BG,
+            corner_radius=0,
+        )
+        self.preview_label.pack(padx=0, pady=0)
+        self.preview_window.geometry(f"{THUMBNAIL_SIZE[0]}x{THUMBNAIL_SIZE[1]}")
+        self.preview_window.withdraw()
 
-                # ffprobe output is in stderr for standard info
-                output = result.stderr or result.stdout
+    def _on_thumbnail_ready(self, request, x_pos, data):
+        """Worker result: show it unless a newer hover or a hide came since"""
+        if request != self._thumbnail_request:
+            return
+        if data is None:
+            print("All attempts failed")
+            self.preview_label.configure(text="Preview\nunavailable")
+            return
+        self._display_thumbnail(data, x_pos)
 
-                v_streams = []
-                p_streams = []
-                a_streams = []
-                s_streams = []
+    def _display_thumbnail(self, data, x_pos):
+        try:
+            from PIL import Image
 
-                v_count = 0
-                a_count = 0
-                s_count = 0
+            thumb_image = Image.open(BytesIO(data))
+        except Exception as e:
+            print(f"Error processing image: {e}")
+            self.preview_label.configure(text="Preview\nunavailable")
+            return
+        self._display_thumbnail_image(thumb_image, x_pos)
 
-                # Even more robust regex to handle technical IDs like [0x1], languages (und), etc.
-                stream_pattern = compile(
-                    r"Stream #0:(\d+)(.*?)\s*:\s*(Video|Audio|Subtitle)\s*:\s*(.*)",
-                    IGNORECASE,
-                )
+    def _display_thumbnail_image(self, thumb_image, x_pos):
+        width, height = THUMBNAIL_SIZE
+        try:
+            ctk_thumb = ctk.CTkImage(light_image=thumb_image, size=THUMBNAIL_SIZE)
+            self.preview_label.configure(image=ctk_thumb, text="")
 
-                for line in output.splitlines():
-                    match = stream_pattern.search(line)
-                    if match:
-                        idx = int(match.group(1))
-                        extra = match.group(2).strip()
-                        s_type = match.group(3).capitalize()
-                        desc = match.group(4).strip()
-
-                        full_text = f"Stream #{idx}{extra}: {desc}"
-
-                        if s_type == "Video":
-                            map_code = f"0:v:{v_count}"
-                            v_count += 1
-                            if "attached pic" in desc.lower():
-                                p_streams.append(
-                                    {
-                                        "index": idx,
-                                        "text": full_text,
-                                        "map_code": map_code,
-                                    }
-                                )
-                            else:
-                                v_streams.append(
-                                    {
-                                        "index": idx,
-                                        "text": full_text,
-                                        "map_code": map_code,
-                                    }
-                                )
-                        elif s_type == "Audio":
-                            map_code = f"0:a:{a_count}"
-                            a_count += 1
-                            a_streams.append(
-                                {"index": idx, "text": full_text, "map_code": map_code}
-                            )
-                        elif s_type == "Subtitle":
-                            map_code = f"0:s:{s_count}"
-                            s_count += 1
-                            s_streams.append(
-                                {"index": idx, "text": full_text, "map_code": map_code}
-                            )
+            if self.scaling > 100:
+                # Position preview in the top-left corner of the screen with 10px offset
+                screen_x = 50
+                screen_y = 50
+                self.preview_window.geometry(f"{width}x{height}+{screen_x}+{screen_y}")
 
-                def update_ui():
-                    if loading_label.winfo_exists():
-                        loading_label.destroy()
+            else:
+                # Position preview above slider handle
+                slider_x = self.trim_canvas.winfo_rootx() + x_pos - width // 2
+                slider_y = self.trim_canvas.winfo_rooty() - height - 10
 
-                    if not (v_streams or a_streams or s_streams or p_streams):
-                        error_label = ctk.CTkLabel(
-                            scroll_frame,
-                            text="No streams found or error parsing output",
-                            text_color=ACCENT_RED,
-                        )
-                        error_label.pack(pady=20)
-                    else:
-                        add_stream_section("Video", v_streams)
-                        add_stream_section("Audio", a_streams)
-                        add_stream_section("Subtitle", s_streams)
-                        add_stream_section("Pictures", p_streams)
+                self.preview_window.geometry(f"{width}x{height}+{slider_x}+{slider_y}")
 
-                    # Enable buttons now that streams are loaded
-                    apply_btn.configure(state="normal")
-                    check_btn.configure(state="normal")
-                    uncheck_btn.configure(state="normal")
+            self.preview_window.deiconify()
+            self.preview_visible = True
 
-                map_window.after(0, update_ui)
+        except Exception as e:
+            print(f"Error processing image: {e}")
+            self.preview_label.configure(text="Preview\nunavailable")
 
-            except Exception as e:
+    def _hide_thumbnail_preview(self):
+        """Hide the thumbnail preview"""
+        # Results still in flight must not show the window again
+        self._thumbnail_request += 1
+        self._thumbnail_last_seconds = None
+        self.thumbnails.cancel()
+        if self.preview_window and self.preview_visible:
+            self.preview_window.withdraw()
+            self.preview_visible = False
 
-                def show_error():
-                    if loading_label.winfo_exists():
-                        loading_label.destroy()
-                    error_label = ctk.CTkLabel(
-                        scroll_frame, text=f"Error: {str(e)}", text_color=ACCENT_RED
-                    )
-                    error_label.pack(pady=20)
+    def _play_input_file(self):
+        input_path = self.input_file.get()
+
+        # Check if file is selected
+        if (
+            not input_path
+            or input_path
+            == "Drag and drop a video file here or use the 'Browse' button."
+        ):
+            messagebox.showerror(
+                "Error", "Please select input file using Browse button"
+            )
+            return
+
+        # Normalize path and check if file exists
+        normalized_path = os.path.normpath(input_path)
+        if not os.path.exists(normalized_path):
+            messagebox.showerror("Error", "Input file does not exist")
+            return
 
-                map_window.after(0, show_error)
+        try:
+            # Open file in system default player
+            os.startfile(normalized_path)
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not play file: {str(e)}")
 
-        # Buttons frame
-        btn_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
-        btn_frame.pack(fill="x", pady=(0, 5))
+    def _play_output_file(self):
+        output_path = self.output_file.get()
 
-        def save_selection():
-            self.map_selection_cache[input_file] = {
-                idx: data["var"].get() for idx, data in stream_vars.items()
-            }
+        # Check if output file is specified
+        if not output_path:
+            messagebox.showerror("Error", "Output file is not specified")
+            return
 
-        def apply_map():
-            selected_vars = [data["var"].get() for data in stream_vars.values()]
-            all_selected = all(selected_vars)
+        # Normalize path and check if file exists
+        normalized_path = os.path.normpath(output_path)
+        if not os.path.exists(normalized_path):
+            messagebox.showerror("Error", "Output file does not exist")
+            return
 
-            if not any(selected_vars):
-                messagebox.showwarning(
-                    "Warning", "At least one stream must be selected."
-                )
-                return
+        try:
+            # Open file in system default player
+            os.startfile(normalized_path)
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not play file: {str(e)}")
 
-            save_selection()
+    # PRESETS & UI TOGGLES
+    def _apply_preset(self, preset_name):
 
-            current_options = self.additional_options.get()
-            if current_options == self.additional_options_placeholder:
-                current_options = ""
+        # Clear Additional Options (Trimming)
+        self._clear_all_filters()
+        self._reset_trim_slider()
+        self.trim_streamcopy.set(False)
+        self.precise_trim.set(False)
+        self.smart_trim.set(False)
 
-            # Remove old -map and -ignore_unknown
-            cleaned_options = sub(r"-map\s+\S+", "", current_options)
-            cleaned_options = sub(r"-ignore_unknown\s*", "", cleaned_options).strip()
+        # Default (Reset)
+        if preset_name == "none":
+            # Reset all settings to their initial values
+            self.bitrate.set("6000")
+            self.constant_qp_mode.set(True)
+            self.quality_level.set("30")
+            self.audio_option.set("copy")
+            self.custom_abitrate.set("160")
 
-            if all_selected:
-                # If everything is selected, we don't need explicit -map 0:x
-                # FFmpeg's default or our default _build_ffmpeg_command logic will handle it
-                new_options = cleaned_options
+            # Reset encoder options
+            self.threads.set("4")
+            self.hwaccel.set("cuda")
+            self.cuda_output_format.set(False)
+            self.preset.set("p7")
+            self.tune.set("hq")
+            if self.video_codec.get() == "hevc":
+                self.profile.set("main")
             else:
-                selected_codes = [
-                    data["map_code"]
-                    for data in stream_vars.values()
-                    if data["var"].get()
-                ]
-                map_str = "-ignore_unknown " + " ".join(
-                    [f"-map {code}" for code in selected_codes]
-                )
-                new_options = f"{cleaned_options} {map_str}".strip()
+                self.profile.set("main")
+            self.level.set("auto")
+            self.tier.set("1")
+            self.multipass.set("qres")
+            self.rc.set("vbr")
+            self.lookahead_level.set("auto")
+            self.spatial_aq.set(True)
+            self.temporal_aq.set(True)
+            self.no_scenecut.set(False)
+            self.weighted_pred.set(False)
+            self.strict_gop.set(False)
+            self.split_encode_mode.set("forced")
+            self.coder.set("cabac")
 
-            if not new_options:
-                self.additional_options.set(self.additional_options_placeholder)
-                self.additional_options_entry.configure(text_color=PLACEHOLDER_COLOR)
-            else:
-                self.additional_options.set(new_options)
-                self.additional_options_entry.configure(text_color=TEXT_COLOR_W)
+            # Reset FPS and scaling options
+            self.fps_option.set("source")
+            self.custom_fps.set("30")
+            self.video_format_option.set("source")
+            self.custom_video_width.set("1920")
+            self.interpolation_algo.set("bicubic")
 
-            self.map_window = None
-            map_window.destroy()
+            self._set_preset_indicator(
+                text="Default settings applied", text_color=ACCENT_GREEN
+            )
+            self._on_tune_changed()
+            self._save_settings()
+            self.selected_preset.set("none")
 
-        def on_close():
-            if stream_vars:
-                save_selection()
-            self.map_window = None
-            map_window.destroy()
+        # FHD Fast preset
+        elif preset_name == "fhdf":
+            # Video settings
+            self.bitrate.set("6000")
+            self.constant_qp_mode.set(True)
+            self.quality_level.set("30")
+            self.video_format_option.set("1920")
+            self.interpolation_algo.set("bicubic")
 
-        def check_all():
-            for data in stream_vars.values():
-                data["var"].set(True)
+            # Encoder settings
+            self.cuda_output_format.set(False)
+            self.preset.set("p3")
+            self.tune.set("hq")
+            if self.video_codec.get() == "hevc":
+                self.profile.set("main")
+            else:
+                self.profile.set("high")
+            self.tier.set("1")
+            self.multipass.set("disabled")
+            self.rc.set("vbr")
+            self.lookahead_level.set("0")
+            self.split_encode_mode.set("auto")
 
-        def uncheck_all():
-            for data in stream_vars.values():
-                data["var"].set(False)
+            # Flags
+            self.spatial_aq.set(False)
+            self.temporal_aq.set(False)
+            self.no_scenecut.set(False)
+            self.weighted_pred.set(False)
+            self.strict_gop.set(False)
 
-        apply_btn = ctk.CTkButton(
-            btn_frame,
-            text="Apply",
-            command=apply_map,
-            fg_color=ACCENT_GREEN,
-            hover_color=HOVER_GREEN,
-            text_color=TEXT_COLOR_B,
-            state="disabled",
-        )
-        apply_btn.pack(side="left", expand=True, fill="x", padx=(0, 5))
+            # Audio
+            self.audio_option.set("aac_160k")
 
-        check_btn = ctk.CTkButton(
-            btn_frame,
-            text="Check All",
-            command=check_all,
-            fg_color=ACCENT_GREY,
-            hover_color=HOVER_GREY,
-            text_color=TEXT_COLOR_B,
-            state="disabled",
-        )
-        check_btn.pack(side="left", expand=True, fill="x", padx=(0, 5))
+            self._set_preset_indicator(
+                text="FHD Fast preset applied", text_color=ACCENT_GREEN
+            )
+            self._save_settings()
+            self.selected_preset.set("fhdf")
 
-        uncheck_btn = ctk.CTkButton(
-            btn_frame,
-            text="Uncheck All",
-            command=uncheck_all,
-            fg_color=ACCENT_GREY,
-            hover_color=HOVER_GREY,
-            text_color=TEXT_COLOR_B,
-            state="disabled",
-        )
-        uncheck_btn.pack(side="left", expand=True, fill="x", padx=(0, 5))
+        # FHD Quality preset
+        elif preset_name == "fhdq":
+            # Video settings
+            self.bitrate.set("8000")
+            self.constant_qp_mode.set(True)
+            self.quality_level.set("27")
+            self.video_format_option.set("1920")
+            self.interpolation_algo.set("spline")
 
-        close_btn = ctk.CTkButton(
-            btn_frame,
-            text="Close",
-            command=on_close,
-            fg_color=ACCENT_GREY,
-            hover_color=HOVER_GREY,
-            text_color=TEXT_COLOR_B,
-        )
-        close_btn.pack(side="left", expand=True, fill="x")
+            # Encoder settings
+            self.cuda_output_format.set(False)
+            self.preset.set("p7")
+            self.tune.set("hq")
+            if self.video_codec.get() == "hevc":
+                self.profile.set("main")
+            else:
+                self.profile.set("high")
+            self.tier.set("1")
+            self.multipass.set("fullres")
+            self.rc.set("vbr")
+            if self.video_codec.get() != "h264":
+                self.lookahead_level.set("auto")
+            self.split_encode_mode.set("auto")
 
-        # Start analysis in background thread now that everything is initialized
-        Thread(target=fetch_and_populate, daemon=True).start()
+            # Flags
+            self.spatial_aq.set(True)
+            self.temporal_aq.set(True)
+            self.no_scenecut.set(False)
+            self.weighted_pred.set(False)
+            self.strict_gop.set(False)
 
-        map_window.protocol("WM_DELETE_WINDOW", on_close)
-        map_window.lift()
-        map_window.focus_force()
-        return map_window
+            # Audio
+            self.audio_option.set("aac_160k")
 
-    def _add_trim_options(self):
-        """Add trim options to the additional options field"""
-        # Validate both times first
-        if not self._validate_trim_time(
-            self.trim_start, True
-        ) or not self._validate_trim_time(self.trim_end, False):
-            return
+            self._set_preset_indicator(
+                text="FHD Quality preset applied", text_color=ACCENT_GREEN
+            )
+            self._save_settings()
+            self.selected_preset.set("fhdq")
+
+        # HD Fast preset
+        elif preset_name == "hdf":
+            # Video settings
+            self.bitrate.set("5000")
+            self.constant_qp_mode.set(True)
+            self.quality_level.set("30")
+            self.video_format_option.set("1280")
+            self.interpolation_algo.set("bicubic")
+
+            # Encoder settings
+            self.cuda_output_format.set(False)
+            self.preset.set("p3")
+            self.tune.set("hq")
+            if self.video_codec.get() == "hevc":
+                self.profile.set("main")
+            else:
+                self.profile.set("high")
+            self.tier.set("1")
+            self.multipass.set("disabled")
+            self.rc.set("vbr")
+            self.lookahead_level.set("0")
+            self.split_encode_mode.set("auto")
 
-        start_time = self.trim_start.get()
-        end_time = self.trim_end.get()
+            # Flags
+            self.spatial_aq.set(False)
+            self.temporal_aq.set(False)
+            self.no_scenecut.set(False)
+            self.weighted_pred.set(False)
+            self.strict_gop.set(False)
 
-        trim_options = f"-ss {start_time} -to {end_time}"
+            # Audio
+            self.audio_option.set("aac_160k")
 
-        current_options = self.additional_options.get()
-        if current_options == self.additional_options_placeholder:
-            current_options = ""
+            self._set_preset_indicator(
+                text="HD Fast preset applied", text_color=ACCENT_GREEN
+            )
+            self._save_settings()
+            self.selected_preset.set("hdf")
 
-        current_options = self._remove_existing_trim_options(current_options)
+        # HD Quality preset
+        elif preset_name == "hdq":
+            # Video settings
+            self.bitrate.set("6000")
+            self.constant_qp_mode.set(True)
+            self.quality_level.set("27")
+            self.video_format_option.set("1280")
+            self.interpolation_algo.set("spline")
 
-        if current_options:
-            new_options = f"{current_options} {trim_options}"
-        else:
-            new_options = trim_options
+            # Encoder settings
+            self.cuda_output_format.set(False)
+            self.preset.set("p7")
+            self.tune.set("hq")
+            if self.video_codec.get() == "hevc":
+                self.profile.set("main")
+            else:
+                self.profile.set("high")
+            self.tier.set("1")
+            self.multipass.set("fullres")
+            self.rc.set("vbr")
+            if self.video_codec.get() != "h264":
+                self.lookahead_level.set("auto")
+            self.split_encode_mode.set("auto")
 
-        self.additional_options.set(new_options)
-        self.additional_options_entry.configure(text_color=TEXT_COLOR_W)
+            # Flags
+            self.spatial_aq.set(True)
+            self.temporal_aq.set(True)
+            self.no_scenecut.set(False)
+            self.weighted_pred.set(False)
+            self.strict_gop.set(False)
 
-    def _remove_existing_trim_options(self, options_str):
-        """Remove any existing trim-related options from the string"""
-        options_str = sub(r"-ss\s+\S+", "", options_str)
-        options_str = sub(r"-to\s+\S+", "", options_str)
-        options_str = sub(r"-c\s+copy", "", options_str)
-        options_str = " ".join(options_str.split())
-        return options_str.strip()
+            # Audio
+            self.audio_option.set("aac_160k")
 
-    # PREVIEW & PLAYBACK
-    def _create_thumbnail_preview(self):
-        """Create a thumbnail preview window"""
-        self.preview_window = None
-        self.preview_label = None
-        self.preview_visible = False
+            self._set_preset_indicator(
+                text="HD Quality preset applied", text_color=ACCENT_GREEN
+            )
+            self._save_settings()
+            self.selected_preset.set("hdq")
 
-    def _run_preview_encoding(self, command, output_path):
-        """Run preview encoding with progress tracking"""
-        startupinfo = None
-        creationflags = 0
-        if os.name == "nt":
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            startupinfo.wShowWindow = subprocess.SW_HIDE
-            creationflags = subprocess.CREATE_NO_WINDOW
+    def _apply_auto_encoder_settings(self):
+        """Set all option menus with 'auto' to auto and uncheck all checkboxes."""
+        for child in self.encoder_options_frame.winfo_children():
+            # Recursively go through subframes
+            for (
+                sub_child
+            ) in child.winfo_children():  # Renamed from 'sub' to 'sub_child'
+                # Option Menus
+                if isinstance(sub_child, ctk.CTkOptionMenu):
+                    try:
+                        if "auto" in sub_child._values:
+                            sub_child._variable.set("auto")
+                    except Exception:
+                        pass
 
-        try:
-            process = subprocess.Popen(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
-                startupinfo=startupinfo,
-                creationflags=creationflags,
-                encoding="utf-8",
-                errors="replace",
-            )
-            self.preview_process = process
+                # CheckBoxes
+                if isinstance(sub_child, ctk.CTkCheckBox):
+                    try:
+                        sub_child._variable.set(False)
+                    except Exception:
+                        pass
 
-            # Process output in real-time
-            for line in process.stdout:
-                if not self.is_creating_preview:  # Check if cancelled
-                    process.terminate()
-                    break
+        self._update_cuda_output_format_state()
 
-                if line:
-                    self.master.after(
-                        0, lambda line_text=line: self.ffmpeg_output.set(line_text)
-                    )
-                    self.master.after(
-                        0,
-                        lambda line_text=line: self._update_preview_progress(line_text),
-                    )
+    def _build_encoder_options_frame(self):
+        """Build the advanced encoder panel the first time it is opened"""
+        self.encoder_options_frame = ctk.CTkFrame(
+            self.main_frame, fg_color=SECONDARY_BG
+        )
 
-            process.wait()
+        left_column_frame = ctk.CTkFrame(
+            self.encoder_options_frame, fg_color="transparent"
+        )
+        left_column_frame.grid(
+            row=1, column=0, columnspan=2, padx=5, pady=5, sticky="nsew"
+        )
 
-            if process.returncode == 0 and self.is_creating_preview:
-                self.master.after(
-                    0, lambda: self.status_text.set("Preview created successfully!")
-                )
-                self.master.after(0, lambda: self.ffmpeg_output.set(""))
-                # Play the result
-                if os.path.exists(output_path):
-                    os.startfile(output_path)
-            elif not self.is_creating_preview:
-                self.master.after(
-                    0, lambda: self.status_text.set("Preview creation cancelled")
-                )
-            else:
-                self.master.after(
-                    0, lambda: self.status_text.set("Preview creation failed!")
-                )
+        # FF Threads
+        ctk.CTkLabel(left_column_frame, text="FF Threads:").grid(
+            row=0, column=0, sticky="w", padx=5, pady=2
+        )
+        preset_option_menu = ctk.CTkOptionMenu(
+            left_column_frame,
+            variable=self.threads,
+            values=["auto"] + [str(i) for i in range(1, 17)],
+            fg_color=PRIMARY_BG,
+            button_color=ACCENT_GREEN,
+            button_hover_color=HOVER_GREEN,
+            dropdown_fg_color=SECONDARY_BG,
+            dropdown_hover_color=ACCENT_GREEN,
+        )
+        preset_option_menu.grid(row=0, column=1, sticky="ew", padx=5, pady=2)
 
-        except Exception as e:
-            error_message = f"Preview error: {str(e)}"
-            self.master.after(0, lambda: self.status_text.set(error_message))
-        finally:
-            self.master.after(0, lambda: self.progress_frame.grid_remove())
-            self.is_creating_preview = False
-            self.preview_process = None
-            # Reset button to normal state
-            self.master.after(
-                0,
-                lambda: self.play10s_button.configure(
-                    text="Play 10s Preview",
-                    fg_color=ACCENT_GREY,
-                    hover_color=HOVER_GREY,
-                ),
-            )
+        # Preset
+        ctk.CTkLabel(left_column_frame, text="Preset:").grid(
+            row=1, column=0, sticky="w", padx=5, pady=2
+        )
+        preset_option_menu = ctk.CTkOptionMenu(
+            left_column_frame,
+            variable=self.preset,
+            values=["auto"] + [f"p{i}" for i in range(1, 8)],
+            fg_color=PRIMARY_BG,
+            button_color=ACCENT_GREEN,
+            button_hover_color=HOVER_GREEN,
+            dropdown_fg_color=SECONDARY_BG,
+            dropdown_hover_color=ACCENT_GREEN,
+        )
+        preset_option_menu.grid(row=1, column=1, sticky="ew", padx=5, pady=2)
 
-    def _update_preview_progress(self, line):
-        """Update progress for preview encoding"""
-        if "time=" in line:
-            time_pos = line.find("time=")
-            time_str = line[time_pos + 5 :].split()[0]
-            try:
-                h, m, s = time_str.split(":")
-                total_seconds = int(h) * 3600 + int(m) * 60 + float(s)
-                # Preview is always 10 seconds long
-                progress = min(1.0, total_seconds / 10.0)
-                self.progress_value.set(progress)
-                self.progress_label.configure(text=f"{progress * 100:.1f}%")
-            except Exception:
-                pass
+        # Tune
+        ctk.CTkLabel(left_column_frame, text="Tune:").grid(
+            row=2, column=0, sticky="w", padx=5, pady=2
+        )
+        tune_option_menu = ctk.CTkOptionMenu(
+            left_column_frame,
+            variable=self.tune,
+            values=["auto", "hq", "uhq", "ll", "ull", "lossless"],
+            fg_color=PRIMARY_BG,
+            button_color=ACCENT_GREEN,
+            button_hover_color=HOVER_GREEN,
+            dropdown_fg_color=SECONDARY_BG,
+            dropdown_hover_color=ACCENT_GREEN,
+        )
+        tune_option_menu.grid(row=2, column=1, sticky="ew", padx=5, pady=2)
 
-    def _cleanup_preview_files(self):
-        """Clean up preview temporary files"""
-        for file_path in self.preview_temp_files:
-            try:
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-            except Exception as e:
-                print(f"Error deleting temp file {file_path}: {e}")
-        self.preview_temp_files = []
+        # Profile
+        self.profile_label = ctk.CTkLabel(left_column_frame, text="Profile:")
+        self.profile_label.grid(row=3, column=0, sticky="w", padx=5, pady=2)
+        profile_option_menu = ctk.CTkOptionMenu(
+            left_column_frame,
+            variable=self.profile,
+            values=["auto", "main", "main10", "rext"],
+            fg_color=PRIMARY_BG,
+            button_color=ACCENT_GREEN,
+            button_hover_color=HOVER_GREEN,
+            dropdown_fg_color=SECONDARY_BG,
+            dropdown_hover_color=ACCENT_GREEN,
+        )
+        profile_option_menu.grid(row=3, column=1, sticky="ew", padx=5, pady=2)
 
-    def _show_thumbnail_preview(self, x_pos, time_seconds):
-        """Show thumbnail preview at specified position and time"""
-        self.preview_job = None
-        if not self.input_file.get() or self.input_file.get().startswith(
-            "Drag and drop"
-        ):
-            return
+        # Level
+        ctk.CTkLabel(left_column_frame, text="Level:").grid(
+            row=4, column=0, sticky="w", padx=5, pady=2
+        )
+        level_option_menu = ctk.CTkOptionMenu(
+            left_column_frame,
+            variable=self.level,
+            values=[
+                "auto",
+                "1.0",
+                "2.0",
+                "2.1",
+                "3.0",
+                "3.1",
+                "4.0",
+                "4.1",
+                "5.0",
+                "5.1",
+                "5.2",
+                "6.0",
+                "6.1",
+                "6.2",
+            ],
+            fg_color=PRIMARY_BG,
+            button_color=ACCENT_GREEN,
+            button_hover_color=HOVER_GREEN,
+            dropdown_fg_color=SECONDARY_BG,
+            dropdown_hover_color=ACCENT_GREEN,
+        )
+        level_option_menu.grid(row=4, column=1, sticky="ew", padx=5, pady=2)
 
-        if not self.ffmpeg_path:
-            return
+        # Tier Label (for HEVC and AV1)
+        self.tier_label = ctk.CTkLabel(left_column_frame, text="Tier:")
+        self.tier_label.grid(row=5, column=0, sticky="w", padx=5, pady=2)
 
-        # Fix for the end (No frame)
-        duration = self._get_video_duration(update_ui=False)
-        if duration > 0 and time_seconds > duration:
-            time_seconds = max(0, duration - 0.1)
+        # Tier OptionMenu
+        self.tier_option_menu = ctk.CTkOptionMenu(
+            left_column_frame,
+            variable=self.tier,
+            values=["auto", "0", "1"],
+            fg_color=PRIMARY_BG,
+            button_color=ACCENT_GREEN,
+            button_hover_color=HOVER_GREEN,
+            dropdown_fg_color=SECONDARY_BG,
+            dropdown_hover_color=ACCENT_GREEN,
+        )
+        self.tier_option_menu.grid(row=5, column=1, sticky="ew", padx=5, pady=2)
 
-        # Create preview window if it doesn't exist
-        if not self.preview_window:
-            self.preview_window = ctk.CTkToplevel(self.master)
-            self.preview_window.title("Preview")
-            self.preview_window.overrideredirect(True)
-            self.preview_window.attributes("-topmost", True)
-            self.preview_window.configure(fg_color=PRIMARY_BG)
-
-            self.preview_label = ctk.CTkLabel(
-                self.preview_window,
-                text="",
-                width=352,
-                height=198,
-                fg_color=SECONDARY_BG,
-                corner_radius=0,
-            )
-            self.preview_label.pack(padx=0, pady=0)
-            self.preview_window.geometry("352x198")
+        # Coder Label (only for H.264)
+        self.coder_label = ctk.CTkLabel(left_column_frame, text="Coder:")
+        self.coder_label.grid(row=5, column=0, sticky="w", padx=5, pady=2)
+        self.coder_label.grid_remove()  # hide by default
 
-        process = None
-        success = False
+        # Coder OptionMenu
+        self.coder_option_menu = ctk.CTkOptionMenu(
+            left_column_frame,
+            variable=self.coder,
+            values=["auto", "cabac", "cavlc", "ac", "vlc"],
+            fg_color=PRIMARY_BG,
+            button_color=ACCENT_GREEN,
+            button_hover_color=HOVER_GREEN,
+            dropdown_fg_color=SECONDARY_BG,
+            dropdown_hover_color=ACCENT_GREEN,
+        )
+        self.coder_option_menu.grid(row=5, column=1, sticky="ew", padx=5, pady=2)
+        self.coder_option_menu.grid_remove()  # hide by default
 
-        # Try NV12 first
-        try:
-            cmd_nv12 = [
-                self.ffmpeg_path,
-                "-threads",
-                "1",
-                "-hwaccel",
-                "cuda",
-                "-hwaccel_output_format",
-                "cuda",
-                "-ss",
-                str(time_seconds),
-                "-i",
-                self.input_file.get(),
-                "-vframes",
-                "1",
-                "-vf",
-                "scale_cuda=352:-2:interp_algo=bilinear,hwdownload,format=nv12",
-                "-q:v",
-                "2",
-                "-an",
-                "-f",
-                "mjpeg",
-                "pipe:1",
-            ]
+        # Chunked encoding (parallel NVENC sessions)
+        ctk.CTkLabel(left_column_frame, text="Chunks:").grid(
+            row=6, column=0, sticky="w", padx=5, pady=2
+        )
+        chunked_option_menu = ctk.CTkOptionMenu(
+            left_column_frame,
+            variable=self.chunked_encode,
+            values=CHUNKED_ENCODE_OPTIONS,
+            fg_color=PRIMARY_BG,
+            button_color=ACCENT_GREEN,
+            button_hover_color=HOVER_GREEN,
+            dropdown_fg_color=SECONDARY_BG,
+            dropdown_hover_color=ACCENT_GREEN,
+        )
+        chunked_option_menu.grid(row=6, column=1, sticky="ew", padx=5, pady=2)
+        add_tooltip(
+            chunked_option_menu,
+            message="Split long files at keyframes and encode the chunks\n"
+            "in this many parallel NVENC sessions, then join them without\n"
+            "re-encoding. Audio is encoded once on the side.\n"
+            "Not used with Streamcopy, trimming or a custom command.",
+            bg_color=SECONDARY_BG,
+            text_color=TEXT_COLOR_W,
+            alpha=1.0,
+            corner_radius=6,
+            delay=0.3,
+        )
 
-            process = subprocess.run(
-                cmd_nv12,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                timeout=5,
-                creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
-            )
+        right_column_frame = ctk.CTkFrame(
+            self.encoder_options_frame, fg_color="transparent"
+        )
+        right_column_frame.grid(
+            row=1, column=2, columnspan=2, padx=5, pady=5, sticky="nsew"
+        )
 
-            if process.returncode == 0 and process.stdout:
-                print("NV12 Success")
-                success = True
-            else:
-                raise Exception(f"NV12 failed with return code {process.returncode}")
+        self.tune_option_menu = tune_option_menu
+        self.profile_option_menu = profile_option_menu
+        self.level_option_menu = level_option_menu
 
-        except (subprocess.TimeoutExpired, Exception) as e:
-            print(f"NV12 Failed: {e}")
-            # Try P010LE next
-            try:
-                cmd_p10 = [
-                    self.ffmpeg_path,
-                    "-threads",
-                    "1",
-                    "-hwaccel",
-                    "cuda",
-                    "-hwaccel_output_format",
-                    "cuda",
-                    "-ss",
-                    str(time_seconds),
-                    "-i",
-                    self.input_file.get(),
-                    "-vframes",
-                    "1",
-                    "-vf",
-                    "scale_cuda=352:-2:interp_algo=bilinear,hwdownload,format=p010le",
-                    "-q:v",
-                    "2",
-                    "-an",
-                    "-f",
-                    "mjpeg",
-                    "pipe:1",
-                ]
+        # HW Accel
+        ctk.CTkLabel(right_column_frame, text="HW Accel:").grid(
+            row=0, column=0, sticky="w", padx=5, pady=2
+        )
+        hwaccel_option_menu = ctk.CTkOptionMenu(
+            right_column_frame,
+            variable=self.hwaccel,
+            values=["auto", "cuda", "d3d11va", "d3d12va", "opencl", "vulkan"],
+            command=lambda _: self._update_cuda_output_format_state(),
+            fg_color=PRIMARY_BG,
+            button_color=ACCENT_GREEN,
+            button_hover_color=HOVER_GREEN,
+            dropdown_fg_color=SECONDARY_BG,
+            dropdown_hover_color=ACCENT_GREEN,
+        )
+        hwaccel_option_menu.grid(row=0, column=1, sticky="ew", padx=5, pady=2)
 
-                process = subprocess.run(
-                    cmd_p10,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    timeout=5,
-                    creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
-                )
+        # Multipass
+        ctk.CTkLabel(right_column_frame, text="Multipass:").grid(
+            row=1, column=0, sticky="w", padx=5, pady=2
+        )
+        multipass_option_menu = ctk.CTkOptionMenu(
+            right_column_frame,
+            variable=self.multipass,
+            values=["auto", "disabled", "qres", "fullres"],
+            fg_color=PRIMARY_BG,
+            button_color=ACCENT_GREEN,
+            button_hover_color=HOVER_GREEN,
+            dropdown_fg_color=SECONDARY_BG,
+            dropdown_hover_color=ACCENT_GREEN,
+        )
+        multipass_option_menu.grid(row=1, column=1, sticky="ew", padx=5, pady=2)
 
-                if process.returncode == 0 and process.stdout:
-                    print("P010LE Success")
-                    success = True
-                else:
-                    raise Exception(
-                        f"P010LE failed with return code {process.returncode}"
-                    )
+        # Rate-Control
+        ctk.CTkLabel(right_column_frame, text="Rate-Control:").grid(
+            row=2, column=0, sticky="w", padx=5, pady=2
+        )
+        self.rc_option_menu = ctk.CTkOptionMenu(
+            right_column_frame,
+            variable=self.rc,
+            values=["vbr", "cbr"],
+            fg_color=PRIMARY_BG,
+            button_color=ACCENT_GREEN,
+            button_hover_color=HOVER_GREEN,
+            dropdown_fg_color=SECONDARY_BG,
+            dropdown_hover_color=ACCENT_GREEN,
+        )
+        self.rc_option_menu.grid(row=2, column=1, sticky="ew", padx=5, pady=2)
 
-            except (subprocess.TimeoutExpired, Exception) as e:
-                print(f"P010LE failed: {e}")
-                # Try CPU fallback last
-                try:
-                    cmd_cpu = [
-                        self.ffmpeg_path,
-                        "-ss",
-                        str(time_seconds),
-                        "-i",
-                        self.input_file.get(),
-                        "-vframes",
-                        "1",
-                        "-vf",
-                        "scale=352:-1",
-                        "-q:v",
-                        "2",
-                        "-an",
-                        "-f",
-                        "mjpeg",
-                        "pipe:1",
-                    ]
-
-                    process = subprocess.run(
-                        cmd_cpu,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE,
-                        timeout=5,
-                        creationflags=subprocess.CREATE_NO_WINDOW
-                        if os.name == "nt"
-                        else 0,
-                    )
+        # Lookahead Level
+        self.lookahead_level_label = ctk.CTkLabel(
+            right_column_frame, text="Lookahead Level:"
+        )
+        self.lookahead_level_menu = ctk.CTkOptionMenu(
+            right_column_frame,
+            variable=self.lookahead_level,
+            values=["auto"] + [str(i) for i in range(16)],
+            fg_color=PRIMARY_BG,
+            button_color=ACCENT_GREEN,
+            button_hover_color=HOVER_GREEN,
+            dropdown_fg_color=SECONDARY_BG,
+            dropdown_hover_color=ACCENT_GREEN,
+        )
+        self.lookahead_level_label.grid(row=3, column=0, sticky="w", padx=5, pady=2)
+        self.lookahead_level_menu.grid(row=3, column=1, sticky="ew", padx=5, pady=2)
 
-                    if process.returncode == 0 and process.stdout:
-                        print("CPU Success")
-                        success = True
-                    else:
-                        raise Exception(
-                            f"CPU failed with return code {process.returncode}"
-                        )
+        # Split Encode Mode
+        self.split_encode_label = ctk.CTkLabel(right_column_frame, text="Split Encode:")
+        self.split_encode_label.grid(row=4, column=0, sticky="w", padx=5, pady=2)
 
-                except (subprocess.TimeoutExpired, Exception) as e:
-                    print(f"CPU Failed: {e}")
+        self.split_encode_menu = ctk.CTkOptionMenu(
+            right_column_frame,
+            variable=self.split_encode_mode,
+            values=["auto", "disabled", "forced", "2", "3"],
+            fg_color=PRIMARY_BG,
+            button_color=ACCENT_GREEN,
+            button_hover_color=HOVER_GREEN,
+            dropdown_fg_color=SECONDARY_BG,
+            dropdown_hover_color=ACCENT_GREEN,
+        )
+        self.split_encode_menu.grid(row=4, column=1, sticky="ew", padx=5, pady=2)
 
-        # Process result
-        if success and process and process.stdout:
-            try:
-                img_buffer = BytesIO(process.stdout)
-                thumb_image = Image.open(img_buffer)
-                ctk_thumb = ctk.CTkImage(light_image=thumb_image, size=(352, 198))
-                self.preview_label.configure(image=ctk_thumb, text="")
+        # Checkboxes
+        self.cuda_output_format_checkbox = ctk.CTkCheckBox(
+            right_column_frame,
+            text="CUDA Output Format",
+            variable=self.cuda_output_format,
+            fg_color=ACCENT_GREEN,
+            hover_color=HOVER_GREEN,
+        )
+        self.cuda_output_format_checkbox.grid(
+            row=0, column=2, columnspan=2, sticky="w", padx=15, pady=2
+        )
 
-                if self.scaling > 100:
-                    # Position preview in the top-left corner of the screen with 10px offset
-                    screen_x = 50
-                    screen_y = 50
-                    self.preview_window.geometry(f"352x198+{screen_x}+{screen_y}")
+        ctk.CTkCheckBox(
+            right_column_frame,
+            text="Spatial AQ",
+            variable=self.spatial_aq,
+            fg_color=ACCENT_GREEN,
+            hover_color=HOVER_GREEN,
+        ).grid(row=1, column=2, columnspan=2, sticky="w", padx=15, pady=2)
 
-                else:
-                    # Position preview above slider handle
-                    slider_x = self.trim_canvas.winfo_rootx() + x_pos - 176
-                    slider_y = self.trim_canvas.winfo_rooty() - 208
+        ctk.CTkCheckBox(
+            right_column_frame,
+            text="Temporal AQ",
+            variable=self.temporal_aq,
+            fg_color=ACCENT_GREEN,
+            hover_color=HOVER_GREEN,
+        ).grid(row=2, column=2, columnspan=2, sticky="w", padx=15, pady=2)
 
-                    self.preview_window.geometry(f"352x198+{slider_x}+{slider_y}")
+        ctk.CTkCheckBox(
+            right_column_frame,
+            text="Strict GOP",
+            variable=self.strict_gop,
+            fg_color=ACCENT_GREEN,
+            hover_color=HOVER_GREEN,
+        ).grid(row=3, column=2, columnspan=2, sticky="w", padx=15, pady=2)
 
-                self.preview_window.deiconify()
-                self.preview_visible = True
+        ctk.CTkCheckBox(
+            right_column_frame,
+            text="No-Scenecut",
+            variable=self.no_scenecut,
+            fg_color=ACCENT_GREEN,
+            hover_color=HOVER_GREEN,
+        ).grid(row=4, column=2, columnspan=2, sticky="w", padx=15, pady=2)
 
-            except Exception as e:
-                print(f"Error processing image: {e}")
-                self.preview_label.configure(text="Preview\nunavailable")
-        else:
-            print("All attempts failed")
-            self.preview_label.configure(text="Preview\nunavailable")
+        ctk.CTkCheckBox(
+            right_column_frame,
+            text="Weighted Prediction",
+            variable=self.weighted_pred,
+            fg_color=ACCENT_GREEN,
+            hover_color=HOVER_GREEN,
+        ).grid(row=5, column=2, columnspan=2, sticky="w", padx=15, pady=2)
 
-    def _schedule_thumbnail_preview(self, x_pos, time_seconds, delay=200):
-        """Debounce thumbnail generation: cancel previous and schedule new one."""
-        try:
-            # cancel any pending scheduled preview
-            if getattr(self, "preview_job", None):
-                self.master.after_cancel(self.preview_job)
-        except Exception:
-            pass
+        # Bring the new widgets in line with the current variables
+        self._update_codec_widgets()
+        self._update_cuda_output_format_state()
+        self._update_rc_option_menu_state()
 
-        # schedule a new preview after `delay` ms
-        self.preview_job = self.master.after(
-            delay, lambda: self._show_thumbnail_preview(x_pos, time_seconds)
+    def _build_fps_scale_options_frame(self):
+        """Build the FPS and scaling panel the first time it is opened"""
+        self.fps_scale_options_frame = ctk.CTkFrame(
+            self.main_frame, fg_color=SECONDARY_BG
         )
 
-    def _hide_thumbnail_preview(self):
-        """Hide the thumbnail preview"""
-        if self.preview_window and self.preview_visible:
-            self.preview_window.withdraw()
-            self.preview_visible = False
-
-    def _play_input_file(self):
-        input_path = self.input_file.get()
-
-        # Check if file is selected
-        if (
-            not input_path
-            or input_path
-            == "Drag and drop a video file here or use the 'Browse' button."
-        ):
-            messagebox.showerror(
-                "Error", "Please select input file using Browse button"
-            )
-            return
-
-        # Normalize path and check if file exists
-        normalized_path = os.path.normpath(input_path)
-        if not os.path.exists(normalized_path):
-            messagebox.showerror("Error", "Input file does not exist")
-            return
+        # FPS
+        ctk.CTkLabel(self.fps_scale_options_frame, text="FPS:").grid(
+            row=1, column=0, sticky="w", padx=10, pady=5
+        )
+        fps_options = [
+            ("Source", "source"),
+            ("60", "60"),
+            ("50", "50"),
+            ("30", "30"),
+            ("23.976", "24000/1001"),
+        ]
 
-        try:
-            # Open file in system default player
-            os.startfile(normalized_path)
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not play file: {str(e)}")
+        for i, (text, value) in enumerate(fps_options):
+            rb = ctk.CTkRadioButton(
+                self.fps_scale_options_frame,
+                text=text,
+                variable=self.fps_option,
+                value=value,
+                command=self._toggle_custom_fps_entry,
+                fg_color=ACCENT_GREEN,
+                hover_color=HOVER_GREEN,
+            )
+            rb.grid(row=1, column=i + 1, sticky="w", padx=2)
 
-    def _play_output_file(self):
-        output_path = self.output_file.get()
+        # Custom FPS
+        rb_custom = ctk.CTkRadioButton(
+            self.fps_scale_options_frame,
+            text="Custom",
+            variable=self.fps_option,
+            value="custom",
+            command=self._toggle_custom_fps_entry,
+            fg_color=ACCENT_GREEN,
+            hover_color=HOVER_GREEN,
+        )
+        rb_custom.grid(row=2, column=1, sticky="w", padx=2, pady=(10, 10))
 
-        # Check if output file is specified
-        if not output_path:
-            messagebox.showerror("Error", "Output file is not specified")
-            return
+        self.custom_fps_entry = ctk.CTkEntry(
+            self.fps_scale_options_frame,
+            textvariable=self.custom_fps,
+            width=80,
+            justify="center",
+            fg_color=ACCENT_GREY,
+            text_color=PLACEHOLDER_COLOR,
+        )
+        self.custom_fps_entry.grid(row=2, column=0, sticky="w", padx=20)
+        self.custom_fps_entry.configure(state="disabled")
 
-        # Normalize path and check if file exists
-        normalized_path = os.path.normpath(output_path)
-        if not os.path.exists(normalized_path):
-            messagebox.showerror("Error", "Output file does not exist")
-            return
+        # FPS Mode
+        ctk.CTkLabel(self.fps_scale_options_frame, text="FPS Mode:").grid(
+            row=3, column=0, sticky="w", padx=10, pady=5
+        )
 
-        try:
-            # Open file in system default player
-            os.startfile(normalized_path)
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not play file: {str(e)}")
+        fps_mode_options = [
+            ("Auto", "auto"),
+            ("Constant", "cfr"),
+            ("Variable", "vfr"),
+            ("Passthrough", "passthrough"),
+        ]
 
-    # PRESETS & UI TOGGLES
-    def _apply_preset(self, preset_name):
+        for i, (text, value) in enumerate(fps_mode_options):
+            rb = ctk.CTkRadioButton(
+                self.fps_scale_options_frame,
+                text=text,
+                variable=self.fps_mode,
+                value=value,
+                fg_color=ACCENT_GREEN,
+                hover_color=HOVER_GREEN,
+            )
+            rb.grid(row=3, column=i + 1, sticky="w", padx=2)
 
-        # Clear Additional Options (Trimming)
-        self._clear_all_filters()
-        self._reset_trim_slider()
-        self.trim_streamcopy.set(False)
-        self.precise_trim.set(False)
+        # Video Format
+        ctk.CTkLabel(self.fps_scale_options_frame, text="Video Format:").grid(
+            row=4, column=0, sticky="w", padx=10, pady=2
+        )
+        video_format_options = [
+            ("Source", "source"),
+            ("HD", "1280"),
+            ("FHD", "1920"),
+            ("QHD", "2560"),
+            ("4K", "3840"),
+        ]
 
-        # Default (Reset)
-        if preset_name == "none":
-            # Reset all settings to their initial values
-            self.bitrate.set("6000")
-            self.constant_qp_mode.set(True)
-            self.quality_level.set("30")
-            self.audio_option.set("copy")
-            self.custom_abitrate.set("160")
+        for i, (text, value) in enumerate(video_format_options):
+            rb = ctk.CTkRadioButton(
+                self.fps_scale_options_frame,
+                text=text,
+                variable=self.video_format_option,
+                value=value,
+                command=self._toggle_custom_video_width_entry,
+                fg_color=ACCENT_GREEN,
+                hover_color=HOVER_GREEN,
+            )
+            rb.grid(row=4, column=i + 1, sticky="w", padx=2)
 
-            # Reset encoder options
-            self.threads.set("4")
-            self.hwaccel.set("cuda")
-            self.cuda_output_format.set(False)
-            self.preset.set("p7")
-            self.tune.set("hq")
-            if self.video_codec.get() == "hevc":
-                self.profile.set("main")
-            else:
-                self.profile.set("main")
-            self.level.set("auto")
-            self.tier.set("1")
-            self.multipass.set("qres")
-            self.rc.set("vbr")
-            self.lookahead_level.set("auto")
-            self.spatial_aq.set(True)
-            self.temporal_aq.set(True)
-            self.no_scenecut.set(False)
-            self.weighted_pred.set(False)
-            self.strict_gop.set(False)
-            self.split_encode_mode.set("forced")
-            self.coder.set("cabac")
+        # Custom Video Format
+        rb_custom_video = ctk.CTkRadioButton(
+            self.fps_scale_options_frame,
+            text="Custom",
+            variable=self.video_format_option,
+            value="custom",
+            command=self._toggle_custom_video_width_entry,
+            fg_color=ACCENT_GREEN,
+            hover_color=HOVER_GREEN,
+        )
+        rb_custom_video.grid(row=5, column=1, sticky="w", padx=2, pady=10)
 
-            # Reset FPS and scaling options
-            self.fps_option.set("source")
-            self.custom_fps.set("30")
-            self.video_format_option.set("source")
-            self.custom_video_width.set("1920")
-            self.interpolation_algo.set("bicubic")
+        self.custom_video_width_entry = ctk.CTkEntry(
+            self.fps_scale_options_frame,
+            textvariable=self.custom_video_width,
+            width=80,
+            justify="center",
+            fg_color=ACCENT_GREY,
+            text_color=PLACEHOLDER_COLOR,
+        )
+        self.custom_video_width_entry.grid(row=5, column=0, sticky="w", padx=20)
+        self.custom_video_width_entry.configure(state="disabled")
 
-            self.preset_indicator.configure(
-                text="Default settings applied", text_color=ACCENT_GREEN
-            )
-            self._on_tune_changed()
-            self._save_settings()
-            self.selected_preset.set("none")
+        # Interpolation
+        ctk.CTkLabel(self.fps_scale_options_frame, text="Interpolation Algo:").grid(
+            row=6, column=0, sticky="w", padx=10, pady=10
+        )
 
-        # FHD Fast preset
-        elif preset_name == "fhdf":
-            # Video settings
-            self.bitrate.set("6000")
-            self.constant_qp_mode.set(True)
-            self.quality_level.set("30")
-            self.video_format_option.set("1920")
-            self.interpolation_algo.set("bicubic")
+        interp_option_menu = ctk.CTkOptionMenu(
+            self.fps_scale_options_frame,
+            variable=self.interpolation_algo,
+            values=["bilinear", "bicubic", "neighbor", "area", "lanczos", "spline"],
+            fg_color=PRIMARY_BG,
+            button_color=ACCENT_GREEN,
+            button_hover_color=HOVER_GREEN,
+            dropdown_fg_color=SECONDARY_BG,
+            dropdown_hover_color=ACCENT_GREEN,
+        )
+        interp_option_menu.grid(row=6, column=1, sticky="ew", padx=5, pady=2)
 
-            # Encoder settings
-            self.cuda_output_format.set(False)
-            self.preset.set("p3")
-            self.tune.set("hq")
-            if self.video_codec.get() == "hevc":
-                self.profile.set("main")
-            else:
-                self.profile.set("high")
-            self.tier.set("1")
-            self.multipass.set("disabled")
-            self.rc.set("vbr")
-            self.lookahead_level.set("0")
-            self.split_encode_mode.set("auto")
+        ctk.CTkLabel(
+            self.fps_scale_options_frame,
+            textvariable=self.interpolation_description,
+            text_color=PLACEHOLDER_COLOR,
+            wraplength=100,
+            anchor="w",
+            justify="left",
+        ).grid(row=6, column=2, sticky="w", padx=5)
 
-            # Flags
-            self.spatial_aq.set(False)
-            self.temporal_aq.set(False)
-            self.no_scenecut.set(False)
-            self.weighted_pred.set(False)
-            self.strict_gop.set(False)
+        self._toggle_custom_fps_entry()
+        self._toggle_custom_video_width_entry()
 
-            # Audio
-            self.audio_option.set("aac_160k")
+    def _build_audio_frame(self):
+        """Build the audio panel the first time it is opened"""
+        self.audio_frame = ctk.CTkFrame(self.main_frame, fg_color=SECONDARY_BG)
+        audio_options_subframe = ctk.CTkFrame(self.audio_frame, fg_color="transparent")
+        audio_options_subframe.pack(fill="x", padx=10, pady=5)
 
-            self.preset_indicator.configure(
-                text="FHD Fast preset applied", text_color=ACCENT_GREEN
-            )
-            self._save_settings()
-            self.selected_preset.set("fhdf")
+        first_row_options = [
+            ("Disable", "disable"),
+            ("Source", "copy"),
+            ("AAC 96", "aac_96k"),
+            ("AAC 160", "aac_160k"),
+            ("AAC 256", "aac_256k"),
+        ]
 
-        # FHD Quality preset
-        elif preset_name == "fhdq":
-            # Video settings
-            self.bitrate.set("8000")
-            self.constant_qp_mode.set(True)
-            self.quality_level.set("27")
-            self.video_format_option.set("1920")
-            self.interpolation_algo.set("spline")
+        second_row_options = [
+            ("Opus 96", "opus_96k"),
+            ("Opus 160", "opus_160k"),
+            ("Opus 256", "opus_256k"),
+        ]
 
-            # Encoder settings
-            self.cuda_output_format.set(False)
-            self.preset.set("p7")
-            self.tune.set("hq")
-            if self.video_codec.get() == "hevc":
-                self.profile.set("main")
-            else:
-                self.profile.set("high")
-            self.tier.set("1")
-            self.multipass.set("fullres")
-            self.rc.set("vbr")
-            if self.video_codec.get() != "h264":
-                self.lookahead_level.set("auto")
-            self.split_encode_mode.set("auto")
+        # AAC row
+        for i, (text, value) in enumerate(first_row_options):
+            rb = ctk.CTkRadioButton(
+                audio_options_subframe,
+                text=text,
+                variable=self.audio_option,
+                value=value,
+                command=self._toggle_custom_abitrate,
+                fg_color=ACCENT_GREEN,
+                hover_color=HOVER_GREEN,
+            )
+            rb.grid(row=0, column=i, sticky="w", padx=15, pady=10)
 
-            # Flags
-            self.spatial_aq.set(True)
-            self.temporal_aq.set(True)
-            self.no_scenecut.set(False)
-            self.weighted_pred.set(False)
-            self.strict_gop.set(False)
+        # Custom AAC bitrate
+        self.custom_audio_rb = ctk.CTkRadioButton(
+            audio_options_subframe,
+            text="Custom",
+            variable=self.audio_option,
+            value="custom",
+            command=self._toggle_custom_abitrate,
+            fg_color=ACCENT_GREEN,
+            hover_color=HOVER_GREEN,
+        )
+        self.custom_audio_rb.grid(row=1, column=1, sticky="w", padx=15, pady=2)
 
-            # Audio
-            self.audio_option.set("aac_160k")
+        self.custom_abitrate_entry = ctk.CTkEntry(
+            audio_options_subframe,
+            textvariable=self.custom_abitrate,
+            width=80,
+            justify="center",
+            fg_color=ACCENT_GREY,
+            text_color=PLACEHOLDER_COLOR,
+        )
+        self.custom_abitrate_entry.grid(row=1, column=0, sticky="w", padx=20)
+        self.custom_abitrate_entry.configure(state="disabled")
 
-            self.preset_indicator.configure(
-                text="FHD Quality preset applied", text_color=ACCENT_GREEN
+        # Opus row
+        for i, (text, value) in enumerate(second_row_options):
+            rb = ctk.CTkRadioButton(
+                audio_options_subframe,
+                text=text,
+                variable=self.audio_option,
+                value=value,
+                command=self._toggle_custom_abitrate,
+                fg_color=ACCENT_GREEN,
+                hover_color=HOVER_GREEN,
             )
-            self._save_settings()
-            self.selected_preset.set("fhdq")
-
-        # HD Fast preset
-        elif preset_name == "hdf":
-            # Video settings
-            self.bitrate.set("5000")
-            self.constant_qp_mode.set(True)
-            self.quality_level.set("30")
-            self.video_format_option.set("1280")
-            self.interpolation_algo.set("bicubic")
+            rb.grid(row=1, column=i + 2, sticky="w", padx=15, pady=10)
 
-            # Encoder settings
-            self.cuda_output_format.set(False)
-            self.preset.set("p3")
-            self.tune.set("hq")
-            if self.video_codec.get() == "hevc":
-                self.profile.set("main")
-            else:
-                self.profile.set("high")
-            self.tier.set("1")
-            self.multipass.set("disabled")
-            self.rc.set("vbr")
-            self.lookahead_level.set("0")
-            self.split_encode_mode.set("auto")
+        self._toggle_custom_abitrate()
 
-            # Flags
-            self.spatial_aq.set(False)
-            self.temporal_aq.set(False)
-            self.no_scenecut.set(False)
-            self.weighted_pred.set(False)
-            self.strict_gop.set(False)
+    def _build_presets_frame(self):
+        """Build the presets panel the first time it is opened"""
+        self.presets_frame = ctk.CTkFrame(self.main_frame, fg_color=SECONDARY_BG)
 
-            # Audio
-            self.audio_option.set("aac_160k")
+        preset_options = [
+            ("Default (Reset)", "none"),
+            ("FHD Fast", "fhdf"),
+            ("FHD Quality", "fhdq"),
+            ("HD Fast", "hdf"),
+            ("HD Quality", "hdq"),
+        ]
 
-            self.preset_indicator.configure(
-                text="HD Fast preset applied", text_color=ACCENT_GREEN
+        for i, (text, value) in enumerate(preset_options):
+            rb = ctk.CTkRadioButton(
+                self.presets_frame,
+                text=text,
+                variable=self.selected_preset,
+                value=value,
+                command=lambda v=value: self._apply_preset(v),
+                fg_color=ACCENT_GREEN,
+                hover_color=HOVER_GREEN,
             )
-            self._save_settings()
-            self.selected_preset.set("hdf")
+            rb.grid(row=1, column=i, padx=10, pady=5, sticky="w")
 
-        # HD Quality preset
-        elif preset_name == "hdq":
-            # Video settings
-            self.bitrate.set("6000")
-            self.constant_qp_mode.set(True)
-            self.quality_level.set("27")
-            self.video_format_option.set("1280")
-            self.interpolation_algo.set("spline")
+        custom_row_frame = ctk.CTkFrame(self.presets_frame, fg_color="transparent")
+        custom_row_frame.grid(
+            row=2, column=0, columnspan=5, sticky="ew", padx=0, pady=5
+        )
 
-            # Encoder settings
-            self.cuda_output_format.set(False)
-            self.preset.set("p7")
-            self.tune.set("hq")
-            if self.video_codec.get() == "hevc":
-                self.profile.set("main")
-            else:
-                self.profile.set("high")
-            self.tier.set("1")
-            self.multipass.set("fullres")
-            self.rc.set("vbr")
-            if self.video_codec.get() != "h264":
-                self.lookahead_level.set("auto")
-            self.split_encode_mode.set("auto")
+        # Custom Radio Button
+        self.custom_preset_rb = ctk.CTkRadioButton(
+            custom_row_frame,
+            text="Custom",
+            variable=self.selected_preset,
+            value="custom",
+            command=self._on_custom_preset_selected,
+            fg_color=ACCENT_GREEN,
+            hover_color=HOVER_GREEN,
+        )
+        self.custom_preset_rb.pack(side="left", padx=(10, 5))
 
-            # Flags
-            self.spatial_aq.set(True)
-            self.temporal_aq.set(True)
-            self.no_scenecut.set(False)
-            self.weighted_pred.set(False)
-            self.strict_gop.set(False)
+        # Preset Label
+        ctk.CTkLabel(custom_row_frame, text="Preset:").pack(side="left", padx=(30, 5))
 
-            # Audio
-            self.audio_option.set("aac_160k")
+        # Preset dropdown
+        self.custom_preset_dropdown = ctk.CTkOptionMenu(
+            custom_row_frame,
+            variable=self.custom_preset_name,
+            values=self._get_preset_list(),
+            command=self._load_custom_preset,
+            fg_color=PRIMARY_BG,
+            button_color=ACCENT_GREEN,
+            button_hover_color=HOVER_GREEN,
+            dropdown_fg_color=SECONDARY_BG,
+            dropdown_hover_color=ACCENT_GREEN,
+            width=170,
+            dynamic_resizing=False,
+        )
+        self.custom_preset_dropdown.pack(side="left", padx=5)
 
-            self.preset_indicator.configure(
-                text="HD Quality preset applied", text_color=ACCENT_GREEN
-            )
-            self._save_settings()
-            self.selected_preset.set("hdq")
+        self.save_as_preset_btn = ctk.CTkButton(
+            custom_row_frame,
+            text="Save As",
+            command=self._save_preset_as,
+            fg_color=ACCENT_GREEN,
+            hover_color=HOVER_GREEN,
+            text_color=TEXT_COLOR_B,
+            width=70,
+        )
+        self.save_as_preset_btn.pack(side="left", padx=(15, 5))
 
-    def _apply_auto_encoder_settings(self):
-        """Set all option menus with 'auto' to auto and uncheck all checkboxes."""
-        for child in self.encoder_options_frame.winfo_children():
-            # Recursively go through subframes
-            for (
-                sub_child
-            ) in child.winfo_children():  # Renamed from 'sub' to 'sub_child'
-                # Option Menus
-                if isinstance(sub_child, ctk.CTkOptionMenu):
-                    try:
-                        if "auto" in sub_child._values:
-                            sub_child._variable.set("auto")
-                    except Exception:
-                        pass
+        self.save_preset_btn = ctk.CTkButton(
+            custom_row_frame,
+            text="Save",
+            command=self._save_preset,
+            fg_color=ACCENT_GREEN,
+            hover_color=HOVER_GREEN,
+            text_color=TEXT_COLOR_B,
+            width=60,
+        )
+        self.save_preset_btn.pack(side="left", padx=5)
 
-                # CheckBoxes
-                if isinstance(sub_child, ctk.CTkCheckBox):
-                    try:
-                        sub_child._variable.set(False)
-                    except Exception:
-                        pass
+        self.delete_preset_btn = ctk.CTkButton(
+            custom_row_frame,
+            text="Delete",
+            command=self._delete_preset,
+            fg_color=ACCENT_RED,
+            hover_color=HOVER_RED,
+            text_color=TEXT_COLOR_B,
+            width=60,
+        )
+        self.delete_preset_btn.pack(side="left", padx=5)
 
-        self._update_cuda_output_format_state()
+        # Preset Indicator
+        self.preset_indicator = ctk.CTkLabel(
+            self.presets_frame, **self.preset_indicator_state
+        )
+        self.preset_indicator.grid(
+            row=3, column=0, columnspan=6, padx=10, pady=5, sticky="w"
+        )
 
     def _toggle_encoder_options_frame(self):
         if self.enable_encoder_options.get():
+            if self.encoder_options_frame is None:
+                self._build_encoder_options_frame()
             self.encoder_options_frame.grid(
                 row=6, column=0, columnspan=3, padx=10, pady=5, sticky="ew"
             )
             self.auto_button.grid()
             self.default_button.grid()
         else:
-            self.encoder_options_frame.grid_remove()
+            if self.encoder_options_frame is not None:
+                self.encoder_options_frame.grid_remove()
             self.auto_button.grid_remove()
             self.default_button.grid_remove()
         self._update_window_size()
 
     def _toggle_audio_options_frame(self):
         if self.enable_audio_options.get():
+            if self.audio_frame is None:
+                self._build_audio_frame()
             self.audio_frame.grid(
                 row=10, column=0, columnspan=4, sticky="ew", padx=10, pady=10
             )
-        else:
+        elif self.audio_frame is not None:
             self.audio_frame.grid_forget()
         self._update_window_size()
 
     def _toggle_fps_scale_options_frame(self):
         if self.enable_fps_scale_options.get():
+            if self.fps_scale_options_frame is None:
+                self._build_fps_scale_options_frame()
             self.fps_scale_options_frame.grid(
                 row=8, column=0, columnspan=4, sticky="ew", padx=10, pady=10
             )
-        else:
+        elif self.fps_scale_options_frame is not None:
             self.fps_scale_options_frame.grid_forget()
         self._update_window_size()
 
@@ -7232,14 +8898,18 @@ class VideoConverterApp:
 
     def _toggle_presets_frame(self):
         if self.enable_presets.get():
+            if self.presets_frame is None:
+                self._build_presets_frame()
             self.presets_frame.grid(
                 row=14, column=0, columnspan=4, sticky="ew", padx=10, pady=10
             )
-        else:
+        elif self.presets_frame is not None:
             self.presets_frame.grid_forget()
         self._update_window_size()
 
     def _toggle_custom_fps_entry(self):
+        if self.fps_scale_options_frame is None:
+            return
         if self.fps_option.get() == "custom":
             self.custom_fps_entry.configure(
                 state="normal",
@@ -7255,6 +8925,8 @@ class VideoConverterApp:
             )
 
     def _toggle_custom_video_width_entry(self):
+        if self.fps_scale_options_frame is None:
+            return
         if self.video_format_option.get() == "custom":
             self.custom_video_width_entry.configure(
                 state="normal",
@@ -7270,6 +8942,8 @@ class VideoConverterApp:
             )
 
     def _toggle_custom_abitrate(self):
+        if self.audio_frame is None:
+            return
         if self.audio_option.get() == "custom":
             self.custom_abitrate_entry.configure(
                 state="normal",
@@ -7389,9 +9063,7 @@ class VideoConverterApp:
 
             # Disable Rate-Control selection
             self.rc_locked.set(True)
-            self.rc_option_menu.configure(
-                state="disabled", fg_color=ACCENT_GREY, button_color=ACCENT_GREY
-            )
+            self._update_rc_option_menu_state()
 
             # Disable file size estimation
             self.estimated_file_size.set("Estimated size: Not available for CQP")
@@ -7406,13 +9078,24 @@ class VideoConverterApp:
 
             # Enable Rate-Control selection
             self.rc_locked.set(False)
-            self.rc_option_menu.configure(
-                state="normal", fg_color=PRIMARY_BG, button_color=ACCENT_GREEN
-            )
+            self._update_rc_option_menu_state()
 
             # Enable file size estimation
             self._calculate_estimated_size()
 
+    def _update_rc_option_menu_state(self):
+        """Grey out Rate-Control while it is locked by Constant QP"""
+        if self.encoder_options_frame is None:
+            return
+        if self.rc_locked.get():
+            self.rc_option_menu.configure(
+                state="disabled", fg_color=ACCENT_GREY, button_color=ACCENT_GREY
+            )
+        else:
+            self.rc_option_menu.configure(
+                state="normal", fg_color=PRIMARY_BG, button_color=ACCENT_GREEN
+            )
+
     def _on_options_entry_focus_in(self, event):
         current_text = self.additional_options.get()
         if current_text == self.additional_options_placeholder:
@@ -8077,27 +9760,13 @@ class VideoConverterApp:
                         else "av1_nvenc"
                     )
                 )
-                cmd = [self.ffmpeg_path, "-h", f"encoder={encoder_name}"]
+                args = ["-h", f"encoder={encoder_name}"]
             elif help_type == "filters":
-                cmd = [self.ffmpeg_path, "-filters"]
+                args = ["-filters"]
             else:
-                cmd = [self.ffmpeg_path, "-h"]
+                args = ["-h"]
 
-            startupinfo = None
-            if os.name == "nt":
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                startupinfo.wShowWindow = subprocess.SW_HIDE
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                encoding="utf-8",
-                errors="replace",
-                startupinfo=startupinfo,
-                creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
-            )
-            output = result.stdout or result.stderr
+            output = self.capabilities.help_text(self.ffmpeg_path, args)
             window.after(0, lambda: text_widget.configure(text=output))
         except Exception as e:
             error_msg = f"Error retrieving help information:\n{str(e)}"
@@ -8181,6 +9850,7 @@ class VideoConverterApp:
                     self.status_text.set(
                         "FFmpeg found but FFprobe not found in the same directory"
                     )
+                self._probe_ffmpeg_capabilities()
 
     # SHUTDOWN & CLEANUP
     def _kill_our_ffmpeg_processes(self):
@@ -8256,8 +9926,10 @@ class VideoConverterApp:
         if getattr(self, "is_creating_preview", False):
             self._cancel_preview()
 
-        if getattr(self, "_vmaf_running", False):
-            self._cancel_vmaf()
+        if self.quality_window and self.quality_window.is_running:
+            self.quality_window.cancel_analysis()
+
+        self.filmstrips.cancel()
 
         # Clean up temporary preview files
         self._cleanup_preview_files()
@@ -8267,6 +9939,7 @@ class VideoConverterApp:
 
         # Save current settings
         self._save_settings()
+        self.metadata.save()
 
         # Clean up tray icon if it was created
         if hasattr(self, "_tray_icon") and self._tray_icon:
@@ -8284,8 +9957,10 @@ class VideoConverterApp:
         self.master.quit()
 
 
+startup_timer.mark("definitions")
 icon_path = get_icon_path()
 root = ctk.CTk()
+startup_timer.mark("root window")
 app = VideoConverterApp(root)
 # ctk.deactivate_automatic_dpi_awareness()
 if os.path.exists(icon_path):
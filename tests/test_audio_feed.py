@@ -0,0 +1,129 @@
+"""PcmRingBuffer and PcmSocketFeed counters, with a local socket as ffmpeg"""
+
+import socket
+import time
+from threading import Event, Thread
+
+import nff.core
+from nff.core import PcmRingBuffer, PcmSocketFeed
+
+RATE = 48000
+CHANNELS = 2
+FRAME_BYTES = 2 * CHANNELS
+BLOCK_SECONDS = 0.01
+
+
+def test_ring_wraps_around():
+    ring = PcmRingBuffer(10)
+    assert ring.write(b"abcdef")
+    ring.consume(6)
+    assert ring.write(b"12345678")
+    assert len(ring) == 8
+    # The first peek stops at the end of the buffer
+    first = bytes(ring.peek())
+    assert first == b"1234"
+    ring.consume(len(first))
+    assert bytes(ring.peek()) == b"5678"
+    ring.consume(4)
+    assert len(ring) == 0
+    assert bytes(ring.peek()) == b""
+
+
+def test_ring_drops_whole_writes_that_do_not_fit():
+    ring = PcmRingBuffer(8)
+    assert ring.write(b"abcd")
+    assert not ring.write(b"123456")
+    assert (ring.overflows, ring.bytes_dropped) == (1, 6)
+    assert bytes(ring.peek()) == b"abcd"
+    assert ring.write(b"1234")
+    assert len(ring) == 8
+
+
+class Reader:
+    """Plays ffmpeg: connects to the feed and reads, or stalls"""
+
+    def __init__(self, feed):
+        self.data = bytearray()
+        self.reading = Event()
+        self.reading.set()
+        self._done = Event()
+        self._socket = socket.socket()
+        # A tiny receive buffer so a stall backs up into the ring quickly
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        self._socket.connect(("127.0.0.1", feed.port))
+        self._thread = Thread(target=self._read, daemon=True)
+        self._thread.start()
+
+    def _read(self):
+        while not self._done.is_set():
+            self.reading.wait()
+            try:
+                chunk = self._socket.recv(65536)
+            except OSError:
+                break
+            if not chunk:
+                break
+            self.data += chunk
+
+    def close(self):
+        self._done.set()
+        self.reading.set()
+        self._thread.join(2)
+        self._socket.close()
+
+
+def open_feed(monkeypatch, **kwargs):
+    monkeypatch.setattr(nff.core, "PCM_FEED_SOCKET_BUFFER", 4096)
+    feed = PcmSocketFeed(RATE, CHANNELS, **kwargs)
+    feed.start()
+    reader = Reader(feed)
+    assert feed._connected.wait(2)
+    return feed, reader
+
+
+def test_source_silence_is_padded_once(monkeypatch):
+    feed, reader = open_feed(monkeypatch, max_gap=0.05)
+    time.sleep(0.5)
+    stats = feed.stats()
+    feed.close()
+    reader.close()
+
+    assert stats["underruns"] == 1
+    assert stats["overflows"] == 0
+    assert 0.3 < stats["padded"] < 0.7
+    assert len(reader.data) % FRAME_BYTES == 0
+    assert not any(reader.data)
+
+
+def test_reader_stall_overflows_then_padding_keeps_the_clock(monkeypatch):
+    feed, reader = open_feed(monkeypatch, max_gap=0.05, buffer_seconds=0.1)
+    block = b"\x01" * int(RATE * BLOCK_SECONDS) * FRAME_BYTES
+    started = time.perf_counter()
+
+    def write_for(seconds):
+        # Real-time paced source, like the loopback callback
+        until = time.perf_counter() + seconds
+        while time.perf_counter() < until:
+            feed.write(block)
+            time.sleep(BLOCK_SECONDS)
+
+    write_for(0.2)
+    reader.reading.clear()
+    write_for(0.6)
+    reader.reading.set()
+    write_for(0.4)
+    # Let the writer drain and bridge what the stall dropped
+    time.sleep(0.3)
+    elapsed = time.perf_counter() - started
+    stats = feed.stats()
+    feed.close()
+    reader.close()
+
+    assert stats["overflows"] > 0
+    assert stats["dropped"] > 0.2
+    assert stats["underruns"] >= 1
+    assert stats["padded"] > 0.2
+    # No torn frames and the stream length follows the sample clock
+    assert len(reader.data) % FRAME_BYTES == 0
+    received = len(reader.data) / FRAME_BYTES / RATE
+    assert abs(received - elapsed) < 0.25
@@ -0,0 +1,27 @@
+"""Chunk boundaries for chunked encoding"""
+
+from nff.core import plan_chunk_boundaries
+
+
+def test_boundaries_snap_to_nearest_keyframes():
+    keyframes = [float(second) for second in range(0, 100, 3)]
+    assert plan_chunk_boundaries(keyframes, 100.0, 4, min_length=20.0) == [
+        24.0,
+        51.0,
+        75.0,
+    ]
+
+
+def test_no_chunk_is_shorter_than_min_length():
+    keyframes = [0.0, 10.0, 30.0, 50.0, 90.0, 95.0]
+    # 10 s is too close to the start, 90 s and 95 s too close to the end
+    boundaries = plan_chunk_boundaries(keyframes, 100.0, 4, min_length=20.0)
+    assert boundaries == [30.0, 50.0]
+    edges = [0.0] + boundaries + [100.0]
+    assert all(right - left >= 20.0 for left, right in zip(edges, edges[1:]))
+
+
+def test_short_or_keyframeless_input_is_not_split():
+    assert plan_chunk_boundaries([], 600.0, 4) == []
+    assert plan_chunk_boundaries([0.0, 10.0, 20.0], 30.0, 2, min_length=20.0) == []
+    assert plan_chunk_boundaries([0.0, 50.0], 100.0, 1) == []
@@ -0,0 +1,105 @@
+"""Golden command lists for build_ffmpeg_command"""
+
+import pytest
+
+from nff.core import build_ffmpeg_command, make_encode_settings
+
+AUTO_ENCODER_OPTIONS = (
+    "encoder_preset",
+    "encoder_tune",
+    "encoder_profile",
+    "encoder_level",
+    "encoder_tier",
+    "encoder_coder",
+    "encoder_multipass",
+    "encoder_lookahead_level",
+    "encoder_split_encode_mode",
+    "encoder_hwaccel",
+    "encoder_threads",
+)
+
+
+def build(**settings):
+    return build_ffmpeg_command(
+        "ffmpeg", make_encode_settings(settings), "in.mkv", "out.mp4"
+    )
+
+
+def test_hevc_defaults():
+    assert build() == [
+        "ffmpeg", "-hide_banner",
+        "-hwaccel:v", "cuda", "-threads", "4",
+        "-y", "-i", "in.mkv", "-map", "0", "-ignore_unknown",
+        "-c:v", "copy", "-c:v:0", "hevc_nvenc",
+        "-preset:v:0", "p7", "-tune:v:0", "hq", "-profile:v:0", "main",
+        "-tier:v:0", "1", "-multipass:v:0", "qres",
+        "-split_encode_mode:v:0", "forced",
+        "-spatial_aq:v:0", "1", "-temporal_aq:v:0", "1",
+        "-rc:v:0", "constqp", "-qp:v:0", "30",
+        "-c:a", "copy",
+        "out.mp4",
+    ]  # fmt: skip
+
+
+def test_h264_uses_coder_and_no_tier_or_split_encode():
+    assert build(codec="h264", encoder_profile="high") == [
+        "ffmpeg", "-hide_banner",
+        "-hwaccel:v", "cuda", "-threads", "4",
+        "-y", "-i", "in.mkv", "-map", "0", "-ignore_unknown",
+        "-c:v", "copy", "-c:v:0", "h264_nvenc",
+        "-preset:v:0", "p7", "-tune:v:0", "hq", "-profile:v:0", "high",
+        "-coder:v:0", "cabac", "-multipass:v:0", "qres",
+        "-spatial_aq:v:0", "1", "-temporal_aq:v:0", "1",
+        "-rc:v:0", "constqp", "-qp:v:0", "30",
+        "-c:a", "copy",
+        "out.mp4",
+    ]  # fmt: skip
+
+
+def test_av1_bitrate_mode_without_profile():
+    assert build(codec="av1", constant_qp_mode=False, bitrate="5000") == [
+        "ffmpeg", "-hide_banner",
+        "-hwaccel:v", "cuda", "-threads", "4",
+        "-y", "-i", "in.mkv", "-map", "0", "-ignore_unknown",
+        "-c:v", "copy", "-c:v:0", "av1_nvenc",
+        "-preset:v:0", "p7", "-tune:v:0", "hq",
+        "-tier:v:0", "1", "-multipass:v:0", "qres",
+        "-split_encode_mode:v:0", "forced",
+        "-spatial_aq:v:0", "1", "-temporal_aq:v:0", "1",
+        "-rc:v:0", "vbr", "-b:v:0", "5000k",
+        "-maxrate:v:0", "6000k", "-bufsize:v:0", "12000k",
+        "-c:a", "copy",
+        "out.mp4",
+    ]  # fmt: skip
+
+
+def test_auto_options_are_skipped():
+    settings = {key: "auto" for key in AUTO_ENCODER_OPTIONS}
+    assert build(**settings) == [
+        "ffmpeg", "-hide_banner",
+        "-y", "-i", "in.mkv", "-map", "0", "-ignore_unknown",
+        "-c:v", "copy", "-c:v:0", "hevc_nvenc",
+        "-spatial_aq:v:0", "1", "-temporal_aq:v:0", "1",
+        "-rc:v:0", "constqp", "-qp:v:0", "30",
+        "-c:a", "copy",
+        "out.mp4",
+    ]  # fmt: skip
+
+
+@pytest.mark.parametrize(
+    "hwaccel, cuda_output_format, expected",
+    [
+        ("cuda", False, ["-hwaccel:v", "cuda"]),
+        ("cuda", True, ["-hwaccel:v", "cuda", "-hwaccel_output_format:v", "cuda"]),
+        # The CUDA output format only applies to CUDA decoding
+        ("d3d11va", True, ["-hwaccel:v", "d3d11va"]),
+        ("auto", True, []),
+    ],
+)
+def test_hwaccel_and_cuda_output_format(hwaccel, cuda_output_format, expected):
+    command = build(
+        encoder_hwaccel=hwaccel,
+        cuda_output_format=cuda_output_format,
+        encoder_threads="auto",
+    )
+    assert command[2 : command.index("-y")] == expected
@@ -0,0 +1,87 @@
+"""FFmpegProgress parsing of `-progress` key=value blocks"""
+
+from nff.core import FFmpegProgress, format_progress
+
+
+def feed_block(parser, **values):
+    for key, value in values.items():
+        assert parser.feed(f"{key}={value}\n")
+
+
+def test_block_is_published_on_progress_key():
+    progress = FFmpegProgress(duration=100.0)
+    feed_block(
+        progress,
+        frame="1500",
+        fps="250.0",
+        bitrate="4000.0kbits/s",
+        total_size="12582912",
+        out_time_us="25000000",
+        dup_frames="2",
+        drop_frames="1",
+        speed="5.0x",
+    )
+    assert progress.latest is None
+    feed_block(progress, progress="continue")
+
+    snapshot = progress.poll()
+    assert snapshot["frame"] == 1500
+    assert snapshot["out_time"] == 25.0
+    assert snapshot["speed"] == 5.0
+    assert snapshot["progress"] == 0.25
+    assert snapshot["eta"] == 15.0
+    assert (snapshot["dup"], snapshot["drop"]) == (2, 1)
+    assert not snapshot["done"]
+    assert "dup=2 drop=1" in format_progress(snapshot)
+
+
+def test_not_available_values_read_as_zero():
+    # ffmpeg reports N/A before the first frame is written
+    progress = FFmpegProgress(duration=60.0)
+    feed_block(
+        progress,
+        frame="0",
+        fps="0.00",
+        bitrate="N/A",
+        total_size="N/A",
+        out_time_us="N/A",
+        out_time_ms="N/A",
+        out_time="N/A",
+        dup_frames="0",
+        drop_frames="0",
+        speed="N/A",
+        progress="continue",
+    )
+    snapshot = progress.poll()
+    assert snapshot["out_time"] == 0.0
+    assert snapshot["speed"] == 0.0
+    assert snapshot["total_size"] == 0
+    assert snapshot["progress"] == 0.0
+    assert snapshot["eta"] is None
+    format_progress(snapshot)
+
+
+def test_out_time_ms_is_read_as_microseconds():
+    progress = FFmpegProgress(duration=10.0)
+    feed_block(progress, out_time_us="N/A", out_time_ms="4000000", progress="continue")
+    assert progress.poll()["out_time"] == 4.0
+
+
+def test_end_block_completes_and_is_never_throttled():
+    progress = FFmpegProgress(duration=10.0)
+    feed_block(progress, out_time_us="9000000", speed="1x", progress="continue")
+    assert progress.poll() is not None
+    feed_block(progress, out_time_us="9500000", progress="continue")
+    assert progress.poll() is None  # Inside PROGRESS_UPDATE_INTERVAL
+    feed_block(progress, out_time_us="9960000", progress="end")
+    snapshot = progress.poll()
+    assert snapshot["done"]
+    assert snapshot["progress"] == 1.0
+
+
+def test_log_lines_are_not_progress():
+    progress = FFmpegProgress()
+    assert not progress.feed("[hevc_nvenc @ 0x1] Using CUDA device 0\n")
+    assert not progress.feed("Stream mapping:\n")
+    assert progress.feed("stream_0_0_q=28.0\n")
+    assert progress.latest is None
@@ -0,0 +1,33 @@
+"""Target quality QP bisection"""
+
+from nff.core import QP_SEARCH_STEPS, search_target_qp
+
+
+def make_evaluate(scores):
+    """evaluate(qp) over a falling score curve, recording every QP tried"""
+    tried = []
+
+    def evaluate(qp):
+        tried.append(qp)
+        return scores(qp), 10000 // qp
+
+    return evaluate, tried
+
+
+def test_finds_highest_passing_qp():
+    evaluate, tried = make_evaluate(lambda qp: 100.0 - qp)
+    # 100 - qp >= 70 up to qp 30
+    assert search_target_qp(evaluate, 70.0, low=15, high=45) == (30, 70.0, 333)
+    assert len(tried) <= QP_SEARCH_STEPS
+    assert len(set(tried)) == len(tried)
+
+
+def test_returns_highest_qp_when_everything_passes():
+    evaluate, _ = make_evaluate(lambda qp: 99.0)
+    assert search_target_qp(evaluate, 90.0, low=15, high=45)[0] == 45
+
+
+def test_returns_none_when_lowest_qp_misses():
+    evaluate, tried = make_evaluate(lambda qp: 80.0 - qp)
+    assert search_target_qp(evaluate, 95.0, low=15, high=45) is None
+    assert min(tried) == 15
@@ -0,0 +1,62 @@
+"""Quality score pooling, per-segment merging and worst frames"""
+
+import pytest
+
+from nff.core import merge_quality_segments, summarize_quality, worst_quality_frames
+
+
+def test_summary_of_known_scores():
+    summary = summarize_quality([float(score) for score in range(101)])
+    assert summary["frames"] == 101
+    assert summary["mean"] == 50.0
+    assert summary["min"] == 0.0
+    # rank (101 - 1) * 0.01 = 1 lands exactly on the second score
+    assert summary["p1"] == 1.0
+
+
+def test_first_percentile_interpolates_between_neighbours():
+    # rank (2 - 1) * 0.01 = 0.01 of the way from 10 to 20
+    assert summarize_quality([20.0, 10.0])["p1"] == pytest.approx(10.1)
+
+
+def test_harmonic_mean_uses_libvmaf_shift():
+    # 2 / (1 / (1 + 1) + 1 / (3 + 1)) - 1
+    assert summarize_quality([1.0, 3.0])["harmonic_mean"] == pytest.approx(5 / 3)
+    # Zero scores stay finite
+    assert summarize_quality([0.0, 0.0])["harmonic_mean"] == 0.0
+
+
+def test_harmonic_mean_weighs_dips_more_than_mean():
+    summary = summarize_quality([95.0] * 99 + [20.0])
+    assert summary["harmonic_mean"] < summary["mean"]
+    assert summary["min"] == 20.0
+
+
+def test_empty_scores_have_no_summary():
+    assert summarize_quality([]) is None
+
+
+def test_segments_are_merged_in_time_order():
+    segments = [(10.0, [70.0, 71.0]), (0.0, [90.0, 91.0])]
+    assert merge_quality_segments(segments, fps=2.0) == [
+        (0.0, 90.0),
+        (0.5, 91.0),
+        (10.0, 70.0),
+        (10.5, 71.0),
+    ]
+
+
+def test_worst_frames_are_spread_apart():
+    frames = [(0.0, 50.0), (0.5, 40.0), (1.0, 45.0), (5.0, 60.0), (9.0, 30.0)]
+    # 0.5 s and 1.0 s are within `spacing` of the 40.0 dip at 0.5 s
+    assert worst_quality_frames(frames, count=3, spacing=2.0) == [
+        (9.0, 30.0),
+        (0.5, 40.0),
+        (5.0, 60.0),
+    ]
+
+
+def test_worst_frames_stop_at_count():
+    frames = [(float(second), float(second)) for second in range(100)]
+    worst = worst_quality_frames(frames, count=2, spacing=1.0)
+    assert worst == [(0.0, 0.0), (1.0, 1.0)]
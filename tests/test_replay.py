@@ -0,0 +1,234 @@
+"""Instant replay ring, snapshots and clip joining, without ffmpeg"""
+
+import os
+import time
+
+import pytest
+
+from nff.core import (
+    REPLAY_SEGMENT_PATTERN,
+    ReplayBuffer,
+    ReplayClipJob,
+    build_audio_options,
+    replay_audio_options,
+)
+
+AUDIO_OPTIONS = [
+    "disable",
+    "copy",
+    "aac_96k",
+    "aac_160k",
+    "aac_256k",
+    "opus_96k",
+    "opus_160k",
+    "opus_256k",
+    "custom",
+]
+# Audio encoders whose streams MPEG-TS can carry as regular audio
+MPEGTS_AUDIO_CODECS = {"aac", "ac3", "eac3", "libmp3lame", "mp2"}
+
+
+def write_segments(buffer, count, first=0):
+    """Fake ffmpeg: numbered segments, one segment length apart in mtime"""
+    now = time.time()
+    paths = []
+    for number in range(first, first + count):
+        path = os.path.join(buffer.directory, REPLAY_SEGMENT_PATTERN % number)
+        with open(path, "wb") as f:
+            f.write(b"segment %d" % number)
+        mtime = now - (first + count - number) * buffer.segment_seconds
+        os.utime(path, (mtime, mtime))
+        paths.append(path)
+    return paths
+
+
+def read_list(clip_dir):
+    with open(os.path.join(clip_dir, "list.txt"), encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+@pytest.fixture
+def ring(tmp_path):
+    # 1 minute of 2 s segments
+    return ReplayBuffer(str(tmp_path / "replay"), 1, segment_seconds=2)
+
+
+def test_capacity_covers_the_buffer_length(tmp_path):
+    assert ReplayBuffer(str(tmp_path / "a"), 1, 2).capacity == 30
+    assert ReplayBuffer(str(tmp_path / "b"), 5, 3).capacity == 100
+    assert ReplayBuffer(str(tmp_path / "c"), 1, 7).capacity == 9
+
+
+def test_stale_segments_are_removed_at_start(tmp_path):
+    directory = tmp_path / "replay"
+    directory.mkdir()
+    (directory / "replay_000001.ts").write_bytes(b"old")
+    ReplayBuffer(str(directory), 1)
+    assert os.listdir(directory) == []
+
+
+def test_prune_keeps_only_the_last_minutes(ring):
+    paths = write_segments(ring, 45)
+    ring.prune()
+    # 30 complete segments plus the one ffmpeg is still writing
+    assert ring._segments() == paths[-31:]
+    assert ring.complete_segments() == paths[-31:-1]
+
+
+def test_prune_keeps_a_short_ring_whole(ring):
+    paths = write_segments(ring, 5)
+    ring.prune()
+    assert ring._segments() == paths
+    assert ring.complete_segments() == paths[:-1]
+
+
+def test_prune_thread_bounds_the_ring(tmp_path):
+    buffer = ReplayBuffer(str(tmp_path / "replay"), 1, segment_seconds=0.02)
+    buffer.capacity = 3
+    buffer.start()
+    try:
+        write_segments(buffer, 10)
+        time.sleep(0.1)
+        assert len(buffer._segments()) == 4
+    finally:
+        buffer.stop()
+    assert buffer._segments() == []
+
+
+def test_snapshot_links_complete_segments_and_leaves_the_ring(ring):
+    paths = write_segments(ring, 45)
+    ring.prune()
+    before = ring._segments()
+
+    clip_dir, seconds = ring.snapshot()
+    assert seconds == 30 * 2
+    names = [os.path.basename(path) for path in paths[-31:-1]]
+    assert read_list(clip_dir) == [f"file '{name}'" for name in names]
+    for name in names:
+        linked = os.stat(os.path.join(clip_dir, name))
+        assert linked.st_ino == os.stat(os.path.join(ring.directory, name)).st_ino
+
+    # The ring is untouched and the clip folder is no segment
+    assert ring._segments() == before
+    ring.prune()
+    assert ring._segments() == before
+
+    # Pruning after the snapshot does not touch the clip
+    write_segments(ring, 10, first=45)
+    ring.prune()
+    assert sorted(os.listdir(clip_dir)) == sorted(names + ["list.txt"])
+
+
+def test_snapshot_copies_without_hard_links(ring, monkeypatch):
+    write_segments(ring, 4)
+
+    def no_link(source, target):
+        raise PermissionError("hard links not supported")
+
+    monkeypatch.setattr(os, "link", no_link)
+    clip_dir, seconds = ring.snapshot()
+    assert seconds == 3 * 2
+    for name in ("replay_000000.ts", "replay_000001.ts", "replay_000002.ts"):
+        with open(os.path.join(clip_dir, name), "rb") as f:
+            assert f.read().startswith(b"segment")
+    assert len(ring._segments()) == 4
+
+
+def test_snapshot_skips_segments_pruned_meanwhile(ring, monkeypatch):
+    write_segments(ring, 4)
+    link = os.link
+
+    def pruned_first(source, target):
+        if source.endswith("replay_000000.ts"):
+            raise FileNotFoundError(source)
+        link(source, target)
+
+    monkeypatch.setattr(os, "link", pruned_first)
+    clip_dir, seconds = ring.snapshot()
+    assert seconds == 2 * 2
+    assert read_list(clip_dir) == [
+        "file 'replay_000001.ts'",
+        "file 'replay_000002.ts'",
+    ]
+
+
+def test_concat_list_escapes_quotes(ring):
+    for name in ("replay_it's.ts", "replay_zz.ts"):
+        with open(os.path.join(ring.directory, name), "wb") as f:
+            f.write(b"x")
+    clip_dir, _ = ring.snapshot()
+    assert read_list(clip_dir) == ["file 'replay_it'\\''s.ts'"]
+
+
+def test_empty_ring_gives_an_empty_snapshot(ring):
+    clip_dir, seconds = ring.snapshot()
+    assert seconds == 0
+    assert read_list(clip_dir) == []
+
+
+def test_stop_deletes_the_ring_but_keeps_clips(ring):
+    write_segments(ring, 5)
+    clip_dir, _ = ring.snapshot()
+    ring.stop()
+    assert ring._segments() == []
+    assert len(os.listdir(clip_dir)) == 5
+
+
+def test_clip_job_joins_the_snapshot_and_removes_it(ring, monkeypatch):
+    write_segments(ring, 5)
+    clip_dir, _ = ring.snapshot()
+    job = ReplayClipJob("ffmpeg", clip_dir, "clip.mp4")
+    runs = []
+
+    def run_process(command, cwd, name):
+        runs.append((command, cwd, name))
+        assert os.path.exists(os.path.join(cwd, "list.txt"))
+
+    monkeypatch.setattr(job, "_run_process", run_process)
+    assert job.run()
+    command, cwd, _ = runs[0]
+    assert cwd == clip_dir
+    assert command[command.index("-f") + 1] == "concat"
+    assert command[command.index("-i") + 1] == "list.txt"
+    assert command[command.index("-c") + 1] == "copy"
+    assert command[-1] == "clip.mp4"
+    assert not os.path.exists(clip_dir)
+
+
+def test_clip_folder_is_removed_when_the_join_fails(ring, monkeypatch):
+    write_segments(ring, 3)
+    clip_dir, _ = ring.snapshot()
+    job = ReplayClipJob("ffmpeg", clip_dir, "clip.mp4")
+
+    def run_process(command, cwd, name):
+        raise RuntimeError("join failed")
+
+    monkeypatch.setattr(job, "_run_process", run_process)
+    with pytest.raises(RuntimeError):
+        job.run()
+    assert not os.path.exists(clip_dir)
+
+
+@pytest.mark.parametrize("audio_option", AUDIO_OPTIONS)
+def test_replay_segments_are_valid_mpegts(ring, audio_option):
+    audio = replay_audio_options(build_audio_options(audio_option, "192"))
+    command = audio + ring.output_args()
+    assert command[command.index("-f") + 1] == "segment"
+    assert command[command.index("-segment_format") + 1] == "mpegts"
+    if audio_option == "disable":
+        assert audio == ["-an"]
+    else:
+        assert command[command.index("-c:a") + 1] in MPEGTS_AUDIO_CODECS
+        assert "-b:a" in command
+
+
+def test_replay_audio_keeps_bitrate_and_aac_choices():
+    assert replay_audio_options(["-c:a", "copy"]) == ["-c:a", "aac", "-b:a", "160k"]
+    assert replay_audio_options(["-c:a", "libopus", "-b:a", "96k"]) == [
+        "-c:a",
+        "aac",
+        "-b:a",
+        "96k",
+    ]
+    aac = ["-c:a", "aac", "-b:a", "256k"]
+    assert replay_audio_options(aac) == aac
@@ -0,0 +1,55 @@
+"""SmartCut plans and boundary re-encode commands"""
+
+from nff.core import MediaInfo, SmartCut, make_encode_settings, plan_smart_cut
+
+PROBE = {
+    "format": {"duration": "60.0", "bit_rate": "8000000"},
+    "streams": [
+        {
+            "codec_type": "video",
+            "codec_name": "h264",
+            "profile": "High",
+            "pix_fmt": "yuv420p",
+            "avg_frame_rate": "30/1",
+            "bit_rate": "7000000",
+        }
+    ],
+}
+
+KEYFRAMES = [0.0, 2.0, 4.0, 6.0, 8.0, 10.0]
+FRAME_TIME = 1 / 30
+
+
+def encode_command(**settings):
+    info = MediaInfo("in.mp4", PROBE)
+    job = SmartCut("ffmpeg", "ffprobe", make_encode_settings(settings), info, "out.mp4")
+    return job._encode_command(0.0, 2.0, "head", "work")
+
+
+def test_encode_command_passes_the_preset():
+    command = encode_command(encoder_preset="p5")
+    assert command[command.index("-preset") + 1] == "p5"
+
+
+def test_encode_command_skips_auto_preset():
+    assert "-preset" not in encode_command(encoder_preset="auto")
+
+
+def test_cuts_on_keyframes_are_copied_whole():
+    assert plan_smart_cut(KEYFRAMES, 2.0, 8.0, FRAME_TIME) == [("copy", 2.0, 8.0)]
+
+
+def test_cuts_between_keyframes_encode_head_and_tail():
+    assert plan_smart_cut(KEYFRAMES, 1.0, 9.0, FRAME_TIME) == [
+        ("encode", 1.0, 2.0),
+        ("copy", 2.0, 8.0),
+        ("encode", 8.0, 9.0),
+    ]
+
+
+def test_cut_within_half_a_frame_of_a_keyframe_snaps_to_it():
+    assert plan_smart_cut(KEYFRAMES, 2.01, 7.99, FRAME_TIME) == [("copy", 2.0, 8.0)]
+
+
+def test_cut_inside_one_gop_is_encoded():
+    assert plan_smart_cut(KEYFRAMES, 2.5, 3.5, FRAME_TIME) == [("encode", 2.5, 3.5)]
@@ -0,0 +1,71 @@
+"""UiUpdateBus coalescing and drain order, no display needed"""
+
+from threading import Thread
+
+from nff.core import UiUpdateBus
+
+
+def test_post_keeps_only_the_latest_update_per_key():
+    bus = UiUpdateBus()
+    seen = []
+    for value in range(100):
+        bus.post("progress", seen.append, value)
+    assert bus.drain() == 1
+    assert seen == [99]
+
+
+def test_drain_runs_updates_in_order_of_their_latest_post():
+    bus = UiUpdateBus()
+    seen = []
+    bus.post("a", seen.append, "a1")
+    bus.post("b", seen.append, "b1")
+    bus.post("c", seen.append, "c1")
+    bus.post("a", seen.append, "a2")
+    assert bus.drain() == 3
+    assert seen == ["b1", "c1", "a2"]
+
+
+def test_drain_empties_the_bus():
+    bus = UiUpdateBus()
+    seen = []
+    bus.post("a", seen.append, 1)
+    bus.drain()
+    assert bus.drain() == 0
+    assert seen == [1]
+
+
+def test_discard_drops_a_pending_update():
+    bus = UiUpdateBus()
+    seen = []
+    bus.post("progress", seen.append, "50%")
+    bus.post("status", seen.append, "done")
+    bus.discard("progress")
+    bus.discard("missing")
+    assert bus.drain() == 1
+    assert seen == ["done"]
+
+
+def test_failing_callback_does_not_stop_the_drain():
+    bus = UiUpdateBus()
+    seen = []
+    bus.post("bad", lambda: 1 / 0)
+    bus.post("good", seen.append, "ok")
+    assert bus.drain() == 2
+    assert seen == ["ok"]
+
+
+def test_posts_from_many_threads_coalesce():
+    bus = UiUpdateBus()
+    seen = []
+
+    def worker(key):
+        for value in range(1000):
+            bus.post(key, seen.append, (key, value))
+
+    threads = [Thread(target=worker, args=(key,)) for key in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert bus.drain() == 4
+    assert sorted(seen) == [(key, 999) for key in range(4)]